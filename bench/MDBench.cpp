@@ -1,6 +1,9 @@
 #include "MDBench.hpp"
 #include <benchmark/benchmark.h>
+#include <fstream>
+#include <iterator>
 #include <sstream>
+#include <vector>
 
 static void
 LineGetStateDeriv(benchmark::State& state, std::string input_file)
@@ -20,9 +23,10 @@ LineGetStateDeriv(benchmark::State& state, std::string input_file)
 	system.Init(x, dx, true);
 
 	auto line = system.GetLines().front();
+	Eigen::Matrix3Xr drdt(3, line->getN() - 1), dvdt(3, line->getN() - 1);
 
 	for (auto _ : state) {
-		line->getStateDeriv();
+		line->getStateDeriv(drdt, dvdt);
 	}
 }
 BENCHMARK_CAPTURE(LineGetStateDeriv,
@@ -33,6 +37,74 @@ BENCHMARK_CAPTURE(LineGetStateDeriv,
 BENCHMARK_CAPTURE(LineGetStateDeriv, NoWaves, "Mooring/no_waves.txt")
     ->Unit(benchmark::kMicrosecond);
 
+/**
+ * @brief Write a copy of Mooring/no_waves.txt with a different number of
+ * segments on the line
+ * @param n The number of segments
+ * @return The path of the new model file
+ */
+static std::string
+resegmented_model(unsigned int n)
+{
+	std::ifstream fin("Mooring/no_waves.txt");
+	std::ostringstream out;
+	std::string line;
+	int row = -1;
+	while (std::getline(fin, line)) {
+		if (line.find("LINES") != std::string::npos)
+			row = 0;
+		else if ((row >= 0) && (++row == 3)) {
+			// The line itself, after the header and the units rows
+			std::istringstream tokens(line);
+			std::vector<std::string> fields{
+				std::istream_iterator<std::string>(tokens), {}
+			};
+			fields[5] = std::to_string(n);
+			line.clear();
+			for (auto field : fields)
+				line += field + " ";
+		}
+		out << line << std::endl;
+	}
+	const std::string path =
+	    "Mooring/no_waves_" + std::to_string(n) + ".txt";
+	std::ofstream(path) << out.str();
+	return path;
+}
+
+/**
+ * @brief Benchmarks the lines kernels, node by node or batched, for
+ * different number of segments
+ * @param state
+ * @param batched true to use the batched kernel, false otherwise
+ */
+static void
+LineKernel(benchmark::State& state, bool batched)
+{
+	const auto path = resegmented_model(state.range(0));
+	moordyn::MoorDyn system(path.c_str(), MOORDYN_NO_OUTPUT);
+	std::vector<double> x(system.NCoupledDOF(), 0.0);
+	std::vector<double> dx(system.NCoupledDOF(), 0.0);
+	system.Init(x.data(), dx.data(), true);
+
+	auto line = system.GetLines().front();
+	line->setBatched(batched);
+	Eigen::Matrix3Xr drdt(3, line->getN() - 1), dvdt(3, line->getN() - 1);
+
+	for (auto _ : state) {
+		line->getStateDeriv(drdt, dvdt);
+	}
+	state.SetItemsProcessed(state.iterations() * state.range(0));
+}
+BENCHMARK_CAPTURE(LineKernel, Scalar, false)
+    ->RangeMultiplier(2)
+    ->Range(8, 1024)
+    ->Unit(benchmark::kMicrosecond);
+BENCHMARK_CAPTURE(LineKernel, Batched, true)
+    ->RangeMultiplier(2)
+    ->Range(8, 1024)
+    ->Unit(benchmark::kMicrosecond);
+
 /**
  * @brief Benchmarks stepping the given model 0.1s
  * Loads the given model file and measures the duration
@@ -76,4 +148,63 @@ BENCHMARK_CAPTURE(MoordynStep, WaveKin2, "Mooring/wavekin_2/wavekin_2.txt")
 BENCHMARK_CAPTURE(MoordynStep, WaveKin7, "Mooring/wavekin_7/wavekin_7.txt")
     ->Unit(benchmark::kMicrosecond);
 
+/**
+ * @brief Benchmarks stepping a farm of 60 lines 0.1s with several threads
+ * The lines derivatives are split among the threads, weighted by their number
+ * of nodes, see moordyn::MoorDyn::SetThreads()
+ * @param state The number of threads is the first range of the state
+ */
+static void
+FarmStep(benchmark::State& state)
+{
+	moordyn::MoorDyn system("Mooring/farm.txt", MOORDYN_NO_OUTPUT);
+	system.SetThreads(state.range(0));
+	system.Init(NULL, NULL, true);
+
+	double t = 0.0, dt = 0.1;
+
+	for (auto _ : state) {
+		system.Step(NULL, NULL, NULL, t, dt);
+	}
+	state.counters["OuterTimeStep"] = dt;
+	state.counters["Threads"] = state.range(0);
+}
+
+BENCHMARK(FarmStep)
+    ->Arg(1)
+    ->Arg(2)
+    ->Arg(4)
+    ->Arg(8)
+    ->UseRealTime()
+    ->Unit(benchmark::kMillisecond);
+
+/**
+ * @brief Benchmarks stepping a farm of 60 lines 0.1s with a time scheme
+ * The multistage schemes are the ones spending more time on the states
+ * algebra, see moordyn::MoorDynState
+ * @param state
+ * @param scheme The time scheme name, see moordyn::create_time_scheme()
+ */
+static void
+FarmSchemeStep(benchmark::State& state, std::string scheme)
+{
+	moordyn::MoorDyn system("Mooring/farm.txt", MOORDYN_NO_OUTPUT);
+	system.SetThreads(1);
+	system.Init(NULL, NULL, true);
+	system.SetTimeScheme(moordyn::create_time_scheme(
+	    scheme, system.GetLogger(), system.GetWaves()));
+
+	double t = 0.0, dt = 0.1;
+
+	for (auto _ : state) {
+		system.Step(NULL, NULL, NULL, t, dt);
+	}
+	state.counters["OuterTimeStep"] = dt;
+}
+
+BENCHMARK_CAPTURE(FarmSchemeStep, RK4, "RK4")
+    ->Unit(benchmark::kMillisecond);
+BENCHMARK_CAPTURE(FarmSchemeStep, Anderson5, "Anderson5")
+    ->Unit(benchmark::kMillisecond);
+
 BENCHMARK_MAIN();
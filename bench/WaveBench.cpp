@@ -1,6 +1,7 @@
 #include <benchmark/benchmark.h>
 #include "WaveBench.hpp"
 #include "Waves/SpectrumKin.hpp"
+#include <memory>
 #include <random>
 
 moordyn::waves::SpectrumKin
@@ -74,6 +75,270 @@ BM_SpectrumKinVel(benchmark::State& state)
 
 BENCHMARK(BM_SpectrumKinVel);
 
+/**
+ * @brief Generate the kinematics of a synthetic wave spectrum
+ *
+ * @param n_comps Number of frequency components
+ * @param phase_tol Phase tolerance to rotate the phasors, 0 to disable it
+ */
+moordyn::waves::SpectrumKin
+generate_spectrum_kin(unsigned int n_comps, double phase_tol = 0.0)
+{
+	std::default_random_engine generator;
+	std::uniform_real_distribution<double> distribution(0.0, 1.0);
+	std::vector<moordyn::waves::FrequencyComponent> comps;
+	comps.emplace_back(0.0, moordyn::complex(0.0, 0.0));
+	for (unsigned int i = 1; i < n_comps; i++) {
+		const double phase = 2.0 * M_PI * distribution(generator);
+		comps.emplace_back(2.0 * i / n_comps,
+		                   std::polar(0.1, phase),
+		                   0.5 * (distribution(generator) - 0.5));
+	}
+
+	EnvCondRef env = make_shared<EnvCond>();
+	env->g = 9.8;
+	env->WtrDpth = 50;
+	env->waterKinOptions.phaseTol = phase_tol;
+	moordyn::waves::SpectrumKin spectrumKin;
+	spectrumKin.setup(comps, env, nullptr);
+
+	return spectrumKin;
+}
+
+/**
+ * @brief Generate a set of nodes along a line from the seafloor to the surface
+ *
+ * @param n_nodes Number of nodes
+ */
+std::vector<moordyn::vec3>
+generate_nodes(unsigned int n_nodes)
+{
+	std::vector<moordyn::vec3> nodes;
+	for (unsigned int i = 0; i < n_nodes; i++) {
+		const double s = (i + 0.5) / n_nodes;
+		nodes.emplace_back(200.0 * s, 10.0 * s, -50.0 * (1.0 - s));
+	}
+	return nodes;
+}
+
+/**
+ * @brief Benchmarks calculating the water kinematics on a set of nodes, one
+ * node at a time
+ *
+ * The first argument is the number of nodes and the second one the number of
+ * spectrum components
+ *
+ * @param state
+ */
+static void
+BM_SpectrumKinNodesPointwise(benchmark::State& state)
+{
+	const unsigned int n_nodes = state.range(0);
+	const unsigned int n_comps = state.range(1);
+	auto spectrumKin = generate_spectrum_kin(n_comps);
+	const auto nodes = generate_nodes(n_nodes);
+	std::vector<moordyn::real> zeta(n_nodes);
+	std::vector<moordyn::vec3> vel(n_nodes), acc(n_nodes);
+
+	moordyn::real t = 0.0;
+	for (auto _ : state) {
+		for (unsigned int i = 0; i < n_nodes; i++) {
+			spectrumKin.getWaveKin(
+			    nodes[i], t, -50, -50, &zeta[i], &vel[i], &acc[i]);
+		}
+		benchmark::ClobberMemory();
+		t += 0.1;
+	}
+	state.SetItemsProcessed(state.iterations() * n_nodes * n_comps);
+}
+
+BENCHMARK(BM_SpectrumKinNodesPointwise)
+    ->ArgsProduct({ { 10, 100, 1000 }, { 10, 100, 500 } });
+
+/**
+ * @brief Benchmarks calculating the water kinematics on a set of nodes, all
+ * the nodes at once
+ *
+ * The first argument is the number of nodes and the second one the number of
+ * spectrum components
+ *
+ * @param state
+ */
+static void
+BM_SpectrumKinNodesBatched(benchmark::State& state)
+{
+	const unsigned int n_nodes = state.range(0);
+	const unsigned int n_comps = state.range(1);
+	auto spectrumKin = generate_spectrum_kin(n_comps);
+	const auto nodes = generate_nodes(n_nodes);
+	std::vector<moordyn::real> depths(n_nodes, -50), zeta(n_nodes);
+	std::vector<moordyn::vec3> vel(n_nodes), acc(n_nodes);
+	moordyn::waves::SpectrumKin::Scratch scratch;
+
+	moordyn::real t = 0.0;
+	for (auto _ : state) {
+		spectrumKin.getWaveKin(n_nodes,
+		                       nodes.data(),
+		                       t,
+		                       -50,
+		                       depths.data(),
+		                       zeta.data(),
+		                       vel.data(),
+		                       acc.data(),
+		                       scratch);
+		benchmark::ClobberMemory();
+		t += 0.1;
+	}
+	state.SetItemsProcessed(state.iterations() * n_nodes * n_comps);
+}
+
+BENCHMARK(BM_SpectrumKinNodesBatched)
+    ->ArgsProduct({ { 10, 100, 1000 }, { 10, 100, 500 } });
+
+/**
+ * @brief Benchmarks calculating the water kinematics on a set of moving
+ * nodes, all the nodes at once, rotating the phasors of the previous
+ * evaluation with a phase tolerance of 1e-6 rad
+ *
+ * The first argument is the number of nodes and the second one the number of
+ * spectrum components
+ *
+ * @param state
+ */
+static void
+BM_SpectrumKinNodesPhasors(benchmark::State& state)
+{
+	const unsigned int n_nodes = state.range(0);
+	const unsigned int n_comps = state.range(1);
+	auto spectrumKin = generate_spectrum_kin(n_comps, 1e-6);
+	const auto nodes0 = generate_nodes(n_nodes);
+	auto nodes = nodes0;
+	std::vector<moordyn::real> depths(n_nodes, -50), zeta(n_nodes);
+	std::vector<moordyn::vec3> vel(n_nodes), acc(n_nodes);
+	moordyn::waves::SpectrumKin::Scratch scratch;
+	moordyn::waves::SpectrumKin::Phasors phasors;
+
+	moordyn::real t = 0.0;
+	for (auto _ : state) {
+		for (unsigned int i = 0; i < n_nodes; i++)
+			nodes[i] = nodes0[i] + moordyn::vec3(0.1 * sin(t), 0.0, 0.0);
+		spectrumKin.getWaveKin(n_nodes,
+		                       nodes.data(),
+		                       t,
+		                       -50,
+		                       depths.data(),
+		                       zeta.data(),
+		                       vel.data(),
+		                       acc.data(),
+		                       scratch,
+		                       &phasors);
+		benchmark::ClobberMemory();
+		t += 0.1;
+	}
+	state.SetItemsProcessed(state.iterations() * n_nodes * n_comps);
+}
+
+BENCHMARK(BM_SpectrumKinNodesPhasors)
+    ->ArgsProduct({ { 10, 100, 1000 }, { 10, 100, 500 } });
+
+/**
+ * @brief Generate a wave grid filled with arbitrary kinematics
+ *
+ * The grid spans 200 x 200 x 50 m, and 100 s
+ *
+ * @param log The log
+ * @param n Number of points along each spatial axis
+ * @param nt Number of time steps
+ * @param uniform true to generate equally spaced axes, false to slightly
+ * perturb them, so they should be scanned
+ */
+std::unique_ptr<moordyn::WaveGrid>
+generate_wave_grid(moordyn::Log* log,
+                   unsigned int n,
+                   unsigned int nt,
+                   bool uniform)
+{
+	std::vector<moordyn::real> px(n), py(n), pz(n);
+	for (unsigned int i = 0; i < n; i++) {
+		const double s = (i + (uniform || !i ? 0.0 : 0.1)) / (n - 1);
+		px[i] = -100.0 + 200.0 * s;
+		py[i] = -100.0 + 200.0 * s;
+		pz[i] = -50.0 + 50.0 * s;
+	}
+	auto grid = std::make_unique<moordyn::WaveGrid>(
+	    log, px, py, pz, nt, 100.0 / nt);
+	grid->allocateKinematicArrays();
+	for (unsigned int ix = 0; ix < n; ix++) {
+		for (unsigned int iy = 0; iy < n; iy++) {
+			for (unsigned int it = 0; it < nt; it++)
+				grid->Zetas()(ix, iy, 0, it) = sin(0.1 * (ix + iy + it));
+			for (unsigned int iz = 0; iz < n; iz++) {
+				for (unsigned int it = 0; it < nt; it++) {
+					const double v = cos(0.1 * (ix + iy + iz + it));
+					grid->PDyn()(ix, iy, iz, it) = v;
+					grid->WaveVel()(ix, iy, iz, it) = moordyn::vec3(v, v, v);
+					grid->WaveAcc()(ix, iy, iz, it) = moordyn::vec3(v, v, v);
+				}
+			}
+		}
+	}
+	return grid;
+}
+
+/**
+ * @brief Benchmarks interpolating the water kinematics on a wave grid
+ *
+ * The first argument is the number of points along each spatial axis, and the
+ * second one is 1 for equally spaced axes, which are addressed with index
+ * arithmetic, or 0 for slightly perturbed axes, which are scanned.
+ *
+ * The memory used by the grid is reported, as well as the memory that the
+ * former nested std::vector storage would take, excluding the allocator
+ * overhead
+ *
+ * @param state
+ */
+static void
+BM_WaveGridLookup(benchmark::State& state)
+{
+	const unsigned int n = state.range(0);
+	const bool uniform = state.range(1);
+	const unsigned int nt = 128;
+	auto log = moordyn::Log(MOORDYN_NO_OUTPUT, MOORDYN_NO_OUTPUT);
+	auto grid = generate_wave_grid(&log, n, nt, uniform);
+
+	std::default_random_engine generator;
+	std::uniform_real_distribution<double> distribution(0.0, 1.0);
+	std::vector<moordyn::vec3> points(1024);
+	for (auto& p : points) {
+		p = moordyn::vec3(-100.0 + 200.0 * distribution(generator),
+		                  -100.0 + 200.0 * distribution(generator),
+		                  -50.0 * distribution(generator));
+	}
+	moordyn::SeafloorProvider seafloor{ -50.0 };
+
+	moordyn::real t = 0.0, zeta, pdyn;
+	moordyn::vec3 vel, acc;
+	unsigned int i = 0;
+	for (auto _ : state) {
+		grid->getWaveKin(points[i], t, seafloor, &zeta, &vel, &acc, &pdyn);
+		benchmark::DoNotOptimize(vel);
+		benchmark::DoNotOptimize(acc);
+		benchmark::DoNotOptimize(pdyn);
+		i = (i + 1) % points.size();
+		t += 0.01;
+	}
+	state.SetItemsProcessed(state.iterations());
+
+	const double n3 = (double)n * n * n, n2 = (double)n * n;
+	const double headers = sizeof(std::vector<moordyn::real>);
+	state.counters["bytes"] = grid->bytes();
+	state.counters["nested_bytes"] =
+	    grid->bytes() + headers * (n + n2) + 3 * headers * (n + n2 + n3);
+}
+
+BENCHMARK(BM_WaveGridLookup)->ArgsProduct({ { 8, 16, 32 }, { 0, 1 } });
+
 /**
  * @brief Benchmarks calculating sinh(k * (z + h)) / sinh(k * h)
  *
@@ -133,6 +133,29 @@ Body::setup(int number_in,
 	       << endl;
 };
 
+Body*
+Body::clone(moordyn::Log* log,
+            EnvCondRef env_in,
+            const std::vector<moordyn::Point*>& points,
+            const std::vector<Rod*>& rods) const
+{
+	Body* obj = new Body(*this);
+	obj->SetLogger(log);
+	obj->env = env_in;
+	obj->waves = nullptr;
+	obj->outfile = NULL;
+	obj->ClearChildren();
+	for (auto& point : obj->attachedP) {
+		point = points[point->pointId];
+		obj->AddChild(point);
+	}
+	for (auto& rod : obj->attachedR) {
+		rod = rods[rod->rodId];
+		obj->AddChild(rod);
+	}
+	return obj;
+}
+
 void
 Body::addPoint(moordyn::Point* point, vec coords)
 {
@@ -472,8 +495,8 @@ Body::setState(XYZQuat pos, vec6 vel)
 	setDependentStates();
 }
 
-std::pair<XYZQuat, vec6>
-Body::getStateDeriv()
+void
+Body::getStateDeriv(Eigen::Ref<vec7> drdt, Eigen::Ref<vec6> dvdt)
 {
 	if ((type != FREE) && (type != CPLDPIN)) {
 		LOGERR << "getStateDeriv called for non-free body" << endl;
@@ -507,7 +530,8 @@ Body::getStateDeriv()
 		dPos.pos = vec::Zero();
 		dPos.quat = 0.5 * (quaternion(0.0, v6[3], v6[4], v6[5]) * r7.quat).coeffs();
 	}
-	return std::make_pair(dPos, a6);
+	drdt = dPos.toVec7();
+	dvdt = a6;
 };
 
 const vec6
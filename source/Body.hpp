@@ -223,6 +223,24 @@ class Body final : public io::IO, public SuperCFL
 	           EnvCondRef env_in,
 	           shared_ptr<ofstream> outfile);
 
+	/** @brief Make a copy of the body, for a cloned system
+	 *
+	 * The attached points and rods are replaced by their copies, the copy
+	 * does not write any output file, and its waves shall be set afterwards
+	 * with setWaves()
+	 * @param log The logging handler of the cloned system
+	 * @param env_in The environmental settings of the cloned system
+	 * @param points The points of the cloned system, sorted by their
+	 * moordyn::Point::pointId
+	 * @param rods The rods of the cloned system, sorted by their
+	 * moordyn::Rod::rodId
+	 * @return The copy, which shall be deleted by the caller
+	 */
+	Body* clone(moordyn::Log* log,
+	            EnvCondRef env_in,
+	            const std::vector<moordyn::Point*>& points,
+	            const std::vector<Rod*>& rods) const;
+
 	/** @brief Attach a point to the body
 	 * @param point The point
 	 * @param coords The fixation point
@@ -384,12 +402,12 @@ class Body final : public io::IO, public SuperCFL
 	/** @brief calculate the forces and state derivatives of the body
 	 *
 	 * This function is only meant for free bodies
-	 * @return The states derivatives, i.e. the velocity (first) and the
-	 * acceleration (second)
+	 * @param drdt The linear velocity and the quaternion derivative
+	 * @param dvdt The linear and angular accelerations
 	 * @throw moordyn::invalid_value_error If the body is of type
 	 * moordyn::Body::FREE
 	 */
-	std::pair<XYZQuat, vec6> getStateDeriv();
+	void getStateDeriv(Eigen::Ref<vec7> drdt, Eigen::Ref<vec6> dvdt);
 
 	/** @brief calculates the forces on the body
 	 * @throw moordyn::invalid_value_error If the body is of type
@@ -0,0 +1,218 @@
+/*
+ * Copyright (c) 2023, Jose Luis Cercos-Pita & Matt Hall
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice,
+ *    this list of conditions and the following disclaimer.
+ *
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions and the following disclaimer in the documentation
+ *    and/or other materials provided with the distribution.
+ *
+ * 3. Neither the name of the copyright holder nor the names of its
+ *    contributors may be used to endorse or promote products derived from
+ *    this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+
+#include "ICCache.hpp"
+#include "IO.hpp"
+#include <algorithm>
+#include <cmath>
+#include <iomanip>
+#include <random>
+#include <sstream>
+#include <tuple>
+
+namespace fs = std::filesystem;
+
+namespace moordyn {
+
+/** @class ICCacheEntry
+ * @brief A cached initial condition, which can be saved and loaded with the
+ * same file format than the rest of the entities
+ */
+class ICCacheEntry : public io::IO
+{
+  public:
+	/** @brief Constructor
+	 * @param log Logging handler
+	 * @param key The key of the entry
+	 */
+	ICCacheEntry(moordyn::Log* log, uint64_t key = 0)
+	  : io::IO(log)
+	  , key(key)
+	{
+	}
+
+	/** @brief Produce the packed data to be saved
+	 * @return The packed data
+	 */
+	std::vector<uint64_t> Serialize(void)
+	{
+		std::vector<uint64_t> packed;
+		packed.push_back(io::IO::Serialize(key));
+		packed.push_back(io::IO::Serialize((uint64_t)data.size()));
+		packed.insert(packed.end(), data.begin(), data.end());
+		return packed;
+	}
+
+	/** @brief Unpack the data to restore the Serialized information
+	 * @param packed The packed data
+	 * @return A pointer to the end of the file, for debugging purposes
+	 */
+	uint64_t* Deserialize(const uint64_t* packed)
+	{
+		uint64_t* ptr = (uint64_t*)packed;
+		uint64_t n;
+		ptr = io::IO::Deserialize(ptr, key);
+		ptr = io::IO::Deserialize(ptr, n);
+		data.assign(ptr, ptr + n);
+		return ptr + n;
+	}
+
+	/// The key of the entry
+	uint64_t key;
+	/// The packed initial condition
+	std::vector<uint64_t> data;
+};
+
+ICCache::ICCache(moordyn::Log* log,
+                 const std::string& path,
+                 uintmax_t max_size,
+                 real tol)
+  : LogUser(log)
+  , _path(path)
+  , _max_size(max_size)
+  , _tol(tol)
+{
+}
+
+ICCache::~ICCache() {}
+
+uint64_t
+ICCache::Key(const std::string& text, const double* x, unsigned int n) const
+{
+	uint64_t key = fnv1a(FNV1A_OFFSET, text);
+	for (unsigned int i = 0; i < n; i++)
+		key = fnv1a(key, (uint64_t)std::llround(x[i] / _tol));
+	return key;
+}
+
+bool
+ICCache::Get(uint64_t key, std::vector<uint64_t>& data)
+{
+	const fs::path filepath = Entry(key);
+	std::error_code ec;
+	if (!fs::exists(filepath, ec))
+		return false;
+
+	ICCacheEntry entry(_log);
+	moordyn::error_id err = MOORDYN_SUCCESS;
+	string err_msg;
+	try {
+		entry.Load(filepath.string());
+	}
+	MOORDYN_CATCHER(err, err_msg);
+	if ((err != MOORDYN_SUCCESS) || (entry.key != key)) {
+		LOGWRN << "Discarding the invalid cache entry '" << filepath.string()
+		       << "'" << endl;
+		return false;
+	}
+	data = std::move(entry.data);
+
+	// The modification time is used to sort the entries on eviction
+	fs::last_write_time(filepath, fs::file_time_type::clock::now(), ec);
+	return true;
+}
+
+void
+ICCache::Put(uint64_t key, const std::vector<uint64_t>& data)
+{
+	std::error_code ec;
+	fs::create_directories(_path, ec);
+	if (ec) {
+		LOGERR << "The cache folder '" << _path.string()
+		       << "' cannot be created: " << ec.message() << endl;
+		throw moordyn::output_file_error("Invalid folder");
+	}
+
+	// The entry is written on a temporary file which is renamed afterwards,
+	// so other processes never find an incomplete entry
+	const fs::path filepath = Entry(key);
+	std::stringstream tmpname;
+	tmpname << filepath.filename().string() << "." << std::hex
+	        << std::random_device()() << ".tmp";
+	const fs::path tmppath = _path / tmpname.str();
+	ICCacheEntry entry(_log, key);
+	entry.data = data;
+	entry.Save(tmppath.string());
+	fs::rename(tmppath, filepath, ec);
+	if (ec) {
+		fs::remove(tmppath, ec);
+		LOGERR << "The cache entry '" << filepath.string()
+		       << "' cannot be written" << endl;
+		throw moordyn::output_file_error("Invalid file");
+	}
+
+	Evict();
+}
+
+fs::path
+ICCache::Entry(uint64_t key) const
+{
+	std::stringstream filename;
+	filename << std::hex << std::setw(16) << std::setfill('0') << key
+	         << ".ic";
+	return _path / filename.str();
+}
+
+void
+ICCache::Evict()
+{
+	// Other processes might be modifying the folder simultaneously, so the
+	// errors are silently ignored
+	std::vector<std::tuple<fs::file_time_type, uintmax_t, fs::path>> entries;
+	uintmax_t size = 0;
+	std::error_code ec;
+	for (const auto& f : fs::directory_iterator(_path, ec)) {
+		if (!f.is_regular_file(ec) || (f.path().extension() != ".ic"))
+			continue;
+		const uintmax_t fsize = f.file_size(ec);
+		if (ec)
+			continue;
+		const auto ftime = f.last_write_time(ec);
+		if (ec)
+			continue;
+		entries.push_back({ ftime, fsize, f.path() });
+		size += fsize;
+	}
+	if (size <= _max_size)
+		return;
+
+	std::sort(entries.begin(), entries.end());
+	for (const auto& [ftime, fsize, fpath] : entries) {
+		if (size <= _max_size)
+			break;
+		if (!fs::remove(fpath, ec))
+			continue;
+		LOGDBG << "Evicted the cache entry '" << fpath.string() << "'"
+		       << endl;
+		size -= fsize;
+	}
+}
+
+} // ::moordyn
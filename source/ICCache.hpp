@@ -0,0 +1,128 @@
+/*
+ * Copyright (c) 2023, Jose Luis Cercos-Pita & Matt Hall
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice,
+ *    this list of conditions and the following disclaimer.
+ *
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions and the following disclaimer in the documentation
+ *    and/or other materials provided with the distribution.
+ *
+ * 3. Neither the name of the copyright holder nor the names of its
+ *    contributors may be used to endorse or promote products derived from
+ *    this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+
+/** @file ICCache.hpp
+ * On-disk cache of the initial conditions
+ */
+
+#pragma once
+
+#include "Misc.hpp"
+#include "Log.hpp"
+#include <filesystem>
+#include <memory>
+#include <string>
+#include <vector>
+
+namespace moordyn {
+
+/** @class ICCache ICCache.hpp
+ * @brief On-disk cache of the initial conditions
+ *
+ * Each converged initial condition is stored on its own file inside the cache
+ * folder, named after a key which hashes the model and the coupled degrees of
+ * freedom positions. The positions are rounded, so slightly different ones
+ * reuse the same entry.
+ *
+ * The entries are written atomically, so several processes might share the
+ * same folder. When the total size of the folder exceeds the limit, the least
+ * recently used entries are removed
+ */
+class ICCache : public LogUser
+{
+  public:
+	/** @brief Constructor
+	 * @param log Logging handler
+	 * @param path The cache folder, which is created on demand
+	 * @param max_size The maximum total size of the entries (bytes)
+	 * @param tol The rounding applied to the coupled degrees of freedom
+	 * positions before hashing them (m or rad)
+	 */
+	ICCache(moordyn::Log* log,
+	        const std::string& path,
+	        uintmax_t max_size,
+	        real tol);
+
+	/** @brief Destructor
+	 */
+	~ICCache();
+
+	/** @brief Get the cache folder
+	 * @return The cache folder
+	 */
+	inline const std::filesystem::path& GetPath() const { return _path; }
+
+	/** @brief Compute the key identifying an initial condition
+	 * @param text The model description, i.e. the input file contents and the
+	 * environment options
+	 * @param x The coupled degrees of freedom positions
+	 * @param n The number of coupled degrees of freedom
+	 * @return The key
+	 */
+	uint64_t Key(const std::string& text, const double* x, unsigned int n) const;
+
+	/** @brief Look up an entry
+	 *
+	 * On a hit the entry is marked as the most recently used one
+	 * @param key The key, see ::Key()
+	 * @param data The packed initial condition, see MoorDyn::Serialize()
+	 * @return true if the entry is found, false otherwise
+	 */
+	bool Get(uint64_t key, std::vector<uint64_t>& data);
+
+	/** @brief Store an entry, removing the least recently used ones if the
+	 * size limit is exceeded
+	 * @param key The key, see ::Key()
+	 * @param data The packed initial condition, see MoorDyn::Serialize()
+	 * @throws moordyn::output_file_error If the entry cannot be written
+	 */
+	void Put(uint64_t key, const std::vector<uint64_t>& data);
+
+  private:
+	/** @brief Get the file of an entry
+	 * @param key The key, see ::Key()
+	 * @return The file path
+	 */
+	std::filesystem::path Entry(uint64_t key) const;
+
+	/** @brief Remove the least recently used entries until the total size
+	 * is below the limit
+	 */
+	void Evict();
+
+	/// The cache folder
+	std::filesystem::path _path;
+	/// The maximum total size of the entries (bytes)
+	uintmax_t _max_size;
+	/// The rounding of the coupled degrees of freedom positions
+	real _tol;
+};
+
+} // ::moordyn
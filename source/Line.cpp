@@ -217,6 +217,43 @@ Line::setup(int number_in,
 	B.assign(N + 1, vec::Zero());    // node bottom contact force
 	Fnet.assign(N + 1, vec::Zero()); // total force on node
 
+	// batched kernel storage
+	batched = N >= BATCH_MIN_SEGMENTS;
+	for (auto field : { &batch.r,
+	                    &batch.rd,
+	                    &batch.q,
+	                    &batch.U,
+	                    &batch.Ud,
+	                    &batch.Dp,
+	                    &batch.Dq,
+	                    &batch.Ap,
+	                    &batch.Aq,
+	                    &batch.B,
+	                    &batch.Fnet,
+	                    &batch.acc })
+		field->setZero(N + 1, 3);
+	for (auto field : { &batch.qs, &batch.T, &batch.Td })
+		field->setZero(N, 3);
+	for (auto field : { &batch.m,
+	                    &batch.ln,
+	                    &batch.Fl,
+	                    &batch.FV,
+	                    &batch.coeff,
+	                    &batch.s1,
+	                    &batch.s2,
+	                    &batch.s3 })
+		field->setZero(N + 1);
+	batch.il.setZero(N);
+
+	// quasi-static catenary storage
+	cat.HF = cat.VF = cat.HA = cat.VA = 0.0;
+	cat.reversed = false;
+	cat.failed = false;
+	cat.s.assign(N + 1, 0.0);
+	cat.X.assign(N + 1, 0.0);
+	cat.Z.assign(N + 1, 0.0);
+	cat.Te.assign(N + 1, 0.0);
+
 	// wave things
 	F.assign(N + 1, 0.0); // VOF scaler for each NODE (mean of two half adjacent
 	                      // segments) (1 = fully submerged, 0 = out of water)
@@ -232,10 +269,23 @@ Line::setup(int number_in,
 	// record output file pointer and channel key-letter list
 	outfile = outfile_pointer.get(); // make outfile point to the right place
 	channels = channels_in;          // copy string of output channels to object
+	// the "q" flag replaces the lumped-mass model by a quasi-static catenary
+	quasi_static = channels.find("q") != string::npos;
 
 	LOGDBG << "   Set up Line " << number << ". " << endl;
 };
 
+Line*
+Line::clone(moordyn::Log* log, EnvCondRef env_in) const
+{
+	Line* obj = new Line(*this);
+	obj->SetLogger(log);
+	obj->env = env_in;
+	obj->waves = nullptr;
+	obj->outfile = NULL;
+	return obj;
+}
+
 std::pair<std::vector<vec>, std::vector<vec>>
 Line::initialize()
 {
@@ -431,6 +481,7 @@ Line::initialize()
 		l[i] = UnstrLen / double(N);
 		V[i] = l[i] * A;
 	}
+	updateCoefficients();
 
 	if (nEApoints > 0) {
 		// For the sake of the following initialization steps, if using a
@@ -462,64 +513,12 @@ Line::initialize()
 	// if conditions are ideal, try to calculate initial line profile using
 	// catenary routine (from FAST v.7)
 
-	real XF = dir(Eigen::seqN(0, 2)).norm(); // horizontal spread
+	const real XF = dir(Eigen::seqN(0, 2)).norm(); // horizontal spread
 	if (XF > 0.0) {
-		// Check if the line touches the seabed, so we are modelling it. Just
-		// the end points are checked
-		const real Tol = 1e-5;
-		real CB = -1.0;
-		for (unsigned int i = 0; i <= N; i += N) {
-			const real waterDepth = getWaterDepth(r[i][0], r[i][1]);
-			if(r[i][2] <= waterDepth * (1.0 - Tol))
-				CB = 0.0;
-		}
-		const real ZF = dir[2];
-		const real LW = ((rho - env->rho_w) * A) * env->g;
-
-		// locations of line nodes along line length - evenly distributed
-		// here
-		vector<real> snodes(N + 1, 0.0);
-		for (unsigned int i = 1; i <= N; i++)
-			snodes[i] = snodes[i - 1] + l[i - 1];
-		// double check to ensure the last node does not surpass the line
-		// length
-		snodes[N] = UnstrLen;
-
-		// output variables
-		real HF, VF, HA, VA, COSPhi, SINPhi;
-		vector<real> Xl(N + 1, 0.0);
-		vector<real> Zl(N + 1, 0.0);
-		vector<real> Te(N + 1, 0.0);
-
-		COSPhi = (r[N][0] - r[0][0]) / XF;
-		SINPhi = (r[N][1] - r[0][1]) / XF;
-
-		int success = Catenary(XF,
-		                       ZF,
-		                       UnstrLen,
-		                       E * A,
-		                       LW,
-		                       CB,
-		                       Tol,
-		                       &HF,
-		                       &VF,
-		                       &HA,
-		                       &VA,
-		                       N+1,
-		                       snodes,
-		                       Xl,
-		                       Zl,
-		                       Te);
-
-		if (success >= 0) {
-			
-			// the catenary solve is successful, update the node positions
+		if (solveCatenary(false)) {
+			// the catenary solve is successful, the node positions are updated
 			LOGDBG << "Catenary initial profile available for Line "
 					<< number << endl;
-			for (unsigned int i = 1; i < N; i++) {
-				vec l(Xl[i] * COSPhi, Xl[i] * SINPhi, Zl[i]);
-				r[i] = r[0] + l;
-			}
 		} else {
 			LOGWRN << "Catenary initial profile failed for Line " << number
 			       << ", initalizing as linear " << endl;
@@ -532,10 +531,133 @@ Line::initialize()
 
 	// also assign the resulting internal node positions to the integrator
 	// initial state vector! (velocities leave at 0)
-	std::vector<vec> vel(N - 1, vec::Zero());
-	return std::make_pair(vector_slice(r, 1, N - 1), vel);
+	std::vector<vec> vel(getNStates(), vec::Zero());
+	return std::make_pair(vector_slice(r, 1, getNStates()), vel);
 };
 
+bool
+Line::solveCatenary(bool warm)
+{
+	const vec dir = r[N] - r[0];
+	const real XF = dir(Eigen::seqN(0, 2)).norm(); // horizontal spread
+	const real ZF = dir[2];
+
+	// Check if the line touches the seabed, so we are modelling it. Just
+	// the end points are checked
+	const real Tol = 1e-5;
+	real CB = -1.0;
+	for (unsigned int i = 0; i <= N; i += N) {
+		const real waterDepth = getWaterDepth(r[i][0], r[i][1]);
+		if(r[i][2] <= waterDepth * (1.0 - Tol))
+			CB = 0.0;
+	}
+	const real LW = ((rho - env->rho_w) * A) * env->g;
+
+	// locations of line nodes along line length - evenly distributed
+	// here
+	cat.s[0] = 0.0;
+	for (unsigned int i = 1; i <= N; i++)
+		cat.s[i] = cat.s[i - 1] + l[i - 1];
+	// double check to ensure the last node does not surpass the line
+	// length
+	cat.s[N] = UnstrLen;
+
+	// The previous solution is just a valid guess if the line ends have not
+	// swapped
+	const bool reversed = ZF < 0.0;
+	warm = warm && (reversed == cat.reversed);
+	real HF = cat.HF, VF = cat.VF, HA, VA;
+	const int success = Catenary(XF,
+	                             ZF,
+	                             UnstrLen,
+	                             E * A,
+	                             LW,
+	                             CB,
+	                             Tol,
+	                             &HF,
+	                             &VF,
+	                             &HA,
+	                             &VA,
+	                             N + 1,
+	                             cat.s,
+	                             cat.X,
+	                             cat.Z,
+	                             cat.Te,
+	                             warm);
+	if ((success < 0) || isnan(HF + VF + HA + VA))
+		return false;
+
+	cat.HF = HF;
+	cat.VF = VF;
+	cat.HA = HA;
+	cat.VA = VA;
+	cat.reversed = reversed;
+
+	// update the internal node positions
+	const real COSPhi = (XF > 0.0) ? dir[0] / XF : 1.0;
+	const real SINPhi = (XF > 0.0) ? dir[1] / XF : 0.0;
+	for (unsigned int i = 1; i < N; i++) {
+		vec l(cat.X[i] * COSPhi, cat.X[i] * SINPhi, cat.Z[i]);
+		r[i] = r[0] + l;
+	}
+	return true;
+}
+
+void
+Line::calcQuasiStatic()
+{
+	if (!solveCatenary(true)) {
+		if (!cat.failed) {
+			LOGWRN << "Catenary failed for the quasi-static Line " << number
+			       << " at t=" << t << " s, keeping the last solution" << endl;
+		}
+		cat.failed = true;
+		return;
+	}
+	cat.failed = false;
+
+	const vec dir = r[N] - r[0];
+	const real XF = dir(Eigen::seqN(0, 2)).norm();
+	const vec h = (XF > 0.0) ? vec(dir[0] / XF, dir[1] / XF, 0.0) :
+	                           vec::UnitX();
+	const vec v = vec::UnitZ();
+
+	// The catenary tensions are given at the fairlead, i.e. the upper end,
+	// and the anchor, i.e. the lower end
+	if (!cat.reversed) {
+		Fnet[0] = cat.HA * h + cat.VA * v;
+		Fnet[N] = -cat.HF * h - cat.VF * v;
+	} else {
+		Fnet[0] = cat.HF * h - cat.VF * v;
+		Fnet[N] = -cat.HA * h + cat.VA * v;
+	}
+
+	// The internal nodes are in equilibrium, moving with the ends
+	for (unsigned int i = 1; i < N; i++) {
+		rd[i] = rd[0] + (rd[N] - rd[0]) * (cat.s[i] / UnstrLen);
+		Fnet[i] = vec::Zero();
+	}
+
+	// Segment tensions, to be reported
+	for (unsigned int i = 0; i < N; i++) {
+		lstr[i] = unitvector(qs[i], r[i], r[i + 1]);
+		T[i] = 0.5 * (cat.Te[i] + cat.Te[i + 1]) * qs[i];
+		Td[i] = vec::Zero();
+	}
+
+	// The end nodes mass matrices are still transferred to the attached
+	// objects
+	const mat I = mat::Identity();
+	for (unsigned int i = 0; i <= N; i += N) {
+		const unsigned int j = i ? N - 1 : 0;
+		q[i] = qs[j];
+		const real m_i = pi / 8. * d * d * l[j] * rho;
+		const real v_i = 0.5 * F[j] * V[j];
+		const mat Q = q[i] * q[i].transpose();
+		M[i] = m_i * I + env->rho_w * v_i * (Can * (I - Q) + Cat * Q);
+	}
+}
+
 real
 Line::GetLineOutput(OutChanProps outChan)
 {
@@ -666,17 +788,18 @@ Line::setPin(std::vector<real> p)
 }
 
 void
-Line::setState(std::vector<vec> pos, std::vector<vec> vel)
+Line::setState(const Eigen::Ref<const Eigen::Matrix3Xr>& pos,
+               const Eigen::Ref<const Eigen::Matrix3Xr>& vel)
 {
-	if ((pos.size() != N - 1) || (vel.size() != N - 1)) {
+	if ((pos.cols() != getNStates()) || (vel.cols() != getNStates())) {
 		LOGERR << "Invalid input size" << endl;
 		throw moordyn::invalid_value_error("Invalid input size");
 	}
 
 	// set interior node positions and velocities based on state vector
-	for (unsigned int i = 1; i < N; i++) {
-		r[i] = pos[i - 1];
-		rd[i] = vel[i - 1];
+	for (unsigned int i = 1; i <= getNStates(); i++) {
+		r[i] = pos.col(i - 1);
+		rd[i] = vel.col(i - 1);
 	}
 }
 
@@ -769,31 +892,107 @@ Line::getEndSegmentMoment(EndPoints end_point, EndPoints rod_end_point) const
 	return qEnd * EIEnd / dlEnd;
 }
 
-std::pair<std::vector<vec>, std::vector<vec>>
-Line::getStateDeriv()
+/** @brief View a list of vectors as a matrix, with one column per vector
+ * @param v The list of vectors
+ * @return The matrix view
+ */
+inline Eigen::Map<Eigen::Matrix3Xr>
+as_matrix(std::vector<vec>& v)
 {
-	// NOTE:
-	// Jose Luis Cercos-Pita: This is by far the most consuming function of the
-	// whole library, just because it is called every single time substep and
-	// it shall make computations in every single line node. Thus it is worthy
-	// to invest effort on keeping it optimized.
+	static_assert(sizeof(vec) == 3 * sizeof(real), "Padded vectors");
+	return Eigen::Map<Eigen::Matrix3Xr>(v.front().data(), 3, v.size());
+}
 
-	// attempting error handling <<<<<<<<
-	for (unsigned int i = 0; i <= N; i++) {
-		if (isnan(r[i].sum())) {
-			stringstream s;
-			LOGERR << "NaN detected" << endl << "Line " << number << endl;
-			LOGMSG << "node positions:" << endl;
-			for (unsigned int j = 0; j <= N; j++)
-				LOGMSG << j << " : [" << r[j].transpose() << "]" << endl;
-			throw moordyn::nan_error("NaN in node positions");
-		}
-	}
+/** @brief View a list of vectors as a matrix, with one column per vector
+ * @param v The list of vectors
+ * @return The matrix view
+ */
+inline Eigen::Map<const Eigen::Matrix3Xr>
+as_matrix(const std::vector<vec>& v)
+{
+	return Eigen::Map<const Eigen::Matrix3Xr>(v.front().data(), 3, v.size());
+}
 
-	// dt is possibly used for stability tricks...
+/** @brief Dot product of two vector fields stored as structures of arrays
+ * @param a The first field, with 3 columns
+ * @param b The second field, with 3 columns
+ * @return The dot product expression, with one component per row
+ */
+template<typename TA, typename TB>
+inline auto
+dot3(const Eigen::ArrayBase<TA>& a, const Eigen::ArrayBase<TB>& b)
+{
+	return a.col(0) * b.col(0) + a.col(1) * b.col(1) + a.col(2) * b.col(2);
+}
 
-	// -------------------- calculate various kinematic quantities
-	// ---------------------------
+/** @brief Norm of a vector field stored as a structure of arrays
+ * @param a The field, with 3 columns
+ * @return The norm expression, with one component per row
+ */
+template<typename T>
+inline auto
+norm3(const Eigen::ArrayBase<T>& a)
+{
+	return dot3(a, a).sqrt();
+}
+
+/** @brief Scale each vector of a field stored as a structure of arrays
+ *
+ * The factors are applied component by component, so they shall be already
+ * evaluated, to avoid computing them 3 times
+ * @param a The field, with 3 columns
+ * @param s The scaling factors, one per row
+ */
+template<typename TA>
+inline void
+scale3(TA&& a, const Eigen::ArrayXr& s)
+{
+	for (unsigned int j = 0; j < 3; j++)
+		a.col(j) *= s.head(a.rows());
+}
+
+/** @brief Replace the null lengths by 1, so the vectors can be safely
+ * normalized, as moordyn::unitvector() does
+ * @param l The lengths
+ * @return The safe lengths expression
+ */
+template<typename T>
+inline auto
+safe_length(const Eigen::ArrayBase<T>& l)
+{
+	constexpr real tol = ((real)100.0) * std::numeric_limits<real>::epsilon() /
+	                     ((real)2.0);
+	return (l > tol).select(l, (real)1.0);
+}
+
+/** @brief Accumulate some segment values on the nodes
+ *
+ * Each node gets the sum of the values of the adjacent segments
+ * @param seg The segment values, with N components
+ * @param node The node values, with N + 1 components
+ */
+template<typename T>
+inline void
+segments_to_nodes(const Eigen::ArrayBase<T>& seg, Eigen::ArrayXr& node)
+{
+	const auto n = seg.size();
+	node.head(n) = seg;
+	node(n) = 0.0;
+	node.tail(n) += seg;
+}
+
+void
+Line::updateCoefficients()
+{
+	const Eigen::Map<const Eigen::ArrayXr> l_seg(l.data(), N);
+	segments_to_nodes(l_seg, batch.ln);
+	batch.m = pi / 8. * d * d * rho * batch.ln;
+	batch.il = l_seg.inverse();
+}
+
+void
+Line::calcKinematics()
+{
 	for (unsigned int i = 0; i < N; i++) {
 		// calculate current (Stretched) segment lengths and unit tangent
 		// vectors (qs) for each segment (this is used for bending calculations)
@@ -812,70 +1011,41 @@ Line::getStateDeriv()
 		    q[i],
 		    r[i - 1],
 		    r[i + 1]); // compute unit vector q ... using adjacent two nodes!
+}
 
-	// calculate unit tangent vectors for either end node if the line has no
-	// bending stiffness of if either end is pinned (otherwise it's already
-	// been set via ::setEndOrientation())
-	const bool isEI = (EI > 0) || (nEIpoints > 0);
-	if ((endTypeA == PINNED) || !isEI)
-		unitvector(q[0], r[0], r[1]);
-	if ((endTypeB == PINNED) || !isEI)
-		unitvector(q[N], r[N - 1], r[N]);
-
-	// calculate the curvatures and normal vectors (just if needed)
-	if (isEI || isPb) {
-		for (unsigned int i = 0; i <= N; i++) {
-			if (i == 0) {
-				// end node A case (only if attached to a Rod, i.e. a
-				// cantilever rather than pinned point)
-				Kurv[i] = (endTypeA == CANTILEVERED) ?
-					GetCurvature(lstr[0], q[0], qs[0]) : 0.0;
-			} else if (i == N) {
-				// end node B case (only if attached to a Rod, i.e. a
-				// cantilever rather than pinned point)
-				Kurv[i] = (endTypeB == CANTILEVERED) ?
-					GetCurvature(lstr[i - 1], qs[i - 1], q[i]) : 0.0;
-			} else {
-				// internal node
-				// curvature <<< remember to check sign, or just take abs
-				Kurv[i] = GetCurvature(lstr[i - 1] + lstr[i], qs[i - 1], qs[i]);
-			}
-			if (EqualRealNos(Kurv[i], 0.0)) {
-				pvec[i] = vec::Zero();
-				continue;
-			}
-
-			if (i == 0)
-				pvec[i] = q[0].cross(qs[0]);
-			else if (i == N)
-				pvec[i] = qs[i - 1].cross(q[N]);
-			else
-				pvec[i] = qs[i - 1].cross(qs[i]);
-			const real l_pvec = pvec[i].norm();
-			// We can renormalize it for afterwards simplicity
-			if (!EqualRealNos(l_pvec, 0.0))
-				pvec[i] /= l_pvec;
-		}
-	}
-
-	//============================================================================================
-	// --------------------------------- apply wave kinematics
-	// -----------------------------
-	auto [zeta, U, Ud, pdyn] = waves->getWaveKinLine(lineId);
-
-	// If in still water, iterate over all the segments and calculate
-	// volume of segment submerged. This is later used to calculate
-	// v_i, the *nodal* submerged volumes, which is then used to
-	// to calculate buoyancy.
-	for (unsigned int i = 0; i < N; i++) {
-		// TODO - figure out the best math to do here
-		// Averaging the surface heights at the two nodes is probably never
-		// correct
-		auto surface_height = 0.5 * (zeta[i] + zeta[i + 1]);
-		F[i] = calcSubSeg(i, i + 1, surface_height);
-	}
-	//============================================================================================
+void
+Line::calcKinematicsBatch()
+{
+	batch.r = as_matrix(r).transpose().array();
+	batch.rd = as_matrix(rd).transpose().array();
+
+	// segments stretched lengths, unit tangent vectors and strain rates
+	Eigen::Map<Eigen::ArrayXr> lstr_seg(lstr.data(), N);
+	batch.qs = batch.r.bottomRows(N) - batch.r.topRows(N);
+	lstr_seg = norm3(batch.qs);
+	batch.s1.head(N) = safe_length(lstr_seg).inverse();
+	scale3(batch.qs, batch.s1);
+	Eigen::Map<Eigen::ArrayXr>(ldstr.data(), N) =
+	    dot3(batch.qs, batch.rd.bottomRows(N) - batch.rd.topRows(N));
+
+	// internal nodes unit tangent vectors, using the adjacent two nodes
+	auto q_in = batch.q.middleRows(1, N - 1);
+	q_in = batch.r.bottomRows(N - 1) - batch.r.topRows(N - 1);
+	batch.s1.head(N - 1) = safe_length(norm3(q_in)).inverse();
+	scale3(q_in, batch.s1);
+
+	// The scalar fields are already written, but the vector ones are still
+	// required by the bending computations and the outputs
+	as_matrix(qs) = batch.qs.matrix().transpose();
+	as_matrix(q).middleCols(1, N - 1) = q_in.matrix().transpose();
+}
 
+void
+Line::calcDynamics(const std::vector<vec>& U,
+                   const std::vector<vec>& Ud,
+                   Eigen::Ref<Eigen::Matrix3Xr> drdt,
+                   Eigen::Ref<Eigen::Matrix3Xr> dvdt)
+{
 	// calculate mass matrix
 	for (unsigned int i = 0; i <= N; i++) {
 		real m_i; // node mass
@@ -921,53 +1091,462 @@ Line::getStateDeriv()
 		Td[i] = c * A * ldstr[i] / l[i] * qs[i];
 	}
 
-	// Bending loads
-	// first zero out the forces from last run
+	// loop through the nodes
 	for (unsigned int i = 0; i <= N; i++) {
-		Bs[i] = vec::Zero();
-		Pb[i] = vec::Zero();
-	}
+		W[i][0] = W[i][1] = 0.0;
+		// submerged weight (including buoyancy)
+		if (i == 0)
+			W[i][2] = 0.5 * A * (l[i] * (rho - F[i] * env->rho_w)) * (-env->g);
+		else if (i == N)
+			W[i][2] = 0.5 * A * (l[i - 1] * (rho - F[i - 1] * env->rho_w)) *
+			          (-env->g); // missing the "W[i][2] =" previously!
+		else
+			W[i][2] = 0.5 * A *
+			          (l[i] * (rho - F[i] * env->rho_w) +
+			           l[i - 1] * (rho - F[i - 1] * env->rho_w)) *
+			          (-env->g);
 
-	// and now compute them (if possible)
-	if (isEI) {
-		// loop through all nodes to calculate bending forces
-		for (unsigned int i = 0; i <= N; i++) {
-			const real Kurvi = Kurv[i];
-			if (EqualRealNos(Kurvi, 0.0))
-				continue;
+		// relative flow velocity over node
+		const vec vi = U[i] - rd[i];
+		// tangential relative flow component
+		// <<<<<<< check sign since I've reversed q
+		const moordyn::real vql = vi.dot(q[i]);
+		const vec vq = vql * q[i];
+		// transverse relative flow component
+		const vec vp = vi - vq;
 
-			// calculate force on each node due to bending stiffness!
+		const moordyn::real vq_mag = vq.norm();
+		const moordyn::real vp_mag = vp.norm();
 
-			if (i == 0) {
-				// end node A case (only if attached to a Rod, i.e. a
-				// cantilever rather than pinned point)
-				if (endTypeA == CANTILEVERED)
-				{
-					if (nEIpoints > 0)
-						EI = getNonlinearEI(Kurvi);
+		// transverse drag
+		if (i == 0)
+			Dp[i] = 0.25 * vp_mag * env->rho_w * Cdn * d * (F[i] * l[i]) * vp;
+		else if (i == N)
+			Dp[i] = 0.25 * vp_mag * env->rho_w * Cdn * d *
+			        (F[i - 1] * l[i - 1]) * vp;
+		else
+			Dp[i] = 0.25 * vp_mag * env->rho_w * Cdn * d *
+			        (F[i] * l[i] + F[i - 1] * l[i - 1]) * vp;
 
-					// get direction of resulting force from bending to apply
-					// on node i+1
-					vec Mforce_ip1 = qs[0].cross(pvec[i]);
+		// tangential drag
+		if (i == 0)
+			Dq[i] =
+			    0.25 * vq_mag * env->rho_w * Cdt * pi * d * (F[i] * l[i]) * vq;
+		else if (i == N)
+			Dq[i] = 0.25 * vq_mag * env->rho_w * Cdt * pi * d *
+			        (F[i - 1] * l[i - 1]) * vq;
+		else
+			Dq[i] = 0.25 * vq_mag * env->rho_w * Cdt * pi * d *
+			        (F[i] * l[i] + F[i - 1] * l[i - 1]) * vq;
 
-					// scale force direction vectors by desired moment force
-					// magnitudes to get resulting forces on adjacent nodes
-					Mforce_ip1 *= Kurvi * EI / lstr[i];
+		// tangential component of fluid acceleration
+		// <<<<<<< check sign since I've reversed q
+		const moordyn::real aql = Ud[i].dot(q[i]);
+		const vec aq = aql * q[i];
+		// normal component of fluid acceleration
+		const vec ap = Ud[i] - aq;
 
-					// set force on node i to cancel out forces on adjacent
-					// nodes
-					vec Mforce_i = -Mforce_ip1;
+		// transverse Froude-Krylov force
+		if (i == 0)
+			Ap[i] = env->rho_w * (1. + Can) * 0.5 * (F[i] * V[i]) * ap;
+		else if (i == N)
+			Ap[i] = env->rho_w * (1. + Can) * 0.5 * (F[i - 1] * V[i - 1]) * ap;
+		else
+			Ap[i] = env->rho_w * (1. + Can) * 0.5 *
+			        (F[i] * V[i] + F[i - 1] * V[i - 1]) * ap;
+		// tangential Froude-Krylov force
+		if (i == 0)
+			Aq[i] = env->rho_w * (1. + Cat) * 0.5 * (F[i] * V[i]) * aq;
+		else if (i == N)
+			Aq[i] = env->rho_w * (1. + Cat) * 0.5 * (F[i - 1] * V[i - 1]) * aq;
+		else
+			Aq[i] = env->rho_w * (1. + Cat) * 0.5 *
+			        (F[i] * V[i] + F[i - 1] * V[i - 1]) * aq;
 
-					// apply these forces to the node forces
-					Bs[i] += Mforce_i;
-					Bs[i + 1] += Mforce_ip1;
-				}
-			}
-			// end node A case (only if attached to a Rod, i.e. a cantilever
-			// rather than pinned point)
-			else if (i == N) {
-				if (endTypeB == CANTILEVERED) // if attached to Rod i.e.
-				                              // cantilever point
+		// bottom contact (stiffness and damping, vertical-only for now) -
+		// updated for general case of potentially anchor or fairlead end in
+		// contact
+		const real waterDepth = getWaterDepth(r[i][0], r[i][1]);
+		if (r[i][2] < waterDepth) {
+			if (i == 0)
+				B[i][2] =
+				    ((waterDepth - r[i][2]) * env->kb - rd[i][2] * env->cb) *
+				    0.5 * d * (l[i]);
+			else if (i == N)
+				B[i][2] =
+				    ((waterDepth - r[i][2]) * env->kb - rd[i][2] * env->cb) *
+				    0.5 * d * (l[i - 1]);
+			else
+				B[i][2] =
+				    ((waterDepth - r[i][2]) * env->kb - rd[i][2] * env->cb) *
+				    0.5 * d * (l[i - 1] + l[i]);
+
+			// new rough-draft addition of seabed friction
+			real FrictionMax =
+			    abs(B[i][2]) *
+			    env->FrictionCoefficient; // dynamic friction force saturation
+			                              // level based on bottom contact force
+
+			// saturated damping approach to applying friction, for now
+			real BottomVel =
+			    sqrt(rd[i][0] * rd[i][0] +
+			         rd[i][1] * rd[i][1]); // velocity of node along sea bed
+			real FrictionForce =
+			    BottomVel * env->FrictionCoefficient *
+			    env->FricDamp; // some arbitrary damping scaling thing at end
+			if (FrictionForce > env->StatDynFricScale * FrictionMax)
+				FrictionForce =
+				    FrictionMax; // saturate (quickly) to static/dynamic
+				                 // friction force level
+
+			if (BottomVel == 0.0) { // check for zero velocity, in which case
+				                    // friction force is zero
+				B[i][0] = 0.0;
+				B[i][1] = 0.0;
+			} else { // otherwise, apply friction force in correct
+				     // direction(opposing direction of motion)
+				B[i][0] = -FrictionForce * rd[i][0] / BottomVel;
+				B[i][1] = -FrictionForce * rd[i][1] / BottomVel;
+			}
+		} else
+			B[i] = vec(0.0, 0.0, 0.0);
+
+		// total forces
+		if (i == 0)
+			Fnet[i] = T[i] + Td[i];
+		else if (i == N)
+			Fnet[i] = -T[i - 1] - Td[i - 1];
+		else
+			Fnet[i] = T[i] - T[i - 1] + Td[i] - Td[i - 1];
+		Fnet[i] += W[i] + (Dp[i] + Dq[i] + Ap[i] + Aq[i]) + B[i] +
+			Bs[i] + Pb[i];
+	}
+
+	//	if (t > 5)
+	//	{
+	//		cout << " in getStateDeriv of line " << number << endl;
+	//
+	//		B[0][0] = 0.001; // meaningless
+	//	}
+
+	// loop through internal nodes and compute the accelerations
+	for (unsigned int i = 1; i < N; i++) {
+		//	double M_out[9];
+		//	double F_out[3];
+		//	for (int I=0; I<3; I++)
+		//	{	F_out[I] = Fnet[i][I];
+		//		for (int J=0; J<3; J++) M_out[3*I + J] = M[i][I][J];
+		//	}
+
+		// solve for accelerations in [M]{a}={f} using LU decomposition
+		//	double LU[9];                        // serialized matrix that will
+		// hold LU matrices combined 	Crout(3, M_out, LU);                  //
+		// perform LU decomposition on mass matrix 	double acc[3]; //
+		// acceleration vector to solve for 	solveCrout(3, LU, F_out, acc);
+		// // solve for acceleration vector
+
+		//	LUsolve3(M[i], acc, Fnet[i]);
+
+		//	Solve3(M[i], acc, (const double*)Fnet[i]);
+
+		// For small systems it is usually faster to compute the inverse
+		// of the matrix. See
+		// https://eigen.tuxfamily.org/dox/group__TutorialLinearAlgebra.html
+		dvdt.col(i - 1) = M[i].inverse() * Fnet[i];
+		drdt.col(i - 1) = rd[i];
+	}
+}
+
+void
+Line::calcDynamicsBatch(const std::vector<vec>& U,
+                        const std::vector<vec>& Ud,
+                        Eigen::Ref<Eigen::Matrix3Xr> drdt,
+                        Eigen::Ref<Eigen::Matrix3Xr> dvdt)
+{
+	const Eigen::Map<const Eigen::ArrayXr> l_seg(l.data(), N);
+	const Eigen::Map<const Eigen::ArrayXr> V_seg(V.data(), N);
+	const Eigen::Map<const Eigen::ArrayXr> F_seg(F.data(), N);
+	const Eigen::Map<const Eigen::ArrayXr> lstr_seg(lstr.data(), N);
+	const Eigen::Map<const Eigen::ArrayXr> ldstr_seg(ldstr.data(), N);
+	const real rho_w = env->rho_w;
+
+	// The end nodes unit tangent vectors are not computed by
+	// ::calcKinematicsBatch()
+	batch.q.row(0) = q[0].transpose().array();
+	batch.q.row(N) = q[N].transpose().array();
+	batch.U = as_matrix(U).transpose().array();
+	batch.Ud = as_matrix(Ud).transpose().array();
+
+	// submerged length and volume attributed to each node
+	segments_to_nodes(F_seg * l_seg, batch.Fl);
+	segments_to_nodes(F_seg * V_seg, batch.FV);
+
+	// line tension, the cable can't "push"
+	auto coeff = batch.coeff.head(N);
+	if (nEApoints > 0) {
+		for (unsigned int i = 0; i < N; i++)
+			coeff[i] = E = getNonlinearE(lstr[i], l[i]);
+	} else
+		coeff.setConstant(E);
+	coeff = (lstr_seg * batch.il > 1.0)
+	            .select(coeff * A * (lstr_seg - l_seg) * batch.il, 0.0);
+	batch.T = batch.qs;
+	scale3(batch.T, batch.coeff);
+
+	// line internal damping force
+	if (nCpoints > 0) {
+		for (unsigned int i = 0; i < N; i++)
+			coeff[i] = c = getNonlinearC(ldstr[i], l[i]);
+	} else
+		coeff.setConstant(c);
+	coeff *= A * ldstr_seg * batch.il;
+	batch.Td = batch.qs;
+	scale3(batch.Td, batch.coeff);
+
+	// relative flow velocity over node, split in the tangential and transverse
+	// components, which are later scaled to get the drag forces
+	auto& vql = batch.s3;
+	vql = dot3(batch.U - batch.rd, batch.q);
+	batch.Dq = batch.q;
+	scale3(batch.Dq, vql);
+	batch.Dp = batch.U - batch.rd - batch.Dq;
+	batch.s2 = 0.25 * rho_w * Cdn * d * batch.Fl * norm3(batch.Dp);
+	scale3(batch.Dp, batch.s2);
+	batch.s2 = 0.25 * rho_w * Cdt * pi * d * batch.Fl * vql.abs();
+	scale3(batch.Dq, batch.s2);
+
+	// fluid acceleration, split in the tangential and transverse components,
+	// which are later scaled to get the Froude-Krylov forces
+	auto& aql = batch.s3;
+	aql = dot3(batch.Ud, batch.q);
+	batch.Aq = batch.q;
+	scale3(batch.Aq, aql);
+	batch.Ap = batch.Ud - batch.Aq;
+	batch.s1 = rho_w * (1. + Can) * 0.5 * batch.FV;
+	scale3(batch.Ap, batch.s1);
+	batch.s1 = rho_w * (1. + Cat) * 0.5 * batch.FV;
+	scale3(batch.Aq, batch.s1);
+
+	// bottom contact (stiffness and damping, vertical-only for now), with
+	// the saturated damping approach to apply the seabed friction
+	auto& depth = batch.s1;
+	if (seafloor) {
+		for (unsigned int i = 0; i <= N; i++)
+			depth[i] = getWaterDepth(r[i][0], r[i][1]);
+	} else
+		depth.setConstant(-env->WtrDpth);
+	const auto contact = batch.r.col(2) < depth;
+	batch.B.col(2) = contact.select(((depth - batch.r.col(2)) * env->kb -
+	                                 batch.rd.col(2) * env->cb) *
+	                                    0.5 * d * batch.ln,
+	                                0.0);
+	auto& bottom_vel = batch.s2;
+	bottom_vel = (batch.rd.col(0).square() + batch.rd.col(1).square()).sqrt();
+	auto& friction = batch.coeff;
+	friction = bottom_vel * env->FrictionCoefficient * env->FricDamp;
+	friction = (friction > env->StatDynFricScale * env->FrictionCoefficient *
+	                           batch.B.col(2).abs())
+	               .select(batch.B.col(2).abs() * env->FrictionCoefficient,
+	                       friction);
+	for (unsigned int j = 0; j < 2; j++) {
+		batch.B.col(j) =
+		    (contact && (bottom_vel != 0.0))
+		        .select(-friction * batch.rd.col(j) / bottom_vel, 0.0);
+	}
+
+	// submerged weight (including buoyancy)
+	auto& weight = batch.coeff;
+	weight = 0.5 * A * (rho * batch.ln - rho_w * batch.Fl) * (-env->g);
+
+	// total forces
+	batch.Fnet = batch.Dp + batch.Dq + batch.Ap + batch.Aq + batch.B;
+	batch.Fnet.col(2) += weight;
+	batch.Fnet.topRows(N) += batch.T + batch.Td;
+	batch.Fnet.bottomRows(N) -= batch.T + batch.Td;
+	if (isPb || (EI > 0) || (nEIpoints > 0)) {
+		batch.acc = (as_matrix(Bs) + as_matrix(Pb)).transpose().array();
+		batch.Fnet += batch.acc;
+	}
+
+	// The mass matrix, m I + rho_w v (Can (I - q q^T) + Cat q q^T), has the
+	// form a I + b q q^T, so the Sherman-Morrison formula gives the
+	// accelerations without inverting any matrix
+	auto& a = batch.s1;
+	auto& b = batch.s2;
+	a = batch.m + rho_w * 0.5 * batch.FV * Can;
+	b = rho_w * 0.5 * batch.FV * (Cat - Can);
+	batch.s3 = -b / (a + b * dot3(batch.q, batch.q)) * dot3(batch.q, batch.Fnet);
+	batch.acc = batch.q;
+	scale3(batch.acc, batch.s3);
+	batch.acc += batch.Fnet;
+	batch.s3 = a.inverse();
+	scale3(batch.acc, batch.s3);
+
+	// back to the per node storage
+	for (unsigned int i = 0; i <= N; i++) {
+		M[i].noalias() = (b[i] * q[i]) * q[i].transpose();
+		M[i].diagonal().array() += a[i];
+		W[i] = vec(0.0, 0.0, weight[i]);
+	}
+	as_matrix(T) = batch.T.matrix().transpose();
+	as_matrix(Td) = batch.Td.matrix().transpose();
+	as_matrix(Dp) = batch.Dp.matrix().transpose();
+	as_matrix(Dq) = batch.Dq.matrix().transpose();
+	as_matrix(Ap) = batch.Ap.matrix().transpose();
+	as_matrix(Aq) = batch.Aq.matrix().transpose();
+	as_matrix(B) = batch.B.matrix().transpose();
+	as_matrix(Fnet) = batch.Fnet.matrix().transpose();
+	drdt = batch.rd.middleRows(1, N - 1).matrix().transpose();
+	dvdt = batch.acc.middleRows(1, N - 1).matrix().transpose();
+}
+
+void
+Line::getStateDeriv(Eigen::Ref<Eigen::Matrix3Xr> drdt,
+                    Eigen::Ref<Eigen::Matrix3Xr> dvdt)
+{
+	// NOTE:
+	// Jose Luis Cercos-Pita: This is by far the most consuming function of the
+	// whole library, just because it is called every single time substep and
+	// it shall make computations in every single line node. Thus it is worthy
+	// to invest effort on keeping it optimized.
+
+	// attempting error handling <<<<<<<<
+	for (unsigned int i = 0; i <= N; i++) {
+		if (isnan(r[i].sum())) {
+			stringstream s;
+			LOGERR << "NaN detected" << endl << "Line " << number << endl;
+			LOGMSG << "node positions:" << endl;
+			for (unsigned int j = 0; j <= N; j++)
+				LOGMSG << j << " : [" << r[j].transpose() << "]" << endl;
+			throw moordyn::nan_error("NaN in node positions");
+		}
+	}
+
+	// the quasi-static lines are just computing the end forces
+	if (quasi_static) {
+		calcQuasiStatic();
+		return;
+	}
+
+	// dt is possibly used for stability tricks...
+
+	// -------------------- calculate various kinematic quantities
+	// ---------------------------
+	if (batched)
+		calcKinematicsBatch();
+	else
+		calcKinematics();
+
+	// calculate unit tangent vectors for either end node if the line has no
+	// bending stiffness of if either end is pinned (otherwise it's already
+	// been set via ::setEndOrientation())
+	const bool isEI = (EI > 0) || (nEIpoints > 0);
+	if ((endTypeA == PINNED) || !isEI)
+		unitvector(q[0], r[0], r[1]);
+	if ((endTypeB == PINNED) || !isEI)
+		unitvector(q[N], r[N - 1], r[N]);
+
+	// calculate the curvatures and normal vectors (just if needed)
+	if (isEI || isPb) {
+		for (unsigned int i = 0; i <= N; i++) {
+			if (i == 0) {
+				// end node A case (only if attached to a Rod, i.e. a
+				// cantilever rather than pinned point)
+				Kurv[i] = (endTypeA == CANTILEVERED) ?
+					GetCurvature(lstr[0], q[0], qs[0]) : 0.0;
+			} else if (i == N) {
+				// end node B case (only if attached to a Rod, i.e. a
+				// cantilever rather than pinned point)
+				Kurv[i] = (endTypeB == CANTILEVERED) ?
+					GetCurvature(lstr[i - 1], qs[i - 1], q[i]) : 0.0;
+			} else {
+				// internal node
+				// curvature <<< remember to check sign, or just take abs
+				Kurv[i] = GetCurvature(lstr[i - 1] + lstr[i], qs[i - 1], qs[i]);
+			}
+			if (EqualRealNos(Kurv[i], 0.0)) {
+				pvec[i] = vec::Zero();
+				continue;
+			}
+
+			if (i == 0)
+				pvec[i] = q[0].cross(qs[0]);
+			else if (i == N)
+				pvec[i] = qs[i - 1].cross(q[N]);
+			else
+				pvec[i] = qs[i - 1].cross(qs[i]);
+			const real l_pvec = pvec[i].norm();
+			// We can renormalize it for afterwards simplicity
+			if (!EqualRealNos(l_pvec, 0.0))
+				pvec[i] /= l_pvec;
+		}
+	}
+
+	//============================================================================================
+	// --------------------------------- apply wave kinematics
+	// -----------------------------
+	auto [zeta, U, Ud, pdyn] = waves->getWaveKinLine(lineId);
+
+	// If in still water, iterate over all the segments and calculate
+	// volume of segment submerged. This is later used to calculate
+	// v_i, the *nodal* submerged volumes, which is then used to
+	// to calculate buoyancy.
+	for (unsigned int i = 0; i < N; i++) {
+		// TODO - figure out the best math to do here
+		// Averaging the surface heights at the two nodes is probably never
+		// correct
+		auto surface_height = 0.5 * (zeta[i] + zeta[i + 1]);
+		F[i] = calcSubSeg(i, i + 1, surface_height);
+	}
+	//============================================================================================
+
+	// Bending loads
+	// first zero out the forces from last run
+	for (unsigned int i = 0; i <= N; i++) {
+		Bs[i] = vec::Zero();
+		Pb[i] = vec::Zero();
+	}
+
+	// and now compute them (if possible)
+	if (isEI) {
+		// loop through all nodes to calculate bending forces
+		for (unsigned int i = 0; i <= N; i++) {
+			const real Kurvi = Kurv[i];
+			if (EqualRealNos(Kurvi, 0.0))
+				continue;
+
+			// calculate force on each node due to bending stiffness!
+
+			if (i == 0) {
+				// end node A case (only if attached to a Rod, i.e. a
+				// cantilever rather than pinned point)
+				if (endTypeA == CANTILEVERED)
+				{
+					if (nEIpoints > 0)
+						EI = getNonlinearEI(Kurvi);
+
+					// get direction of resulting force from bending to apply
+					// on node i+1
+					vec Mforce_ip1 = qs[0].cross(pvec[i]);
+
+					// scale force direction vectors by desired moment force
+					// magnitudes to get resulting forces on adjacent nodes
+					Mforce_ip1 *= Kurvi * EI / lstr[i];
+
+					// set force on node i to cancel out forces on adjacent
+					// nodes
+					vec Mforce_i = -Mforce_ip1;
+
+					// apply these forces to the node forces
+					Bs[i] += Mforce_i;
+					Bs[i + 1] += Mforce_ip1;
+				}
+			}
+			// end node A case (only if attached to a Rod, i.e. a cantilever
+			// rather than pinned point)
+			else if (i == N) {
+				if (endTypeB == CANTILEVERED) // if attached to Rod i.e.
+				                              // cantilever point
 				{
 					// curvature <<< check if this approximation
 					// works for an end (assuming rod angle is node
@@ -1092,175 +1671,12 @@ Line::getStateDeriv()
 		}
 	}
 
-	// loop through the nodes
-	for (unsigned int i = 0; i <= N; i++) {
-		W[i][0] = W[i][1] = 0.0;
-		// submerged weight (including buoyancy)
-		if (i == 0)
-			W[i][2] = 0.5 * A * (l[i] * (rho - F[i] * env->rho_w)) * (-env->g);
-		else if (i == N)
-			W[i][2] = 0.5 * A * (l[i - 1] * (rho - F[i - 1] * env->rho_w)) *
-			          (-env->g); // missing the "W[i][2] =" previously!
-		else
-			W[i][2] = 0.5 * A *
-			          (l[i] * (rho - F[i] * env->rho_w) +
-			           l[i - 1] * (rho - F[i - 1] * env->rho_w)) *
-			          (-env->g);
-
-		// relative flow velocity over node
-		const vec vi = U[i] - rd[i];
-		// tangential relative flow component
-		// <<<<<<< check sign since I've reversed q
-		const moordyn::real vql = vi.dot(q[i]);
-		const vec vq = vql * q[i];
-		// transverse relative flow component
-		const vec vp = vi - vq;
-
-		const moordyn::real vq_mag = vq.norm();
-		const moordyn::real vp_mag = vp.norm();
-
-		// transverse drag
-		if (i == 0)
-			Dp[i] = 0.25 * vp_mag * env->rho_w * Cdn * d * (F[i] * l[i]) * vp;
-		else if (i == N)
-			Dp[i] = 0.25 * vp_mag * env->rho_w * Cdn * d *
-			        (F[i - 1] * l[i - 1]) * vp;
-		else
-			Dp[i] = 0.25 * vp_mag * env->rho_w * Cdn * d *
-			        (F[i] * l[i] + F[i - 1] * l[i - 1]) * vp;
-
-		// tangential drag
-		if (i == 0)
-			Dq[i] =
-			    0.25 * vq_mag * env->rho_w * Cdt * pi * d * (F[i] * l[i]) * vq;
-		else if (i == N)
-			Dq[i] = 0.25 * vq_mag * env->rho_w * Cdt * pi * d *
-			        (F[i - 1] * l[i - 1]) * vq;
-		else
-			Dq[i] = 0.25 * vq_mag * env->rho_w * Cdt * pi * d *
-			        (F[i] * l[i] + F[i - 1] * l[i - 1]) * vq;
-
-		// tangential component of fluid acceleration
-		// <<<<<<< check sign since I've reversed q
-		const moordyn::real aql = Ud[i].dot(q[i]);
-		const vec aq = aql * q[i];
-		// normal component of fluid acceleration
-		const vec ap = Ud[i] - aq;
-
-		// transverse Froude-Krylov force
-		if (i == 0)
-			Ap[i] = env->rho_w * (1. + Can) * 0.5 * (F[i] * V[i]) * ap;
-		else if (i == N)
-			Ap[i] = env->rho_w * (1. + Can) * 0.5 * (F[i - 1] * V[i - 1]) * ap;
-		else
-			Ap[i] = env->rho_w * (1. + Can) * 0.5 *
-			        (F[i] * V[i] + F[i - 1] * V[i - 1]) * ap;
-		// tangential Froude-Krylov force
-		if (i == 0)
-			Aq[i] = env->rho_w * (1. + Cat) * 0.5 * (F[i] * V[i]) * aq;
-		else if (i == N)
-			Aq[i] = env->rho_w * (1. + Cat) * 0.5 * (F[i - 1] * V[i - 1]) * aq;
-		else
-			Aq[i] = env->rho_w * (1. + Cat) * 0.5 *
-			        (F[i] * V[i] + F[i - 1] * V[i - 1]) * aq;
-
-		// bottom contact (stiffness and damping, vertical-only for now) -
-		// updated for general case of potentially anchor or fairlead end in
-		// contact
-		const real waterDepth = getWaterDepth(r[i][0], r[i][1]);
-		if (r[i][2] < waterDepth) {
-			if (i == 0)
-				B[i][2] =
-				    ((waterDepth - r[i][2]) * env->kb - rd[i][2] * env->cb) *
-				    0.5 * d * (l[i]);
-			else if (i == N)
-				B[i][2] =
-				    ((waterDepth - r[i][2]) * env->kb - rd[i][2] * env->cb) *
-				    0.5 * d * (l[i - 1]);
-			else
-				B[i][2] =
-				    ((waterDepth - r[i][2]) * env->kb - rd[i][2] * env->cb) *
-				    0.5 * d * (l[i - 1] + l[i]);
-
-			// new rough-draft addition of seabed friction
-			real FrictionMax =
-			    abs(B[i][2]) *
-			    env->FrictionCoefficient; // dynamic friction force saturation
-			                              // level based on bottom contact force
-
-			// saturated damping approach to applying friction, for now
-			real BottomVel =
-			    sqrt(rd[i][0] * rd[i][0] +
-			         rd[i][1] * rd[i][1]); // velocity of node along sea bed
-			real FrictionForce =
-			    BottomVel * env->FrictionCoefficient *
-			    env->FricDamp; // some arbitrary damping scaling thing at end
-			if (FrictionForce > env->StatDynFricScale * FrictionMax)
-				FrictionForce =
-				    FrictionMax; // saturate (quickly) to static/dynamic
-				                 // friction force level
-
-			if (BottomVel == 0.0) { // check for zero velocity, in which case
-				                    // friction force is zero
-				B[i][0] = 0.0;
-				B[i][1] = 0.0;
-			} else { // otherwise, apply friction force in correct
-				     // direction(opposing direction of motion)
-				B[i][0] = -FrictionForce * rd[i][0] / BottomVel;
-				B[i][1] = -FrictionForce * rd[i][1] / BottomVel;
-			}
-		} else
-			B[i] = vec(0.0, 0.0, 0.0);
-
-		// total forces
-		if (i == 0)
-			Fnet[i] = T[i] + Td[i];
-		else if (i == N)
-			Fnet[i] = -T[i - 1] - Td[i - 1];
-		else
-			Fnet[i] = T[i] - T[i - 1] + Td[i] - Td[i - 1];
-		Fnet[i] += W[i] + (Dp[i] + Dq[i] + Ap[i] + Aq[i]) + B[i] +
-			Bs[i] + Pb[i];
-	}
-
-	//	if (t > 5)
-	//	{
-	//		cout << " in getStateDeriv of line " << number << endl;
-	//
-	//		B[0][0] = 0.001; // meaningless
-	//	}
-
-	// loop through internal nodes and compute the accelerations
-	std::vector<vec> u, a;
-	u.reserve(N - 1);
-	a.reserve(N - 1);
-	for (unsigned int i = 1; i < N; i++) {
-		//	double M_out[9];
-		//	double F_out[3];
-		//	for (int I=0; I<3; I++)
-		//	{	F_out[I] = Fnet[i][I];
-		//		for (int J=0; J<3; J++) M_out[3*I + J] = M[i][I][J];
-		//	}
-
-		// solve for accelerations in [M]{a}={f} using LU decomposition
-		//	double LU[9];                        // serialized matrix that will
-		// hold LU matrices combined 	Crout(3, M_out, LU);                  //
-		// perform LU decomposition on mass matrix 	double acc[3]; //
-		// acceleration vector to solve for 	solveCrout(3, LU, F_out, acc);
-		// // solve for acceleration vector
-
-		//	LUsolve3(M[i], acc, Fnet[i]);
-
-		//	Solve3(M[i], acc, (const double*)Fnet[i]);
-
-		// For small systems it is usually faster to compute the inverse
-		// of the matrix. See
-		// https://eigen.tuxfamily.org/dox/group__TutorialLinearAlgebra.html
-		a.push_back(M[i].inverse() * Fnet[i]);
-		u.push_back(rd[i]);
-	}
-
-	return make_pair(u, a);
+	// ============  CALCULATE NODES FORCES AND ACCELERATIONS
+	// ===============================
+	if (batched)
+		calcDynamicsBatch(U, Ud, drdt, dvdt);
+	else
+		calcDynamics(U, Ud, drdt, dvdt);
 };
 
 // write output file for line  (accepts time parameter since retained time value
@@ -1446,6 +1862,7 @@ Line::Deserialize(const uint64_t* data)
 	ptr = io::IO::Deserialize(ptr, B);
 	ptr = io::IO::Deserialize(ptr, Fnet);
 	ptr = io::IO::Deserialize(ptr, F);
+	updateCoefficients();
 
 	return ptr;
 }
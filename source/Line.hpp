@@ -120,6 +120,65 @@ class Line final : public io::IO, public NatFreqCFL
 	{
 		return seafloor ? seafloor->getAverageDepth() : -env->WtrDpth;
 	}
+
+	/** @brief Update the per node coefficients table of the batched kernel
+	 *
+	 * This shall be called each time the unstretched segment lengths change
+	 */
+	void updateCoefficients();
+
+	/** @brief Compute the segments stretched lengths, unit tangent vectors and
+	 * strain rates, as well as the internal nodes unit tangent vectors
+	 */
+	void calcKinematics();
+
+	/** @brief Batched version of ::calcKinematics()
+	 */
+	void calcKinematicsBatch();
+
+	/** @brief Compute the nodes forces and accelerations
+	 *
+	 * The kinematics, bending and pressure bending forces are assumed to be
+	 * already computed
+	 * @param U The water velocity at each node
+	 * @param Ud The water acceleration at each node
+	 * @param drdt The velocities of the internal nodes
+	 * @param dvdt The accelerations of the internal nodes
+	 */
+	void calcDynamics(const std::vector<vec>& U,
+	                  const std::vector<vec>& Ud,
+	                  Eigen::Ref<Eigen::Matrix3Xr> drdt,
+	                  Eigen::Ref<Eigen::Matrix3Xr> dvdt);
+
+	/** @brief Batched version of ::calcDynamics()
+	 * @param U The water velocity at each node
+	 * @param Ud The water acceleration at each node
+	 * @param drdt The velocities of the internal nodes
+	 * @param dvdt The accelerations of the internal nodes
+	 */
+	void calcDynamicsBatch(const std::vector<vec>& U,
+	                       const std::vector<vec>& Ud,
+	                       Eigen::Ref<Eigen::Matrix3Xr> drdt,
+	                       Eigen::Ref<Eigen::Matrix3Xr> dvdt);
+
+	/** @brief Solve the quasi-static catenary between the line ends
+	 *
+	 * On success the internal nodes are placed along the resulting profile
+	 * and the fairlead and anchor tensions are stored on moordyn::Line::cat
+	 * @param warm true to start the Newton-Raphson iterations from the last
+	 * solution, false to use the default initial guess
+	 * @return true if the quasi-static equilibrium is found, false otherwise
+	 */
+	bool solveCatenary(bool warm);
+
+	/** @brief Compute the end forces of a quasi-static line
+	 *
+	 * This replaces ::calcDynamics() on the lines set as quasi-static, see
+	 * ::isQuasiStatic(). If the catenary cannot be solved the last solution
+	 * is kept
+	 */
+	void calcQuasiStatic();
+
 	// ENVIRONMENTAL STUFF
 	/// Global struct that holds environmental settings
 	EnvCondRef env;
@@ -250,6 +309,99 @@ class Line final : public io::IO, public NatFreqCFL
 	/// VOF scalar for each segment (1 = fully submerged, 0 = out of water)
 	std::vector<moordyn::real> F;
 
+	/// true if the batched kernel shall be used, see ::setBatched()
+	bool batched;
+
+	/// true if the line is modelled as a quasi-static catenary
+	bool quasi_static;
+
+	/** @brief Storage of the quasi-static catenary solver
+	 *
+	 * The tensions are kept to warm start the next solve, see
+	 * ::solveCatenary()
+	 */
+	struct
+	{
+		/// horizontal tension at the fairlead (N)
+		real HF;
+		/// vertical tension at the fairlead (N)
+		real VF;
+		/// horizontal tension at the anchor (N)
+		real HA;
+		/// vertical tension at the anchor (N)
+		real VA;
+		/// true if the ends were reversed, i.e. end A is above end B
+		bool reversed;
+		/// true if the last solve failed
+		bool failed;
+		/// unstretched arc length from end A to each node
+		std::vector<moordyn::real> s;
+		/// horizontal position of each node relative to end A
+		std::vector<moordyn::real> X;
+		/// vertical position of each node relative to end A
+		std::vector<moordyn::real> Z;
+		/// effective tension at each node
+		std::vector<moordyn::real> Te;
+	} cat;
+
+	/** @brief Storage of the batched kernel
+	 *
+	 * The vector fields are stored as structures of arrays, i.e. one
+	 * contiguous column per component, so the loops can process several nodes
+	 * at once, whatever the SIMD width is
+	 */
+	struct
+	{
+		/// node positions
+		Eigen::ArrayX3r r;
+		/// node velocities
+		Eigen::ArrayX3r rd;
+		/// unit tangent vectors for each node
+		Eigen::ArrayX3r q;
+		/// unit tangent vectors for each segment
+		Eigen::ArrayX3r qs;
+		/// water velocities at each node
+		Eigen::ArrayX3r U;
+		/// water accelerations at each node
+		Eigen::ArrayX3r Ud;
+		/// segment tensions
+		Eigen::ArrayX3r T;
+		/// segment damping forces
+		Eigen::ArrayX3r Td;
+		/// node drag (transversal)
+		Eigen::ArrayX3r Dp;
+		/// node drag (axial)
+		Eigen::ArrayX3r Dq;
+		/// node added mass forcing (transversal)
+		Eigen::ArrayX3r Ap;
+		/// node added mass forcing (axial)
+		Eigen::ArrayX3r Aq;
+		/// node bottom contact force
+		Eigen::ArrayX3r B;
+		/// total force on node
+		Eigen::ArrayX3r Fnet;
+		/// node accelerations
+		Eigen::ArrayX3r acc;
+		/// node mass (coefficients table)
+		Eigen::ArrayXr m;
+		/// unstretched length attributed to each node (coefficients table)
+		Eigen::ArrayXr ln;
+		/// inverse of the unstretched segment lengths (coefficients table)
+		Eigen::ArrayXr il;
+		/// submerged length attributed to each node
+		Eigen::ArrayXr Fl;
+		/// submerged volume attributed to each node
+		Eigen::ArrayXr FV;
+		/// segments stiffness or damping coefficients
+		Eigen::ArrayXr coeff;
+		/// per node or per segment scratch values
+		Eigen::ArrayXr s1;
+		/// per node or per segment scratch values
+		Eigen::ArrayXr s2;
+		/// per node or per segment scratch values
+		Eigen::ArrayXr s3;
+	} batch;
+
 	// time
 	/// simulation time
 	moordyn::real t;
@@ -330,6 +482,16 @@ class Line final : public io::IO, public NatFreqCFL
 	           shared_ptr<ofstream> outfile,
 	           string channels);
 
+	/** @brief Make a copy of the line, for a cloned system
+	 *
+	 * The copy does not write any output file, and its waves shall be set
+	 * afterwards with setWaves()
+	 * @param log The logging handler of the cloned system
+	 * @param env_in The environmental settings of the cloned system
+	 * @return The copy, which shall be deleted by the caller
+	 */
+	Line* clone(moordyn::Log* log, EnvCondRef env_in) const;
+
 	/** @brief Set the environmental data
 	 * @param waves_in Global Waves object
 	 * @param seafloor_in Global 3D Seafloor object
@@ -358,6 +520,70 @@ class Line final : public io::IO, public NatFreqCFL
 	 */
 	inline unsigned int getN() const { return N; }
 
+	/** @brief Check whether the line is modelled as a quasi-static catenary
+	 *
+	 * Quasi-static lines are set adding the "q" flag to the outputs column of
+	 * the LINES section. Their internal nodes are not integrated in time,
+	 * but placed along the catenary profile between the line ends each time
+	 * the forces are computed
+	 * @return true if the line is quasi-static, false otherwise
+	 */
+	inline bool isQuasiStatic() const { return quasi_static; }
+
+	/** @brief Number of nodes integrated by the time scheme
+	 * @return moordyn::Line::getN() - 1 for dynamic lines, 0 for quasi-static
+	 * lines
+	 * @see ::isQuasiStatic()
+	 */
+	inline unsigned int getNStates() const
+	{
+		return quasi_static ? 0 : N - 1;
+	}
+
+	/** @brief Get the timestep from a CFL factor
+	 *
+	 * The quasi-static lines are not limiting the timestep at all
+	 * @param cfl CFL factor
+	 * @return The timestep
+	 */
+	inline real cfl2dt(const real cfl) const
+	{
+		if (quasi_static)
+			return (std::numeric_limits<real>::max)();
+		return NatFreqCFL::cfl2dt(cfl);
+	}
+
+	/** @brief Get the CFL factor from a timestep
+	 * @param dt Timestep
+	 * @return CFL factor, 0 for the quasi-static lines
+	 */
+	inline real dt2cfl(const real dt) const
+	{
+		return quasi_static ? 0.0 : NatFreqCFL::dt2cfl(dt);
+	}
+
+	/** @brief Get the timestep from a CFL factor and velocity
+	 * @param cfl CFL factor
+	 * @param v velocity
+	 * @return The timestep
+	 */
+	inline real cfl2dt(const real cfl, const real v) const
+	{
+		if (quasi_static)
+			return (std::numeric_limits<real>::max)();
+		return NatFreqCFL::cfl2dt(cfl, v);
+	}
+
+	/** @brief Get the CFL factor from a timestep and velocity
+	 * @param dt Timestep
+	 * @param v velocity
+	 * @return CFL factor, 0 for the quasi-static lines
+	 */
+	inline real dt2cfl(const real dt, const real v) const
+	{
+		return quasi_static ? 0.0 : NatFreqCFL::dt2cfl(dt, v);
+	}
+
 	/** @brief Get the unstretched length of the line
 	 * @return The unstretched length, moordyn::Line::UnstrLen
 	 */
@@ -379,6 +605,7 @@ class Line final : public io::IO, public NatFreqCFL
 			l[i] = UnstrLen / double(N);
 			V[i] = l[i] * A;
 		}
+		updateCoefficients();
 	}
 
 	/** @brief Set the unstretched length rate of change of the line
@@ -705,6 +932,43 @@ class Line final : public io::IO, public NatFreqCFL
 		}
 	}
 
+	/** @brief Get the forces and moments at both line endpoints
+	 * @param FA The force at the end point A
+	 * @param MA The moment at the end point A
+	 * @param FB The force at the end point B
+	 * @param MB The moment at the end point B
+	 * @see Line::setEndForces()
+	 */
+	inline void getEndForces(vec& FA, vec& MA, vec& FB, vec& MB) const
+	{
+		FA = Fnet[0];
+		MA = endMomentA;
+		FB = Fnet[N];
+		MB = endMomentB;
+	}
+
+	/** @brief Overwrite the forces and moments at both line endpoints
+	 *
+	 * The values are replaced on the next call to getStateDeriv(). This is
+	 * used by the multirate time schemes to feed the attached entities with
+	 * forces interpolated in time, while the line is not computed
+	 * @param FA The force at the end point A
+	 * @param MA The moment at the end point A
+	 * @param FB The force at the end point B
+	 * @param MB The moment at the end point B
+	 * @see Line::getEndStuff()
+	 */
+	inline void setEndForces(const vec& FA,
+	                         const vec& MA,
+	                         const vec& FB,
+	                         const vec& MB)
+	{
+		Fnet[0] = FA;
+		endMomentA = MA;
+		Fnet[N] = FB;
+		endMomentB = MB;
+	}
+
 	/** @brief Get line output
 	 *
 	 * This function is useful when outputs are set in the line properties
@@ -810,13 +1074,14 @@ class Line final : public io::IO, public NatFreqCFL
 	inline void setTime(real time) { t = time; }
 
 	/** @brief Set the line state
-	 * @param r The moordyn::Line::getN() - 1 positions
-	 * @param u The moordyn::Line::getN() - 1 velocities
+	 * @param r The moordyn::Line::getNStates() positions, one per column
+	 * @param u The moordyn::Line::getNStates() velocities, one per column
 	 * @note This method is not affecting the line end points
 	 * @see moordyn::Line::setEndState
 	 * @throws invalid_value_error If either @p r or @p u have wrong sizes
 	 */
-	void setState(std::vector<vec> r, std::vector<vec> u);
+	void setState(const Eigen::Ref<const Eigen::Matrix3Xr>& r,
+	              const Eigen::Ref<const Eigen::Matrix3Xr>& u);
 
 	/** @brief Set the position and velocity of an end point
 	 * @param r Position
@@ -856,11 +1121,51 @@ class Line final : public io::IO, public NatFreqCFL
 	vec getEndSegmentMoment(EndPoints end_point, EndPoints rod_end_point) const;
 
 	/** @brief Calculate forces and get the derivative of the line's states
-	 * @return The velocities of the internal nodes (first) and the accelerations
-	 * of the internal nodes (second)
+	 *
+	 * The derivatives are written straight on the provided storage, one column
+	 * per internal node, so no memory is allocated
+	 * @param drdt The velocities of the internal nodes
+	 * @param dvdt The accelerations of the internal nodes
 	 * @throws nan_error If nan values are detected in any node position
 	 */
-	std::pair<std::vector<vec>, std::vector<vec>> getStateDeriv();
+	void getStateDeriv(Eigen::Ref<Eigen::Matrix3Xr> drdt,
+	                   Eigen::Ref<Eigen::Matrix3Xr> dvdt);
+
+	/** @brief Set whether the batched kernel shall be used to compute the
+	 * state derivatives
+	 *
+	 * The batched kernel processes the segments and nodes as structures of
+	 * arrays, which pays off on long lines. Thus it is enabled by default on
+	 * lines with at least moordyn::Line::BATCH_MIN_SEGMENTS segments
+	 * @param enable true to use the batched kernel, false to use the node by
+	 * node one
+	 * @see ::getStateDeriv()
+	 */
+	inline void setBatched(bool enable) { batched = enable; }
+
+	/** @brief Get whether the batched kernel is used to compute the state
+	 * derivatives
+	 * @return true if the batched kernel is used, false otherwise
+	 * @see ::setBatched()
+	 */
+	inline bool isBatched() const { return batched; }
+
+	/// Minimum number of segments to use the batched kernel by default
+	static constexpr unsigned int BATCH_MIN_SEGMENTS = 64;
+
+	/** @brief Get the number of neighbour nodes, at each side, affecting the
+	 * derivatives of an internal node
+	 *
+	 * The axial stiffness and damping are just coupling each node with the
+	 * adjacent ones, while the bending stiffness and the pressure bending are
+	 * computed from the curvature, which depends on the adjacent segments
+	 * @return 2 if the line has bending stiffness or pressure bending, 1
+	 * otherwise
+	 */
+	inline unsigned int getBandwidth() const
+	{
+		return (isPb || (EI > 0) || (nEIpoints > 0)) ? 2 : 1;
+	}
 
 	// void initiateStep(vector<double> &rFairIn, vector<double> &rdFairIn,
 	// double time);
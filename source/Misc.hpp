@@ -43,6 +43,7 @@
 #include <cmath>
 #include <complex>
 #include <utility>
+#include <cstdint>
 #include <initializer_list>
 #include <filesystem>
 
@@ -82,8 +83,16 @@ typedef Matrix<int, 6, 6> Matrix6i;
 // It is also convenient for us to define a generic Eigen dynamic matrix class
 #ifdef MOORDYN_SINGLEPRECISSION
 typedef MatrixXf MatrixXr;
+typedef VectorXf VectorXr;
+typedef Matrix3Xf Matrix3Xr;
+typedef ArrayXf ArrayXr;
+typedef Array<float, Dynamic, 3> ArrayX3r;
 #else
 typedef MatrixXd MatrixXr;
+typedef VectorXd VectorXr;
+typedef Matrix3Xd Matrix3Xr;
+typedef ArrayXd ArrayXr;
+typedef Array<double, Dynamic, 3> ArrayX3r;
 #endif
 }
 
@@ -130,6 +139,8 @@ typedef mat3 mat;
 /// Quaternion of real numbers
 typedef Eigen::Quaterniond quaternion;
 #endif
+/// 7-D vector of real numbers, i.e. a position and a quaternion
+typedef Eigen::Matrix<real, 7, 1> vec7;
 /// 2-D vector of integers
 typedef Eigen::Vector2i ivec2;
 /// 3-D vector of integers
@@ -302,9 +313,13 @@ struct XYZQuat
 		out.tail<3>() = Quat2Euler(this->quat);
 		return out;
 	}
-	Eigen::Vector<real, 7> toVec7() const
+	static XYZQuat fromVec7(const vec7& vec)
 	{
-		Eigen::Vector<real, 7> out;
+		return XYZQuat{ vec.head<3>(), quaternion(vec.tail<4>()) };
+	}
+	vec7 toVec7() const
+	{
+		vec7 out;
 		out.head<3>() = pos;
 		out.tail<4>() = quat.coeffs();
 		return out;
@@ -740,6 +755,45 @@ fileToLines(const std::filesystem::path& path);
 
 }
 
+/// Initial value of the 64 bits FNV-1a hash, see ::fnv1a()
+#define FNV1A_OFFSET 0xcbf29ce484222325ULL
+
+/** @brief Accumulate a string on a 64 bits FNV-1a hash
+ *
+ * The FNV-1a hash is stable across platforms and compilers, so it can be
+ * used to key the files cached on disk
+ * @param key The hash so far, FNV1A_OFFSET to start a new one
+ * @param text The string to accumulate
+ * @return The resulting hash
+ */
+inline uint64_t
+fnv1a(uint64_t key, const std::string& text)
+{
+	for (unsigned char c : text) {
+		key ^= c;
+		key *= 0x100000001b3ULL;
+	}
+	return key;
+}
+
+/** @brief Accumulate an integer on a 64 bits FNV-1a hash
+ *
+ * The bytes are accumulated from the least significant one, so the result
+ * does not depend on the endianness
+ * @param key The hash so far, FNV1A_OFFSET to start a new one
+ * @param v The integer to accumulate
+ * @return The resulting hash
+ */
+inline uint64_t
+fnv1a(uint64_t key, uint64_t v)
+{
+	for (unsigned int i = 0; i < 8; i++) {
+		key ^= (v >> (8 * i)) & 0xff;
+		key *= 0x100000001b3ULL;
+	}
+	return key;
+}
+
 /**
  * @}
  */
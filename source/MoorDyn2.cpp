@@ -34,6 +34,8 @@
 #include "Misc.hpp"
 #include "MoorDyn2.hpp"
 #include "Rod.hpp"
+#include "Util/ThreadPool.hpp"
+#include <atomic>
 
 #ifdef LINUX
 #include <cmath>
@@ -76,7 +78,9 @@ const char* UnitList[] = {
 	"(Nm)      ", "(frac)    "
 };
 
-moordyn::MoorDyn::MoorDyn(const char* infilename, int log_level)
+moordyn::MoorDyn::MoorDyn(const char* infilename,
+                          int log_level,
+                          bool write_outputs)
   : io::IO(NULL)
   , _filepath("Mooring/lines.txt")
   , _basename("lines")
@@ -88,9 +92,17 @@ moordyn::MoorDyn::MoorDyn(const char* infilename, int log_level)
   , WaveKinTemp(waves::WAVES_NONE)
   , dtM0((std::numeric_limits<real>::max)())
   , cfl(0.5)
+  , rtol(1e-3)
+  , atol(1e-3)
   , dtOut(0.0)
   , _t_integrator(NULL)
   , ICgenDynamic(false)
+  , ICgenNewton(false)
+  , ICNewtonIters(50)
+  , ICNewtonStatus(-1)
+  , ICCacheSize(100.0)
+  , ICCacheTol(1e-3)
+  , _n_threads(1)
   , env(std::make_shared<EnvCond>())
   , GroundBody(NULL)
   , waves(nullptr)
@@ -138,6 +150,7 @@ moordyn::MoorDyn::MoorDyn(const char* infilename, int log_level)
 	env->StatDynFricScale = 1.0;
 
 	waves = std::make_shared<moordyn::Waves>(_log);
+	_write_outputs = write_outputs;
 
 	const moordyn::error_id err = ReadInFile();
 	if (err != MOORDYN_SUCCESS) {
@@ -156,6 +169,103 @@ moordyn::MoorDyn::MoorDyn(const char* infilename, int log_level)
 	nXtra = nX + 6 * 2 * ui_size(LineList);
 }
 
+moordyn::MoorDyn::MoorDyn(const MoorDyn& system)
+  : io::IO(NULL)
+  , _filepath(system._filepath)
+  , _basename(system._basename)
+  , _basepath(system._basepath)
+  , ICDfac(system.ICDfac)
+  , ICdt(system.ICdt)
+  , ICTmax(system.ICTmax)
+  , ICthresh(system.ICthresh)
+  , ICgenDynamic(system.ICgenDynamic)
+  , ICgenNewton(system.ICgenNewton)
+  , ICNewtonIters(system.ICNewtonIters)
+  , ICNewtonStatus(system.ICNewtonStatus)
+  , ICCachePath(system.ICCachePath)
+  , ICCacheSize(system.ICCacheSize)
+  , ICCacheTol(system.ICCacheTol)
+  , WaveKinTemp(system.WaveKinTemp)
+  , dtM0(system.dtM0)
+  , cfl(system.cfl)
+  , rtol(system.rtol)
+  , atol(system.atol)
+  , _n_threads(system._n_threads)
+  , dtOut(system.dtOut)
+  , _t_integrator(NULL)
+  , env(std::make_shared<EnvCond>(*system.env))
+  , GroundBody(NULL)
+  , waves(nullptr)
+  , _shared_waves(system.waves)
+  , _write_outputs(false)
+  , _x_cpld(system._x_cpld)
+  , _xd_cpld(system._xd_cpld)
+  , _surrogate(system._surrogate)
+  , seafloor(system.seafloor)
+  , LineStateIs(system.LineStateIs)
+  , PointStateIs(system.PointStateIs)
+  , RodStateIs(system.RodStateIs)
+  , BodyStateIs(system.BodyStateIs)
+  , FreeBodyIs(system.FreeBodyIs)
+  , FixedBodyIs(system.FixedBodyIs)
+  , CpldBodyIs(system.CpldBodyIs)
+  , FreeRodIs(system.FreeRodIs)
+  , CpldRodIs(system.CpldRodIs)
+  , FreePointIs(system.FreePointIs)
+  , CpldPointIs(system.CpldPointIs)
+  , nX(system.nX)
+  , nXtra(system.nXtra)
+  , npW(system.npW)
+  , outChans(system.outChans)
+{
+	SetLogger(new Log(system._log->GetVerbosity()));
+	LOGMSG << "Cloning the system " << _filepath << endl;
+
+	// Copy the entities, pointing the attachments to the copies
+	for (auto obj : system.LinePropList)
+		LinePropList.push_back(new LineProps(*obj));
+	for (auto obj : system.RodPropList)
+		RodPropList.push_back(new RodProps(*obj));
+	for (auto obj : system.LineList)
+		LineList.push_back(obj->clone(_log, env));
+	for (auto obj : system.PointList)
+		PointList.push_back(obj->clone(_log, env, LineList));
+	for (auto obj : system.RodList)
+		RodList.push_back(obj->clone(_log, env, LineList));
+	GroundBody = system.GroundBody->clone(_log, env, PointList, RodList);
+	for (auto obj : system.BodyList)
+		BodyList.push_back(obj->clone(_log, env, PointList, RodList));
+	for (auto obj : system.FailList) {
+		FailProps* fail = new FailProps(*obj);
+		if (fail->rod)
+			fail->rod = RodList[fail->rod->rodId];
+		if (fail->point)
+			fail->point = PointList[fail->point->pointId];
+		for (auto& line : fail->lines)
+			line = LineList[line->lineId];
+		FailList.push_back(fail);
+	}
+
+	// The seafloor and the kinematics providers are shared, so no file is
+	// read at all
+	waves = std::make_shared<moordyn::Waves>(_log);
+	moordyn::error_id err = MOORDYN_SUCCESS;
+	string err_msg;
+	try {
+		// Initializing the time scheme would initialize the objects again,
+		// so it just takes the state of the original one
+		attachTimeScheme(create_time_scheme(
+		    system._t_integrator->GetKey(), _log, waves));
+		_t_integrator->SetState(system._t_integrator->GetState());
+		setupWaves(_shared_waves.get());
+	}
+	MOORDYN_CATCHER(err, err_msg);
+	if (err != MOORDYN_SUCCESS) {
+		delete GetLogger();
+	}
+	MOORDYN_THROW(err, err_msg.c_str());
+}
+
 moordyn::MoorDyn::~MoorDyn()
 {
 	if (outfileMain.is_open())
@@ -351,6 +461,7 @@ moordyn::MoorDyn::icStationary()
 	for (auto obj : LineList)
 		t_integrator.AddLine(obj);
 	t_integrator.SetCFL((std::min)(cfl, 1.0));
+	t_integrator.SetThreads(_n_threads);
 	t_integrator.Init();
 	auto n_states = t_integrator.NStates();
 	while ((ICTmax - t) > (std::numeric_limits<real>::min)()) {
@@ -402,6 +513,219 @@ moordyn::MoorDyn::icStationary()
 	return MOORDYN_SUCCESS;
 }
 
+bool
+moordyn::MoorDyn::icNewton()
+{
+	LOGMSG << "Finalizing ICs using Newton static solve" << endl;
+
+	StaticNewtonScheme t_integrator(_log, waves);
+	t_integrator.SetGround(GroundBody);
+	for (auto obj : BodyList)
+		t_integrator.AddBody(obj);
+	for (auto obj : RodList)
+		t_integrator.AddRod(obj);
+	for (auto obj : PointList)
+		t_integrator.AddPoint(obj);
+	for (auto obj : LineList)
+		t_integrator.AddLine(obj);
+	t_integrator.SetThreads(_n_threads);
+
+	moordyn::error_id err = MOORDYN_SUCCESS;
+	string err_msg;
+	try {
+		t_integrator.Init();
+	}
+	MOORDYN_CATCHER(err, err_msg);
+	if (err != MOORDYN_SUCCESS) {
+		LOGWRN << "The Newton static solver failed: " << err_msg << endl;
+		return false;
+	}
+	const real error0 = t_integrator.Error();
+	LOGMSG << "Newton iteration 0: residue = " << error0 << endl;
+
+	bool converged = !error0;
+	unsigned int iter;
+	for (iter = 1; !converged && (iter <= ICNewtonIters); iter++) {
+		try {
+			real dt = 1.0;
+			t_integrator.Step(dt);
+		}
+		MOORDYN_CATCHER(err, err_msg);
+		if (err != MOORDYN_SUCCESS) {
+			LOGWRN << "The Newton static solver failed: " << err_msg << endl;
+			return false;
+		}
+		const real error = t_integrator.Error();
+		LOGMSG << "Newton iteration " << iter << ": residue = " << error
+		       << ", line search step = " << t_integrator.Alpha()
+		       << ", Krylov iterations = " << t_integrator.GetKrylovIters()
+		       << ", next damping = " << t_integrator.Damping() << endl;
+		if (!std::isfinite(error))
+			break;
+		converged = (error <= ICthresh * error0);
+	}
+
+	if (!converged) {
+		LOGWRN << "The Newton static solver did not converge, the residue "
+		       << "is " << t_integrator.Error() << " (" << error0
+		       << " initially)" << endl;
+		return false;
+	}
+	_t_integrator->SetState(t_integrator.GetState());
+	ICNewtonStatus = iter - 1;
+	LOGMSG << "Static equilibrium found after " << iter - 1
+	       << " Newton iterations, residue = " << t_integrator.Error() << endl;
+	return true;
+}
+
+moordyn::error_id
+moordyn::MoorDyn::icSolve()
+{
+	ICNewtonStatus = -1;
+	if (ICgenNewton && icNewton())
+		return MOORDYN_SUCCESS;
+	if (ICgenDynamic)
+		return icLegacy();
+	return icStationary();
+}
+
+moordyn::error_id
+moordyn::MoorDyn::icCached(const double* x)
+{
+	ICCache cache(_log,
+	              ICCachePath,
+	              (uintmax_t)(ICCacheSize * 1.0e6),
+	              ICCacheTol);
+
+	// The environment options are also hashed, since they might be modified
+	// while reading the entities (e.g. the water depth from the anchors)
+	string input;
+	if (canonicalInput(input) != MOORDYN_SUCCESS)
+		return MOORDYN_INVALID_INPUT_FILE;
+	stringstream text;
+	text << input << std::setprecision(17) << env->g << " " << env->WtrDpth << " "
+	     << env->rho_w << " " << env->kb << " " << env->cb << " "
+	     << env->SeafloorMode << " " << env->FrictionCoefficient << " "
+	     << env->FricDamp << " " << env->StatDynFricScale << endl;
+	const uint64_t key = cache.Key(text.str(), x, NCoupledDOF());
+
+	std::vector<uint64_t> data;
+	if (cache.Get(key, data) && (data.size() == Serialize().size())) {
+		moordyn::error_id err = MOORDYN_SUCCESS;
+		string err_msg;
+		try {
+			_t_integrator->Init();
+			Deserialize(data.data());
+		}
+		MOORDYN_CATCHER(err, err_msg);
+		if (err != MOORDYN_SUCCESS) {
+			LOGERR << "Error restoring the cached initial condition: "
+			       << err_msg << endl;
+			return err;
+		}
+		LOGMSG << "Initial condition restored from the cache '"
+		       << ICCachePath << "'" << endl;
+		return MOORDYN_SUCCESS;
+	}
+
+	moordyn::error_id err = icSolve();
+	if (err != MOORDYN_SUCCESS)
+		return err;
+	string err_msg;
+	try {
+		cache.Put(key, Serialize());
+	}
+	MOORDYN_CATCHER(err, err_msg);
+	if (err != MOORDYN_SUCCESS) {
+		LOGWRN << "The initial condition cannot be cached: " << err_msg
+		       << endl;
+		return MOORDYN_SUCCESS;
+	}
+	LOGMSG << "Initial condition cached on '" << ICCachePath << "'" << endl;
+	return MOORDYN_SUCCESS;
+}
+
+moordyn::error_id
+moordyn::MoorDyn::setupSurrogate(const double* x)
+{
+	_surrogate->SetOrigin(x);
+
+	// The table is keyed by the inputs, so it is recomputed as soon as the
+	// input file or any of the files it refers to is modified
+	string text;
+	if (canonicalInput(text) != MOORDYN_SUCCESS)
+		return MOORDYN_INVALID_INPUT_FILE;
+	const uint64_t key = _surrogate->Key(text);
+
+	stringstream filepath;
+	filepath << _basepath << _basename << ".srg";
+	if (ifstream(filepath.str()).good()) {
+		auto cached = std::make_shared<Surrogate>(_log);
+		moordyn::error_id err = MOORDYN_SUCCESS;
+		string err_msg;
+		try {
+			cached->Load(filepath.str());
+		}
+		MOORDYN_CATCHER(err, err_msg);
+		if ((err == MOORDYN_SUCCESS) && (cached->GetKey() == key)) {
+			LOGMSG << "Surrogate table loaded from '" << filepath.str() << "'"
+			       << endl;
+			_surrogate = cached;
+			return MOORDYN_SUCCESS;
+		}
+		LOGMSG << "Outdated surrogate table '" << filepath.str() << "'"
+		       << endl;
+	}
+
+	const unsigned int n_nodes = _surrogate->NNodes();
+	const unsigned int n_dof = NCoupledDOF();
+	LOGMSG << "Sampling the surrogate table on " << n_nodes << " nodes..."
+	       << endl;
+	// Each grid node is an independent system, so the nodes are dynamically
+	// distributed among the threads
+	std::atomic<unsigned int> next(0);
+	ThreadPool pool(_n_threads);
+	moordyn::error_id err = MOORDYN_SUCCESS;
+	string err_msg;
+	try {
+		pool.run([&](unsigned int) {
+			std::vector<double> xi(n_dof), vi(n_dof, 0.0), fi(n_dof);
+			unsigned int i;
+			while ((i = next++) < n_nodes) {
+				_surrogate->GetNode(i, xi.data());
+				MoorDyn sampler(_filepath.c_str(), MOORDYN_NO_OUTPUT, false);
+				sampler._surrogate = nullptr;
+				sampler._n_threads = 1;
+				const moordyn::error_id err =
+				    sampler.Init(xi.data(), vi.data());
+				MOORDYN_THROW(err, "Failure computing a surrogate node");
+				sampler.GetForces(fi.data());
+				_surrogate->SetForces(i, fi.data());
+			}
+		});
+	}
+	MOORDYN_CATCHER(err, err_msg);
+	if (err != MOORDYN_SUCCESS) {
+		LOGERR << "Error sampling the surrogate table: " << err_msg << endl;
+		return err;
+	}
+	_surrogate->SetKey(key);
+	_surrogate->SetReady(true);
+
+	if (!_write_outputs)
+		return MOORDYN_SUCCESS;
+	try {
+		_surrogate->Save(filepath.str());
+	}
+	MOORDYN_CATCHER(err, err_msg);
+	if (err != MOORDYN_SUCCESS) {
+		LOGWRN << "The surrogate table cannot be cached: " << err_msg << endl;
+		return MOORDYN_SUCCESS;
+	}
+	LOGMSG << "Surrogate table cached on '" << filepath.str() << "'" << endl;
+	return MOORDYN_SUCCESS;
+}
+
 moordyn::error_id
 moordyn::MoorDyn::Init(const double* x, const double* xd, bool skip_ic)
 {
@@ -425,6 +749,10 @@ moordyn::MoorDyn::Init(const double* x, const double* xd, bool skip_ic)
 		BodyList[l]->initializeUnfreeBody(BodyList[l]->body_r6, vec6::Zero());
 	}
 
+	// Keep the coupled kinematics, in case the system is cloned
+	_x_cpld.assign(x, x + NCoupledDOF());
+	_xd_cpld.assign(xd, xd + NCoupledDOF());
+
 	// initialize coupled objects based on passed kinematics
 	int ix = 0;
 
@@ -525,14 +853,14 @@ moordyn::MoorDyn::Init(const double* x, const double* xd, bool skip_ic)
 
 	// Initialize the system state
 	_t_integrator->SetCFL(cfl);
+	_t_integrator->SetRTol(rtol);
+	_t_integrator->SetATol(atol);
+	_t_integrator->SetThreads(_n_threads);
 
 	// ------------------ do IC gen --------------------
 	if (!skip_ic) {
-		moordyn::error_id err;
-		if (ICgenDynamic)
-			err = icLegacy();
-		else
-			err = icStationary();
+		const moordyn::error_id err =
+		    ICCachePath.empty() ? icSolve() : icCached(x);
 		if (err != MOORDYN_SUCCESS)
 			return err;
 	} else {
@@ -554,13 +882,23 @@ moordyn::MoorDyn::Init(const double* x, const double* xd, bool skip_ic)
 		if (seafloor) {
 			env->WtrDpth = -seafloor->getAverageDepth();
 		}
-		waves->setup(env, seafloor, _t_integrator, _basepath.c_str());
+		waves->setup(env,
+		             seafloor,
+		             _t_integrator,
+		             _basepath.c_str(),
+		             _shared_waves.get());
 		env->WtrDpth = tmp;
 	}
 	MOORDYN_CATCHER(err, err_msg);
 	if (err != MOORDYN_SUCCESS)
 		return err;
 
+	if (_surrogate && !_surrogate->IsReady()) {
+		err = setupSurrogate(x);
+		if (err != MOORDYN_SUCCESS)
+			return err;
+	}
+
 	// @mth: new approach to be implemented
 	// ------------------------- calculate wave time series if needed
 	// -------------------
@@ -573,6 +911,9 @@ moordyn::MoorDyn::Init(const double* x, const double* xd, bool skip_ic)
 	// -------------------------- start main output file
 	// --------------------------------
 
+	if (!_write_outputs)
+		return MOORDYN_SUCCESS;
+
 	stringstream oname;
 	oname << _basepath << _basename << ".out";
 
@@ -610,6 +951,19 @@ moordyn::MoorDyn::Step(const double* x,
                        double& t,
                        double& dt)
 {
+	if (_surrogate && _surrogate->IsReady()) {
+		// The forces are just interpolated on the quasi-static table
+		if (NCoupledDOF() && x && xd) {
+			std::copy(x, x + NCoupledDOF(), _x_cpld.begin());
+			std::copy(xd, xd + NCoupledDOF(), _xd_cpld.begin());
+		}
+		if (dt > 0) {
+			t = _t_integrator->GetTime() + dt;
+			_t_integrator->SetTime(t);
+		}
+		return NCoupledDOF() ? GetForces(f) : MOORDYN_SUCCESS;
+	}
+
 	// should check if wave kinematics have been set up if expected!
 	const auto default_precision{std::cout.precision()};
 	std::cout << std::fixed << setprecision(1);
@@ -630,6 +984,10 @@ moordyn::MoorDyn::Step(const double* x,
 		LOGERR << "Null Pointer received in " << __FUNC_NAME__ << " ("
 		       << XSTR(__FILE__) << ":" << __LINE__ << ")" << endl;
 	}
+	if (NCoupledDOF() && x && xd) {
+		std::copy(x, x + NCoupledDOF(), _x_cpld.begin());
+		std::copy(xd, xd + NCoupledDOF(), _xd_cpld.begin());
+	}
 
 	unsigned int ix = 0;
 
@@ -746,6 +1104,47 @@ moordyn::MoorDyn::Step(const double* x,
 		return MOORDYN_SUCCESS;
 }
 
+moordyn::MoorDyn* DECLDIR
+moordyn::MoorDyn::Clone()
+{
+	if (NCoupledDOF() && (_x_cpld.size() != NCoupledDOF())) {
+		LOGERR << "The system shall be initialized before cloning it" << endl;
+		throw moordyn::invalid_value_error("Uninitialized system");
+	}
+
+	MoorDyn* clone = new MoorDyn(*this);
+	// Copy the state of the time integrator and all the objects
+	const std::vector<uint64_t> data = Serialize();
+	clone->Deserialize(data.data());
+	return clone;
+}
+
+moordyn::error_id DECLDIR
+moordyn::MoorDyn::StepMany(unsigned int n,
+                           const double* x,
+                           const double* xd,
+                           double* f,
+                           double t0,
+                           double dt)
+{
+	const unsigned int n_dof = NCoupledDOF();
+	for (unsigned int i = 0; i < n; i++) {
+		double t = t0 + i * dt;
+		double dt_step = dt;
+		const moordyn::error_id err = Step(x ? x + i * n_dof : NULL,
+		                                   xd ? xd + i * n_dof : NULL,
+		                                   f ? f + i * n_dof : NULL,
+		                                   t,
+		                                   dt_step);
+		if (err != MOORDYN_SUCCESS) {
+			LOGERR << "Failure integrating the coupling step " << i
+			       << " (t = " << t << " s)" << endl;
+			return err;
+		}
+	}
+	return MOORDYN_SUCCESS;
+}
+
 std::vector<uint64_t>
 MoorDyn::Serialize(void)
 {
@@ -803,6 +1202,76 @@ MoorDyn::Deserialize(const uint64_t* data)
 	return ptr;
 }
 
+unsigned int
+MoorDyn::NSnapshotNodes() const
+{
+	unsigned int n = ui_size(BodyList) + ui_size(PointList);
+	for (auto obj : RodList)
+		n += obj->getN() + 1;
+	for (auto obj : LineList)
+		n += obj->getN() + 1;
+	return n;
+}
+
+void
+MoorDyn::GetSnapshot(double* r, double* rd, double* f) const
+{
+	unsigned int ix = 0;
+	for (auto obj : BodyList) {
+		if (r)
+			moordyn::vec2array(obj->getPosition(), r + ix);
+		if (rd)
+			moordyn::vec2array(obj->getVelocity(), rd + ix);
+		if (f) {
+			const vec6 fnet = obj->getFnet();
+			moordyn::vec2array(fnet.head<3>(), f + ix);
+		}
+		ix += 3;
+	}
+	for (auto obj : RodList) {
+		for (unsigned int i = 0; i <= obj->getN(); i++) {
+			if (r)
+				moordyn::vec2array(obj->getNodePos(i), r + ix);
+			if (rd)
+				moordyn::vec2array(obj->getNodeVel(i), rd + ix);
+			if (f)
+				moordyn::vec2array(obj->getNodeForce(i), f + ix);
+			ix += 3;
+		}
+	}
+	for (auto obj : PointList) {
+		if (r)
+			moordyn::vec2array(obj->getPosition(), r + ix);
+		if (rd)
+			moordyn::vec2array(obj->getVelocity(), rd + ix);
+		if (f)
+			moordyn::vec2array(obj->getFnet(), f + ix);
+		ix += 3;
+	}
+	for (auto obj : LineList) {
+		for (unsigned int i = 0; i <= obj->getN(); i++) {
+			if (r)
+				moordyn::vec2array(obj->getNodePos(i), r + ix);
+			if (rd)
+				moordyn::vec2array(obj->getNodeVel(i), rd + ix);
+			if (f)
+				moordyn::vec2array(obj->getNodeTen(i), f + ix);
+			ix += 3;
+		}
+	}
+
+	for (auto arr : { r, rd, f }) {
+		if (!arr)
+			continue;
+		for (unsigned int i = 0; i < ix; i++) {
+			if (isnan(arr[i])) {
+				LOGERR << "NaN detected on the system snapshot" << endl;
+				throw moordyn::nan_error("NaN detected");
+			}
+		}
+	}
+}
+
 #ifdef USE_VTK
 vtkSmartPointer<vtkMultiBlockDataSet>
 MoorDyn::getVTK() const
@@ -1153,7 +1622,7 @@ moordyn::MoorDyn::ReadInFile()
 			}
 
 			// Make the output file (if queried)
-			if ((outchannels.size() > 0) &&
+			if (_write_outputs && (outchannels.size() > 0) &&
 			    (strcspn(outchannels.c_str(), "pvUDctsd") <
 			     strlen(outchannels.c_str()))) {
 				// if 1+ output flag chars are given and they're valid
@@ -1183,8 +1652,8 @@ moordyn::MoorDyn::ReadInFile()
 			LineList.push_back(obj);
 			LineStateIs.push_back(
 			    nX);                 // assign start index of this Line's states
-			nX += 6 * (NumSegs - 1); // add 6 state variables for each
-			                         // internal node of this line
+			nX += 6 * obj->getNStates(); // add 6 state variables for each
+			                             // internal node of this line
 
 			for (unsigned int I = 0; I < 2; I++) {
 				const EndPoints end_point = I == 0 ? ENDPOINT_A : ENDPOINT_B;
@@ -1344,6 +1813,52 @@ moordyn::MoorDyn::ReadInFile()
 		}
 	}
 
+	if ((i = findStartOfSection(in_txt, { "SURROGATE" })) != -1) {
+		LOGDBG << "   Reading surrogate grid:" << endl;
+		_surrogate = std::make_shared<Surrogate>(_log);
+		_surrogate->Resize(NCoupledDOF());
+		// parse until the next header or the end of the file
+		while ((in_txt[i].find("---") == string::npos) && (i < (int)in_txt.size())) {
+			vector<string> entries = moordyn::str::split(in_txt[i], ' ');
+			if (entries.size() < 4) {
+				LOGERR << "Error in " << _filepath << ":" << i + 1 << "..."
+				       << endl
+				       << "'" << in_txt[i] << "'" << endl
+				       << "4 fields are required, but just " << entries.size()
+				       << " are provided" << endl;
+				return MOORDYN_INVALID_INPUT;
+			}
+
+			const int dof = atoi(entries[0].c_str());
+			if ((dof < 1) || (dof > (int)NCoupledDOF())) {
+				LOGERR << "Error in " << _filepath << ":" << i + 1 << "..."
+				       << endl
+				       << "'" << in_txt[i] << "'" << endl
+				       << "There are not " << dof
+				       << " coupled degrees of freedom" << endl;
+				return MOORDYN_INVALID_INPUT;
+			}
+			moordyn::error_id err = MOORDYN_SUCCESS;
+			string err_msg;
+			try {
+				_surrogate->SetAxis(dof - 1,
+				                    atof(entries[1].c_str()),
+				                    atof(entries[2].c_str()),
+				                    atoi(entries[3].c_str()));
+			}
+			MOORDYN_CATCHER(err, err_msg);
+			if (err != MOORDYN_SUCCESS) {
+				LOGERR << "Error in " << _filepath << ":" << i + 1 << "..."
+				       << endl
+				       << "'" << in_txt[i] << "'" << endl
+				       << err_msg << endl;
+				return MOORDYN_INVALID_INPUT;
+			}
+
+			i++;
+		}
+	}
+
 	// Options read in at start
 
 	if ((i = findStartOfSection(in_txt, { "OUTPUT" })) != -1) {
@@ -1636,21 +2151,29 @@ moordyn::MoorDyn::ReadInFile()
 
 	// Setup the waves and populate them
 	try {
-		// TODO - figure out how i want to do this better
-		// because this is horrible. the solution is probably to move EnvCond
-		// to its own .hpp and .cpp file so that it can contain the Seafloor and
-		// can itself be queries about the seafloor in general
-		real tmp = env->WtrDpth;
-		if (seafloor) {
-			env->WtrDpth = -seafloor->getAverageDepth();
-		}
-		waves->setup(env, seafloor, _t_integrator, _basepath.c_str());
-		env->WtrDpth = tmp;
+		setupWaves();
 	}
 	MOORDYN_CATCHER(err, err_msg);
 	if (err != MOORDYN_SUCCESS)
 		return err;
 
+	return MOORDYN_SUCCESS;
+}
+
+void
+moordyn::MoorDyn::setupWaves(const Waves* shared)
+{
+	// TODO - figure out how i want to do this better
+	// because this is horrible. the solution is probably to move EnvCond
+	// to its own .hpp and .cpp file so that it can contain the Seafloor and
+	// can itself be queries about the seafloor in general
+	real tmp = env->WtrDpth;
+	if (seafloor) {
+		env->WtrDpth = -seafloor->getAverageDepth();
+	}
+	waves->setup(env, seafloor, _t_integrator, _basepath.c_str(), shared);
+	env->WtrDpth = tmp;
+
 	GroundBody->setWaves(waves);
 	waves->addBody(GroundBody);
 	for (auto obj : BodyList) {
@@ -1669,8 +2192,6 @@ moordyn::MoorDyn::ReadInFile()
 		obj->setWaves(waves, seafloor);
 		waves->addLine(obj);
 	}
-
-	return MOORDYN_SUCCESS;
 }
 
 moordyn::error_id
@@ -1712,6 +2233,79 @@ moordyn::MoorDyn::findStartOfSection(vector<string>& in_txt,
 
 	return i;
 }
+moordyn::error_id
+moordyn::MoorDyn::canonicalInput(string& text)
+{
+	vector<string> in_txt;
+	if (readFileIntoBuffers(in_txt) != MOORDYN_SUCCESS)
+		return MOORDYN_INVALID_INPUT_FILE;
+
+	// Hash a file, if it exists
+	auto hash_file = [](const string& path, stringstream& out) {
+		std::error_code ec;
+		if (!std::filesystem::is_regular_file(path, ec))
+			return;
+		ifstream f(path, std::ios::in | std::ios::binary);
+		stringstream contents;
+		contents << f.rdbuf();
+		out << path << " " << fnv1a(FNV1A_OFFSET, contents.str()) << endl;
+	};
+
+	stringstream out;
+	string section;
+	unsigned int skip = 0;
+	for (auto line_txt : in_txt) {
+		vector<string> entries = moordyn::str::split(line_txt, ' ');
+		if (line_txt.find("---") != string::npos) {
+			// The section headers are kept, without the decoration
+			section = "";
+			for (auto entry : entries) {
+				if (entry.find_first_not_of('-') != string::npos)
+					section += moordyn::str::upper(entry) + " ";
+			}
+			out << section << endl;
+			// The tables have a labels and an units line
+			const bool is_table = !moordyn::str::has(section, { "OPTIONS" }) &&
+			                      !moordyn::str::has(section, { "OUTPUT" });
+			skip = is_table ? 2 : 0;
+			continue;
+		}
+		// The title lines, the tables labels and units, and the outputs,
+		// which do not affect the results, are discarded
+		if (section.empty() || moordyn::str::has(section, { "OUTPUT" }) ||
+		    entries.empty())
+			continue;
+		if (skip) {
+			skip--;
+			continue;
+		}
+		// Just the value and the name of the options, not the description
+		if (moordyn::str::has(section, { "OPTIONS" }) && (entries.size() > 2))
+			entries.resize(2);
+		for (auto entry : entries)
+			out << entry << " ";
+		out << endl;
+		// The entries might be files, either relative to the working
+		// directory (e.g. the 3D seafloor) or to the input file (e.g. the
+		// nonlinear curves)
+		for (auto entry : entries) {
+			hash_file(entry, out);
+			hash_file(_basepath + entry, out);
+		}
+	}
+	// The waves and currents inputs
+	for (auto fname : { "wave_frequencies.txt",
+	                    "wave_elevation.txt",
+	                    "water_grid.txt",
+	                    "current_profile.txt",
+	                    "current_profile_dynamic.txt",
+	                    "current_profile_4d.txt" })
+		hash_file(_basepath + fname, out);
+
+	text = out.str();
+	return MOORDYN_SUCCESS;
+}
+
 LineProps*
 moordyn::MoorDyn::readLineProps(string inputText)
 {
@@ -1927,13 +2521,17 @@ moordyn::MoorDyn::readBody(string inputText)
 		BodyStateIs.push_back(nX); // assign start index of this body's states
 		nX += 12;                  // add 12 state variables for the body
 	}
-	stringstream oname;
-	oname << _basepath << _basename << "_Body" << number << ".out";
-	outfiles.push_back(make_shared<ofstream>(oname.str()));
-	if (!outfiles.back()->is_open()) {
-		LOGERR << "Cannot create the output file '" << oname.str() << endl;
-		return nullptr;
-	}
+	if (_write_outputs) {
+		stringstream oname;
+		oname << _basepath << _basename << "_Body" << number << ".out";
+		outfiles.push_back(make_shared<ofstream>(oname.str()));
+		if (!outfiles.back()->is_open()) {
+			LOGERR << "Cannot create the output file '" << oname.str()
+			       << endl;
+			return nullptr;
+		}
+	} else
+		outfiles.push_back(NULL);
 
 	// id = size + 1 because of ground body, which has an Id of zero
 	Body* obj = new Body(_log, BodyList.size() + 1);
@@ -2047,8 +2645,9 @@ moordyn::MoorDyn::readRod(string inputText)
 	}
 
 	// Make the output file (if queried)
-	if ((outchannels.size() > 0) && (strcspn(outchannels.c_str(), "pvUDctsd") <
-	                                 strlen(outchannels.c_str()))) {
+	if (_write_outputs && (outchannels.size() > 0) &&
+	    (strcspn(outchannels.c_str(), "pvUDctsd") <
+	     strlen(outchannels.c_str()))) {
 		// if 1+ output flag chars are given and they're valid
 		stringstream oname;
 		oname << _basepath << _basename << "_Rod" << number << ".out";
@@ -2109,6 +2708,10 @@ moordyn::MoorDyn::readOptionsLine(vector<string>& in_txt, int i)
 		dtM0 = atof(entries[0].c_str());
 	else if ((name == "CFL") || (name == "cfl"))
 		cfl = atof(entries[0].c_str());
+	else if (name == "tSchemeRTol")
+		rtol = atof(entries[0].c_str());
+	else if (name == "tSchemeATol")
+		atol = atof(entries[0].c_str());
 	else if (name == "writeLog") {
 		// This was actually already did, so we do not need to do that again
 		// But we really want to have this if to avoid showing a warning for
@@ -2150,6 +2753,14 @@ moordyn::MoorDyn::readOptionsLine(vector<string>& in_txt, int i)
 			LOGWRN << "Unknown WaveKin option value " << WaveKinTemp << endl;
 	} else if (name == "dtWave")
 		env->waterKinOptions.dtWave = stof(entries[0]);
+	else if (name == "WavePhaseTol")
+		env->waterKinOptions.phaseTol = atof(entries[0].c_str());
+	else if (name == "WavePruneTol")
+		env->waterKinOptions.pruneTol = atof(entries[0].c_str());
+	else if (name == "WaveGridFile")
+		env->waterKinOptions.waveGridFile = entries[0];
+	else if (name == "CurrentGridFile")
+		env->waterKinOptions.currentGridFile = entries[0];
 	else if (name == "Currents") {
 		auto current_mode = (waves::currents_settings)stoi(entries[0]);
 		env->waterKinOptions.currentMode = current_mode;
@@ -2183,6 +2794,23 @@ moordyn::MoorDyn::readOptionsLine(vector<string>& in_txt, int i)
 		this->seafloor->setup(env, filepath);
 	} else if (name == "ICgenDynamic")
 		ICgenDynamic = bool(atof(entries[0].c_str()));
+	else if (name == "ICgenNewton")
+		ICgenNewton = bool(atof(entries[0].c_str()));
+	else if (name == "ICNewtonIters")
+		ICNewtonIters = atoi(entries[0].c_str());
+	else if (name == "ICCache")
+		ICCachePath = entries[0];
+	else if (name == "ICCacheSize")
+		ICCacheSize = atof(entries[0].c_str());
+	else if (name == "ICCacheTol")
+		ICCacheTol = atof(entries[0].c_str());
+	else if (name == "Threads") {
+		const int n = atoi(entries[0].c_str());
+		if (n < 1)
+			LOGWRN << "Invalid number of threads " << entries[0]
+			       << ". Defaulting to 1" << endl;
+		_n_threads = (std::max)(n, 1);
+	}
 	else
 		LOGWRN << "Warning: Unrecognized option '" << name << "'" << endl;
 }
@@ -2281,6 +2909,9 @@ moordyn::MoorDyn::AllOutput(double t, double dt)
 	// if (env->writeLog == 0)
 	// 	return MOORDYN_SUCCESS;
 
+	if (!_write_outputs)
+		return MOORDYN_SUCCESS;
+
 	if (dtOut > 0)
 		if (t < (floor((t - dt) / dtOut) + 1.0) * dtOut)
 			return MOORDYN_SUCCESS;
@@ -2423,6 +3054,44 @@ MoorDyn_Step(MoorDyn system,
 	return ((moordyn::MoorDyn*)system)->Step(x, xd, f, *t, *dt);
 }
 
+MoorDyn DECLDIR
+MoorDyn_Clone(MoorDyn system)
+{
+	if (!system) {
+		cerr << "Null system received in " << __FUNC_NAME__ << " ("
+		     << XSTR(__FILE__) << ":" << __LINE__ << ")" << endl;
+		return NULL;
+	}
+
+	moordyn::MoorDyn* instance = NULL;
+	moordyn::error_id err = MOORDYN_SUCCESS;
+	string err_msg;
+	try {
+		instance = ((moordyn::MoorDyn*)system)->Clone();
+	}
+	MOORDYN_CATCHER(err, err_msg);
+	if (err != MOORDYN_SUCCESS) {
+		cerr << "Error (" << err << ") at " << __FUNC_NAME__ << "():" << endl
+		     << err_msg << endl;
+		return NULL;
+	}
+	return (MoorDyn)instance;
+}
+
+int DECLDIR
+MoorDyn_StepMany(MoorDyn system,
+                 unsigned int n,
+                 const double* x,
+                 const double* xd,
+                 double t0,
+                 double dt,
+                 double* forces_out)
+{
+	CHECK_SYSTEM(system);
+	return ((moordyn::MoorDyn*)system)
+	    ->StepMany(n, x, xd, forces_out, t0, dt);
+}
+
 int DECLDIR
 MoorDyn_Close(MoorDyn system)
 {
@@ -2604,6 +3273,77 @@ MoorDyn_GetLine(MoorDyn system, unsigned int l)
 	return (MoorDynLine)(lines[l - 1]);
 }
 
+int DECLDIR
+MoorDyn_GetSnapshotSize(MoorDyn system,
+                        unsigned int* n_objects,
+                        unsigned int* n_nodes)
+{
+	CHECK_SYSTEM(system);
+	moordyn::MoorDyn* sys = (moordyn::MoorDyn*)system;
+	if (n_objects)
+		*n_objects = ui_size(sys->GetBodies()) + ui_size(sys->GetRods()) +
+		             ui_size(sys->GetPoints()) + ui_size(sys->GetLines());
+	if (n_nodes)
+		*n_nodes = sys->NSnapshotNodes();
+	return MOORDYN_SUCCESS;
+}
+
+int DECLDIR
+MoorDyn_GetSnapshotLayout(MoorDyn system,
+                          int* types,
+                          unsigned int* ids,
+                          unsigned int* offsets,
+                          unsigned int* n_nodes)
+{
+	CHECK_SYSTEM(system);
+	moordyn::MoorDyn* sys = (moordyn::MoorDyn*)system;
+
+	unsigned int i = 0, offset = 0;
+	auto add = [&](int type, unsigned int id, unsigned int n) {
+		if (types)
+			types[i] = type;
+		if (ids)
+			ids[i] = id;
+		if (offsets)
+			offsets[i] = offset;
+		if (n_nodes)
+			n_nodes[i] = n;
+		offset += n;
+		i++;
+	};
+	const auto bodies = sys->GetBodies();
+	for (unsigned int j = 0; j < bodies.size(); j++)
+		add(MOORDYN_OBJECT_BODY, j + 1, 1);
+	const auto rods = sys->GetRods();
+	for (unsigned int j = 0; j < rods.size(); j++)
+		add(MOORDYN_OBJECT_ROD, j + 1, rods[j]->getN() + 1);
+	const auto points = sys->GetPoints();
+	for (unsigned int j = 0; j < points.size(); j++)
+		add(MOORDYN_OBJECT_POINT, j + 1, 1);
+	const auto lines = sys->GetLines();
+	for (unsigned int j = 0; j < lines.size(); j++)
+		add(MOORDYN_OBJECT_LINE, j + 1, lines[j]->getN() + 1);
+
+	return MOORDYN_SUCCESS;
+}
+
+int DECLDIR
+MoorDyn_GetSystemSnapshot(MoorDyn system, double* r, double* rd, double* f)
+{
+	CHECK_SYSTEM(system);
+	moordyn::error_id err = MOORDYN_SUCCESS;
+	string err_msg;
+	try {
+		((moordyn::MoorDyn*)system)->GetSnapshot(r, rd, f);
+	}
+	MOORDYN_CATCHER(err, err_msg);
+	if (err != MOORDYN_SUCCESS) {
+		cerr << "Error (" << err << ") at " << __FUNC_NAME__ << "():" << endl
+		     << err_msg << endl;
+	}
+	return err;
+}
+
 int DECLDIR
 MoorDyn_GetFASTtens(MoorDyn system,
                     const int* numLines,
@@ -2645,6 +3385,14 @@ MoorDyn_SetDt(MoorDyn system, double dt)
 	return MOORDYN_SUCCESS;
 }
 
+int DECLDIR
+MoorDyn_GetICNewtonIters(MoorDyn system, int* n)
+{
+	CHECK_SYSTEM(system);
+	*n = ((moordyn::MoorDyn*)system)->GetICNewtonIters();
+	return MOORDYN_SUCCESS;
+}
+
 int DECLDIR
 MoorDyn_GetCFL(MoorDyn system, double* cfl)
 {
@@ -2662,6 +3410,22 @@ MoorDyn_SetCFL(MoorDyn system, double cfl)
 	return MOORDYN_SUCCESS;
 }
 
+int DECLDIR
+MoorDyn_GetThreads(MoorDyn system, unsigned int* n)
+{
+	CHECK_SYSTEM(system);
+	*n = ((moordyn::MoorDyn*)system)->GetThreads();
+	return MOORDYN_SUCCESS;
+}
+
+int DECLDIR
+MoorDyn_SetThreads(MoorDyn system, unsigned int n)
+{
+	CHECK_SYSTEM(system);
+	((moordyn::MoorDyn*)system)->SetThreads(n);
+	return MOORDYN_SUCCESS;
+}
+
 int DECLDIR
 MoorDyn_GetTimeScheme(MoorDyn system, char* name, size_t* name_len)
 {
@@ -195,6 +195,50 @@ extern "C"
 	                         double* t,
 	                         double* dt);
 
+	/** @brief Clone an initialized MoorDyn system
+	 *
+	 * The clone has the same state than the original system, so both can be
+	 * evolved independently afterwards. The lines, points, rods and bodies
+	 * are copied, so the input file is not read again, and neither the
+	 * initial condition nor the wave and current kinematics are computed
+	 * again, the latter being shared among all the clones. The settings
+	 * changed after creating the original system, like the time scheme or
+	 * the lines unstretched lengths, are kept.
+	 *
+	 * The clone does not write output files
+	 * @param system The Moordyn system to clone, already initialized with
+	 * MoorDyn_Init()
+	 * @return The cloned system, NULL if errors happened. It shall be
+	 * deallocated with MoorDyn_Close()
+	 */
+	MoorDyn DECLDIR MoorDyn_Clone(MoorDyn system);
+
+	/** @brief Runs several consecutive time steps of the MoorDyn system
+	 *
+	 * This is equivalent to calling MoorDyn_Step() \p n times, with the times
+	 * \p t0 + i * \p dt, but the whole trajectory is integrated without
+	 * returning from the library
+	 * @param system The Moordyn system
+	 * @param n Number of coupling time steps
+	 * @param x Position vectors, a row major \p n x n_dof matrix
+	 * @param xd Velocity vectors, a row major \p n x n_dof matrix
+	 * @param t0 Simulation time at the beginning of the first time step
+	 * @param dt Coupling time step
+	 * @param forces_out Output forces, a row major \p n x n_dof matrix where
+	 * the forces after each coupling time step are written
+	 * @return MOORDYN_SUCESS if the mooring system has correctly evolved, an
+	 * error code otherwise (see @ref moordyn_errors)
+	 * @note MoorDyn_NCoupledDOF() can be used to know the number of
+	 * components, n_dof, of each row of \p x, \p xd and \p forces_out
+	 */
+	int DECLDIR MoorDyn_StepMany(MoorDyn system,
+	                             unsigned int n,
+	                             const double* x,
+	                             const double* xd,
+	                             double t0,
+	                             double dt,
+	                             double* forces_out);
+
 	/** @brief Releases MoorDyn allocated resources
 	 * @param system The Moordyn system
 	 * @return MOORDYN_SUCESS If the mooring system is correctly destroyed, an
@@ -394,6 +438,87 @@ extern "C"
 	 */
 	MoorDynLine DECLDIR MoorDyn_GetLine(MoorDyn system, unsigned int l);
 
+	/** @defgroup moordyn_objects The object types on the system snapshot
+	 *  @see MoorDyn_GetSnapshotLayout()
+	 *  @{
+	 */
+
+	/// Line object
+#define MOORDYN_OBJECT_LINE 1
+	/// Point object
+#define MOORDYN_OBJECT_POINT 2
+	/// Rod object
+#define MOORDYN_OBJECT_ROD 3
+	/// Body object
+#define MOORDYN_OBJECT_BODY 4
+
+	/**
+	 * @}
+	 */
+
+	/** @brief Get the size of the whole system snapshot
+	 * @param system The Moordyn system
+	 * @param n_objects The output number of objects, i.e. the number of
+	 * bodies, rods, points and lines. It can be NULL
+	 * @param n_nodes The output number of nodes. Each body and each point
+	 * contributes with one node, while each rod and line contributes with all
+	 * its nodes. It can be NULL
+	 * @return MOORDYN_SUCESS If the data is correctly got, an error code
+	 * otherwise (see @ref moordyn_errors)
+	 * @see MoorDyn_GetSnapshotLayout()
+	 * @see MoorDyn_GetSystemSnapshot()
+	 */
+	int DECLDIR MoorDyn_GetSnapshotSize(MoorDyn system,
+	                                    unsigned int* n_objects,
+	                                    unsigned int* n_nodes);
+
+	/** @brief Get the layout of the whole system snapshot
+	 *
+	 * The objects are sorted as follows: bodies, rods, points and lines. The
+	 * layout does not change along the simulation, so it is enough to get it
+	 * once
+	 * @param system The Moordyn system
+	 * @param types The output object types (see @ref moordyn_objects),
+	 * with n_objects components (see MoorDyn_GetSnapshotSize()). It can be
+	 * NULL
+	 * @param ids The output object indexes, starting at 1, as can be passed
+	 * to MoorDyn_GetBody(), MoorDyn_GetRod(), MoorDyn_GetPoint() or
+	 * MoorDyn_GetLine(). It can be NULL
+	 * @param offsets The output index of the first node of each object. It
+	 * can be NULL
+	 * @param n_nodes The output number of nodes of each object. It can be
+	 * NULL
+	 * @return MOORDYN_SUCESS If the data is correctly got, an error code
+	 * otherwise (see @ref moordyn_errors)
+	 * @see MoorDyn_GetSystemSnapshot()
+	 */
+	int DECLDIR MoorDyn_GetSnapshotLayout(MoorDyn system,
+	                                      int* types,
+	                                      unsigned int* ids,
+	                                      unsigned int* offsets,
+	                                      unsigned int* n_nodes);
+
+	/** @brief Get the positions, velocities and forces of all the system
+	 * nodes at once
+	 *
+	 * The output arrays are row major (n_nodes, 3) matrices, with n_nodes the
+	 * number reported by MoorDyn_GetSnapshotSize(), sorted as described by
+	 * MoorDyn_GetSnapshotLayout(). For bodies, the reference point position
+	 * and linear velocity are provided, as well as the force without the
+	 * moment. The forces are the net forces for rods and points, and the
+	 * tensions (see MoorDyn_GetLineNodeTen()) for lines
+	 * @param system The Moordyn system
+	 * @param r The output positions. It can be NULL
+	 * @param rd The output velocities. It can be NULL
+	 * @param f The output forces. It can be NULL
+	 * @return MOORDYN_SUCESS If the data is correctly got, an error code
+	 * otherwise (see @ref moordyn_errors)
+	 */
+	int DECLDIR MoorDyn_GetSystemSnapshot(MoorDyn system,
+	                                      double* r,
+	                                      double* rd,
+	                                      double* f);
+
 	/** @brief Function for providing FASTv7 customary line tension quantities
 	 * @param system The Moordyn system
 	 * @param numLines The number of lines
@@ -431,6 +556,17 @@ extern "C"
 	 */
 	int DECLDIR MoorDyn_SetDt(MoorDyn system, double dt);
 
+	/** @brief Get the number of iterations taken by the Newton static solver
+	 * to find the initial condition
+	 * @param system The Moordyn system
+	 * @param n The output number of Newton iterations, -1 if the Newton
+	 * static solver was not used or failed, so another initial condition
+	 * solver was used instead
+	 * @return MOORDYN_SUCESS if the data is correctly got, an error code
+	 * otherwise (see @ref moordyn_errors)
+	 */
+	int DECLDIR MoorDyn_GetICNewtonIters(MoorDyn system, int* n);
+
 	/** @brief Get the current model Courant–Friedrichs–Lewy factor
 	 * @param system The Moordyn system
 	 * @param cfl The output Courant–Friedrichs–Lewy factor
@@ -447,6 +583,30 @@ extern "C"
 	 */
 	int DECLDIR MoorDyn_SetCFL(MoorDyn system, double cfl);
 
+	/** @brief Get the number of threads used to compute the lines and rods
+	 * derivatives
+	 * @param system The Moordyn system
+	 * @param n The output number of threads
+	 * @return MOORDYN_SUCESS if the data is correctly got, an error code
+	 * otherwise (see @ref moordyn_errors)
+	 */
+	int DECLDIR MoorDyn_GetThreads(MoorDyn system, unsigned int* n);
+
+	/** @brief Set the number of threads used to compute the lines and rods
+	 * derivatives
+	 *
+	 * This can also be set with the Threads option of the input file. The
+	 * lines, and then the rods, are split among the threads weighted by their
+	 * number of nodes. The results are exactly the same no matter the number
+	 * of threads
+	 * @param system The Moordyn system
+	 * @param n The number of threads. 1 to compute everything on the calling
+	 * thread
+	 * @return MOORDYN_SUCESS if the data is correctly set, an error code
+	 * otherwise (see @ref moordyn_errors)
+	 */
+	int DECLDIR MoorDyn_SetThreads(MoorDyn system, unsigned int n);
+
 	/** @brief Get the current time scheme name
 	 * @param system The Moordyn system
 	 * @param name The output name. Can be NULL.
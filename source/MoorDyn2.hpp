@@ -46,6 +46,8 @@
 #include "Rod.hpp"
 #include "Body.hpp"
 #include "Seafloor.hpp"
+#include "Surrogate.hpp"
+#include "ICCache.hpp"
 #include <limits>
 
 #ifdef USE_VTK
@@ -71,9 +73,11 @@ class MoorDyn final : public io::IO
 	 * @param infilename The input file, if either NULL or "", then
 	 * "Mooring/lines.txt" will be considered
 	 * @param log_level The logging level. It can be changed afterwards
+	 * @param write_outputs false to skip writing the output and log files
 	 */
 	DECLDIR MoorDyn(const char* infilename = NULL,
-	                int log_level = MOORDYN_MSG_LEVEL);
+	                int log_level = MOORDYN_MSG_LEVEL,
+	                bool write_outputs = true);
 
 	/** @brief Destructor
 	 */
@@ -110,6 +114,45 @@ class MoorDyn final : public io::IO
 	moordyn::error_id DECLDIR
 	Step(const double* x, const double* xd, double* f, double& t, double& dt);
 
+	/** @brief Create a copy of the mooring system, on its current state
+	 *
+	 * The lines, points, rods and bodies are copied, so neither the input
+	 * file nor the files it refers to are read again. The initial condition
+	 * is not computed either, since the state is copied from this system.
+	 * The settings changed afterwards, like the time scheme, the time step,
+	 * the tolerances or the lines unstretched lengths, are copied as well.
+	 * The seafloor and the wave and current kinematics providers, which are
+	 * read only, are shared with this system, so the wave grids are not built
+	 * again
+	 * @return The new mooring system, which shall be deleted by the caller
+	 * @throws moordyn::invalid_value_error If this system has not been
+	 * initialized yet
+	 * @note The new system does not write output or log files, so it is not
+	 * messing up with the files of this system
+	 */
+	MoorDyn* DECLDIR Clone();
+
+	/** @brief Runs several consecutive time steps of the MoorDyn system
+	 *
+	 * This is equivalent to calling MoorDyn::Step() \p n times, with the
+	 * times \p t0 + i * \p dt, but without leaving the library in between
+	 * @param n Number of coupling time steps
+	 * @param x Position vectors, \p n rows of MoorDyn::NCoupledDOF()
+	 * components each
+	 * @param xd Velocity vectors, with the same layout than \p x
+	 * @param f Output forces, with the same layout than \p x
+	 * @param t0 Simulation time at the beginning of the first time step
+	 * @param dt Coupling time step
+	 * @return MOORDYN_SUCCESS If the mooring system is correctly evolved,
+	 * an error code otherwise (see @ref moordyn_errors)
+	 */
+	moordyn::error_id DECLDIR StepMany(unsigned int n,
+	                                   const double* x,
+	                                   const double* xd,
+	                                   double* f,
+	                                   double t0,
+	                                   double dt);
+
 	/** @brief Get the points
 	 */
 	inline vector<Body*> GetBodies() const { return BodyList; }
@@ -126,6 +169,34 @@ class MoorDyn final : public io::IO
 	 */
 	inline vector<Line*> GetLines() const { return LineList; }
 
+	/** @brief Get the number of nodes of the whole system snapshot
+	 *
+	 * Each body and each point contributes with a single node, while each rod
+	 * and each line contributes with all its nodes
+	 * @return The number of nodes
+	 * @see MoorDyn::GetSnapshot()
+	 */
+	unsigned int NSnapshotNodes() const;
+
+	/** @brief Get the positions, velocities and forces of all the nodes of
+	 * the system at once
+	 *
+	 * The nodes are sorted as follows: bodies, rods, points and lines, each
+	 * one in the same order they were defined in the input file. For bodies
+	 * the reference point position, linear velocity and the force (without
+	 * the moment) are provided. For rods the nodes net forces are provided,
+	 * for points the net force and for lines the nodes tensions (see
+	 * moordyn::Line::getNodeTen())
+	 * @param r The output positions, 3 * MoorDyn::NSnapshotNodes() components.
+	 * It can be NULL
+	 * @param rd The output velocities, 3 * MoorDyn::NSnapshotNodes()
+	 * components. It can be NULL
+	 * @param f The output forces, 3 * MoorDyn::NSnapshotNodes() components.
+	 * It can be NULL
+	 * @throws moordyn::nan_error If NaN values are detected on the nodes
+	 */
+	void GetSnapshot(double* r, double* rd, double* f) const;
+
 	/** @brief Return the number of coupled Degrees Of Freedom (DOF)
 	 *
 	 * This should match with the number of components of the positions and
@@ -360,6 +431,63 @@ class MoorDyn final : public io::IO
 			dtM0 = (std::min)(dtM0, obj->cfl2dt(cfl));
 	}
 
+	/** @brief Get the number of iterations taken by the Newton static solver
+	 * to find the initial condition
+	 * @return The number of Newton iterations, -1 if the Newton static solver
+	 * was not used or failed, so another initial condition solver was used
+	 * instead
+	 * @see ::ICgenNewton
+	 */
+	inline int GetICNewtonIters() const { return ICNewtonStatus; }
+
+	/** @brief Get the relative and absolute tolerances of the adaptive time
+	 * schemes
+	 * @return The relative and absolute tolerances
+	 */
+	inline std::pair<real, real> GetTolerances() const
+	{
+		return std::make_pair(rtol, atol);
+	}
+
+	/** @brief Set the relative and absolute tolerances of the adaptive time
+	 * schemes
+	 *
+	 * The tolerances are ignored by the fixed time step schemes
+	 * @param rtol The relative tolerance
+	 * @param atol The absolute tolerance
+	 * @see moordyn::EmbeddedRKScheme
+	 */
+	inline void SetTolerances(real rtol, real atol)
+	{
+		this->rtol = rtol;
+		this->atol = atol;
+		if (_t_integrator) {
+			_t_integrator->SetRTol(rtol);
+			_t_integrator->SetATol(atol);
+		}
+	}
+
+	/** @brief Get the number of threads used to compute the lines and rods
+	 * derivatives
+	 * @return The number of threads
+	 */
+	inline unsigned int GetThreads() const { return _n_threads; }
+
+	/** @brief Set the number of threads used to compute the lines and rods
+	 * derivatives
+	 *
+	 * The results are exactly the same no matter the number of threads
+	 * @param n The number of threads, 1 to run everything on the calling
+	 * thread
+	 * @see moordyn::TimeScheme::SetThreads()
+	 */
+	inline void SetThreads(unsigned int n)
+	{
+		_n_threads = (std::max)(n, 1u);
+		if (_t_integrator)
+			_t_integrator->SetThreads(_n_threads);
+	}
+
 	/** @brief Get the current time integrator
 	 * @return The time integrator
 	 */
@@ -369,6 +497,17 @@ class MoorDyn final : public io::IO
 	 * @return The time integrator
 	 */
 	inline void SetTimeScheme(TimeScheme* tscheme) {
+		attachTimeScheme(tscheme);
+		_t_integrator->Init();
+	}
+
+  protected:
+	/** @brief Replace the time integrator, populating it with all the
+	 * objects, but without initializing it
+	 * @param tscheme The time integrator
+	 * @see ::SetTimeScheme()
+	 */
+	inline void attachTimeScheme(TimeScheme* tscheme) {
 		if (_t_integrator) delete _t_integrator;
 		_t_integrator = tscheme;
 		_t_integrator->SetGround(GroundBody);
@@ -381,10 +520,11 @@ class MoorDyn final : public io::IO
 		for (auto obj : LineList)
 			_t_integrator->AddLine(obj);
 		_t_integrator->SetCFL(cfl);
-		_t_integrator->Init();
+		_t_integrator->SetRTol(rtol);
+		_t_integrator->SetATol(atol);
+		_t_integrator->SetThreads(_n_threads);
 	}
 
-  protected:
 	/** @brief Read the input file, setting up all the required objects and
 	 * their relationships
 	 *
@@ -397,6 +537,14 @@ class MoorDyn final : public io::IO
 	 */
 	moordyn::error_id ReadInFile();
 
+	/** @brief Setup the waves, and attach them to all the objects
+	 * @param shared The waves to share the kinematics providers with, NULL
+	 * to build them from the inputs
+	 * @see ::ReadInFile()
+	 * @see ::Clone()
+	 */
+	void setupWaves(const Waves* shared = NULL);
+
 	/** @brief Read the input file and store it as a set of strings, one per
 	 * line
 	 * @param in_txt The output list of strings
@@ -416,6 +564,21 @@ class MoorDyn final : public io::IO
 	 */
 	int findStartOfSection(vector<string>& in_txt, vector<string> sectionName);
 
+	/** @brief Get a canonical text of the inputs, to key the on-disk caches
+	 *
+	 * The titles, the table labels and units, the options descriptions, the
+	 * outputs and the whitespace of the input file are discarded, while the
+	 * contents of the files it refers to (e.g. the 3D seafloor or the
+	 * nonlinear curves), and the waves and currents inputs, are hashed, so
+	 * the caches are invalidated when any of them is modified
+	 * @param text The output canonical text
+	 * @return MOORDYN_SUCCESS If the input file is correctly read, an error
+	 * code otherwise (see @ref moordyn_errors)
+	 * @see ::icCached()
+	 * @see ::setupSurrogate()
+	 */
+	moordyn::error_id canonicalInput(string& text);
+
 	/** @brief Helper function to read a new line property given a line from
 	 * the input file.
 	 *
@@ -476,6 +639,46 @@ class MoorDyn final : public io::IO
 	 */
 	moordyn::error_id icLegacy();
 
+	/** @brief Compute an initial condition using the Newton static solver
+	 *
+	 * The residue history is reported on the log
+	 * @return true if the static equilibrium is found, false otherwise, so
+	 * the time marching solvers shall be used instead
+	 * @see ::ICgenNewton
+	 */
+	bool icNewton();
+
+	/** @brief Compute an initial condition with the solvers selected on the
+	 * options
+	 * @see ::ICgenNewton
+	 * @see ::ICgenDynamic
+	 */
+	moordyn::error_id icSolve();
+
+	/** @brief Restore the initial condition from the on-disk cache, or
+	 * compute it and store it on the cache
+	 *
+	 * The cache entries are keyed by the canonical inputs, the environment
+	 * options and the rounded coupled degrees of freedom positions
+	 * @param x The coupled objects initial positions
+	 * @see ::ICCachePath
+	 * @see ::icSolve()
+	 */
+	moordyn::error_id icCached(const double* x);
+
+	/** @brief Load or sample the quasi-static surrogate table
+	 *
+	 * The table is loaded from the cache file if it has the same key,
+	 * otherwise the static equilibrium is computed on every grid node, in
+	 * parallel, and the cache file is written
+	 * @param x The coupled objects initial positions, which the grid offsets
+	 * are referred to
+	 * @return MOORDYN_SUCCESS If the table is ready, an error code otherwise
+	 * (see @ref moordyn_errors)
+	 * @see ::_surrogate
+	 */
+	moordyn::error_id setupSurrogate(const double* x);
+
 	/** @brief Get the forces
 	 * @param f The forces array
 	 * @return MOORDYN_SUCCESS If the forces are correctly set, an error code
@@ -500,6 +703,10 @@ class MoorDyn final : public io::IO
 			    << NCoupledDOF() << " coupled Degrees Of Freedom" << std::endl;
 			return MOORDYN_INVALID_VALUE;
 		}
+		if (_surrogate && _surrogate->IsReady()) {
+			_surrogate->GetForces(_x_cpld.data(), f);
+			return MOORDYN_SUCCESS;
+		}
 		unsigned int ix = 0;
 		for (auto l : CpldBodyIs) {
 			// BUG: These conversions will not be needed in the future
@@ -531,6 +738,17 @@ class MoorDyn final : public io::IO
 		return MOORDYN_SUCCESS;
 	}
 
+  private:
+	/** @brief Copy the objects of another mooring system
+	 *
+	 * The seafloor and the wave and current kinematics providers are shared.
+	 * The objects are already initialized, so the system shall not be
+	 * initialized again, but just get its state copied
+	 * @param system The mooring system to copy
+	 * @see ::Clone()
+	 */
+	MoorDyn(const MoorDyn& system);
+
   private:
 	/// The input file
 	string _filepath;
@@ -550,6 +768,18 @@ class MoorDyn final : public io::IO
 	real ICthresh;
 	// use dynamic (true) or stationary (false) initial condition solver
 	bool ICgenDynamic;
+	// try first the Newton static solver for the initial condition
+	bool ICgenNewton;
+	// max number of Newton iterations for IC generation
+	unsigned int ICNewtonIters;
+	// Newton iterations taken to find the IC, -1 if not used or failed
+	int ICNewtonStatus;
+	// folder of the on-disk initial conditions cache, empty to disable it
+	string ICCachePath;
+	// (MB) max total size of the initial conditions cache
+	real ICCacheSize;
+	// (m or rad) rounding of the coupled positions on the cache keys
+	real ICCacheTol;
 	// temporary wave kinematics flag used to store input value while keeping
 	// env.WaveKin=0 for IC gen
 	moordyn::waves::waves_settings WaveKinTemp;
@@ -557,6 +787,12 @@ class MoorDyn final : public io::IO
 	real dtM0;
 	/// desired mooring line model maximum CFL factor
 	real cfl;
+	/// relative tolerance of the adaptive time schemes
+	real rtol;
+	/// absolute tolerance of the adaptive time schemes
+	real atol;
+	/// Number of threads to compute the lines and rods derivatives
+	unsigned int _n_threads;
 	/// (s) desired output interval (the default zero value provides output at
 	/// every call to MoorDyn)
 	real dtOut;
@@ -570,6 +806,17 @@ class MoorDyn final : public io::IO
 	Body* GroundBody;
 	/// Waves object that will be created to hold water kinematics info
 	WavesRef waves{};
+	/// Waves object whose kinematics providers are shared, see Clone()
+	WavesRef _shared_waves{};
+	/// Whether the output and log files are written or not
+	bool _write_outputs{ true };
+	/// Last coupled objects positions, see Clone()
+	std::vector<double> _x_cpld{};
+	/// Last coupled objects velocities, see Clone()
+	std::vector<double> _xd_cpld{};
+	/// Quasi-static forces table, replacing the time integration if the
+	/// SURROGATE section is provided
+	SurrogateRef _surrogate{};
 	/// 3D Seafloor object that gets shared with the lines and other things that
 	/// need it
 	moordyn::SeafloorRef seafloor;
@@ -654,7 +901,7 @@ class MoorDyn final : public io::IO
 			log_level = MOORDYN_DBG_LEVEL;
 		GetLogger()->SetLogLevel(log_level);
 
-		if (env->writeLog > 0) {
+		if ((env->writeLog > 0) && _write_outputs) {
 			moordyn::error_id err = MOORDYN_SUCCESS;
 			string err_msg;
 			stringstream filepath;
@@ -98,6 +98,23 @@ Point::setup(int number_in,
 	       << "'. " << endl;
 }
 
+Point*
+Point::clone(moordyn::Log* log,
+             EnvCondRef env_in,
+             const std::vector<Line*>& lines) const
+{
+	Point* obj = new Point(*this);
+	obj->SetLogger(log);
+	obj->env = env_in;
+	obj->waves = nullptr;
+	obj->ClearChildren();
+	for (auto& a : obj->attached) {
+		a.line = lines[a.line->lineId];
+		obj->AddChild(a.line);
+	}
+	return obj;
+}
+
 // this function handles assigning a line to a point node
 void
 Point::addLine(Line* theLine, EndPoints end_point)
@@ -276,8 +293,8 @@ Point::setState(vec pos, vec vel)
 		a.line->setEndKinematics(r, rd, a.end_point);
 }
 
-std::pair<vec, vec>
-Point::getStateDeriv()
+void
+Point::getStateDeriv(Eigen::Ref<vec> drdt, Eigen::Ref<vec> dvdt)
 {
 	// the RHS is only relevant (there are only states to worry about) if it is
 	// a Point type of Point
@@ -295,7 +312,8 @@ Point::getStateDeriv()
 	acc = M.inverse() * Fnet;
 
 	// update states
-	return std::make_pair(rd, acc);
+	drdt = rd;
+	dvdt = acc;
 };
 
 void
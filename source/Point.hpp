@@ -223,6 +223,20 @@ class Point final : public io::IO, public SuperCFL
 	           double Ca_in,
 	           EnvCondRef env_in);
 
+	/** @brief Make a copy of the point, for a cloned system
+	 *
+	 * The attached lines are replaced by their copies, and the waves shall be
+	 * set afterwards with setWaves()
+	 * @param log The logging handler of the cloned system
+	 * @param env_in The environmental settings of the cloned system
+	 * @param lines The lines of the cloned system, sorted by their
+	 * moordyn::Line::lineId
+	 * @return The copy, which shall be deleted by the caller
+	 */
+	Point* clone(moordyn::Log* log,
+	             EnvCondRef env_in,
+	             const std::vector<Line*>& lines) const;
+
 	/** @brief Attach a line endpoint to this point
 	 * @param theLine The line to be attached
 	 * @param end_point The line endpoint
@@ -357,11 +371,11 @@ class Point final : public io::IO, public SuperCFL
 	void setState(vec pos, vec vel);
 
 	/** @brief Calculate the forces and state derivatives of the point
-	 * @return The states derivatives, i.e. the velocity (first) and the
-	 * acceleration (second)
+	 * @param drdt The velocity
+	 * @param dvdt The acceleration
 	 * @throws moordyn::invalid_value_error If it is not a FREE point
 	 */
-	std::pair<vec, vec> getStateDeriv();
+	void getStateDeriv(Eigen::Ref<vec> drdt, Eigen::Ref<vec> dvdt);
 
 	/** @brief Calculate the force and mass contributions of the point on the
 	 * parent body
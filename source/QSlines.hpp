@@ -79,6 +79,9 @@ int longwinded = 0;
  * @param Z Output vertical locations of each line node relative to the anchor
  *          (meters)
  * @param Te Output effective line tensions at each node (N)
+ * @param WarmStart true to take the values pointed by @p HFout and @p VFout as
+ *                  the initial guesses of the Newton-Raphson iteration, e.g.
+ *                  the previous time step solution
  * @return 1 if the quasi-static equilibrium is found, -1 otherwise
  */
 template<typename T>
@@ -98,7 +101,8 @@ Catenary(T XF,
          vector<T>& s,
          vector<T>& X,
          vector<T>& Z,
-         vector<T>& Te)
+         vector<T>& Te,
+         bool WarmStart = false)
 {
 	if (longwinded == 1)
 		cout << "In Catenary.  XF is " << XF << " and ZF is " << ZF << endl;
@@ -240,6 +244,11 @@ Catenary(T XF,
 	HF = abs(0.5 * W * XF / Lamda0);
 	VF = 0.5 * W * (ZF / tanh(Lamda0) + L);
 
+	if (WarmStart && (*HFout > 0.0)) {
+		HF = *HFout;
+		VF = *VFout;
+	}
+
 	/*
 	! To avoid an ill-conditioned situation, ensure that the initial guess for
 	!   HF is not less than or equal to zero.  Similarly, avoid the problems
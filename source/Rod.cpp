@@ -181,6 +181,26 @@ Rod::setup(int number_in,
 	       << "'. " << endl;
 };
 
+Rod*
+Rod::clone(moordyn::Log* log,
+           EnvCondRef env_in,
+           const std::vector<Line*>& lines) const
+{
+	Rod* obj = new Rod(*this);
+	obj->SetLogger(log);
+	obj->env = env_in;
+	obj->waves = nullptr;
+	obj->outfile = NULL;
+	obj->ClearChildren();
+	for (auto attached : { &obj->attachedA, &obj->attachedB }) {
+		for (auto& a : *attached) {
+			a.line = lines[a.line->lineId];
+			obj->AddChild(a.line);
+		}
+	}
+	return obj;
+}
+
 void
 Rod::addLine(Line* l, EndPoints l_end_point, EndPoints end_point)
 {
@@ -601,8 +621,8 @@ Rod::setDependentStates()
 		attached.line->setEndOrientation(q, attached.end_point, ENDPOINT_B);
 }
 
-std::pair<XYZQuat, vec6>
-Rod::getStateDeriv()
+void
+Rod::getStateDeriv(Eigen::Ref<vec7> drdt, Eigen::Ref<vec6> dvdt)
 {
 	// attempting error handling <<<<<<<<
 	for (unsigned int i = 0; i <= N; i++) {
@@ -683,7 +703,8 @@ Rod::getStateDeriv()
 		    0.5 * (quaternion(0.0, v6[3], v6[4], v6[5]) * r7.quat).coeffs();
 	}
 
-	return std::make_pair(vel7, acc6);
+	drdt = vel7.toVec7();
+	dvdt = acc6;
 }
 
 const vec6
@@ -303,6 +303,21 @@ class Rod final : public io::IO, public SuperCFL
 	           shared_ptr<ofstream> outfile,
 	           string channels);
 
+	/** @brief Make a copy of the rod, for a cloned system
+	 *
+	 * The attached lines are replaced by their copies, the copy does not
+	 * write any output file, and its waves shall be set afterwards with
+	 * setWaves()
+	 * @param log The logging handler of the cloned system
+	 * @param env_in The environmental settings of the cloned system
+	 * @param lines The lines of the cloned system, sorted by their
+	 * moordyn::Line::lineId
+	 * @return The copy, which shall be deleted by the caller
+	 */
+	Rod* clone(moordyn::Log* log,
+	           EnvCondRef env_in,
+	           const std::vector<Line*>& lines) const;
+
 	/** @brief Attach a line endpoint to the rod end point A
 	 * @param line The line to be attached
 	 * @param line_end_point The line endpoint
@@ -320,6 +335,15 @@ class Rod final : public io::IO, public SuperCFL
 	 */
 	EndPoints removeLine(EndPoints end_point, Line* line);
 
+	/** @brief Get the list of attachments on a rod end point
+	 * @param end_point The rod end point
+	 * @return The list of attachments
+	 */
+	inline std::vector<attachment> getLines(EndPoints end_point) const
+	{
+		return (end_point == ENDPOINT_A) ? attachedA : attachedB;
+	}
+
 	/** @brief Set the environmental data
 	 * @param waves_in Global Waves object
 	 * @param seafloor_in Global Seafloor object
@@ -393,6 +417,22 @@ class Rod final : public io::IO, public SuperCFL
 		return rd[i];
 	}
 
+	/** @brief Get the net force on a node
+	 * @param i The line node index
+	 * @return The net force
+	 * @throws invalid_value_error If the node index \p i is bigger than the
+	 * number of nodes, moordyn::Line::N + 1
+	 */
+	inline const vec& getNodeForce(unsigned int i) const
+	{
+		if (i > N) {
+			LOGERR << "Asking node " << i << " of rod " << number
+			       << ", which only has " << N + 1 << " nodes" << std::endl;
+			throw moordyn::invalid_value_error("Invalid node index");
+		}
+		return Fnet[i];
+	}
+
 	/** @brief Get rod output
 	 *
 	 * This funtion is useful when outputs are set in the rod properties
@@ -519,13 +559,13 @@ class Rod final : public io::IO, public SuperCFL
 	void setDependentStates();
 
 	/** @brief calculate the forces and state derivatives of the rod
-	 * @return The linear and angular velocity (first), and the linear and
-	 * angular accelerations (second)
+	 * @param drdt The linear velocity and the quaternion derivative
+	 * @param dvdt The linear and angular accelerations
 	 * @throws nan_error If nan values are detected in any node position
 	 * @note The returned linear velocity and accelerations for pinned rods
 	 * should be ignored
 	 */
-	std::pair<XYZQuat, vec6> getStateDeriv();
+	void getStateDeriv(Eigen::Ref<vec7> drdt, Eigen::Ref<vec6> dvdt);
 
 	/** @brief Get the net force on rod (and possibly moment at end A if it's
 	 * not pinned)
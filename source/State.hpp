@@ -41,138 +41,308 @@
 
 namespace moordyn {
 
-/** @class StateVar Time.hpp
+/** @class StateVar State.hpp
  * @brief Generic state variables
  *
- * This is holding the position and velocities
+ * This is holding views of the position and velocity of an entity, which are
+ * actually stored on the flat buffer of a moordyn::MoorDynState
  */
 template<typename T, typename V = T>
-class StateVar
+struct StateVar
 {
-  public:
-	/// @brief Costructor
-	StateVar() {}
-
-	/// @brief Destructor
-	~StateVar() {}
-
 	/// The position
 	T pos;
 	/// The velocity
 	V vel;
+};
 
-	/** @brief Give a string representation of the state variables
-	 *
-	 * Useful for debugging purposes
-	 * @return A string representation
+/** @class StateVarDeriv State.hpp
+ * @brief Generic state variables derivative
+ *
+ * This is holding views of the velocity and acceleration of an entity, which
+ * are actually stored on the flat buffer of a moordyn::DMoorDynStateDt
+ */
+template<typename T, typename V = T>
+struct StateVarDeriv
+{
+	/// The velocity
+	T vel;
+	/// The acceleration
+	V acc;
+};
+
+/// The state variables for lines, with a column per internal node
+typedef StateVar<Eigen::Map<Eigen::Matrix3Xr>> LineState;
+
+/// The state variables derivative for lines, with a column per internal node
+typedef StateVarDeriv<Eigen::Map<Eigen::Matrix3Xr>> DLineStateDt;
+
+/// The state variables for points
+typedef StateVar<Eigen::Map<vec>> PointState;
+
+/// The state variables derivative for points
+typedef StateVarDeriv<Eigen::Map<vec>> DPointStateDt;
+
+/// The state variables for rods, with the position as in XYZQuat::toVec7()
+typedef StateVar<Eigen::Map<vec7>, Eigen::Map<vec6>> RodState;
+
+/// The state variables derivative for rods, with the velocity as in
+/// XYZQuat::toVec7()
+typedef StateVarDeriv<Eigen::Map<vec7>, Eigen::Map<vec6>> DRodStateDt;
+
+/// The state variables for bodies, with the position as in XYZQuat::toVec7()
+typedef StateVar<Eigen::Map<vec7>, Eigen::Map<vec6>> BodyState;
+
+/// The state variables derivative for bodies, with the velocity as in
+/// XYZQuat::toVec7()
+typedef StateVarDeriv<Eigen::Map<vec7>, Eigen::Map<vec6>> DBodyStateDt;
+
+/** @class FlatState State.hpp
+ * @brief Storage of the state variables, or their derivatives, of the whole
+ * system
+ *
+ * All the entities are packed on a single aligned buffer, so the time
+ * schemes can operate on all of them at once, without allocating memory.
+ * Each entity takes a contiguous block with two fields, i.e. the position
+ * and the velocity, or the velocity and the acceleration. Lines take 3
+ * components per internal node on each field, points take 3 + 3 components,
+ * and rods and bodies take 7 + 6 components, i.e. the position and the
+ * quaternion followed by the linear and angular velocity
+ */
+class FlatState
+{
+  public:
+	/// @brief Constructor
+	FlatState() {}
+
+	/// @brief Destructor
+	~FlatState() {}
+
+	/// The packed values of all the entities
+	Eigen::VectorXr values;
+
+	/** @brief Add a line, with all its values set to zero
+	 * @param n The number of internal nodes
 	 */
-	string AsString() const;
+	inline void AddLine(unsigned int n)
+	{
+		_lines.push_back(Append(6 * n));
+		_lines_n.push_back(n);
+	}
 
-	/** @brief Copy operator
-	 * @param visitor The entity to copy
+	/** @brief Remove a line
+	 * @param i The index of the line
 	 */
-	StateVar<T, V>& operator=(const StateVar<T, V>& visitor)
+	inline void RemoveLine(unsigned int i)
 	{
-		pos = visitor.pos;
-		vel = visitor.vel;
-		return *this;
+		Erase(_lines, i, 6 * _lines_n[i]);
+		_lines_n.erase(_lines_n.begin() + i);
 	}
 
-	/** @brief Sum operator
-	 * @param visitor The entity to sum
+	/// @brief Add a point, with all its values set to zero
+	inline void AddPoint() { _points.push_back(Append(6)); }
+
+	/** @brief Remove a point
+	 * @param i The index of the point
 	 */
-	StateVar<T, V> operator+(const StateVar<T, V>& visitor);
+	inline void RemovePoint(unsigned int i) { Erase(_points, i, 6); }
+
+	/// @brief Add a rod, with all its values set to zero
+	inline void AddRod() { _rods.push_back(Append(13)); }
 
-	/** @brief Sum operator
-	 * @param visitor The entity to sum
+	/** @brief Remove a rod
+	 * @param i The index of the rod
 	 */
-	StateVar<T, V> operator-(const StateVar<T, V>& visitor);
+	inline void RemoveRod(unsigned int i) { Erase(_rods, i, 13); }
+
+	/// @brief Add a body, with all its values set to zero
+	inline void AddBody() { _bodies.push_back(Append(13)); }
+
+	/** @brief Remove a body
+	 * @param i The index of the body
+	 */
+	inline void RemoveBody(unsigned int i) { Erase(_bodies, i, 13); }
+
+	/** @brief Get the number of internal nodes of a line
+	 * @param i The index of the line
+	 * @return The number of internal nodes
+	 */
+	inline unsigned int LineNodes(unsigned int i) const { return _lines_n[i]; }
+
+	/** @brief Get the block of a line on the buffer, with both fields
+	 * @param i The index of the line
+	 * @return The view of the line block
+	 */
+	inline Eigen::VectorBlock<Eigen::VectorXr> LineValues(unsigned int i)
+	{
+		return values.segment(_lines[i], 6 * _lines_n[i]);
+	}
+
+	/** @brief Get the block of a point on the buffer, with both fields
+	 * @param i The index of the point
+	 * @return The view of the point block
+	 */
+	inline Eigen::VectorBlock<Eigen::VectorXr> PointValues(unsigned int i)
+	{
+		return values.segment(_points[i], 6);
+	}
+
+	/** @brief Get the block of a rod on the buffer, with both fields
+	 * @param i The index of the rod
+	 * @return The view of the rod block
+	 */
+	inline Eigen::VectorBlock<Eigen::VectorXr> RodValues(unsigned int i)
+	{
+		return values.segment(_rods[i], 13);
+	}
+
+	/** @brief Get the block of a body on the buffer, with both fields
+	 * @param i The index of the body
+	 * @return The view of the body block
+	 */
+	inline Eigen::VectorBlock<Eigen::VectorXr> BodyValues(unsigned int i)
+	{
+		return values.segment(_bodies[i], 13);
+	}
 
 	/** @brief Mix this state with another one
 	 *
 	 * This can be used as a relaxation method when looking for stationary
 	 * solutions
-	 * @param visitor The other state
+	 * @param visitor The other state, which shall have the same entities
 	 * @param f The mix factor. If 0.0, the state is not altered at all. If 1.0
 	 * the state is completely replaced by the @p visitor
 	 */
-	void Mix(const StateVar<T, V>& visitor, const real& f);
+	inline void Mix(const FlatState& visitor, const real& f)
+	{
+		values = values * (1.0 - f) + visitor.values * f;
+	}
+
+  protected:
+	/// The offset of each line on the buffer
+	std::vector<unsigned int> _lines;
+	/// The number of internal nodes of each line
+	std::vector<unsigned int> _lines_n;
+	/// The offset of each point on the buffer
+	std::vector<unsigned int> _points;
+	/// The offset of each rod on the buffer
+	std::vector<unsigned int> _rods;
+	/// The offset of each body on the buffer
+	std::vector<unsigned int> _bodies;
+
+	/** @brief Run a function on each entity block
+	 *
+	 * Lines and points are linear blocks, with two fields of the same size,
+	 * while rods and bodies have a 7 components field followed by a 6
+	 * components one
+	 * @param linear Function called with the offset and the size of each
+	 * field of the lines and points blocks
+	 * @param quat Function called with the offset of each rod and body block
+	 */
+	template<typename F, typename G>
+	inline void ForEachBlock(F linear, G quat) const
+	{
+		for (unsigned int i = 0; i < _lines.size(); i++)
+			linear(_lines[i], 3 * _lines_n[i]);
+		for (auto offset : _points)
+			linear(offset, 3);
+		for (auto offset : _rods)
+			quat(offset);
+		for (auto offset : _bodies)
+			quat(offset);
+	}
+
+	/** @brief Give a string representation of each entity
+	 * @param first The name of the first field
+	 * @param second The name of the second field
+	 * @return A string representation
+	 */
+	string AsString(const string& first, const string& second) const;
+
+  private:
+	/** @brief Append a zeroed block at the end of the buffer
+	 * @param n The block size
+	 * @return The block offset
+	 */
+	unsigned int Append(unsigned int n);
+
+	/** @brief Remove a block from the buffer
+	 * @param offsets The list of offsets of the entity type
+	 * @param i The index of the entity
+	 * @param n The block size
+	 */
+	void Erase(std::vector<unsigned int>& offsets,
+	           unsigned int i,
+	           unsigned int n);
 };
 
-/** @class StateVarDeriv Time.hpp
- * @brief Generic state variables derivative
- *
- * This is holding the velocities and accelerations
+class DMoorDynStateDt;
+
+/** @class MoorDynState State.hpp
+ * @brief The collection of state variables of the whole system
  */
-template<class T, class V = T>
-class StateVarDeriv
+class MoorDynState : public FlatState
 {
   public:
 	/// @brief Constructor
-	StateVarDeriv() {}
+	MoorDynState() {}
 
 	/// @brief Destructor
-	~StateVarDeriv() {}
-
-	/// The velocity
-	T vel;
-	/// The acceleration
-	V acc;
-
-	/** @brief Give a string representation of the state variables
-	 *
-	 * Useful for debugging purposes
-	 * @return A string representation
-	 */
-	string AsString() const;
+	~MoorDynState() {}
 
-	/** @brief Copy operator
-	 * @param visitor The entity to copy
+	/** @brief Get the state of a line
+	 * @param i The index of the line
+	 * @return The views of the line state
 	 */
-	StateVarDeriv<T, V>& operator=(const StateVarDeriv<T, V>& visitor)
+	inline LineState line(unsigned int i)
 	{
-		vel = visitor.vel;
-		acc = visitor.acc;
-		return *this;
+		const unsigned int n = _lines_n[i];
+		real* ptr = values.data() + _lines[i];
+		return { Eigen::Map<Eigen::Matrix3Xr>(ptr, 3, n),
+			     Eigen::Map<Eigen::Matrix3Xr>(ptr + 3 * n, 3, n) };
 	}
 
-	/** @brief Integrate in time
-	 * @param dt The time step
-	 * @return The state variables increment
+	/** @brief Get the state of a point
+	 * @param i The index of the point
+	 * @return The views of the point state
 	 */
-	StateVar<T, V> operator*(const real& dt);
+	inline PointState point(unsigned int i)
+	{
+		real* ptr = values.data() + _points[i];
+		return { Eigen::Map<vec>(ptr), Eigen::Map<vec>(ptr + 3) };
+	}
 
-	/** @brief Sum operator
-	 * @param visitor The entity to sum
+	/** @brief Get the state of a rod
+	 * @param i The index of the rod
+	 * @return The views of the rod state
 	 */
-	StateVarDeriv<T, V> operator+(const StateVarDeriv<T, V>& visitor);
+	inline RodState rod(unsigned int i)
+	{
+		real* ptr = values.data() + _rods[i];
+		return { Eigen::Map<vec7>(ptr), Eigen::Map<vec6>(ptr + 7) };
+	}
 
-	/** @brief Subtract operator
-	 * @param visitor The entity to subtract
+	/** @brief Get the state of a body
+	 * @param i The index of the body
+	 * @return The views of the body state
 	 */
-	StateVarDeriv<T, V> operator-(const StateVarDeriv<T, V>& visitor);
+	inline BodyState body(unsigned int i)
+	{
+		real* ptr = values.data() + _bodies[i];
+		return { Eigen::Map<vec7>(ptr), Eigen::Map<vec6>(ptr + 7) };
+	}
 
-	/** @brief Transform the variation rate to a stationary case
-	 *
-	 * In MoorDyn the states variation rates are called velocity and
-	 * acceleration, because that is indeed the physical meaning they have.
-	 *
-	 * However, they are actually the position variation rate and the velocity
-	 * variation rate respectively. Thus, replacing the former by the later
-	 * multiplied by half of the time step, and vanishing the later, would
-	 * be equivalent to getting an infinite viscosity, i.e. the system would
-	 * not take velocity at all.
+	/** @brief Give a string representation of the state variables
 	 *
-	 * This can be use therefore to look for stationary solutions
-	 * @param dt Time step.
-	 * @return The module of the linear acceleration, or their sum in case
-	 * of lists of accelerations
+	 * Useful for debugging purposes
+	 * @return A string representation
 	 */
-	real MakeStationary(const real &dt);
+	inline string AsString() const { return FlatState::AsString("pos", "vel"); }
 
 	/** @brief Carry out a Newmark step
 	 *
-	 * The resulting state rate of change will have the following velocity
+	 * The state is set as \f$ r = r_0 + \Delta t \dot{r} \f$, where the
+	 * rate of change has the following velocity
 	 *
 	 * \f[ u(t_{n+1}) = u(t_{n}) + \Delta t (
 	 *         (1/2 - \beta) \dot{u(t_{n})} +
@@ -183,19 +353,24 @@ class StateVarDeriv
 	 * \f[ \dot{u(t_{n+1})} = (1 - \gamma) \dot{u(t_{n})} +
 	 *                        \gamma \dot{u(t_{n+1})}) \f]
 	 *
-	 * @param visitor The acceleration at the next time step
+	 * @param r0 The state at the current time step, \f$ r_0 \f$
+	 * @param rd0 The rate of change at the current time step
+	 * @param rd1 The rate of change at the next time step
 	 * @param dt Time step.
 	 * @param gamma The Newmark gamma factor.
 	 * @param beta Time Newmark beta factor.
 	 */
-	StateVarDeriv<T, V> Newmark(const StateVarDeriv<T, V>& visitor,
-	                            const real& dt,
-	                            real gamma = 0.5,
-	                            real beta = 0.25);
+	void Newmark(const MoorDynState& r0,
+	             const DMoorDynStateDt& rd0,
+	             const DMoorDynStateDt& rd1,
+	             const real& dt,
+	             real gamma = 0.5,
+	             real beta = 0.25);
 
 	/** @brief Carry out a Wilson step
 	 *
-	 * The resulting state rate of change will have the following acceleration
+	 * The state is set as \f$ r = r_0 + \tau \dot{r} \f$, where the
+	 * rate of change has the following acceleration
 	 *
 	 * \f[ \dot{u(t_{n+1})} =
 	 *         (1 - \frac{\tau}{2 \theta \Delta t}) \dot{u(t_{n})} +
@@ -209,157 +384,86 @@ class StateVarDeriv
 	 *
 	 * Note that \f$ \tau \f$ can be smaller than \f$ \theta \Delta t \f$.
 	 *
-	 * @param visitor The acceleration at the next time step
+	 * @param r0 The state at the current time step, \f$ r_0 \f$
+	 * @param rd0 The rate of change at the current time step
+	 * @param rd1 The rate of change at the next time step
 	 * @param tau Time advancing, \f$ \tau \f$.
 	 * @param dt Enlarged time step, \f$ \theta \Delta t \f$.
 	 */
-	StateVarDeriv<T, V> Wilson(const StateVarDeriv<T, V>& visitor,
-	                           const real& tau,
-	                           const real& dt);
-
-	/** @brief Mix this state variation rate with another one
-	 *
-	 * This can be used as a relaxation method when looking for stationary
-	 * solutions
-	 * @param visitor The other state variation rate
-	 * @param f The mix factor. If 0.0, the state is not altered at all. If 1.0
-	 * the state is completely replaced by the @p visitor
-	 */
-	void Mix(const StateVarDeriv<T, V>& visitor, const real& f);
+	void Wilson(const MoorDynState& r0,
+	            const DMoorDynStateDt& rd0,
+	            const DMoorDynStateDt& rd1,
+	            const real& tau,
+	            const real& dt);
 };
 
-/// The state variables for lines
-typedef StateVar<std::vector<vec>> LineState;
-
-/// The state variables derivative for lines
-typedef StateVarDeriv<std::vector<vec>> DLineStateDt;
-
-/// The state variables for points
-typedef StateVar<vec> PointState;
-
-/// The state variables derivative for points
-typedef StateVarDeriv<vec> DPointStateDt;
-
-/// The state variables for rods
-typedef StateVar<XYZQuat, vec6> RodState;
-
-/// The state variables derivative for rods
-typedef StateVarDeriv<XYZQuat, vec6> DRodStateDt;
-
-/// The state variables for bodies
-typedef StateVar<XYZQuat, vec6> BodyState;
-
-/// The state variables derivative for bodies
-typedef StateVarDeriv<XYZQuat, vec6> DBodyStateDt;
-
-/** @class MoorDynState Time.hpp
- * @brief The collection of state variables of the whole system
+/** @class DMoorDynStateDt State.hpp
+ * @brief The collection of state variable derivatives of the whole system
+ *
+ * The derivatives share the layout of moordyn::MoorDynState, so the states
+ * can be integrated operating directly on the flat buffers, e.g.
+ * @code
+ * r.values = r0.values + dt * rd.values;
+ * @endcode
+ * which is evaluated in a single loop, without temporary allocations
  */
-class MoorDynState
+class DMoorDynStateDt : public FlatState
 {
   public:
 	/// @brief Constructor
-	MoorDynState() {}
+	DMoorDynStateDt() {}
 
 	/// @brief Destructor
-	~MoorDynState() {}
-
-	/// The states of the lines
-	std::vector<LineState> lines;
-
-	/// The states of the points
-	std::vector<PointState> points;
-
-	/// The states of the rods
-	std::vector<RodState> rods;
-
-	/// The states of the bodies
-	std::vector<BodyState> bodies;
-
-	/** @brief Give a string representation of the state variables
-	 *
-	 * Useful for debugging purposes
-	 * @return A string representation
-	 */
-	string AsString() const;
+	~DMoorDynStateDt() {}
 
-	/** @brief Copy operator
-	 * @param visitor The entity to copy
+	/** @brief Get the state derivative of a line
+	 * @param i The index of the line
+	 * @return The views of the line state derivative
 	 */
-	MoorDynState& operator=(const MoorDynState& visitor);
+	inline DLineStateDt line(unsigned int i)
+	{
+		const unsigned int n = _lines_n[i];
+		real* ptr = values.data() + _lines[i];
+		return { Eigen::Map<Eigen::Matrix3Xr>(ptr, 3, n),
+			     Eigen::Map<Eigen::Matrix3Xr>(ptr + 3 * n, 3, n) };
+	}
 
-	/** @brief Sum operator
-	 * @param visitor The entity to sum
+	/** @brief Get the state derivative of a point
+	 * @param i The index of the point
+	 * @return The views of the point state derivative
 	 */
-	MoorDynState operator+(const MoorDynState& visitor);
+	inline DPointStateDt point(unsigned int i)
+	{
+		real* ptr = values.data() + _points[i];
+		return { Eigen::Map<vec>(ptr), Eigen::Map<vec>(ptr + 3) };
+	}
 
-	/** @brief Sum operator
-	 * @param visitor The entity to sum
+	/** @brief Get the state derivative of a rod
+	 * @param i The index of the rod
+	 * @return The views of the rod state derivative
 	 */
-	MoorDynState operator-(const MoorDynState& visitor);
+	inline DRodStateDt rod(unsigned int i)
+	{
+		real* ptr = values.data() + _rods[i];
+		return { Eigen::Map<vec7>(ptr), Eigen::Map<vec6>(ptr + 7) };
+	}
 
-	/** @brief Mix this state with another one
-	 *
-	 * This can be used as a relaxation method when looking for stationary
-	 * solutions
-	 * @param visitor The other state
-	 * @param f The mix factor. If 0.0, the state is not altered at all. If 1.0
-	 * the state is completely replaced by the @p visitor
+	/** @brief Get the state derivative of a body
+	 * @param i The index of the body
+	 * @return The views of the body state derivative
 	 */
-	void Mix(const MoorDynState& visitor, const real& f);
-};
-
-/** @class DMoorDynStateDt Time.hpp
- * @brief The collection of state variable derivatives of the whole system
- */
-class DMoorDynStateDt
-{
-  public:
-	/// @brief Constructor
-	DMoorDynStateDt() {}
-
-	/// @brief Destructor
-	~DMoorDynStateDt() {}
-
-	/// The state derivatives of the lines
-	std::vector<DLineStateDt> lines;
-
-	/// The state derivatives of the points
-	std::vector<DPointStateDt> points;
-
-	/// The state derivatives of the rods
-	std::vector<DRodStateDt> rods;
-
-	/// The state derivatives of the bodies
-	std::vector<DBodyStateDt> bodies;
+	inline DBodyStateDt body(unsigned int i)
+	{
+		real* ptr = values.data() + _bodies[i];
+		return { Eigen::Map<vec7>(ptr), Eigen::Map<vec6>(ptr + 7) };
+	}
 
 	/** @brief Give a string representation of the state variables
 	 *
 	 * Useful for debugging purposes
 	 * @return A string representation
 	 */
-	string AsString() const;
-
-	/** @brief Copy operator
-	 * @param visitor The entity to copy
-	 */
-	DMoorDynStateDt& operator=(const DMoorDynStateDt& visitor);
-
-	/** @brief Integrate in time
-	 * @param dt The time step
-	 * @return The state variables increment
-	 */
-	MoorDynState operator*(const real& dt);
-
-	/** @brief Sum operator
-	 * @param visitor The entity to sum
-	 */
-	DMoorDynStateDt operator+(const DMoorDynStateDt& visitor);
-
-	/** @brief Sum operator
-	 * @param visitor The entity to sum
-	 */
-	DMoorDynStateDt operator-(const DMoorDynStateDt& visitor);
+	inline string AsString() const { return FlatState::AsString("vel", "acc"); }
 
 	/** @brief Transform the variation rate to a stationary case
 	 *
@@ -377,63 +481,6 @@ class DMoorDynStateDt
 	 * @return The sum of the linear acceleration norms
 	 */
 	real MakeStationary(const real &dt);
-
-	/** @brief Carry out a Newmark step
-	 *
-	 * The resulting state rate of change will have the following velocity
-	 *
-	 * \f[ u(t_{n+1}) = u(t_{n}) + \Delta t (
-	 *         (1/2 - \beta) \dot{u(t_{n})} +
-	 *         \beta \dot{u(t_{n+1})}) \f]
-	 *
-	 * and the following acceleration
-	 *
-	 * \f[ \dot{u(t_{n+1})} = (1 - \gamma) \dot{u(t_{n})} +
-	 *                        \gamma \dot{u(t_{n+1})}) \f]
-	 *
-	 * @param visitor The acceleration at the next time step
-	 * @param dt Time step.
-	 * @param gamma The Newmark gamma factor.
-	 * @param beta Time Newmark beta factor.
-	 */
-	DMoorDynStateDt Newmark(const DMoorDynStateDt& visitor,
-	                        const real& dt,
-	                        real gamma = 0.5,
-	                        real beta = 0.25);
-
-	/** @brief Carry out a Wilson step
-	 *
-	 * The resulting state rate of change will have the following acceleration
-	 *
-	 * \f[ \dot{u(t_{n+1})} =
-	 *         (1 - \frac{\tau}{2 \theta \Delta t}) \dot{u(t_{n})} +
-	 *         \frac{\tau}{2 \theta \Delta t} \dot{u(t_{n+1})}) \f]
-	 *
-	 * and the following velocity
-	 *
-	 * \f[ u(t_{n+1}) = u(t_{n}) + \frac{\tau}{2} (
-	 *         (1 - \frac{\tau}{3 \theta \Delta t}) \dot{u(t_{n})} +
-	 *         \frac{\tau}{3 \theta \Delta t} \dot{u(t_{n+1})}) \f]
-	 *
-	 * Note that \f$ \tau \f$ can be smaller than \f$ \theta \Delta t \f$.
-	 *
-	 * @param visitor The acceleration at the next time step
-	 * @param tau Time advancing, \f$ \tau \f$.
-	 * @param dt Enlarged time step, \f$ \theta \Delta t \f$.
-	 */
-	DMoorDynStateDt Wilson(const DMoorDynStateDt& visitor,
-	                       const real& tau,
-	                       const real& dt);
-
-	/** @brief Mix this state variation rate with another one
-	 *
-	 * This can be used as a relaxation method when looking for stationary
-	 * solutions
-	 * @param visitor The other state variation rate
-	 * @param f The mix factor. If 0.0, the state is not altered at all. If 1.0
-	 * the state is completely replaced by the @p visitor
-	 */
-	void Mix(const DMoorDynStateDt& visitor, const real& f);
 };
 
 } // ::moordyn
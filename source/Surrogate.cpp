@@ -0,0 +1,214 @@
+/*
+ * Copyright (c) 2023, Jose Luis Cercos-Pita & Matt Hall
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice,
+ *    this list of conditions and the following disclaimer.
+ *
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions and the following disclaimer in the documentation
+ *    and/or other materials provided with the distribution.
+ *
+ * 3. Neither the name of the copyright holder nor the names of its
+ *    contributors may be used to endorse or promote products derived from
+ *    this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+
+#include "Surrogate.hpp"
+#include <algorithm>
+#include <cmath>
+
+namespace moordyn {
+
+Surrogate::Surrogate(moordyn::Log* log)
+  : io::IO(log)
+  , _key(0)
+  , _ready(false)
+{
+}
+
+Surrogate::~Surrogate() {}
+
+void
+Surrogate::Resize(unsigned int n)
+{
+	_x0.assign(n, 0.0);
+	_min.assign(n, 0.0);
+	_max.assign(n, 0.0);
+	_n.assign(n, 1);
+	_f.clear();
+	_ready = false;
+}
+
+void
+Surrogate::SetAxis(unsigned int dof, real min, real max, unsigned int n)
+{
+	if (dof >= NDOF()) {
+		LOGERR << "Invalid degree of freedom " << dof + 1 << ", just "
+		       << NDOF() << " are coupled" << endl;
+		throw moordyn::invalid_value_error("Invalid degree of freedom");
+	}
+	if (!n || ((n > 1) && (min >= max))) {
+		LOGERR << "Invalid grid axis for the degree of freedom " << dof + 1
+		       << ": [" << min << ", " << max << "] with " << n << " nodes"
+		       << endl;
+		throw moordyn::invalid_value_error("Invalid grid axis");
+	}
+	_min[dof] = min;
+	_max[dof] = (n > 1) ? max : min;
+	_n[dof] = n;
+	_f.clear();
+	_ready = false;
+}
+
+void
+Surrogate::SetOrigin(const double* x)
+{
+	_x0.assign(x, x + NDOF());
+	_f.assign(NNodes() * NDOF(), 0.0);
+	_ready = false;
+}
+
+unsigned int
+Surrogate::NNodes() const
+{
+	unsigned int n = 1;
+	for (auto ni : _n)
+		n *= ni;
+	return n;
+}
+
+void
+Surrogate::GetNode(unsigned int i, double* x) const
+{
+	for (unsigned int d = 0; d < NDOF(); d++) {
+		const unsigned int j = i % _n[d];
+		i /= _n[d];
+		x[d] = _x0[d] + _min[d];
+		if (_n[d] > 1)
+			x[d] += j * (_max[d] - _min[d]) / (_n[d] - 1);
+	}
+}
+
+void
+Surrogate::SetForces(unsigned int i, const double* f)
+{
+	std::copy(f, f + NDOF(), _f.begin() + i * NDOF());
+}
+
+void
+Surrogate::GetForces(const double* x, double* f) const
+{
+	const unsigned int ndof = NDOF();
+	// Count the axes with several nodes, which shall be interpolated
+	unsigned int m = 0;
+	for (auto n : _n)
+		m += (n > 1) ? 1 : 0;
+
+	std::fill(f, f + ndof, 0.0);
+	// Visit the corners of the grid cell containing the point
+	for (unsigned int c = 0; c < (1u << m); c++) {
+		real w = 1.0;
+		unsigned int node = 0, stride = 1, k = 0;
+		for (unsigned int d = 0; d < ndof; d++) {
+			const unsigned int n = _n[d];
+			if (n == 1)
+				continue;
+			const real h = (_max[d] - _min[d]) / (n - 1);
+			const real s =
+			    (std::min)((std::max)((x[d] - _x0[d] - _min[d]) / h, 0.0),
+			               (real)(n - 1));
+			const unsigned int j =
+			    (std::min)(static_cast<unsigned int>(std::floor(s)), n - 2);
+			const real t = s - j;
+			if ((c >> k++) & 1) {
+				w *= t;
+				node += (j + 1) * stride;
+			} else {
+				w *= 1.0 - t;
+				node += j * stride;
+			}
+			stride *= n;
+		}
+		if (w == 0.0)
+			continue;
+		for (unsigned int d = 0; d < ndof; d++)
+			f[d] += w * _f[node * ndof + d];
+	}
+}
+
+uint64_t
+Surrogate::Key(const std::string& text)
+{
+	uint64_t key = fnv1a(FNV1A_OFFSET, text);
+	for (unsigned int d = 0; d < NDOF(); d++) {
+		key = fnv1a(key, io::IO::Serialize(_x0[d]));
+		key = fnv1a(key, io::IO::Serialize(_min[d]));
+		key = fnv1a(key, io::IO::Serialize(_max[d]));
+		key = fnv1a(key, (uint64_t)_n[d]);
+	}
+	return key;
+}
+
+std::vector<uint64_t>
+Surrogate::Serialize(void)
+{
+	std::vector<uint64_t> data, subdata;
+
+	data.push_back(io::IO::Serialize(_key));
+	data.push_back(io::IO::Serialize((uint64_t)NDOF()));
+	for (auto n : _n)
+		data.push_back(io::IO::Serialize((uint64_t)n));
+	subdata = io::IO::Serialize(_x0);
+	data.insert(data.end(), subdata.begin(), subdata.end());
+	subdata = io::IO::Serialize(_min);
+	data.insert(data.end(), subdata.begin(), subdata.end());
+	subdata = io::IO::Serialize(_max);
+	data.insert(data.end(), subdata.begin(), subdata.end());
+	subdata = io::IO::Serialize(_f);
+	data.insert(data.end(), subdata.begin(), subdata.end());
+
+	return data;
+}
+
+uint64_t*
+Surrogate::Deserialize(const uint64_t* data)
+{
+	uint64_t* ptr = (uint64_t*)data;
+	uint64_t n;
+	ptr = io::IO::Deserialize(ptr, _key);
+	ptr = io::IO::Deserialize(ptr, n);
+	_n.resize(n);
+	for (auto& ni : _n) {
+		ptr = io::IO::Deserialize(ptr, n);
+		ni = static_cast<unsigned int>(n);
+	}
+	ptr = io::IO::Deserialize(ptr, _x0);
+	ptr = io::IO::Deserialize(ptr, _min);
+	ptr = io::IO::Deserialize(ptr, _max);
+	ptr = io::IO::Deserialize(ptr, _f);
+	if ((_x0.size() != NDOF()) || (_min.size() != NDOF()) ||
+	    (_max.size() != NDOF()) || (_f.size() != NNodes() * NDOF())) {
+		LOGERR << "Inconsistent surrogate table sizes" << endl;
+		throw moordyn::input_error("Invalid size");
+	}
+	_ready = true;
+
+	return ptr;
+}
+
+} // ::moordyn
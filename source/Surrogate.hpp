@@ -0,0 +1,190 @@
+/*
+ * Copyright (c) 2023, Jose Luis Cercos-Pita & Matt Hall
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice,
+ *    this list of conditions and the following disclaimer.
+ *
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions and the following disclaimer in the documentation
+ *    and/or other materials provided with the distribution.
+ *
+ * 3. Neither the name of the copyright holder nor the names of its
+ *    contributors may be used to endorse or promote products derived from
+ *    this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+
+/** @file Surrogate.hpp
+ * Quasi-static surrogate of the forces on the coupled degrees of freedom
+ */
+
+#pragma once
+
+#include "Misc.hpp"
+#include "IO.hpp"
+#include <memory>
+#include <string>
+#include <vector>
+
+namespace moordyn {
+
+/** @class Surrogate Surrogate.hpp
+ * @brief Table of the static equilibrium forces on the coupled degrees of
+ * freedom
+ *
+ * The forces are sampled on a regular grid of offsets of the coupled degrees
+ * of freedom, with respect to the positions provided on the initialization.
+ * Afterwards they are computed by multilinear interpolation, so no time
+ * integration is carried out at all.
+ *
+ * The degrees of freedom without a grid axis are kept on the initial position,
+ * while the offsets beyond the grid bounds are clamped
+ */
+class Surrogate : public io::IO
+{
+  public:
+	/** @brief Constructor
+	 * @param log Logging handler
+	 */
+	Surrogate(moordyn::Log* log);
+
+	/** @brief Destructor
+	 */
+	~Surrogate();
+
+	/** @brief Set the number of coupled degrees of freedom
+	 *
+	 * All the axes are reset, i.e. the grid has a single node with no offset
+	 * @param n The number of coupled degrees of freedom
+	 */
+	void Resize(unsigned int n);
+
+	/** @brief Get the number of coupled degrees of freedom
+	 * @return The number of coupled degrees of freedom
+	 */
+	inline unsigned int NDOF() const
+	{
+		return static_cast<unsigned int>(_n.size());
+	}
+
+	/** @brief Set the grid axis of a coupled degree of freedom
+	 * @param dof The coupled degree of freedom index, starting at 0
+	 * @param min The minimum offset
+	 * @param max The maximum offset
+	 * @param n The number of grid nodes along the axis
+	 * @throws invalid_value_error If @p dof is out of bounds, @p n is zero or
+	 * @p min is not smaller than @p max on a multinode axis
+	 */
+	void SetAxis(unsigned int dof, real min, real max, unsigned int n);
+
+	/** @brief Set the positions the offsets are referred to
+	 *
+	 * This is invalidating the forces table, see ::IsReady()
+	 * @param x The coupled degrees of freedom positions
+	 */
+	void SetOrigin(const double* x);
+
+	/** @brief Get the number of grid nodes
+	 * @return The number of grid nodes
+	 */
+	unsigned int NNodes() const;
+
+	/** @brief Get the coupled degrees of freedom positions on a grid node
+	 * @param i The grid node index
+	 * @param x The output positions
+	 */
+	void GetNode(unsigned int i, double* x) const;
+
+	/** @brief Set the forces on a grid node
+	 * @param i The grid node index
+	 * @param f The forces on the coupled degrees of freedom
+	 */
+	void SetForces(unsigned int i, const double* f);
+
+	/** @brief Interpolate the forces
+	 *
+	 * This function is not allocating memory nor modifying the table, so it
+	 * can be safely called from several threads
+	 * @param x The coupled degrees of freedom positions
+	 * @param f The output forces
+	 */
+	void GetForces(const double* x, double* f) const;
+
+	/** @brief Check whether the forces table is complete
+	 * @return true if all the grid nodes forces have been set, false otherwise
+	 */
+	inline bool IsReady() const { return _ready; }
+
+	/** @brief Set whether the forces table is complete
+	 * @param ready true if all the grid nodes forces have been set
+	 */
+	inline void SetReady(bool ready) { _ready = ready; }
+
+	/** @brief Compute the key identifying a table
+	 *
+	 * The key is a hash of the provided input file contents, the grid and the
+	 * origin
+	 * @param text The input file contents
+	 * @return The key
+	 */
+	uint64_t Key(const std::string& text);
+
+	/** @brief Get the key of the table
+	 * @return The key
+	 * @see ::Key()
+	 */
+	inline uint64_t GetKey() const { return _key; }
+
+	/** @brief Set the key of the table
+	 * @param key The key
+	 * @see ::Key()
+	 */
+	inline void SetKey(uint64_t key) { _key = key; }
+
+	/** @brief Produce the packed data to be saved
+	 * @return The packed data
+	 */
+	std::vector<uint64_t> Serialize(void);
+
+	/** @brief Unpack the data to restore the Serialized information
+	 * @param data The packed data
+	 * @return A pointer to the end of the file, for debugging purposes
+	 */
+	uint64_t* Deserialize(const uint64_t* data);
+
+  private:
+	/// Key identifying the table, see ::Key()
+	uint64_t _key;
+	/// Positions the offsets are referred to
+	std::vector<real> _x0;
+	/// Minimum offset on each axis
+	std::vector<real> _min;
+	/// Maximum offset on each axis
+	std::vector<real> _max;
+	/// Number of grid nodes on each axis
+	std::vector<unsigned int> _n;
+	/// Forces on the grid nodes, NDOF() components per node. The first axis
+	/// is the fastest varying one
+	std::vector<real> _f;
+	/// true if all the grid nodes forces have been set
+	bool _ready;
+};
+
+/// Shared pointer
+typedef std::shared_ptr<Surrogate> SurrogateRef;
+
+} // ::moordyn
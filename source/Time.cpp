@@ -65,7 +65,8 @@ TimeSchemeBase<NSTATE, NDERIV>::Update(real t_local, unsigned int substep)
 	for (unsigned int i = 0; i < bodies.size(); i++) {
 		if ((bodies[i]->type != Body::FREE) && (bodies[i]->type != Body::CPLDPIN))
 			continue;
-		bodies[i]->setState(r[substep].bodies[i].pos, r[substep].bodies[i].vel);
+		const auto state = r[substep].body(i);
+		bodies[i]->setState(XYZQuat::fromVec7(state.pos), state.vel);
 	}
 
 	for (unsigned int i = 0; i < rods.size(); i++) {
@@ -73,18 +74,21 @@ TimeSchemeBase<NSTATE, NDERIV>::Update(real t_local, unsigned int substep)
 		if ((rods[i]->type != Rod::PINNED) && (rods[i]->type != Rod::CPLDPIN) &&
 		    (rods[i]->type != Rod::FREE))
 			continue;
-		rods[i]->setState(r[substep].rods[i].pos, r[substep].rods[i].vel);
+		const auto state = r[substep].rod(i);
+		rods[i]->setState(XYZQuat::fromVec7(state.pos), state.vel);
 	}
 
 	for (unsigned int i = 0; i < points.size(); i++) {
 		if (points[i]->type != Point::FREE)
 			continue;
-		points[i]->setState(r[substep].points[i].pos, r[substep].points[i].vel);
+		const auto state = r[substep].point(i);
+		points[i]->setState(state.pos, state.vel);
 	}
 
 	for (unsigned int i = 0; i < lines.size(); i++) {
 		lines[i]->setTime(this->t);
-		lines[i]->setState(r[substep].lines[i].pos, r[substep].lines[i].vel);
+		const auto state = r[substep].line(i);
+		lines[i]->setState(state.pos, state.vel);
 	}
 }
 
@@ -94,11 +98,33 @@ TimeSchemeBase<NSTATE, NDERIV>::CalcStateDeriv(unsigned int substep)
 {
 	waves->updateWaves();
 
-	for (unsigned int i = 0; i < lines.size(); i++) {
+	auto line_deriv = [this, substep](unsigned int i) {
 		if (!_calc_mask.lines[i])
-			continue;
-		std::tie(rd[substep].lines[i].vel, rd[substep].lines[i].acc) =
-		    lines[i]->getStateDeriv();
+			return;
+		auto dstate = rd[substep].line(i);
+		lines[i]->getStateDeriv(dstate.vel, dstate.acc);
+	};
+	auto rod_deriv = [this, substep](unsigned int i) {
+		if (!_calc_mask.rods[i])
+			return;
+		if ((rods[i]->type != Rod::PINNED) && (rods[i]->type != Rod::CPLDPIN) &&
+		    (rods[i]->type != Rod::FREE))
+			return;
+		auto dstate = rd[substep].rod(i);
+		rods[i]->getStateDeriv(dstate.vel, dstate.acc);
+	};
+
+	// The lines are independent within a substep, so they can be computed
+	// concurrently. The rods depend on the lines attached to them
+	if (_pool) {
+		UpdatePartition();
+		_pool->run([this, &line_deriv](unsigned int thread) {
+			for (auto i : _lines_partition[thread])
+				line_deriv(i);
+		});
+	} else {
+		for (unsigned int i = 0; i < lines.size(); i++)
+			line_deriv(i);
 	}
 
 	for (unsigned int i = 0; i < points.size(); i++) {
@@ -106,18 +132,18 @@ TimeSchemeBase<NSTATE, NDERIV>::CalcStateDeriv(unsigned int substep)
 			continue;
 		if (points[i]->type != Point::FREE)
 			continue;
-		std::tie(rd[substep].points[i].vel, rd[substep].points[i].acc) =
-		    points[i]->getStateDeriv();
+		auto dstate = rd[substep].point(i);
+		points[i]->getStateDeriv(dstate.vel, dstate.acc);
 	}
 
-	for (unsigned int i = 0; i < rods.size(); i++) {
-		if (!_calc_mask.rods[i])
-			continue;
-		if ((rods[i]->type != Rod::PINNED) && (rods[i]->type != Rod::CPLDPIN) &&
-		    (rods[i]->type != Rod::FREE))
-			continue;
-		std::tie(rd[substep].rods[i].vel, rd[substep].rods[i].acc) =
-		    rods[i]->getStateDeriv();
+	if (_pool) {
+		_pool->run([this, &rod_deriv](unsigned int thread) {
+			for (auto i : _rods_partition[thread])
+				rod_deriv(i);
+		});
+	} else {
+		for (unsigned int i = 0; i < rods.size(); i++)
+			rod_deriv(i);
 	}
 
 	for (unsigned int i = 0; i < bodies.size(); i++) {
@@ -125,8 +151,8 @@ TimeSchemeBase<NSTATE, NDERIV>::CalcStateDeriv(unsigned int substep)
 			continue;
 		if ((bodies[i]->type != Body::FREE) && (bodies[i]->type != Body::CPLDPIN))
 			continue;
-		std::tie(rd[substep].bodies[i].vel, rd[substep].bodies[i].acc) =
-		    bodies[i]->getStateDeriv();
+		auto dstate = rd[substep].body(i);
+		bodies[i]->getStateDeriv(dstate.vel, dstate.acc);
 	}
 
 	for (auto obj : points) {
@@ -216,7 +242,7 @@ StationaryScheme::Step(real& dt)
 	}
 
 	r[1] = r[0];
-	r[0] = r[0] + rd[0] * new_dt;
+	r[0].values += new_dt * rd[0].values;
 	t += dt;
 	Update(dt, 0);
 	TimeSchemeBase::Step(dt);
@@ -233,7 +259,7 @@ EulerScheme::Step(real& dt)
 {
 	Update(0.0, 0);
 	CalcStateDeriv(0);
-	r[0] = r[0] + rd[0] * dt;
+	r[0].values += dt * rd[0].values;
 	t += dt;
 	Update(dt, 0);
 	TimeSchemeBase::Step(dt);
@@ -298,9 +324,12 @@ LocalTimeSchemeBase<NSTATE, NDERIV>::ComputeDt()
 		dt = (std::min)(dt, obj->cfl2dt(this->cfl));
 
 	for (auto line : this->lines) {
-		const real dt_line = line->cfl2dt(this->cfl);
-		_dt0.lines.push_back(0.999 * dt_line);
-		_dt.lines.push_back(dt_line);
+		// The quasi-static lines are not limiting the timestep, but their
+		// end forces shall be updated as often as the attached objects
+		const real dt_line =
+		    line->isQuasiStatic() ? dt : line->cfl2dt(this->cfl);
+		_dt0.lines.push_back(line->isQuasiStatic() ? 0.0 : 0.999 * dt_line);
+		_dt.lines.push_back(line->isQuasiStatic() ? 0.0 : dt_line);
 		this->LOGMSG << "Line " << line->number << ": dt = " << dt_line
 		             << " s (updated each " << std::ceil(dt_line / dt)
 		             << " timesteps)" << endl;
@@ -339,7 +368,7 @@ LocalEulerScheme::Step(real& dt)
 	SetCalcMask(dt);
 	Update(0.0, 0);
 	CalcStateDeriv(0);
-	r[0] = r[0] + rd[0] * dt;
+	r[0].values += dt * rd[0].values;
 	t += dt;
 	Update(dt, 0);
 	TimeSchemeBase::Step(dt);
@@ -355,13 +384,13 @@ void
 HeunScheme::Step(real& dt)
 {
 	// Apply the latest knew derivative, as a predictor
-	r[0] = r[0] + rd[0] * dt;
+	r[0].values += dt * rd[0].values;
 	rd[1] = rd[0];
 	// Compute the new derivative
 	Update(0.0, 0);
 	CalcStateDeriv(0);
 	// Correct the integration
-	r[0] = r[0] + (rd[0] - rd[1]) * (0.5 * dt);
+	r[0].values += (0.5 * dt) * (rd[0].values - rd[1].values);
 
 	t += dt;
 	Update(dt, 0);
@@ -382,11 +411,11 @@ RK2Scheme::Step(real& dt)
 	// Compute the intermediate state
 	CalcStateDeriv(0);
 	t += 0.5 * dt;
-	r[1] = r[0] + rd[0] * (0.5 * dt);
+	r[1].values = r[0].values + (0.5 * dt) * rd[0].values;
 	Update(0.5 * dt, 1);
 	// And so we can compute the new derivative and apply it
 	CalcStateDeriv(1);
-	r[0] = r[0] + rd[1] * dt;
+	r[0].values += dt * rd[1].values;
 	t += 0.5 * dt;
 	Update(dt, 0);
 	TimeSchemeBase::Step(dt);
@@ -408,28 +437,450 @@ RK4Scheme::Step(real& dt)
 
 	// k2
 	t += 0.5 * dt;
-	r[1] = r[0] + rd[0] * (0.5 * dt);
+	r[1].values = r[0].values + (0.5 * dt) * rd[0].values;
 	Update(0.5 * dt, 1);
 	CalcStateDeriv(1);
 
 	// k3
-	r[1] = r[0] + rd[1] * (0.5 * dt);
+	r[1].values = r[0].values + (0.5 * dt) * rd[1].values;
 	Update(0.5 * dt, 1);
 	CalcStateDeriv(2);
 
 	// k4
 	t += 0.5 * dt;
-	r[2] = r[0] + rd[2] * dt;
+	r[2].values = r[0].values + dt * rd[2].values;
 	Update(dt, 2);
 	CalcStateDeriv(3);
 
 	// Apply
-	r[0] = r[0] + (rd[0] + rd[3]) * (dt / 6.0) + (rd[1] + rd[2]) * (dt / 3.0);
+	r[0].values = r[0].values + (dt / 6.0) * (rd[0].values + rd[3].values) +
+	              (dt / 3.0) * (rd[1].values + rd[2].values);
 
 	Update(dt, 0);
 	TimeSchemeBase::Step(dt);
 }
 
+template<class Tableau>
+EmbeddedRKScheme<Tableau>::EmbeddedRKScheme(moordyn::Log* log,
+                                            moordyn::WavesRef waves)
+  : TimeSchemeBase<2, Tableau::stages>(log, waves)
+  , _dt_next(0.0)
+  , _fsal(false)
+  , _rejections(0)
+{
+	this->name = Tableau::name;
+}
+
+#ifndef EMBEDDED_RK_SAFETY
+#define EMBEDDED_RK_SAFETY 0.9
+#endif
+
+#ifndef EMBEDDED_RK_MIN_FACTOR
+#define EMBEDDED_RK_MIN_FACTOR 0.2
+#endif
+
+#ifndef EMBEDDED_RK_MAX_FACTOR
+#define EMBEDDED_RK_MAX_FACTOR 5.0
+#endif
+
+template<class Tableau>
+real
+EmbeddedRKScheme<Tableau>::Error(real dt)
+{
+	if (!this->r[0].values.size())
+		return 0.0;
+	_err = (Tableau::e[0] * dt) * this->rd[0].values;
+	for (unsigned int i = 1; i < Tableau::stages; i++) {
+		if (Tableau::e[i] != 0.0)
+			_err += (Tableau::e[i] * dt) * this->rd[i].values;
+	}
+	const auto y0 = this->r[0].values.array().abs();
+	const auto y1 = this->r[1].values.array().abs();
+	return (_err.array().abs() / (this->atol + this->rtol * y0.max(y1)))
+	    .maxCoeff();
+}
+
+template<class Tableau>
+void
+EmbeddedRKScheme<Tableau>::Step(real& dt)
+{
+	constexpr unsigned int n = Tableau::stages;
+	auto& r = this->r;
+	auto& rd = this->rd;
+	const real t0 = this->t;
+
+	// The last stage of the former time step is the first one of this time
+	// step, unless the coupled entities have been moved in between
+	if (!_fsal || (this->t_local == 0.0)) {
+		this->Update(0.0, 0);
+		this->CalcStateDeriv(0);
+	}
+	if (_err.size() != r[0].values.size())
+		_err.resize(r[0].values.size());
+
+	// Try the proposed time step, unless it is too large
+	real h = dt;
+	bool limited = false;
+	if ((_dt_next > 0.0) && (_dt_next < dt))
+		h = _dt_next;
+	else if (_dt_next > 0.0)
+		limited = true;
+	while (true) {
+		for (unsigned int i = 1; i < n; i++) {
+			r[1].values = r[0].values;
+			for (unsigned int j = 0; j < i; j++) {
+				if (Tableau::a[i][j] != 0.0)
+					r[1].values += (Tableau::a[i][j] * h) * rd[j].values;
+			}
+			this->t = t0 + Tableau::c[i] * h;
+			this->Update(Tableau::c[i] * h, 1);
+			this->CalcStateDeriv(i);
+		}
+
+		const real err = Error(h);
+		real factor = EMBEDDED_RK_MAX_FACTOR;
+		if (err > 0.0)
+			factor = EMBEDDED_RK_SAFETY *
+			         std::pow(err, -1.0 / (Tableau::order + 1.0));
+		factor = (std::min)(
+		    (std::max)(factor, (real)EMBEDDED_RK_MIN_FACTOR),
+		    (real)EMBEDDED_RK_MAX_FACTOR);
+		if (err <= 1.0) {
+			// Do not let the coupling time step to shrink the proposal
+			_dt_next = limited ? (std::max)(_dt_next, factor * h)
+			                   : factor * h;
+			break;
+		}
+
+		// Reject the time step and try again with a smaller one
+		_rejections++;
+		limited = false;
+		this->t = t0;
+		h *= (std::min)(factor, (real)EMBEDDED_RK_SAFETY);
+		if (h <= std::numeric_limits<real>::epsilon() *
+		             (std::max)(std::abs(t0), dt)) {
+			this->LOGERR << "The time step underflowed at t = " << t0
+			             << " s, with a scaled error " << err << endl;
+			throw moordyn::unhandled_error("Time step underflow");
+		}
+	}
+
+	// Accept the time step. Since the schemes are FSAL, the last stage
+	// derivative is already the one of the new state
+	r[0].values = r[1].values;
+	rd[0].values = rd[n - 1].values;
+	_fsal = true;
+	this->t = t0 + h;
+	this->Update(h, 0);
+	dt = h;
+	TimeSchemeBase<2, n>::Step(dt);
+}
+
+template<unsigned int order>
+MultirateRKScheme<order>::MultirateRKScheme(moordyn::Log* log,
+                                            moordyn::WavesRef waves)
+  : TimeSchemeBase<2, order>(log, waves)
+{
+	stringstream s;
+	s << order << ((order == 2) ? "nd" : "th")
+	  << " order Multirate Runge-Kutta";
+	this->name = s.str();
+}
+
+#ifndef MULTIRATE_MAX_LEVEL
+#define MULTIRATE_MAX_LEVEL 8
+#endif
+
+template<unsigned int order>
+void
+MultirateRKScheme<order>::ComputeRates()
+{
+	const rate status = { 0, 0, 0.0, 0.0 };
+	_rates.lines.assign(this->lines.size(), status);
+	_rates.points.assign(this->points.size(), status);
+	_rates.rods.assign(this->rods.size(), status);
+	_rates.bodies.assign(this->bodies.size(), status);
+	_history.resize(this->lines.size());
+	for (auto& h : _history)
+		h.n = 0;
+	_fresh.assign(this->lines.size(), false);
+
+	real dt = (std::numeric_limits<real>::max)();
+	for (auto obj : this->lines)
+		dt = (std::min)(dt, obj->cfl2dt(this->cfl));
+	for (auto obj : this->points)
+		dt = (std::min)(dt, obj->cfl2dt(this->cfl));
+	for (auto obj : this->rods)
+		dt = (std::min)(dt, obj->cfl2dt(this->cfl));
+	for (auto obj : this->bodies)
+		dt = (std::min)(dt, obj->cfl2dt(this->cfl));
+	auto level = [dt](real dt_obj) {
+		unsigned int l = 0;
+		while ((l < MULTIRATE_MAX_LEVEL) && ((real)(2u << l) * dt <= dt_obj))
+			l++;
+		return l;
+	};
+	auto line_level = [this](const Line* line) {
+		const auto it =
+		    std::find(this->lines.begin(), this->lines.end(), line);
+		return _rates.lines[std::distance(this->lines.begin(), it)].level;
+	};
+
+	// The quasi-static lines end forces are updated at the fastest rate
+	for (unsigned int i = 0; i < this->lines.size(); i++) {
+		const Line* line = this->lines[i];
+		_rates.lines[i].level =
+		    line->isQuasiStatic() ? 0 : level(line->cfl2dt(this->cfl));
+	}
+	// The rods and bodies shall be ready each time an attached line is
+	// computed, so they are never slower than the lines
+	for (unsigned int i = 0; i < this->rods.size(); i++) {
+		auto rod = this->rods[i];
+		auto l = level(rod->cfl2dt(this->cfl));
+		for (auto end_point : { ENDPOINT_A, ENDPOINT_B }) {
+			for (auto attachment : rod->getLines(end_point))
+				l = (std::min)(l, line_level(attachment.line));
+		}
+		_rates.rods[i].level = l;
+	}
+	for (unsigned int i = 0; i < this->bodies.size(); i++) {
+		auto body = this->bodies[i];
+		auto l = level(body->cfl2dt(this->cfl));
+		for (auto point : body->attachedP) {
+			for (auto attachment : point->getLines())
+				l = (std::min)(l, line_level(attachment.line));
+		}
+		for (auto rod : body->attachedR) {
+			const auto it =
+			    std::find(this->rods.begin(), this->rods.end(), rod);
+			l = (std::min)(
+			    l, _rates.rods[std::distance(this->rods.begin(), it)].level);
+		}
+		_rates.bodies[i].level = l;
+		if ((body->type != Body::FREE) && (body->type != Body::CPLDPIN))
+			continue;
+		// The body and its rods are moving together
+		for (auto rod : body->attachedR) {
+			const auto it =
+			    std::find(this->rods.begin(), this->rods.end(), rod);
+			_rates.rods[std::distance(this->rods.begin(), it)].level = l;
+		}
+	}
+
+	this->LOGMSG << this->name << ":" << endl;
+	auto log = [this, dt](const char* kind, int number, const rate& u) {
+		const unsigned int n = 1u << u.level;
+		this->LOGMSG << kind << " " << number << ": dt = " << n * dt
+		             << " s (updated each " << n << " timesteps)" << endl;
+	};
+	for (unsigned int i = 0; i < this->lines.size(); i++)
+		log("Line", this->lines[i]->number, _rates.lines[i]);
+	for (unsigned int i = 0; i < this->points.size(); i++)
+		log("Point", this->points[i]->number, _rates.points[i]);
+	for (unsigned int i = 0; i < this->rods.size(); i++)
+		log("Rod", this->rods[i]->number, _rates.rods[i]);
+	for (unsigned int i = 0; i < this->bodies.size(); i++)
+		log("Body", this->bodies[i]->number, _rates.bodies[i]);
+}
+
+template<unsigned int order>
+bool
+MultirateRKScheme<order>::SetCalcMask(unsigned int stage)
+{
+	bool masked = false;
+	ForEach([&masked, stage](rate& u, auto mask, auto) {
+		mask = (u.count == (stage << u.level));
+		masked = masked || mask;
+	});
+	return masked;
+}
+
+template<unsigned int order>
+void
+MultirateRKScheme<order>::Evaluate(real t_local, unsigned int substep)
+{
+	this->Update(t_local, 1);
+	// Linearly extrapolate the forces of the lines which are not computed
+	Eigen::Matrix<real, 12, 1> f;
+	for (unsigned int i = 0; i < this->lines.size(); i++) {
+		const auto& h = _history[i];
+		if (_fresh[i] || this->_calc_mask.lines[i] || !h.n)
+			continue;
+		f = h.f.col(0);
+		if (h.n > 1)
+			f += (this->t - h.t[0]) / (h.t[0] - h.t[1]) *
+			     (h.f.col(0) - h.f.col(1));
+		this->lines[i]->setEndForces(
+		    f.template segment<3>(0), f.template segment<3>(3),
+		    f.template segment<3>(6), f.template segment<3>(9));
+	}
+	this->CalcStateDeriv(substep);
+	for (unsigned int i = 0; i < this->lines.size(); i++) {
+		if (this->_calc_mask.lines[i])
+			_fresh[i] = true;
+	}
+}
+
+template<unsigned int order>
+void
+MultirateRKScheme<order>::Stages(real t_local)
+{
+	auto& r = this->r;
+	auto& rd = this->rd;
+	std::fill(_fresh.begin(), _fresh.end(), false);
+
+	// The instances at the midpoint go first, so the ones starting their time
+	// step get their forces
+	if (SetCalcMask(1)) {
+		ForEach([&r, &rd](rate& u, auto mask, auto block) {
+			if (!mask)
+				return;
+			u.mid = u.elapsed;
+			block(r[1]) = block(r[0]) + u.mid * block(rd[0]);
+		});
+		Evaluate(t_local, 1);
+		if constexpr (order == 4) {
+			ForEach([&r, &rd](rate& u, auto mask, auto block) {
+				if (mask)
+					block(r[1]) = block(r[0]) + u.mid * block(rd[1]);
+			});
+			Evaluate(t_local, 2);
+		}
+	}
+
+	if (SetCalcMask(0)) {
+		ForEach([&r](rate&, auto mask, auto block) {
+			if (mask)
+				block(r[1]) = block(r[0]);
+		});
+		Evaluate(t_local, 0);
+		// Register the forces to extrapolate them later
+		vec FA, MA, FB, MB;
+		for (unsigned int i = 0; i < this->lines.size(); i++) {
+			if (!this->_calc_mask.lines[i])
+				continue;
+			auto& h = _history[i];
+			h.f.col(1) = h.f.col(0);
+			h.t[1] = h.t[0];
+			this->lines[i]->getEndForces(FA, MA, FB, MB);
+			h.f.col(0) << FA, MA, FB, MB;
+			h.t[0] = this->t;
+			h.n = (std::min)(h.n + 1, 2u);
+		}
+	}
+}
+
+template<unsigned int order>
+void
+MultirateRKScheme<order>::Advance(real dt)
+{
+	this->t += dt;
+	ForEach([dt](rate& u, auto, auto) {
+		u.count++;
+		u.elapsed += dt;
+	});
+}
+
+template<unsigned int order>
+void
+MultirateRKScheme<order>::Step(real& dt)
+{
+	auto& r = this->r;
+	auto& rd = this->rd;
+
+	Stages(0.0);
+	Advance(0.5 * dt);
+	Stages(0.5 * dt);
+	Advance(0.5 * dt);
+
+	// Finish the time step of the instances
+	std::fill(_fresh.begin(), _fresh.end(), false);
+	if (SetCalcMask(2)) {
+		if constexpr (order == 4) {
+			ForEach([&r, &rd](rate& u, auto mask, auto block) {
+				if (mask)
+					block(r[1]) = block(r[0]) + u.elapsed * block(rd[2]);
+			});
+			Evaluate(dt, 3);
+		}
+		ForEach([&r, &rd](rate& u, auto mask, auto block) {
+			if (!mask)
+				return;
+			const real h = u.elapsed;
+			if constexpr (order == 2) {
+				// Just the midpoint scheme if the time steps are uniform
+				const real b = 0.5 * h / u.mid;
+				block(r[0]) +=
+				    h * ((1.0 - b) * block(rd[0]) + b * block(rd[1]));
+			} else {
+				block(r[0]) += (h / 6.0) * (block(rd[0]) + block(rd[3]) +
+				                            2.0 * block(rd[1]) +
+				                            2.0 * block(rd[2]));
+			}
+			block(r[1]) = block(r[0]);
+			u.count = 0;
+			u.elapsed = 0.0;
+		});
+	}
+
+	// Update the coupling forces on the new states
+	ForEach([](rate&, auto mask, auto) { mask = false; });
+	Evaluate(dt, 0);
+	TimeSchemeBase<2, order>::Step(dt);
+}
+
+template<unsigned int order>
+std::vector<uint64_t>
+MultirateRKScheme<order>::Serialize(void)
+{
+	std::vector<uint64_t> data = TimeSchemeBase<2, order>::Serialize();
+	// We append the integration status of each instance
+	ForEach([this, &data](rate& u, auto, auto) {
+		data.push_back(io::IO::Serialize((uint64_t)u.level));
+		data.push_back(io::IO::Serialize((uint64_t)u.count));
+		data.push_back(io::IO::Serialize(u.elapsed));
+		data.push_back(io::IO::Serialize(u.mid));
+	});
+	for (const auto& h : _history) {
+		data.push_back(io::IO::Serialize((uint64_t)h.n));
+		for (unsigned int j = 0; j < h.n; j++) {
+			data.push_back(io::IO::Serialize(h.t[j]));
+			for (unsigned int k = 0; k < 12; k++)
+				data.push_back(io::IO::Serialize(h.f(k, j)));
+		}
+	}
+
+	return data;
+}
+
+template<unsigned int order>
+uint64_t*
+MultirateRKScheme<order>::Deserialize(const uint64_t* data)
+{
+	uint64_t* ptr = TimeSchemeBase<2, order>::Deserialize(data);
+	ForEach([this, &ptr](rate& u, auto, auto) {
+		uint64_t n;
+		ptr = io::IO::Deserialize(ptr, n);
+		u.level = n;
+		ptr = io::IO::Deserialize(ptr, n);
+		u.count = n;
+		ptr = io::IO::Deserialize(ptr, u.elapsed);
+		ptr = io::IO::Deserialize(ptr, u.mid);
+	});
+	for (auto& h : _history) {
+		uint64_t n;
+		ptr = io::IO::Deserialize(ptr, n);
+		h.n = n;
+		for (unsigned int j = 0; j < h.n; j++) {
+			ptr = io::IO::Deserialize(ptr, h.t[j]);
+			for (unsigned int k = 0; k < 12; k++)
+				ptr = io::IO::Deserialize(ptr, h.f(k, j));
+		}
+	}
+
+	return ptr;
+}
+
 template<unsigned int order, bool local>
 ABScheme<order, local>::ABScheme(moordyn::Log* log, moordyn::WavesRef waves)
   : LocalTimeSchemeBase(log, waves)
@@ -463,24 +914,29 @@ ABScheme<order, local>::Step(real& dt)
 	// Apply different formulas depending on the number of derivatives available
 	switch (n_steps) {
 		case 0:
-			r[0] = r[0] + rd[0] * dt;
+			r[0].values += dt * rd[0].values;
 			break;
 		case 1:
-			r[0] = r[0] + rd[0] * (dt * 1.5) - rd[1] * (dt * 0.5);
+			r[0].values = r[0].values + (dt * 1.5) * rd[0].values -
+			              (dt * 0.5) * rd[1].values;
 			break;
 		case 2:
-			r[0] = r[0] + rd[0] * (dt * 23.0 / 12.0) -
-			       rd[1] * (dt * 4.0 / 3.0) + rd[2] * (dt * 5.0 / 12.0);
+			r[0].values = r[0].values + (dt * 23.0 / 12.0) * rd[0].values -
+			              (dt * 4.0 / 3.0) * rd[1].values +
+			              (dt * 5.0 / 12.0) * rd[2].values;
 			break;
 		case 3:
-			r[0] = r[0] + rd[0] * (dt * 55.0 / 24.0) -
-			       rd[1] * (dt * 59.0 / 24.0) + rd[2] * (dt * 37.0 / 24.0) -
-			       rd[3] * (dt * 3.0 / 8.0);
+			r[0].values = r[0].values + (dt * 55.0 / 24.0) * rd[0].values -
+			              (dt * 59.0 / 24.0) * rd[1].values +
+			              (dt * 37.0 / 24.0) * rd[2].values -
+			              (dt * 3.0 / 8.0) * rd[3].values;
 			break;
 		default:
-			r[0] = r[0] + rd[0] * (dt * 1901.0 / 720.0) -
-			       rd[1] * (dt * 1387.0 / 360.0) + rd[2] * (dt * 109.0 / 30.0) -
-			       rd[3] * (dt * 637.0 / 360.0) + rd[4] * (dt * 251.0 / 720.0);
+			r[0].values = r[0].values + (dt * 1901.0 / 720.0) * rd[0].values -
+			              (dt * 1387.0 / 360.0) * rd[1].values +
+			              (dt * 109.0 / 30.0) * rd[2].values -
+			              (dt * 637.0 / 360.0) * rd[3].values +
+			              (dt * 251.0 / 720.0) * rd[4].values;
 	}
 
 	n_steps = (std::min)(n_steps + 1, order);
@@ -602,29 +1058,36 @@ AndersonSchemeBase<NSTATE, NDERIV>::qr(unsigned int iter,
 	Eigen::MatrixXr acc = _x.col(1) + _g.col(1) - (_X + Gr) * gamma;
 	unsigned int n = 0;
 	for (unsigned int i = 0; i < this->lines.size(); i++) {
-		for (unsigned int j = 0; j < this->rd[org].lines[i].acc.size(); j++) {
-			this->rd[dst].lines[i].acc[j] = acc(Eigen::seqN(n, 3), 0);
-			this->rd[dst].lines[i].vel[j] = this->rd[org].lines[i].vel[j] + dt * (
-				this->rd[dst].lines[i].acc[j] - this->rd[org].lines[i].acc[j]);
+		auto dorg = this->rd[org].line(i);
+		auto ddst = this->rd[dst].line(i);
+		for (unsigned int j = 0; j < dorg.acc.cols(); j++) {
+			ddst.acc.col(j) = acc(Eigen::seqN(n, 3), 0);
+			ddst.vel.col(j) = dorg.vel.col(j) + dt * (
+				ddst.acc.col(j) - dorg.acc.col(j));
 			n += 3;
 		}
 	}
 	for (unsigned int i = 0; i < this->points.size(); i++) {
-		this->rd[dst].points[i].acc =  acc(Eigen::seqN(n, 3), 0);
-		this->rd[dst].points[i].vel = this->rd[org].points[i].vel + dt * (
-			this->rd[dst].points[i].acc - this->rd[org].points[i].acc);
+		auto dorg = this->rd[org].point(i);
+		auto ddst = this->rd[dst].point(i);
+		ddst.acc = acc(Eigen::seqN(n, 3), 0);
+		ddst.vel = dorg.vel + dt * (ddst.acc - dorg.acc);
 		n += 3;
 	}
 	for (unsigned int i = 0; i < this->rods.size(); i++) {
-		this->rd[dst].rods[i].acc =  acc(Eigen::seqN(n, 6), 0);
-		this->rd[dst].rods[i].vel = this->rd[org].rods[i].vel + XYZQuat::fromVec6(
-			dt * (this->rd[dst].rods[i].acc - this->rd[org].rods[i].acc));
+		auto dorg = this->rd[org].rod(i);
+		auto ddst = this->rd[dst].rod(i);
+		ddst.acc = acc(Eigen::seqN(n, 6), 0);
+		ddst.vel = dorg.vel + XYZQuat::fromVec6(
+			dt * (ddst.acc - dorg.acc)).toVec7();
 		n += 6;
 	}
 	for (unsigned int i = 0; i < this->bodies.size(); i++) {
-		this->rd[dst].bodies[i].acc =  acc(Eigen::seqN(n, 6), 0);
-		this->rd[dst].bodies[i].vel = this->rd[org].bodies[i].vel + XYZQuat::fromVec6(
-			dt * (this->rd[dst].bodies[i].acc - this->rd[org].bodies[i].acc));
+		auto dorg = this->rd[org].body(i);
+		auto ddst = this->rd[dst].body(i);
+		ddst.acc = acc(Eigen::seqN(n, 6), 0);
+		ddst.vel = dorg.vel + XYZQuat::fromVec6(
+			dt * (ddst.acc - dorg.acc)).toVec7();
 		n += 6;
 	}
 
@@ -649,7 +1112,7 @@ ImplicitEulerScheme::Step(real& dt)
 	t += _dt_factor * dt;
 	rd[1] = rd[0];  // We use rd[1] just as a tmp storage to compute relaxation
 	for (unsigned int i = 0; i < iters(); i++) {
-		r[1] = r[0] + rd[0] * (_dt_factor * dt);
+		r[1].values = r[0].values + (_dt_factor * dt) * rd[0].values;
 		Update(_dt_factor * dt, 1);
 		CalcStateDeriv(0);
 
@@ -662,7 +1125,7 @@ ImplicitEulerScheme::Step(real& dt)
 	}
 
 	// Apply
-	r[0] = r[0] + rd[0] * dt;
+	r[0].values += dt * rd[0].values;
 	t += (1.0 - _dt_factor) * dt;
 	Update(dt, 0);
 	TimeSchemeBase::Step(dt);
@@ -686,7 +1149,7 @@ AndersonEulerScheme::Step(real& dt)
 {
 	t += _dt_factor * dt;
 	for (unsigned int i = 0; i < iters(); i++) {
-		r[1] = r[0] + rd[0] * (_dt_factor * dt);
+		r[1].values = r[0].values + (_dt_factor * dt) * rd[0].values;
 		Update(_dt_factor * dt, 1);
 		CalcStateDeriv(0);
 
@@ -700,7 +1163,7 @@ AndersonEulerScheme::Step(real& dt)
 	}
 
 	// Apply
-	r[0] = r[0] + rd[0] * dt;
+	r[0].values += dt * rd[0].values;
 	t += (1.0 - _dt_factor) * dt;
 	Update(dt, 0);
 	TimeSchemeBase::Step(dt);
@@ -736,7 +1199,7 @@ ImplicitNewmarkScheme::Step(real& dt)
 		// At the time of computing r acts as an input, and rd as an output.
 		// Thus we just need to apply the Newmark scheme on r[1] and store
 		// the new rates of change on rd[1]
-		r[1] = r[0] + rd[0].Newmark(rd[1], dt, _gamma, _beta) * dt;
+		r[1].Newmark(r[0], rd[0], rd[1], dt, _gamma, _beta);
 		Update(dt, 1);
 		CalcStateDeriv(1);
 
@@ -749,7 +1212,7 @@ ImplicitNewmarkScheme::Step(real& dt)
 	}
 
 	// Apply
-	r[1] = r[0] + rd[0].Newmark(rd[1], dt, _gamma, _beta) * dt;
+	r[1].Newmark(r[0], rd[0], rd[1], dt, _gamma, _beta);
 	r[0] = r[1];
 	rd[0] = rd[1];
 	Update(dt, 0);
@@ -781,7 +1244,7 @@ ImplicitWilsonScheme::Step(real& dt)
 		// At the time of computing r acts as an input, and rd as an output.
 		// Thus we just need to apply the Newmark scheme on r[1] and store
 		// the new rates of change on rd[1]
-		r[1] = r[0] + rd[0].Wilson(rd[1], tdt, tdt) * tdt;
+		r[1].Wilson(r[0], rd[0], rd[1], tdt, tdt);
 		Update(tdt, 1);
 		CalcStateDeriv(1);
 
@@ -795,13 +1258,636 @@ ImplicitWilsonScheme::Step(real& dt)
 
 	// Apply
 	t -= (1.f - _theta) * dt;
-	r[1] = r[0] + rd[0].Wilson(rd[1], dt, tdt) * dt;
+	r[1].Wilson(r[0], rd[0], rd[1], dt, tdt);
 	r[0] = r[1];
 	rd[0] = rd[1];
 	Update(dt, 0);
 	TimeSchemeBase::Step(dt);
 }
 
+#ifndef NEWTON_KRYLOV_RTOL
+#define NEWTON_KRYLOV_RTOL 1.e-3
+#endif
+
+/** @brief Compute the block tridiagonal derivatives of the accelerations of a
+ * line with respect to one of the fields of its state, by finite differences
+ *
+ * The nodes sharing a colour are far enough to not affect the derivatives of
+ * the same nodes, so they are perturbed at once
+ * @param line The line
+ * @param x The line state, which is perturbed and restored afterwards
+ * @param x0 A copy of the line state, used to restore it
+ * @param f Scratch storage for the perturbed derivatives
+ * @param acc The unperturbed accelerations
+ * @param field 0 to derive with respect to the positions, 1 with respect to
+ * the velocities
+ * @param jl The lower blocks, coupling each node with the previous one
+ * @param jd The diagonal blocks
+ * @param ju The upper blocks, coupling each node with the next one
+ */
+static void
+line_acc_jacobian(Line* line,
+              LineState& x,
+              const LineState& x0,
+              DLineStateDt& f,
+              const Eigen::Matrix3Xr& acc,
+              unsigned int field,
+              Eigen::Matrix3Xr& jl,
+              Eigen::Matrix3Xr& jd,
+              Eigen::Matrix3Xr& ju)
+{
+	const unsigned int n = x.pos.cols();
+	const unsigned int colors = 2 * line->getBandwidth() + 1;
+	const real eps = sqrt(std::numeric_limits<real>::epsilon());
+	auto& xs = field ? x.vel : x.pos;
+	const auto& xs0 = field ? x0.vel : x0.pos;
+	for (unsigned int c = 0; c < (std::min)(colors, n); c++) {
+		for (unsigned int d = 0; d < 3; d++) {
+			for (unsigned int j = c; j < n; j += colors)
+				xs(d, j) += eps * (1.0 + std::abs(xs(d, j)));
+			line->setState(x.pos, x.vel);
+			line->getStateDeriv(f.vel, f.acc);
+			for (unsigned int j = c; j < n; j += colors) {
+				const real dx = xs(d, j) - xs0(d, j);
+				xs(d, j) = xs0(d, j);
+				if (j > 0)
+					ju.col(3 * (j - 1) + d) =
+					    (f.acc.col(j - 1) - acc.col(j - 1)) / dx;
+				jd.col(3 * j + d) = (f.acc.col(j) - acc.col(j)) / dx;
+				if (j < n - 1)
+					jl.col(3 * (j + 1) + d) =
+					    (f.acc.col(j + 1) - acc.col(j + 1)) / dx;
+			}
+		}
+	}
+	line->setState(x.pos, x.vel);
+}
+
+/** @brief Factorize a block tridiagonal matrix with the block Thomas
+ * algorithm
+ * @param l The lower blocks
+ * @param d The diagonal blocks, which are replaced by the inverse of the
+ * factorized ones
+ * @param u The upper blocks
+ */
+static void
+block_thomas_factorize(const Eigen::Matrix3Xr& l,
+                       Eigen::Matrix3Xr& d,
+                       const Eigen::Matrix3Xr& u)
+{
+	const unsigned int n = d.cols() / 3;
+	for (unsigned int j = 0; j < n; j++) {
+		mat dj = d.middleCols<3>(3 * j);
+		if (j > 0) {
+			dj -= l.middleCols<3>(3 * j) * d.middleCols<3>(3 * (j - 1)) *
+			      u.middleCols<3>(3 * (j - 1));
+		}
+		d.middleCols<3>(3 * j) = dj.inverse();
+	}
+}
+
+/** @brief Solve a block tridiagonal system factorized with
+ * block_thomas_factorize()
+ * @param l The lower blocks
+ * @param dinv The inverse of the factorized diagonal blocks
+ * @param u The upper blocks
+ * @param y The right hand side, with a column per node, which is destroyed
+ * @param x The solution, with a column per node
+ */
+static void
+block_thomas_solve(const Eigen::Matrix3Xr& l,
+                   const Eigen::Matrix3Xr& dinv,
+                   const Eigen::Matrix3Xr& u,
+                   Eigen::Matrix3Xr& y,
+                   Eigen::Map<Eigen::Matrix3Xr>& x)
+{
+	const unsigned int n = x.cols();
+	for (unsigned int j = 1; j < n; j++) {
+		y.col(j) -= l.middleCols<3>(3 * j) *
+		            dinv.middleCols<3>(3 * (j - 1)) * y.col(j - 1);
+	}
+	x.col(n - 1) = dinv.middleCols<3>(3 * (n - 1)) * y.col(n - 1);
+	for (int j = n - 2; j >= 0; j--) {
+		x.col(j) = dinv.middleCols<3>(3 * j) *
+		           (y.col(j) - u.middleCols<3>(3 * j) * x.col(j + 1));
+	}
+}
+
+NewtonKrylovScheme::NewtonKrylovScheme(moordyn::Log* log,
+                                       moordyn::WavesRef waves,
+                                       unsigned int iters,
+                                       unsigned int krylov,
+                                       real tol)
+  : ImplicitSchemeBase(log, waves, iters)
+  , _krylov(krylov)
+  , _tol(tol)
+  , _newton_iters(0)
+  , _krylov_iters(0)
+  , _twice(false)
+{
+	stringstream s;
+	s << "Newton-Krylov backward Euler (" << iters << " iterations)";
+	name = s.str();
+}
+
+void
+NewtonKrylovScheme::Step(real& dt)
+{
+	Allocate();
+
+	t += dt;
+	// Predict the solution with the explicit Euler scheme
+	r[1].values = r[0].values + dt * rd[0].values;
+	Evaluate(dt, 1, 0);
+
+	// The lines Jacobians are computed just once per time step, since they
+	// are only used to precondition the Krylov solver
+	r[2].values = r[1].values;
+	auto line_jacobian = [this, dt](unsigned int i) { LineJacobian(i, dt); };
+	if (_pool) {
+		UpdatePartition();
+		_pool->run([this, &line_jacobian](unsigned int thread) {
+			for (auto i : _lines_partition[thread])
+				line_jacobian(i);
+		});
+	} else {
+		for (unsigned int i = 0; i < lines.size(); i++)
+			line_jacobian(i);
+	}
+
+	_newton_iters = 0;
+	_krylov_iters = 0;
+	real res = 0.0;
+	for (unsigned int i = 0; i <= iters(); i++) {
+		_res.values = r[0].values + dt * rd[0].values - r[1].values;
+		res = _res.values.cwiseAbs().maxCoeff();
+		if ((res < _tol) || (i == iters()))
+			break;
+		_krylov_iters += Krylov(dt);
+		r[1].values += _z.values;
+		Evaluate(dt, 1, 0);
+		_newton_iters++;
+	}
+	// Formatting the message is not free, even if it is discarded
+	if ((_log->GetVerbosity() <= MOORDYN_DBG_LEVEL) ||
+	    (_log->GetLogLevel() <= MOORDYN_DBG_LEVEL)) {
+		LOGDBG << name << ": " << _newton_iters << " Newton iterations, "
+		       << _krylov_iters << " Krylov iterations, residue = " << res
+		       << endl;
+	}
+
+	// Apply
+	r[0].values += dt * rd[0].values;
+	Update(dt, 0);
+	TimeSchemeBase::Step(dt);
+}
+
+void
+NewtonKrylovScheme::Evaluate(real h, unsigned int org, unsigned int dst)
+{
+	// The zero-length rods are computing their orientation from the lines
+	// attached to them, which are updated later on
+	Update(h, org);
+	if (_twice)
+		Update(h, org);
+	CalcStateDeriv(dst);
+}
+
+void
+NewtonKrylovScheme::Allocate()
+{
+	const unsigned int n = r[0].values.size();
+	bool resize = (_gmres.rows() != n) || (_jacobians.size() != lines.size());
+	for (unsigned int i = 0; !resize && (i < lines.size()); i++)
+		resize = (_jacobians[i].acc.cols() != r[0].LineNodes(i));
+	if (!resize)
+		return;
+
+	_jacobians.resize(lines.size());
+	for (unsigned int i = 0; i < lines.size(); i++) {
+		const unsigned int nodes = r[0].LineNodes(i);
+		auto& jac = _jacobians[i];
+		for (auto m : { &jac.jr_l, &jac.jr_d, &jac.jr_u,
+		                &jac.a_l, &jac.a_dinv, &jac.a_u })
+			m->setZero(3, 3 * nodes);
+		jac.acc.setZero(3, nodes);
+	}
+	_twice = false;
+	for (auto rod : rods)
+		_twice |= (rod->getN() == 0);
+	_res = r[0];
+	_z = r[0];
+	_gmres.Resize(n, _krylov);
+}
+
+void
+NewtonKrylovScheme::LineJacobian(unsigned int i, real h)
+{
+	Line* line = lines[i];
+	auto x = r[2].line(i);
+	const auto x1 = r[1].line(i);
+	auto f = rd[1].line(i);
+	auto& jac = _jacobians[i];
+	const unsigned int n = x.pos.cols();
+	if (!n)
+		return;
+
+	line->setState(x.pos, x.vel);
+	line->getStateDeriv(f.vel, f.acc);
+	jac.acc = f.acc;
+
+	// The derivatives w.r.t. the velocities are stored on the velocities
+	// system matrix, which is assembled later
+	line_acc_jacobian(line, x, x1, f, jac.acc, 0, jac.jr_l, jac.jr_d, jac.jr_u);
+	line_acc_jacobian(line, x, x1, f, jac.acc, 1, jac.a_l, jac.a_dinv, jac.a_u);
+
+	// Assemble the velocities system matrix, I - h * JU - h^2 * JR, and
+	// factorize it with the block Thomas algorithm
+	jac.a_l = -h * jac.a_l - h * h * jac.jr_l;
+	jac.a_dinv = -h * jac.a_dinv - h * h * jac.jr_d;
+	jac.a_u = -h * jac.a_u - h * h * jac.jr_u;
+	for (unsigned int j = 0; j < n; j++)
+		jac.a_dinv.middleCols<3>(3 * j) += mat::Identity();
+	block_thomas_factorize(jac.a_l, jac.a_dinv, jac.a_u);
+}
+
+void
+NewtonKrylovScheme::Precondition(real h)
+{
+	// The lines system is
+	// | I       -h I     | |dR|   |zR|
+	// | -h JR   I - h JU | |dU| = |zU|
+	// so the velocities can be solved first, and the positions afterwards
+	for (unsigned int i = 0; i < lines.size(); i++) {
+		auto z = _z.line(i);
+		auto& jac = _jacobians[i];
+		auto& y = jac.acc;
+		const unsigned int n = z.pos.cols();
+		if (!n)
+			continue;
+		for (unsigned int j = 0; j < n; j++) {
+			vec jr = jac.jr_d.middleCols<3>(3 * j) * z.pos.col(j);
+			if (j > 0)
+				jr += jac.jr_l.middleCols<3>(3 * j) * z.pos.col(j - 1);
+			if (j < n - 1)
+				jr += jac.jr_u.middleCols<3>(3 * j) * z.pos.col(j + 1);
+			y.col(j) = z.vel.col(j) + h * jr;
+		}
+		block_thomas_solve(jac.a_l, jac.a_dinv, jac.a_u, y, z.vel);
+		z.pos += h * z.vel;
+	}
+}
+
+void
+NewtonKrylovScheme::JacobianProduct(real h, Eigen::VectorXr& w)
+{
+	const real norm = _z.values.norm();
+	if (norm == 0.0) {
+		w.setZero();
+		return;
+	}
+	const real eps = sqrt((1.0 + r[1].values.norm()) *
+	                      std::numeric_limits<real>::epsilon()) / norm;
+	r[2].values = r[1].values + eps * _z.values;
+	Evaluate(h, 2, 1);
+	w = _z.values - (h / eps) * (rd[1].values - rd[0].values);
+}
+
+unsigned int
+NewtonKrylovScheme::Krylov(real h)
+{
+	return _gmres.Solve(
+	    _res.values,
+	    _z.values,
+	    [this, h](Eigen::VectorXr& w) { JacobianProduct(h, w); },
+	    [this, h]() { Precondition(h); },
+	    NEWTON_KRYLOV_RTOL);
+}
+
+#ifndef STATIC_NEWTON_RTOL
+#define STATIC_NEWTON_RTOL 1.e-3
+#endif
+
+#ifndef STATIC_NEWTON_REG
+#define STATIC_NEWTON_REG 1.e-6
+#endif
+
+#ifndef STATIC_NEWTON_MU
+#define STATIC_NEWTON_MU 1.e-4
+#endif
+
+#ifndef STATIC_NEWTON_LINE_SEARCH
+#define STATIC_NEWTON_LINE_SEARCH 10
+#endif
+
+StaticNewtonScheme::StaticNewtonScheme(moordyn::Log* log,
+                                       moordyn::WavesRef waves,
+                                       unsigned int krylov)
+  : TimeSchemeBase(log, waves)
+  , _krylov(krylov)
+  , _error(0.0)
+  , _alpha(0.0)
+  , _krylov_iters(0)
+  , _mu(0.0)
+  , _scale(0.0)
+  , _twice(false)
+{
+	name = "Newton static solution";
+}
+
+void
+StaticNewtonScheme::Init()
+{
+	TimeSchemeBase::Init();
+	for (unsigned int i = 0; i < lines.size(); i++)
+		r[0].line(i).vel.setZero();
+	for (unsigned int i = 0; i < points.size(); i++)
+		r[0].point(i).vel.setZero();
+	for (unsigned int i = 0; i < rods.size(); i++)
+		r[0].rod(i).vel.setZero();
+	for (unsigned int i = 0; i < bodies.size(); i++)
+		r[0].body(i).vel.setZero();
+	Allocate();
+	_error = Evaluate(0, 0);
+}
+
+void
+StaticNewtonScheme::Step(real& dt)
+{
+	Allocate();
+	_error = Evaluate(0, 0);
+	Jacobians();
+
+	_b = -rd[0].values;
+	bool valid = true;
+	try {
+		_krylov_iters = _gmres.Solve(
+		    _b,
+		    _z.values,
+		    [this](Eigen::VectorXr& w) { JacobianProduct(w); },
+		    [this]() { Precondition(); },
+		    STATIC_NEWTON_RTOL);
+	} catch (const moordyn::nan_error&) {
+		valid = false;
+	}
+	valid = valid && _z.values.allFinite();
+
+	// Backtracking line search, asking for a sufficient decrease of the
+	// residue. The states producing NaNs are just rejected
+	_alpha = 1.0;
+	unsigned int i;
+	for (i = 0; valid && (i < STATIC_NEWTON_LINE_SEARCH); i++) {
+		Displace(0, 1, _alpha);
+		real error = std::numeric_limits<real>::infinity();
+		try {
+			error = Evaluate(1, 1);
+		} catch (const moordyn::nan_error&) {
+		}
+		if (error < (1.0 - 1.e-4 * _alpha) * _error) {
+			r[0].values = r[1].values;
+			rd[0].values = rd[1].values;
+			_error = error;
+			break;
+		}
+		_alpha *= 0.5;
+	}
+	if (!valid || (i == STATIC_NEWTON_LINE_SEARCH)) {
+		_alpha = 0.0;
+		Evaluate(0, 0);
+	}
+
+	// The damping is increased if the full Newton correction has been
+	// rejected, and released otherwise
+	if (_alpha == 1.0)
+		_mu = 0.1 * _mu < STATIC_NEWTON_MU * _scale ? 0.0 : 0.1 * _mu;
+	else
+		_mu = (std::max)(10.0 * _mu, STATIC_NEWTON_MU * _scale);
+
+	t += dt;
+	TimeSchemeBase::Step(dt);
+}
+
+void
+StaticNewtonScheme::Allocate()
+{
+	const unsigned int n = r[0].values.size();
+	bool resize = (_gmres.rows() != n) || (_jacobians.size() != lines.size());
+	for (unsigned int i = 0; !resize && (i < lines.size()); i++)
+		resize = (_jacobians[i].acc.cols() != r[0].LineNodes(i));
+	if (!resize)
+		return;
+
+	_jacobians.resize(lines.size());
+	for (unsigned int i = 0; i < lines.size(); i++) {
+		const unsigned int nodes = r[0].LineNodes(i);
+		auto& jac = _jacobians[i];
+		for (auto m : { &jac.jl, &jac.jdinv, &jac.ju })
+			m->setZero(3, 3 * nodes);
+		jac.acc.setZero(3, nodes);
+		jac.scale = 0.0;
+	}
+	_points_jinv.assign(points.size(), mat::Zero());
+	_rods_jinv.assign(rods.size(), mat6::Zero());
+	_bodies_jinv.assign(bodies.size(), mat6::Zero());
+	_twice = false;
+	for (auto rod : rods)
+		_twice |= (rod->getN() == 0);
+	_z = rd[0];
+	_z.values.setZero();
+	_b.setZero(n);
+	_gmres.Resize(n, _krylov);
+}
+
+real
+StaticNewtonScheme::Evaluate(unsigned int org, unsigned int dst)
+{
+	// The zero-length rods are computing their orientation from the lines
+	// attached to them, which are updated later on
+	Update(0.0, org);
+	if (_twice)
+		Update(0.0, org);
+	CalcStateDeriv(dst);
+	// The velocities are null, so just the accelerations are considered
+	for (unsigned int i = 0; i < lines.size(); i++)
+		rd[dst].line(i).vel.setZero();
+	for (unsigned int i = 0; i < points.size(); i++)
+		rd[dst].point(i).vel.setZero();
+	for (unsigned int i = 0; i < rods.size(); i++)
+		rd[dst].rod(i).vel.setZero();
+	for (unsigned int i = 0; i < bodies.size(); i++)
+		rd[dst].body(i).vel.setZero();
+	return rd[dst].values.norm();
+}
+
+void
+StaticNewtonScheme::Displace(unsigned int org, unsigned int dst, real f)
+{
+	r[dst].values = r[org].values;
+	for (unsigned int i = 0; i < lines.size(); i++)
+		r[dst].line(i).pos += f * _z.line(i).acc;
+	for (unsigned int i = 0; i < points.size(); i++)
+		r[dst].point(i).pos += f * _z.point(i).acc;
+	auto displace = [f](Eigen::Map<vec7>& pos, const vec6& d) {
+		const quaternion q(pos.tail<4>());
+		pos.head<3>() += f * d.head<3>();
+		pos.tail<4>() = (Euler2Quat(f * d.tail<3>()) * q).normalized().coeffs();
+	};
+	for (unsigned int i = 0; i < rods.size(); i++) {
+		auto x = r[dst].rod(i);
+		displace(x.pos, _z.rod(i).acc);
+	}
+	for (unsigned int i = 0; i < bodies.size(); i++) {
+		auto x = r[dst].body(i);
+		displace(x.pos, _z.body(i).acc);
+	}
+}
+
+void
+StaticNewtonScheme::Jacobians()
+{
+	// The lines are independent, so their Jacobians can be computed
+	// concurrently
+	r[2].values = r[0].values;
+	auto line_jac = [this](unsigned int i) {
+		Line* line = lines[i];
+		auto x = r[2].line(i);
+		const auto x0 = r[0].line(i);
+		auto f = rd[1].line(i);
+		auto& jac = _jacobians[i];
+		if (!x.pos.cols())
+			return;
+		line->setState(x.pos, x.vel);
+		line->getStateDeriv(f.vel, f.acc);
+		jac.acc = f.acc;
+		line_acc_jacobian(line, x, x0, f, jac.acc, 0, jac.jl, jac.jdinv, jac.ju);
+		jac.scale = jac.jdinv.cwiseAbs().maxCoeff();
+		// The slack segments have no stiffness, so the Jacobian is
+		// regularized to keep it invertible
+		const real reg = STATIC_NEWTON_REG * jac.scale + _mu;
+		for (unsigned int j = 0; j < x.pos.cols(); j++)
+			jac.jdinv.middleCols<3>(3 * j) -= reg * mat::Identity();
+		block_thomas_factorize(jac.jl, jac.jdinv, jac.ju);
+	};
+	if (_pool) {
+		UpdatePartition();
+		_pool->run([this, &line_jac](unsigned int thread) {
+			for (auto i : _lines_partition[thread])
+				line_jac(i);
+		});
+	} else {
+		for (unsigned int i = 0; i < lines.size(); i++)
+			line_jac(i);
+	}
+
+	_scale = 0.0;
+	for (unsigned int i = 0; i < lines.size(); i++) {
+		if (r[0].LineNodes(i))
+			_scale = (std::max)(_scale, _jacobians[i].scale);
+	}
+
+	// The rest of entities are perturbed one by one, so their Jacobians are
+	// computed with the rest of the system fixed. The pseudo-inverse takes
+	// care of the constrained degrees of freedom, like the position of the
+	// pinned rods
+	const real eps = sqrt(std::numeric_limits<real>::epsilon());
+	_z.values.setZero();
+	for (unsigned int i = 0; i < points.size(); i++) {
+		_points_jinv[i].setZero();
+		if (points[i]->type != Point::FREE)
+			continue;
+		auto z = _z.point(i);
+		const real h = eps * (1.0 + r[0].point(i).pos.norm());
+		mat jac;
+		for (unsigned int d = 0; d < 3; d++) {
+			z.acc(d) = 1.0;
+			Displace(0, 2, h);
+			Evaluate(2, 1);
+			jac.col(d) = (rd[1].point(i).acc - rd[0].point(i).acc) / h;
+			z.acc(d) = 0.0;
+		}
+		_scale = (std::max)(_scale, jac.diagonal().cwiseAbs().maxCoeff());
+		jac -= _mu * mat::Identity();
+		_points_jinv[i] = jac.completeOrthogonalDecomposition().pseudoInverse();
+	}
+	for (unsigned int i = 0; i < rods.size(); i++) {
+		_rods_jinv[i].setZero();
+		if ((rods[i]->type != Rod::PINNED) && (rods[i]->type != Rod::CPLDPIN) &&
+		    (rods[i]->type != Rod::FREE))
+			continue;
+		auto z = _z.rod(i);
+		const real h = eps * (1.0 + r[0].rod(i).pos.head<3>().norm());
+		mat6 jac;
+		for (unsigned int d = 0; d < 6; d++) {
+			z.acc(d) = 1.0;
+			Displace(0, 2, h);
+			Evaluate(2, 1);
+			jac.col(d) = (rd[1].rod(i).acc - rd[0].rod(i).acc) / h;
+			z.acc(d) = 0.0;
+		}
+		_scale = (std::max)(_scale, jac.diagonal().cwiseAbs().maxCoeff());
+		jac -= _mu * mat6::Identity();
+		_rods_jinv[i] = jac.completeOrthogonalDecomposition().pseudoInverse();
+	}
+	for (unsigned int i = 0; i < bodies.size(); i++) {
+		_bodies_jinv[i].setZero();
+		if ((bodies[i]->type != Body::FREE) &&
+		    (bodies[i]->type != Body::CPLDPIN))
+			continue;
+		auto z = _z.body(i);
+		const real h = eps * (1.0 + r[0].body(i).pos.head<3>().norm());
+		mat6 jac;
+		for (unsigned int d = 0; d < 6; d++) {
+			z.acc(d) = 1.0;
+			Displace(0, 2, h);
+			Evaluate(2, 1);
+			jac.col(d) = (rd[1].body(i).acc - rd[0].body(i).acc) / h;
+			z.acc(d) = 0.0;
+		}
+		_scale = (std::max)(_scale, jac.diagonal().cwiseAbs().maxCoeff());
+		jac -= _mu * mat6::Identity();
+		_bodies_jinv[i] =
+		    jac.completeOrthogonalDecomposition().pseudoInverse();
+	}
+}
+
+void
+StaticNewtonScheme::Precondition()
+{
+	for (unsigned int i = 0; i < lines.size(); i++) {
+		auto z = _z.line(i);
+		auto& jac = _jacobians[i];
+		if (!z.acc.cols())
+			continue;
+		jac.acc = z.acc;
+		block_thomas_solve(jac.jl, jac.jdinv, jac.ju, jac.acc, z.acc);
+	}
+	for (unsigned int i = 0; i < points.size(); i++)
+		_z.point(i).acc = _points_jinv[i] * _z.point(i).acc;
+	for (unsigned int i = 0; i < rods.size(); i++)
+		_z.rod(i).acc = _rods_jinv[i] * _z.rod(i).acc;
+	for (unsigned int i = 0; i < bodies.size(); i++)
+		_z.body(i).acc = _bodies_jinv[i] * _z.body(i).acc;
+}
+
+void
+StaticNewtonScheme::JacobianProduct(Eigen::VectorXr& w)
+{
+	const real norm = _z.values.norm();
+	if (norm == 0.0) {
+		w.setZero();
+		return;
+	}
+	// Singular Jacobians, like the ones of the slack lines, would produce
+	// NaNs in the preconditioner
+	if (!std::isfinite(norm))
+		throw moordyn::nan_error("NaN in the Newton correction");
+	const real eps = sqrt((1.0 + r[0].values.norm()) *
+	                      std::numeric_limits<real>::epsilon()) / norm;
+	Displace(0, 2, eps);
+	Evaluate(2, 1);
+	w = (rd[1].values - rd[0].values) / eps - _mu * _z.values;
+}
+
 TimeScheme*
 create_time_scheme(const std::string& name,
                    moordyn::Log* log,
@@ -818,6 +1904,14 @@ create_time_scheme(const std::string& name,
 		out = new RK2Scheme(log, waves);
 	} else if (str::lower(name) == "rk4") {
 		out = new RK4Scheme(log, waves);
+	} else if (str::lower(name) == "rk23") {
+		out = new EmbeddedRKScheme<BogackiShampineTableau>(log, waves);
+	} else if (str::lower(name) == "rk45") {
+		out = new EmbeddedRKScheme<DormandPrinceTableau>(log, waves);
+	} else if (str::lower(name) == "mrk2") {
+		out = new MultirateRKScheme<2>(log, waves);
+	} else if (str::lower(name) == "mrk4") {
+		out = new MultirateRKScheme<4>(log, waves);
 	} else if (str::lower(name) == "ab2") {
 		out = new ABScheme<2, false>(log, waves);
 	} else if (str::lower(name) == "ab3") {
@@ -877,6 +1971,16 @@ create_time_scheme(const std::string& name,
 			  << name << "'";
 			throw moordyn::invalid_value_error(s.str().c_str());
 		}
+	} else if (str::startswith(str::lower(name), "newton")) {
+		try {
+			unsigned int iters = std::stoi(name.substr(6));
+			out = new NewtonKrylovScheme(log, waves, iters);
+		} catch (std::invalid_argument) {
+			stringstream s;
+			s << "Invalid Newton-Krylov name format '"
+			  << name << "'";
+			throw moordyn::invalid_value_error(s.str().c_str());
+		}
 	} else {
 		stringstream s;
 		s << "Unknown time scheme '" << name << "'";
@@ -884,6 +1988,7 @@ create_time_scheme(const std::string& name,
 	}
 	if (!out)
 		throw moordyn::mem_error("Failure allocating the time scheme");
+	out->key = name;
 	return out;
 }
 
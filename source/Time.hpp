@@ -41,11 +41,16 @@
 #include "Point.hpp"
 #include "Rod.hpp"
 #include "Body.hpp"
+#include "Util/ThreadPool.hpp"
 #include <vector>
 #include <string>
 
 namespace moordyn {
 
+// Forward declare waves
+class Waves;
+typedef std::shared_ptr<Waves> WavesRef;
+
 /** @class TimeScheme Time.hpp
  * @brief Time scheme abstraction
  *
@@ -75,6 +80,7 @@ class TimeScheme : public io::IO
 			throw moordyn::invalid_value_error("Repeated object");
 		}
 		lines.push_back(obj);
+		_partition_dirty = true;
 	}
 
 	/** @brief Remove a line
@@ -93,6 +99,7 @@ class TimeScheme : public io::IO
 		}
 		const unsigned int i = std::distance(lines.begin(), it);
 		lines.erase(it);
+		_partition_dirty = true;
 		return i;
 	}
 
@@ -141,6 +148,7 @@ class TimeScheme : public io::IO
 			throw moordyn::invalid_value_error("Repeated object");
 		}
 		rods.push_back(obj);
+		_partition_dirty = true;
 	}
 
 	/** @brief Remove a rod
@@ -159,6 +167,7 @@ class TimeScheme : public io::IO
 		}
 		const unsigned int i = std::distance(rods.begin(), it);
 		rods.erase(it);
+		_partition_dirty = true;
 		return i;
 	}
 
@@ -200,6 +209,11 @@ class TimeScheme : public io::IO
 	 */
 	inline std::string GetName() const { return name; }
 
+	/** @brief Get the name the scheme was created with
+	 * @return The name passed to moordyn::create_time_scheme(), e.g. "RK4"
+	 */
+	inline std::string GetKey() const { return key; }
+
 	/** @brief Get the simulation time
 	 * @return The time
 	 */
@@ -225,6 +239,56 @@ class TimeScheme : public io::IO
 	 */
 	inline void SetCFL(const real& cfl) { this->cfl = cfl; }
 
+	/** @brief Get the relative tolerance of the adaptive time schemes
+	 * @return The relative tolerance
+	 */
+	inline real GetRTol() const { return rtol; }
+
+	/** @brief Set the relative tolerance of the adaptive time schemes
+	 *
+	 * This value is ignored by the fixed time step schemes
+	 * @param rtol The relative tolerance
+	 */
+	inline void SetRTol(const real& rtol) { this->rtol = rtol; }
+
+	/** @brief Get the absolute tolerance of the adaptive time schemes
+	 * @return The absolute tolerance
+	 */
+	inline real GetATol() const { return atol; }
+
+	/** @brief Set the absolute tolerance of the adaptive time schemes
+	 *
+	 * This value is ignored by the fixed time step schemes
+	 * @param atol The absolute tolerance
+	 */
+	inline void SetATol(const real& atol) { this->atol = atol; }
+
+	/** @brief Get the number of threads used to compute the lines and rods
+	 * derivatives
+	 * @return The number of threads
+	 */
+	inline unsigned int GetThreads() const { return _pool ? _pool->size() : 1; }
+
+	/** @brief Set the number of threads used to compute the lines and rods
+	 * derivatives
+	 *
+	 * The lines, and afterwards the rods, are split among the threads
+	 * weighted by their number of nodes. Each entity writes just its own
+	 * derivatives, so the results do not depend on the number of threads
+	 * @param n The number of threads, including the calling one. 0 or 1 to
+	 * compute everything on the calling thread
+	 */
+	inline void SetThreads(unsigned int n)
+	{
+		if (n == GetThreads())
+			return;
+		if (n <= 1)
+			_pool.reset();
+		else
+			_pool = std::make_shared<ThreadPool>(n);
+		_partition_dirty = true;
+	}
+
 	/** @brief Prepare everything for the next outer time step
 	 *
 	 * Always call this method before start calling TimeScheme::Step()
@@ -249,7 +313,8 @@ class TimeScheme : public io::IO
 	 * This function is the one that must be specialized on each time scheme,
 	 * but remember to call it at the end of the inherited function to increment
 	 * TimeScheme::t_local
-	 * @param dt Time step
+	 * @param dt Time step. The adaptive time schemes might take a shorter
+	 * one, which is written back
 	 */
 	virtual void Step(real& dt) { t_local += dt; };
 
@@ -277,9 +342,30 @@ class TimeScheme : public io::IO
 	  : io::IO(log)
 	  , name("None")
 	  , t(0.0)
+	  , rtol(1e-3)
+	  , atol(1e-3)
+	  , _partition_dirty(true)
 	{
 	}
 
+	/** @brief Split the lines and rods among the threads, if the entities
+	 * or the number of threads have changed
+	 */
+	inline void UpdatePartition()
+	{
+		if (!_partition_dirty)
+			return;
+		std::vector<unsigned int> weights;
+		for (auto obj : lines)
+			weights.push_back(obj->getN() + 1);
+		_lines_partition = ThreadPool::partition(weights, GetThreads());
+		weights.clear();
+		for (auto obj : rods)
+			weights.push_back(obj->getN() + 1);
+		_rods_partition = ThreadPool::partition(weights, GetThreads());
+		_partition_dirty = false;
+	}
+
 	/// The ground body
 	Body* ground;
 
@@ -298,6 +384,9 @@ class TimeScheme : public io::IO
 	/// The scheme name
 	std::string name;
 
+	/// The name the scheme was created with, see moordyn::create_time_scheme()
+	std::string key;
+
 	/// The simulation time
 	real t;
 	/// The local time, within the outer time step
@@ -305,11 +394,25 @@ class TimeScheme : public io::IO
 
 	/// Maximum CFL factor
 	real cfl;
-};
 
-// Forward declare waves
-class Waves;
-typedef std::shared_ptr<Waves> WavesRef;
+	/// Relative tolerance of the adaptive time schemes
+	real rtol;
+	/// Absolute tolerance of the adaptive time schemes
+	real atol;
+
+	/// The threads to compute the lines and rods derivatives, if any
+	std::shared_ptr<ThreadPool> _pool;
+	/// True if the lines and rods shall be split among the threads again
+	bool _partition_dirty;
+	/// The lines computed by each thread
+	std::vector<std::vector<unsigned int>> _lines_partition;
+	/// The rods computed by each thread
+	std::vector<std::vector<unsigned int>> _rods_partition;
+
+	friend TimeScheme* create_time_scheme(const std::string& name,
+	                                      moordyn::Log* log,
+	                                      WavesRef waves);
+};
 
 /** @class TimeSchemeBase Time.hpp
  * @brief A generic abstract integration scheme
@@ -335,19 +438,11 @@ class TimeSchemeBase : public TimeScheme
 			throw;
 		}
 		// Build up the states and states derivatives
-		unsigned int n = obj->getN() - 1;
-		LineState state;
-		state.pos.assign(n, vec::Zero());
-		state.vel.assign(n, vec::Zero());
-		for (unsigned int i = 0; i < r.size(); i++) {
-			r[i].lines.push_back(state);
-		}
-		DLineStateDt dstate;
-		dstate.vel.assign(n, vec::Zero());
-		dstate.acc.assign(n, vec::Zero());
-		for (unsigned int i = 0; i < rd.size(); i++) {
-			rd[i].lines.push_back(dstate);
-		}
+		const unsigned int n = obj->getNStates();
+		for (auto& state : r)
+			state.AddLine(n);
+		for (auto& dstate : rd)
+			dstate.AddLine(n);
 		// Add the mask value
 		_calc_mask.lines.push_back(true);
 	}
@@ -366,10 +461,10 @@ class TimeSchemeBase : public TimeScheme
 		} catch (...) {
 			throw;
 		}
-		for (unsigned int i = 0; i < r.size(); i++)
-			r[i].lines.erase(r[i].lines.begin() + i);
-		for (unsigned int i = 0; i < rd.size(); i++)
-			rd[i].lines.erase(rd[i].lines.begin() + i);
+		for (auto& state : r)
+			state.RemoveLine(i);
+		for (auto& dstate : rd)
+			dstate.RemoveLine(i);
 		_calc_mask.lines.erase(_calc_mask.lines.begin() + i);
 		return i;
 	}
@@ -386,18 +481,10 @@ class TimeSchemeBase : public TimeScheme
 			throw;
 		}
 		// Build up the states and states derivatives
-		PointState state;
-		state.pos = vec::Zero();
-		state.vel = vec::Zero();
-		for (unsigned int i = 0; i < r.size(); i++) {
-			r[i].points.push_back(state);
-		}
-		DPointStateDt dstate;
-		dstate.vel = vec::Zero();
-		dstate.acc = vec::Zero();
-		for (unsigned int i = 0; i < rd.size(); i++) {
-			rd[i].points.push_back(dstate);
-		}
+		for (auto& state : r)
+			state.AddPoint();
+		for (auto& dstate : rd)
+			dstate.AddPoint();
 		// Add the mask value
 		_calc_mask.points.push_back(true);
 	}
@@ -416,10 +503,10 @@ class TimeSchemeBase : public TimeScheme
 		} catch (...) {
 			throw;
 		}
-		for (unsigned int i = 0; i < r.size(); i++)
-			r[i].points.erase(r[i].points.begin() + i);
-		for (unsigned int i = 0; i < rd.size(); i++)
-			rd[i].points.erase(rd[i].points.begin() + i);
+		for (auto& state : r)
+			state.RemovePoint(i);
+		for (auto& dstate : rd)
+			dstate.RemovePoint(i);
 		_calc_mask.points.erase(_calc_mask.points.begin() + i);
 		return i;
 	}
@@ -436,18 +523,10 @@ class TimeSchemeBase : public TimeScheme
 			throw;
 		}
 		// Build up the states and states derivatives
-		RodState state;
-		state.pos = XYZQuat::Zero();
-		state.vel = vec6::Zero();
-		for (unsigned int i = 0; i < r.size(); i++) {
-			r[i].rods.push_back(state);
-		}
-		DRodStateDt dstate;
-		dstate.vel = XYZQuat::Zero();
-		dstate.acc = vec6::Zero();
-		for (unsigned int i = 0; i < rd.size(); i++) {
-			rd[i].rods.push_back(dstate);
-		}
+		for (auto& state : r)
+			state.AddRod();
+		for (auto& dstate : rd)
+			dstate.AddRod();
 		// Add the mask value
 		_calc_mask.rods.push_back(true);
 	}
@@ -466,10 +545,10 @@ class TimeSchemeBase : public TimeScheme
 		} catch (...) {
 			throw;
 		}
-		for (unsigned int i = 0; i < r.size(); i++)
-			r[i].rods.erase(r[i].rods.begin() + i);
-		for (unsigned int i = 0; i < rd.size(); i++)
-			rd[i].rods.erase(rd[i].rods.begin() + i);
+		for (auto& state : r)
+			state.RemoveRod(i);
+		for (auto& dstate : rd)
+			dstate.RemoveRod(i);
 		_calc_mask.rods.erase(_calc_mask.rods.begin() + i);
 		return i;
 	}
@@ -486,18 +565,10 @@ class TimeSchemeBase : public TimeScheme
 			throw;
 		}
 		// Build up the states and states derivatives
-		BodyState state;
-		state.pos = XYZQuat::Zero();
-		state.vel = vec6::Zero();
-		for (unsigned int i = 0; i < r.size(); i++) {
-			r[i].bodies.push_back(state);
-		}
-		DBodyStateDt dstate;
-		dstate.vel = XYZQuat::Zero();
-		dstate.acc = vec6::Zero();
-		for (unsigned int i = 0; i < rd.size(); i++) {
-			rd[i].bodies.push_back(dstate);
-		}
+		for (auto& state : r)
+			state.AddBody();
+		for (auto& dstate : rd)
+			dstate.AddBody();
 		// Add the mask value
 		_calc_mask.bodies.push_back(true);
 	}
@@ -516,10 +587,10 @@ class TimeSchemeBase : public TimeScheme
 		} catch (...) {
 			throw;
 		}
-		for (unsigned int i = 0; i < r.size(); i++)
-			r[i].bodies.erase(r[i].bodies.begin() + i);
-		for (unsigned int i = 0; i < rd.size(); i++)
-			rd[i].bodies.erase(rd[i].bodies.begin() + i);
+		for (auto& state : r)
+			state.RemoveBody(i);
+		for (auto& dstate : rd)
+			dstate.RemoveBody(i);
 		_calc_mask.bodies.erase(_calc_mask.bodies.begin() + i);
 		return i;
 	}
@@ -538,27 +609,37 @@ class TimeSchemeBase : public TimeScheme
 		for (unsigned int i = 0; i < bodies.size(); i++) {
 			if ((bodies[i]->type != Body::FREE) && (bodies[i]->type != Body::CPLDPIN)) // Only fully coupled bodies are intialized in MD2.cpp
 				continue;
-			std::tie(r[0].bodies[i].pos, r[0].bodies[i].vel) =
-			    bodies[i]->initialize();
+			const auto [pos, vel] = bodies[i]->initialize();
+			auto state = r[0].body(i);
+			state.pos = pos.toVec7();
+			state.vel = vel;
 		}
 
 		for (unsigned int i = 0; i < rods.size(); i++) {
 			if ((rods[i]->type != Rod::FREE) && (rods[i]->type != Rod::PINNED))
 				continue;
-			std::tie(r[0].rods[i].pos, r[0].rods[i].vel) =
-			    rods[i]->initialize();
+			const auto [pos, vel] = rods[i]->initialize();
+			auto state = r[0].rod(i);
+			state.pos = pos.toVec7();
+			state.vel = vel;
 		}
 
 		for (unsigned int i = 0; i < points.size(); i++) {
 			if (points[i]->type != Point::FREE)
 				continue;
-			std::tie(r[0].points[i].pos, r[0].points[i].vel) =
-			    points[i]->initialize();
+			const auto [pos, vel] = points[i]->initialize();
+			auto state = r[0].point(i);
+			state.pos = pos;
+			state.vel = vel;
 		}
 
 		for (unsigned int i = 0; i < lines.size(); i++) {
-			std::tie(r[0].lines[i].pos, r[0].lines[i].vel) =
-			    lines[i]->initialize();
+			const auto [pos, vel] = lines[i]->initialize();
+			auto state = r[0].line(i);
+			for (unsigned int j = 0; j < pos.size(); j++) {
+				state.pos.col(j) = pos[j];
+				state.vel.col(j) = vel[j];
+			}
 		}
 	}
 
@@ -606,56 +687,58 @@ class TimeSchemeBase : public TimeScheme
 		// Along the same line, we do not need to same information about the
 		// number of lines, rods and so on. That information is already
 		// collected from the definition file
+		auto pack = [this, &data](const auto& m) {
+			for (unsigned int k = 0; k < m.size(); k++)
+				data.push_back(io::IO::Serialize(m.data()[k]));
+		};
+		// The lines are packed as lists of vectors, i.e. starting with the
+		// number of nodes
+		auto pack_list = [this, &data, &pack](const auto& m) {
+			data.push_back(io::IO::Serialize((uint64_t)m.cols()));
+			pack(m);
+		};
 		for (unsigned int substep = 0; substep < NSTATE; substep++) {
 			for (unsigned int i = 0; i < bodies.size(); i++) {
-				subdata = io::IO::Serialize(r[substep].bodies[i].pos);
-				data.insert(data.end(), subdata.begin(), subdata.end());
-				subdata = io::IO::Serialize(r[substep].bodies[i].vel);
-				data.insert(data.end(), subdata.begin(), subdata.end());
+				const auto state = r[substep].body(i);
+				pack(state.pos);
+				pack(state.vel);
 			}
 			for (unsigned int i = 0; i < rods.size(); i++) {
-				subdata = io::IO::Serialize(r[substep].rods[i].pos);
-				data.insert(data.end(), subdata.begin(), subdata.end());
-				subdata = io::IO::Serialize(r[substep].rods[i].vel);
-				data.insert(data.end(), subdata.begin(), subdata.end());
+				const auto state = r[substep].rod(i);
+				pack(state.pos);
+				pack(state.vel);
 			}
 			for (unsigned int i = 0; i < points.size(); i++) {
-				subdata = io::IO::Serialize(r[substep].points[i].pos);
-				data.insert(data.end(), subdata.begin(), subdata.end());
-				subdata = io::IO::Serialize(r[substep].points[i].vel);
-				data.insert(data.end(), subdata.begin(), subdata.end());
+				const auto state = r[substep].point(i);
+				pack(state.pos);
+				pack(state.vel);
 			}
 			for (unsigned int i = 0; i < lines.size(); i++) {
-				subdata = io::IO::Serialize(r[substep].lines[i].pos);
-				data.insert(data.end(), subdata.begin(), subdata.end());
-				subdata = io::IO::Serialize(r[substep].lines[i].vel);
-				data.insert(data.end(), subdata.begin(), subdata.end());
+				const auto state = r[substep].line(i);
+				pack_list(state.pos);
+				pack_list(state.vel);
 			}
 		}
 		for (unsigned int substep = 0; substep < NDERIV; substep++) {
 			for (unsigned int i = 0; i < bodies.size(); i++) {
-				subdata = io::IO::Serialize(rd[substep].bodies[i].vel);
-				data.insert(data.end(), subdata.begin(), subdata.end());
-				subdata = io::IO::Serialize(rd[substep].bodies[i].acc);
-				data.insert(data.end(), subdata.begin(), subdata.end());
+				const auto dstate = rd[substep].body(i);
+				pack(dstate.vel);
+				pack(dstate.acc);
 			}
 			for (unsigned int i = 0; i < rods.size(); i++) {
-				subdata = io::IO::Serialize(rd[substep].rods[i].vel);
-				data.insert(data.end(), subdata.begin(), subdata.end());
-				subdata = io::IO::Serialize(rd[substep].rods[i].acc);
-				data.insert(data.end(), subdata.begin(), subdata.end());
+				const auto dstate = rd[substep].rod(i);
+				pack(dstate.vel);
+				pack(dstate.acc);
 			}
 			for (unsigned int i = 0; i < points.size(); i++) {
-				subdata = io::IO::Serialize(rd[substep].points[i].vel);
-				data.insert(data.end(), subdata.begin(), subdata.end());
-				subdata = io::IO::Serialize(rd[substep].points[i].acc);
-				data.insert(data.end(), subdata.begin(), subdata.end());
+				const auto dstate = rd[substep].point(i);
+				pack(dstate.vel);
+				pack(dstate.acc);
 			}
 			for (unsigned int i = 0; i < lines.size(); i++) {
-				subdata = io::IO::Serialize(rd[substep].lines[i].vel);
-				data.insert(data.end(), subdata.begin(), subdata.end());
-				subdata = io::IO::Serialize(rd[substep].lines[i].acc);
-				data.insert(data.end(), subdata.begin(), subdata.end());
+				const auto dstate = rd[substep].line(i);
+				pack_list(dstate.vel);
+				pack_list(dstate.acc);
 			}
 		}
 
@@ -678,40 +761,62 @@ class TimeSchemeBase : public TimeScheme
 		// information is already known by each specific time scheme.
 		// Along the same line, we did not save information about the number of
 		// lines, rods and so on
+		auto unpack = [this, &ptr](auto m) {
+			for (unsigned int k = 0; k < m.size(); k++)
+				ptr = io::IO::Deserialize(ptr, m.data()[k]);
+		};
+		auto unpack_list = [this, &ptr, &unpack](auto m) {
+			uint64_t n;
+			ptr = io::IO::Deserialize(ptr, n);
+			if (n != (uint64_t)m.cols()) {
+				LOGERR << "Expected " << m.cols() << " line nodes, but " << n
+				       << " were unpacked" << endl;
+				throw moordyn::invalid_value_error("Invalid input size");
+			}
+			unpack(m);
+		};
 		for (unsigned int substep = 0; substep < NSTATE; substep++) {
 			for (unsigned int i = 0; i < bodies.size(); i++) {
-				ptr = io::IO::Deserialize(ptr, r[substep].bodies[i].pos);
-				ptr = io::IO::Deserialize(ptr, r[substep].bodies[i].vel);
+				auto state = r[substep].body(i);
+				unpack(state.pos);
+				unpack(state.vel);
 			}
 			for (unsigned int i = 0; i < rods.size(); i++) {
-				ptr = io::IO::Deserialize(ptr, r[substep].rods[i].pos);
-				ptr = io::IO::Deserialize(ptr, r[substep].rods[i].vel);
+				auto state = r[substep].rod(i);
+				unpack(state.pos);
+				unpack(state.vel);
 			}
 			for (unsigned int i = 0; i < points.size(); i++) {
-				ptr = io::IO::Deserialize(ptr, r[substep].points[i].pos);
-				ptr = io::IO::Deserialize(ptr, r[substep].points[i].vel);
+				auto state = r[substep].point(i);
+				unpack(state.pos);
+				unpack(state.vel);
 			}
 			for (unsigned int i = 0; i < lines.size(); i++) {
-				ptr = io::IO::Deserialize(ptr, r[substep].lines[i].pos);
-				ptr = io::IO::Deserialize(ptr, r[substep].lines[i].vel);
+				auto state = r[substep].line(i);
+				unpack_list(state.pos);
+				unpack_list(state.vel);
 			}
 		}
 		for (unsigned int substep = 0; substep < NDERIV; substep++) {
 			for (unsigned int i = 0; i < bodies.size(); i++) {
-				ptr = io::IO::Deserialize(ptr, rd[substep].bodies[i].vel);
-				ptr = io::IO::Deserialize(ptr, rd[substep].bodies[i].acc);
+				auto dstate = rd[substep].body(i);
+				unpack(dstate.vel);
+				unpack(dstate.acc);
 			}
 			for (unsigned int i = 0; i < rods.size(); i++) {
-				ptr = io::IO::Deserialize(ptr, rd[substep].rods[i].vel);
-				ptr = io::IO::Deserialize(ptr, rd[substep].rods[i].acc);
+				auto dstate = rd[substep].rod(i);
+				unpack(dstate.vel);
+				unpack(dstate.acc);
 			}
 			for (unsigned int i = 0; i < points.size(); i++) {
-				ptr = io::IO::Deserialize(ptr, rd[substep].points[i].vel);
-				ptr = io::IO::Deserialize(ptr, rd[substep].points[i].acc);
+				auto dstate = rd[substep].point(i);
+				unpack(dstate.vel);
+				unpack(dstate.acc);
 			}
 			for (unsigned int i = 0; i < lines.size(); i++) {
-				ptr = io::IO::Deserialize(ptr, rd[substep].lines[i].vel);
-				ptr = io::IO::Deserialize(ptr, rd[substep].lines[i].acc);
+				auto dstate = rd[substep].line(i);
+				unpack_list(dstate.vel);
+				unpack_list(dstate.acc);
 			}
 		}
 
@@ -816,7 +921,7 @@ class StationaryScheme : public TimeSchemeBase<2, 1>
 	inline unsigned int NStates() const {
 		unsigned int n = bodies.size() + rods.size() + points.size();
 		for (unsigned int i = 0; i < lines.size(); i++)
-			n += r[0].lines[i].pos.size();
+			n += r[0].LineNodes(i);
 		return n;
 	}
 
@@ -1043,6 +1148,409 @@ class RK4Scheme : public TimeSchemeBase<5, 4>
 	virtual void Step(real& dt);
 };
 
+/** @brief Butcher tableau of the Bogacki-Shampine 3(2) embedded pair
+ *
+ * The last stage is evaluated on the 3rd order solution, so it can be
+ * reused as the first stage of the next time step (FSAL)
+ */
+struct BogackiShampineTableau
+{
+	/// Name of the scheme
+	static constexpr const char* name = "Bogacki-Shampine 3(2)";
+	/// Number of stages
+	static constexpr unsigned int stages = 4;
+	/// Order of the error estimation
+	static constexpr unsigned int order = 2;
+	/// Stages times
+	static constexpr real c[stages] = { 0.0, 0.5, 0.75, 1.0 };
+	/// Stages coefficients, i.e. the lower triangular Runge-Kutta matrix
+	static constexpr real a[stages][stages] = {
+		{ 0.0, 0.0, 0.0, 0.0 },
+		{ 0.5, 0.0, 0.0, 0.0 },
+		{ 0.0, 0.75, 0.0, 0.0 },
+		{ 2.0 / 9.0, 1.0 / 3.0, 4.0 / 9.0, 0.0 },
+	};
+	/// Difference between the weights of both solutions
+	static constexpr real e[stages] = { 2.0 / 9.0 - 7.0 / 24.0,
+		                                1.0 / 3.0 - 0.25,
+		                                4.0 / 9.0 - 1.0 / 3.0,
+		                                -0.125 };
+};
+
+/** @brief Butcher tableau of the Dormand-Prince 5(4) embedded pair
+ *
+ * The last stage is evaluated on the 5th order solution, so it can be
+ * reused as the first stage of the next time step (FSAL)
+ */
+struct DormandPrinceTableau
+{
+	/// Name of the scheme
+	static constexpr const char* name = "Dormand-Prince 5(4)";
+	/// Number of stages
+	static constexpr unsigned int stages = 7;
+	/// Order of the error estimation
+	static constexpr unsigned int order = 4;
+	/// Stages times
+	static constexpr real c[stages] = { 0.0,       0.2, 0.3, 0.8,
+		                                8.0 / 9.0, 1.0, 1.0 };
+	/// Stages coefficients, i.e. the lower triangular Runge-Kutta matrix
+	static constexpr real a[stages][stages] = {
+		{ 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0 },
+		{ 0.2, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0 },
+		{ 3.0 / 40.0, 9.0 / 40.0, 0.0, 0.0, 0.0, 0.0, 0.0 },
+		{ 44.0 / 45.0, -56.0 / 15.0, 32.0 / 9.0, 0.0, 0.0, 0.0, 0.0 },
+		{ 19372.0 / 6561.0,
+		  -25360.0 / 2187.0,
+		  64448.0 / 6561.0,
+		  -212.0 / 729.0,
+		  0.0,
+		  0.0,
+		  0.0 },
+		{ 9017.0 / 3168.0,
+		  -355.0 / 33.0,
+		  46732.0 / 5247.0,
+		  49.0 / 176.0,
+		  -5103.0 / 18656.0,
+		  0.0,
+		  0.0 },
+		{ 35.0 / 384.0,
+		  0.0,
+		  500.0 / 1113.0,
+		  125.0 / 192.0,
+		  -2187.0 / 6784.0,
+		  11.0 / 84.0,
+		  0.0 },
+	};
+	/// Difference between the weights of both solutions
+	static constexpr real e[stages] = { 35.0 / 384.0 - 5179.0 / 57600.0,
+		                                0.0,
+		                                500.0 / 1113.0 - 7571.0 / 16695.0,
+		                                125.0 / 192.0 - 393.0 / 640.0,
+		                                -2187.0 / 6784.0 + 92097.0 / 339200.0,
+		                                11.0 / 84.0 - 187.0 / 2100.0,
+		                                -1.0 / 40.0 };
+};
+
+/** @class EmbeddedRKScheme Time.hpp
+ * @brief Adaptive time step embedded Runge-Kutta schemes collection
+ *
+ * The difference between the solutions of two orders, computed with the same
+ * stages, is used to estimate the error of each time step. Time steps with
+ * errors above the tolerances are rejected and retried with a smaller time
+ * step, while the time step is increased if the error is small enough.
+ *
+ * The error is measured with the maximum norm over the whole state, so a
+ * localized snap load is not hidden by the rest of the system. Each state
+ * variable is scaled by @f$ atol + rtol \max(\vert y_0 \vert, \vert y_1
+ * \vert) @f$, see TimeScheme::SetRTol() and TimeScheme::SetATol().
+ *
+ * The time step provided to EmbeddedRKScheme::Step() is the maximum one,
+ * i.e. it is already limited by the CFL condition and the coupling time
+ * step, and it is overwritten with the time step actually taken
+ */
+template<class Tableau>
+class EmbeddedRKScheme : public TimeSchemeBase<2, Tableau::stages>
+{
+  public:
+	/** @brief Constructor
+	 * @param log Logging handler
+	 * @param waves Waves instance
+	 */
+	EmbeddedRKScheme(moordyn::Log* log, WavesRef waves);
+
+	/// @brief Destructor
+	~EmbeddedRKScheme() {}
+
+	/** @brief Run a time step
+	 *
+	 * This function is the one that must be specialized on each time scheme
+	 * @param dt Maximum time step, overwritten with the one actually taken
+	 */
+	virtual void Step(real& dt);
+
+	/** @brief Get the proposed time step for the next step
+	 * @return The time step, 0 if no time step has been taken yet
+	 */
+	inline real GetNextDt() const { return _dt_next; }
+
+	/** @brief Get the number of rejected time steps so far
+	 * @return The number of rejected time steps
+	 */
+	inline unsigned int GetRejections() const { return _rejections; }
+
+	/** @brief Resume the simulation from the stationary solution
+	 * @param state The stationary solution
+	 * @param i The index of the state variable to take
+	 */
+	inline virtual void SetState(const MoorDynState& state, unsigned int i = 0)
+	{
+		TimeSchemeBase<2, Tableau::stages>::SetState(state, i);
+		_fsal = false;
+	}
+
+	/** @brief Produce the packed data to be saved
+	 *
+	 * The produced data can be used afterwards to restore the saved information
+	 * afterwards calling Deserialize(void).
+	 * @return The packed data
+	 */
+	virtual std::vector<uint64_t> Serialize(void)
+	{
+		std::vector<uint64_t> data =
+		    TimeSchemeBase<2, Tableau::stages>::Serialize();
+		// We append the proposed time step
+		data.push_back(io::IO::Serialize(_dt_next));
+
+		return data;
+	}
+
+	/** @brief Unpack the data to restore the Serialized information
+	 *
+	 * This is the function that each inherited class must implement, and should
+	 * be the inverse of Serialize(void)
+	 * @param data The packed data
+	 * @return A pointer to the end of the file, for debugging purposes
+	 */
+	virtual uint64_t* Deserialize(const uint64_t* data)
+	{
+		uint64_t* ptr = TimeSchemeBase<2, Tableau::stages>::Deserialize(data);
+		ptr = io::IO::Deserialize(ptr, _dt_next);
+		_fsal = false;
+
+		return ptr;
+	}
+
+  private:
+	/** @brief Compute the scaled error of the time step
+	 *
+	 * The error estimation is computed from the stages derivatives, while the
+	 * original and the new states are expected on the first and second
+	 * states respectively
+	 * @param dt Time step
+	 * @return The scaled error, which shall be smaller than 1 to accept the
+	 * time step
+	 */
+	real Error(real dt);
+
+	/// The proposed time step for the next step, 0 before the first one
+	real _dt_next;
+
+	/// true if the first stage derivative is the last one of the former step
+	bool _fsal;
+
+	/// Number of rejected time steps
+	unsigned int _rejections;
+
+	/// The error estimation
+	Eigen::VectorXr _err;
+};
+
+/** @class MultirateRKScheme Time.hpp
+ * @brief Multirate Runge-Kutta time schemes collection
+ *
+ * Each line, rod and body is integrated with its own time step, which is the
+ * time step provided to MultirateRKScheme::Step() times a power of two, as
+ * large as the CFL factor allows, see TimeScheme::SetCFL(). Thus a short and
+ * stiff line does not force every other line to take its tiny time step. The
+ * points are always integrated with the base time step.
+ *
+ * Each instance is integrated with either the 2nd order midpoint or the
+ * classic 4th order Runge-Kutta scheme on its own time step, evaluating its
+ * stages as soon as the base time steps reach them. Meanwhile, the forces
+ * that the lines exert on their end points are linearly extrapolated in time
+ * from their latest evaluations. Higher order extrapolations are unstable,
+ * as happens with the Adams-Bashforth schemes, so the coupling is 2nd order
+ * in both cases. The rods and bodies are never slower than the lines
+ * attached to them, so they are always ready when a line is computed, and the
+ * rods attached to a body share its time step.
+ *
+ * The time steps are computed on initialization. If the time step provided to
+ * MultirateRKScheme::Step() eventually changes, e.g. to fit the coupling time
+ * step, the integration is still consistent, but the 4th order one degrades
+ * locally
+ */
+template<unsigned int order>
+class MultirateRKScheme : public TimeSchemeBase<2, order>
+{
+  public:
+	/** @brief Constructor
+	 * @param log Logging handler
+	 * @param waves Waves instance
+	 */
+	MultirateRKScheme(moordyn::Log* log, WavesRef waves);
+
+	/// @brief Destructor
+	~MultirateRKScheme() {}
+
+	/** @brief Create an initial state for all the entities
+	 * @note Just the first state is written. None of the following states, nor
+	 * the derivatives are initialized in any way.
+	 * @note It is assumed that the coupled entities were already initialized
+	 */
+	inline void Init()
+	{
+		TimeSchemeBase<2, order>::Init();
+		ComputeRates();
+	}
+
+	/** @brief Resume the simulation from the stationary solution
+	 * @param state The stationary solution
+	 * @param i The index of the state variable to take
+	 */
+	inline void SetState(const MoorDynState& state, unsigned int i = 0)
+	{
+		TimeSchemeBase<2, order>::SetState(state, i);
+		ComputeRates();
+	}
+
+	/** @brief Run a time step
+	 *
+	 * This function is the one that must be specialized on each time scheme
+	 * @param dt Time step
+	 */
+	virtual void Step(real& dt);
+
+	/** @brief Get the rate level of a line
+	 *
+	 * The line is integrated with a time step 2 to the power of the level
+	 * times the base one
+	 * @param i The index of the line
+	 * @return The rate level
+	 */
+	inline unsigned int GetLineLevel(unsigned int i) const
+	{
+		return _rates.lines[i].level;
+	}
+
+	/** @brief Produce the packed data to be saved
+	 *
+	 * The produced data can be used afterwards to restore the saved information
+	 * afterwards calling Deserialize(void).
+	 * @return The packed data
+	 */
+	virtual std::vector<uint64_t> Serialize(void);
+
+	/** @brief Unpack the data to restore the Serialized information
+	 *
+	 * This is the function that each inherited class must implement, and should
+	 * be the inverse of Serialize(void)
+	 * @param data The packed data
+	 * @return A pointer to the end of the file, for debugging purposes
+	 */
+	virtual uint64_t* Deserialize(const uint64_t* data);
+
+  private:
+	/** @brief The integration status of an instance
+	 */
+	typedef struct _rate
+	{
+		/// The instance time step is 2^level times the base one
+		unsigned int level;
+		/// Number of base half time steps since the instance step started
+		unsigned int count;
+		/// Time since the instance step started
+		real elapsed;
+		/// Time between the instance step start and its midpoint stage
+		real mid;
+	} rate;
+
+	/** @brief The integration status of all the instances
+	 */
+	typedef struct _rates
+	{
+		/// The lines status
+		std::vector<rate> lines;
+		/// The points status
+		std::vector<rate> points;
+		/// The rods status
+		std::vector<rate> rods;
+		/// The bodies status
+		std::vector<rate> bodies;
+	} rates;
+
+	/** @brief The latest forces at the line ends, to extrapolate them
+	 *
+	 * Each column packs the forces and moments at both ends, see
+	 * Line::getEndForces(). The newest sample is the first one
+	 */
+	typedef struct _history
+	{
+		/// The sampled forces
+		Eigen::Matrix<real, 12, 2> f;
+		/// The sampling times
+		vec2 t;
+		/// The number of available samples
+		unsigned int n;
+	} history;
+
+	/** @brief Compute the rate level of each instance
+	 *
+	 * This can be done since we know the TimeScheme::cfl factor
+	 */
+	void ComputeRates();
+
+	/** @brief Run a function on each instance
+	 * @param f The function, which receives the instance status, its mask
+	 * and a function to get its block on a state or a state derivative
+	 */
+	template<typename F>
+	inline void ForEach(F f)
+	{
+		for (unsigned int i = 0; i < this->lines.size(); i++)
+			f(_rates.lines[i], this->_calc_mask.lines[i], [i](FlatState& s) {
+				return s.LineValues(i);
+			});
+		for (unsigned int i = 0; i < this->points.size(); i++)
+			f(_rates.points[i], this->_calc_mask.points[i], [i](FlatState& s) {
+				return s.PointValues(i);
+			});
+		for (unsigned int i = 0; i < this->rods.size(); i++)
+			f(_rates.rods[i], this->_calc_mask.rods[i], [i](FlatState& s) {
+				return s.RodValues(i);
+			});
+		for (unsigned int i = 0; i < this->bodies.size(); i++)
+			f(_rates.bodies[i], this->_calc_mask.bodies[i], [i](FlatState& s) {
+				return s.BodyValues(i);
+			});
+	}
+
+	/** @brief Set the calculation mask
+	 * @param stage 0 to mask the instances starting their own time step, 1 to
+	 * mask the ones at its midpoint and 2 to mask the ones finishing it
+	 * @return true if any instance is masked, false otherwise
+	 */
+	bool SetCalcMask(unsigned int stage);
+
+	/** @brief Compute the derivatives of the masked instances
+	 *
+	 * The states are taken from the second state variable. The forces of the
+	 * lines not computed yet at this time are extrapolated
+	 * @param t_local The local time, within the inner time step
+	 * @param substep The index within moordyn::TimeSchemeBase::rd where the
+	 * info will be saved
+	 */
+	void Evaluate(real t_local, unsigned int substep);
+
+	/** @brief Evaluate the masked instances stages at a time instant
+	 * @param t_local The local time, within the inner time step
+	 */
+	void Stages(real t_local);
+
+	/** @brief Advance the clock of all the instances
+	 * @param dt Half of the base time step
+	 */
+	void Advance(real dt);
+
+	/// The integration status of each instance
+	rates _rates;
+
+	/// The latest forces at the ends of each line
+	std::vector<history> _history;
+
+	/// The lines already computed at the current time instant
+	std::vector<bool> _fresh;
+};
+
 /** @class ABScheme Time.hpp
  * @brief Adam-Bashforth time schemes collection
  *
@@ -1118,30 +1626,30 @@ class ABScheme : public LocalTimeSchemeBase<1, 5>
 		for (unsigned int i = 0; i < lines.size(); i++) {
 			if (!_calc_mask.lines[i])
 				continue;
-			rd[dst].lines[i].vel = rd[org].lines[i].vel;
-			rd[dst].lines[i].acc = rd[org].lines[i].acc;
+			rd[dst].line(i).vel = rd[org].line(i).vel;
+			rd[dst].line(i).acc = rd[org].line(i).acc;
 		}
 
 		for (unsigned int i = 0; i < points.size(); i++) {
 			if (!_calc_mask.points[i] && (points[i]->type == Point::FREE))
 				continue;
-			rd[dst].points[i].vel = rd[org].points[i].vel;
-			rd[dst].points[i].acc = rd[org].points[i].acc;
+			rd[dst].point(i).vel = rd[org].point(i).vel;
+			rd[dst].point(i).acc = rd[org].point(i).acc;
 		}
 
 		for (unsigned int i = 0; i < rods.size(); i++) {
 			if (!_calc_mask.rods[i] && ((rods[i]->type != Rod::FREE) ||
 			                            (rods[i]->type != Rod::PINNED)))
 				continue;
-			rd[dst].rods[i].vel = rd[org].rods[i].vel;
-			rd[dst].rods[i].acc = rd[org].rods[i].acc;
+			rd[dst].rod(i).vel = rd[org].rod(i).vel;
+			rd[dst].rod(i).acc = rd[org].rod(i).acc;
 		}
 
 		for (unsigned int i = 0; i < bodies.size(); i++) {
 			if (!_calc_mask.bodies[i] && (bodies[i]->type == Body::FREE))
 				continue;
-			rd[dst].bodies[i].vel = rd[org].bodies[i].vel;
-			rd[dst].bodies[i].acc = rd[org].bodies[i].acc;
+			rd[dst].body(i).vel = rd[org].body(i).vel;
+			rd[dst].body(i).acc = rd[org].body(i).acc;
 		}
 	}
 
@@ -1340,7 +1848,7 @@ class AndersonSchemeBase : public ImplicitSchemeBase<NSTATE, NDERIV>
 	inline unsigned int ndof() const {
 		unsigned int n = 3 * this->points.size() + 6 * (this->bodies.size() + this->rods.size());
 		for (unsigned int i = 0; i < this->lines.size(); i++)
-			n += 3 * this->rd[0].lines[i].acc.size();
+			n += 3 * this->rd[0].LineNodes(i);
 		return n;
 	}
 
@@ -1353,31 +1861,33 @@ class AndersonSchemeBase : public ImplicitSchemeBase<NSTATE, NDERIV>
 	{
 		unsigned int i, j, n = 0;
 		for (i = 0; i < this->lines.size(); i++) {
-			for (j = 0; j < this->rd[org].lines[i].acc.size(); j++) {
-				const vec x = this->rd[org].lines[i].acc[j];
-				const vec fx = this->rd[dst].lines[i].acc[j];
+			const auto xs = this->rd[org].line(i).acc;
+			const auto fxs = this->rd[dst].line(i).acc;
+			for (j = 0; j < xs.cols(); j++) {
+				const vec x = xs.col(j);
+				const vec fx = fxs.col(j);
 				_x(Eigen::seqN(n, 3), 1) = x;
 				_g(Eigen::seqN(n, 3), 1) = fx - x;
 				n += 3;
 			}
 		}
 		for (i = 0; i < this->points.size(); i++) {
-			const vec x = this->rd[org].points[i].acc;
-			const vec fx = this->rd[dst].points[i].acc;
+			const vec x = this->rd[org].point(i).acc;
+			const vec fx = this->rd[dst].point(i).acc;
 			_x(Eigen::seqN(n, 3), 1) = x;
 			_g(Eigen::seqN(n, 3), 1) = fx - x;
 			n += 3;
 		}
 		for (i = 0; i < this->rods.size(); i++) {
-			const vec6 x = this->rd[org].rods[i].acc;
-			const vec6 fx = this->rd[dst].rods[i].acc;
+			const vec6 x = this->rd[org].rod(i).acc;
+			const vec6 fx = this->rd[dst].rod(i).acc;
 			_x(Eigen::seqN(n, 6), 1) = x;
 			_g(Eigen::seqN(n, 6), 1) = fx - x;
 			n += 6;
 		}
 		for (i = 0; i < this->bodies.size(); i++) {
-			const vec6 x = this->rd[org].bodies[i].acc;
-			const vec6 fx = this->rd[dst].bodies[i].acc;
+			const vec6 x = this->rd[org].body(i).acc;
+			const vec6 fx = this->rd[dst].body(i).acc;
 			_x(Eigen::seqN(n, 6), 1) = x;
 			_g(Eigen::seqN(n, 6), 1) = fx - x;
 			n += 6;
@@ -1542,6 +2052,480 @@ class ImplicitWilsonScheme : public ImplicitSchemeBase<2, 3>
 	real _theta;
 };
 
+/** @class GMRES Time.hpp
+ * @brief Right preconditioned GMRES linear solver, without restarting
+ *
+ * The matrix-vector product and the preconditioner are provided as
+ * functions, so the Jacobian-free Newton-Krylov solvers can compute the
+ * products by finite differences. All the storage is allocated by
+ * GMRES::Resize(), so solving is not allocating memory
+ */
+class GMRES
+{
+  public:
+	/** @brief Allocate the storage
+	 * @param n The number of unknowns
+	 * @param m The maximum number of Krylov iterations
+	 */
+	inline void Resize(unsigned int n, unsigned int m)
+	{
+		_w.setZero(n);
+		_V.setZero(n, m + 1);
+		_H.setZero(m + 1, m);
+		_cs.setZero(m);
+		_sn.setZero(m);
+		_g.setZero(m + 1);
+		_y.setZero(m);
+	}
+
+	/** @brief Get the number of unknowns
+	 * @return The number of unknowns
+	 */
+	inline unsigned int rows() const { return _V.rows(); }
+
+	/** @brief Solve the linear system
+	 * @param b The right hand side
+	 * @param x The solution. It is also the storage of the vectors passed to
+	 * @p product and @p precond, so it shall not be aliased with @p b
+	 * @param product Function computing the matrix-vector product of @p x,
+	 * with the signature void product(Eigen::VectorXr& w), where w is the
+	 * output
+	 * @param precond Function applying the preconditioner on @p x in place,
+	 * with the signature void precond()
+	 * @param rtol The residue reduction to consider that the solution has
+	 * converged
+	 * @return The number of Krylov iterations
+	 */
+	template<typename Product, typename Precond>
+	unsigned int Solve(const Eigen::VectorXr& b,
+	                   Eigen::VectorXr& x,
+	                   Product product,
+	                   Precond precond,
+	                   real rtol)
+	{
+		const unsigned int m = _H.cols();
+		const real beta = b.norm();
+		x.setZero();
+		if (beta == 0.0)
+			return 0;
+		_V.col(0) = b / beta;
+		_g.setZero();
+		_g(0) = beta;
+		unsigned int k = 0;
+		while (k < m) {
+			x = _V.col(k);
+			precond();
+			product(_w);
+			// Modified Gram-Schmidt
+			for (unsigned int j = 0; j <= k; j++) {
+				_H(j, k) = _w.dot(_V.col(j));
+				_w -= _H(j, k) * _V.col(j);
+			}
+			_H(k + 1, k) = _w.norm();
+			if (_H(k + 1, k) > 0.0)
+				_V.col(k + 1) = _w / _H(k + 1, k);
+			// Givens rotations
+			for (unsigned int j = 0; j < k; j++) {
+				const real hj = _H(j, k), hj1 = _H(j + 1, k);
+				_H(j, k) = _cs(j) * hj + _sn(j) * hj1;
+				_H(j + 1, k) = -_sn(j) * hj + _cs(j) * hj1;
+			}
+			const real a = _H(k, k), c = _H(k + 1, k);
+			const real d = sqrt(a * a + c * c);
+			_cs(k) = d > 0.0 ? a / d : 1.0;
+			_sn(k) = d > 0.0 ? c / d : 0.0;
+			_H(k, k) = d;
+			_H(k + 1, k) = 0.0;
+			_g(k + 1) = -_sn(k) * _g(k);
+			_g(k) = _cs(k) * _g(k);
+			k++;
+			if ((std::abs(_g(k)) < rtol * beta) || (c == 0.0))
+				break;
+		}
+
+		// Solve the upper triangular system and compute the solution
+		for (int j = k - 1; j >= 0; j--) {
+			real s = _g(j);
+			for (unsigned int l = j + 1; l < k; l++)
+				s -= _H(j, l) * _y(l);
+			_y(j) = _H(j, j) != 0.0 ? s / _H(j, j) : 0.0;
+		}
+		x.setZero();
+		for (unsigned int j = 0; j < k; j++)
+			x += _y(j) * _V.col(j);
+		precond();
+		return k;
+	}
+
+  private:
+	/// The matrix-vector product
+	Eigen::VectorXr _w;
+
+	/// The Krylov subspace basis
+	Eigen::MatrixXr _V;
+
+	/// The Hessenberg matrix
+	Eigen::MatrixXr _H;
+
+	/// The Givens rotations cosines
+	Eigen::VectorXr _cs;
+
+	/// The Givens rotations sines
+	Eigen::VectorXr _sn;
+
+	/// The residual vector on the Krylov subspace
+	Eigen::VectorXr _g;
+
+	/// The solution on the Krylov subspace
+	Eigen::VectorXr _y;
+};
+
+/** @class NewtonKrylovScheme Time.hpp
+ * @brief Backward Euler scheme solved with a Newton-Krylov method
+ *
+ * The fixed point iterations carried out by the other implicit schemes only
+ * converge if the time step is small enough to resolve the stiffest dynamics,
+ * which can be quite restrictive on stiff lines, like the polyester ones.
+ * This scheme solves instead the backward Euler nonlinear system with the
+ * Newton method, where each linear system is solved with GMRES using
+ * finite differences to compute the Jacobian-vector products.
+ *
+ * Since the nodes of a line are just coupled with their neighbours, the
+ * Jacobian of each line is block tridiagonal. Such Jacobians are computed
+ * with coloured finite differences on moordyn::Line::getStateDeriv() and
+ * solved with a direct block tridiagonal method, which is used as the GMRES
+ * preconditioner. Thus the Krylov iterations are just taking care of the
+ * coupling between the lines and the rest of entities
+ */
+class NewtonKrylovScheme : public ImplicitSchemeBase<3, 2>
+{
+  public:
+	/** @brief Constructor
+	 * @param log Logging handler
+	 * @param waves Waves instance
+	 * @param iters The maximum number of Newton iterations
+	 * @param krylov The maximum number of Krylov iterations on each Newton
+	 * iteration
+	 * @param tol Maximum residue to consider that the solution has converged
+	 */
+	NewtonKrylovScheme(moordyn::Log* log,
+	                   WavesRef waves,
+	                   unsigned int iters = 10,
+	                   unsigned int krylov = 20,
+	                   real tol = 1.e-6);
+
+	/// @brief Destructor
+	~NewtonKrylovScheme() {}
+
+	/** @brief Run a time step
+	 *
+	 * This function is the one that must be specialized on each time scheme
+	 * @param dt Time step
+	 */
+	virtual void Step(real& dt);
+
+	/** @brief Get the number of Newton iterations carried out on the last
+	 * time step
+	 * @return The number of Newton iterations
+	 */
+	inline unsigned int GetNewtonIters() const { return _newton_iters; }
+
+	/** @brief Get the number of Krylov iterations carried out on the last
+	 * time step, summing up all the Newton iterations
+	 * @return The number of Krylov iterations
+	 */
+	inline unsigned int GetKrylovIters() const { return _krylov_iters; }
+
+	/** @brief Get the residual tolerance
+	 * @return The tolerance
+	 */
+	inline real tol() const { return _tol; }
+
+	/** @brief Set the residual tolerance
+	 *
+	 * When the maximum residue of the backward Euler system falls below this
+	 * value the Newton iterations are stopped
+	 * @param t The tolerance
+	 */
+	inline void tol(const real t) { _tol = t; }
+
+  private:
+	/** @brief The block tridiagonal Jacobian of a line
+	 *
+	 * The blocks are stored as 3x3 matrices, one after the other. The lower
+	 * block of a node is the one coupling it with the previous node, and the
+	 * upper block is the one coupling it with the next node
+	 */
+	typedef struct _line_jacobian
+	{
+		/// The lower blocks of the acceleration derivative w.r.t. positions
+		Eigen::Matrix3Xr jr_l;
+		/// The diagonal blocks of the acceleration derivative w.r.t. positions
+		Eigen::Matrix3Xr jr_d;
+		/// The upper blocks of the acceleration derivative w.r.t. positions
+		Eigen::Matrix3Xr jr_u;
+		/// The lower blocks of the velocities system matrix
+		Eigen::Matrix3Xr a_l;
+		/// The inverse of the factorized diagonal blocks of the velocities
+		/// system matrix
+		Eigen::Matrix3Xr a_dinv;
+		/// The upper blocks of the velocities system matrix
+		Eigen::Matrix3Xr a_u;
+		/// The unperturbed accelerations, also used as a scratch storage
+		Eigen::Matrix3Xr acc;
+	} line_jacobian;
+
+	/// The maximum number of Krylov iterations
+	unsigned int _krylov;
+
+	/// Maximum residue to consider that the solution has converged
+	real _tol;
+
+	/// The number of Newton iterations on the last time step
+	unsigned int _newton_iters;
+
+	/// The number of Krylov iterations on the last time step
+	unsigned int _krylov_iters;
+
+	/// The lines Jacobians
+	std::vector<line_jacobian> _jacobians;
+
+	/// The residue of the backward Euler system
+	MoorDynState _res;
+
+	/// The preconditioned vector, also used to return the Newton correction
+	MoorDynState _z;
+
+	/// The linear solver
+	GMRES _gmres;
+
+	/// Whether the entities shall be updated twice before computing the
+	/// derivatives
+	bool _twice;
+
+	/** @brief Allocate the storage, if the entities have changed
+	 */
+	void Allocate();
+
+	/** @brief Set a state and compute its derivative
+	 *
+	 * The zero-length rods are computing their orientation from the attached
+	 * lines before these are updated. In such a case the entities are updated
+	 * twice, so the derivative is just a function of the state, as required
+	 * by the Newton method
+	 * @param h The time step
+	 * @param org The index within TimeSchemeBase::r of the state
+	 * @param dst The index within TimeSchemeBase::rd where the derivative
+	 * shall be saved
+	 */
+	void Evaluate(real h, unsigned int org, unsigned int dst);
+
+	/** @brief Compute the Jacobian of a line by finite differences, and
+	 * factorize it
+	 *
+	 * The nodes are coloured, so the nodes sharing a colour do not affect the
+	 * derivatives of the same nodes, and they can be perturbed at once
+	 * @param i The line index
+	 * @param h The time step
+	 * @note The line state is taken from TimeSchemeBase::r[2], which is
+	 * restored afterwards, while TimeSchemeBase::rd[1] is used as a scratch
+	 * storage
+	 */
+	void LineJacobian(unsigned int i, real h);
+
+	/** @brief Apply the preconditioner, i.e. the lines block tridiagonal
+	 * Jacobians inverse, on NewtonKrylovScheme::_z
+	 * @param h The time step
+	 */
+	void Precondition(real h);
+
+	/** @brief Compute the Jacobian-vector product of the backward Euler
+	 * system on NewtonKrylovScheme::_z
+	 *
+	 * The product is computed by finite differences around the state
+	 * TimeSchemeBase::r[1], whose derivative shall be already computed on
+	 * TimeSchemeBase::rd[0]
+	 * @param h The time step
+	 * @param w The output product
+	 */
+	void JacobianProduct(real h, Eigen::VectorXr& w);
+
+	/** @brief Solve the Newton correction with preconditioned GMRES
+	 *
+	 * The residue is taken from NewtonKrylovScheme::_res, while the
+	 * correction is stored on NewtonKrylovScheme::_z
+	 * @param h The time step
+	 * @return The number of Krylov iterations
+	 */
+	unsigned int Krylov(real h);
+};
+
+/** @class StaticNewtonScheme Time.hpp
+ * @brief Static equilibrium solved with the Newton method
+ *
+ * This is not actually a time scheme, but a solver for the initial
+ * condition. Each step is a Newton iteration on the accelerations of the free
+ * entities, with null velocities, with respect to their positions. The
+ * linear systems are solved with GMRES, preconditioned with the block
+ * tridiagonal Jacobians of the lines, as in NewtonKrylovScheme, and the
+ * Jacobians of the points, rods and bodies alone. The Newton correction is
+ * afterwards relaxed with a backtracking line search, so the residue never
+ * grows.
+ *
+ * The slack segments have no stiffness at all, so the Jacobian might be
+ * singular. To deal with that, the Jacobian is shifted in the
+ * Levenberg-Marquardt way, with a damping that is increased when the full
+ * Newton correction cannot be applied, and decreased otherwise
+ */
+class StaticNewtonScheme : public TimeSchemeBase<3, 2>
+{
+  public:
+	/** @brief Constructor
+	 * @param log Logging handler
+	 * @param waves Waves instance
+	 * @param krylov The maximum number of Krylov iterations on each Newton
+	 * iteration
+	 */
+	StaticNewtonScheme(moordyn::Log* log,
+	                   WavesRef waves,
+	                   unsigned int krylov = 50);
+
+	/// @brief Destructor
+	~StaticNewtonScheme() {}
+
+	/** @brief Create an initial state for all the entities, with null
+	 * velocities, and compute its residue
+	 */
+	void Init();
+
+	/** @brief Run a Newton iteration
+	 * @param dt Time step, which is just added to the solver time
+	 */
+	void Step(real& dt);
+
+	/** @brief Get the residue, i.e. the norm of the accelerations of the
+	 * free entities
+	 * @return The residue
+	 */
+	inline real Error() const { return _error; }
+
+	/** @brief Get the line search step of the last Newton iteration
+	 * @return The fraction of the Newton correction applied, 0 if the line
+	 * search failed to reduce the residue
+	 */
+	inline real Alpha() const { return _alpha; }
+
+	/** @brief Get the number of Krylov iterations of the last Newton
+	 * iteration
+	 * @return The number of Krylov iterations
+	 */
+	inline unsigned int GetKrylovIters() const { return _krylov_iters; }
+
+	/** @brief Get the Levenberg-Marquardt damping to be applied on the next
+	 * Newton iteration
+	 * @return The damping
+	 */
+	inline real Damping() const { return _mu; }
+
+  private:
+	/// The blocks of the lines Jacobians
+	typedef struct _line_jacobian
+	{
+		/// The lower blocks
+		Eigen::Matrix3Xr jl;
+		/// The inverse of the factorized diagonal blocks
+		Eigen::Matrix3Xr jdinv;
+		/// The upper blocks
+		Eigen::Matrix3Xr ju;
+		/// The unperturbed accelerations, also used as a scratch storage
+		Eigen::Matrix3Xr acc;
+		/// The largest diagonal block coefficient
+		real scale;
+	} line_jacobian;
+
+	/// The maximum number of Krylov iterations
+	unsigned int _krylov;
+
+	/// The residue
+	real _error;
+
+	/// The line search step of the last Newton iteration
+	real _alpha;
+
+	/// The number of Krylov iterations of the last Newton iteration
+	unsigned int _krylov_iters;
+
+	/// The Levenberg-Marquardt damping
+	real _mu;
+
+	/// The largest diagonal coefficient of the Jacobians, used to scale the
+	/// damping
+	real _scale;
+
+	/// The lines Jacobians
+	std::vector<line_jacobian> _jacobians;
+
+	/// The inverse of the points Jacobians
+	std::vector<mat> _points_jinv;
+
+	/// The inverse of the rods Jacobians
+	std::vector<mat6> _rods_jinv;
+
+	/// The inverse of the bodies Jacobians
+	std::vector<mat6> _bodies_jinv;
+
+	/// The displacements, stored on the accelerations fields
+	DMoorDynStateDt _z;
+
+	/// The Newton correction right hand side, i.e. minus the residue
+	Eigen::VectorXr _b;
+
+	/// The linear solver
+	GMRES _gmres;
+
+	/// Whether the entities shall be updated twice before computing the
+	/// derivatives
+	bool _twice;
+
+	/** @brief Allocate the storage, if the entities have changed
+	 */
+	void Allocate();
+
+	/** @brief Set a state and compute its residue
+	 * @param org The index within TimeSchemeBase::r of the state
+	 * @param dst The index within TimeSchemeBase::rd where the residue shall
+	 * be saved
+	 * @return The residue norm
+	 */
+	real Evaluate(unsigned int org, unsigned int dst);
+
+	/** @brief Displace a state
+	 * @param org The index within TimeSchemeBase::r of the state
+	 * @param dst The index within TimeSchemeBase::r where the displaced
+	 * state shall be saved
+	 * @param f The factor applied to the displacements, taken from
+	 * StaticNewtonScheme::_z
+	 */
+	void Displace(unsigned int org, unsigned int dst, real f);
+
+	/** @brief Compute the damped Jacobians used as preconditioner
+	 *
+	 * The residue of TimeSchemeBase::r[0] shall be already computed on
+	 * TimeSchemeBase::rd[0]
+	 */
+	void Jacobians();
+
+	/** @brief Apply the preconditioner on StaticNewtonScheme::_z
+	 */
+	void Precondition();
+
+	/** @brief Compute the damped Jacobian-vector product on
+	 * StaticNewtonScheme::_z
+	 * @param w The output product
+	 */
+	void JacobianProduct(Eigen::VectorXr& w);
+};
+
 /** @brief Create a time scheme
  * @param name The time scheme name, one of the following:
  * "Euler", "Heun", "RK2", "RK4", "AB3", "AB4"
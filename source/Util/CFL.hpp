@@ -262,6 +262,10 @@ class SuperCFL : public CFL
 		                _children.end());
 	}
 
+	/** @brief Remove all the children
+	 */
+	inline void ClearChildren() { _children.clear(); }
+
   private:
 	/// List of children
 	std::vector<CFL*> _children;
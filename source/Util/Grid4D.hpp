@@ -0,0 +1,269 @@
+#pragma once
+
+#include <cstddef>
+#include <vector>
+
+namespace moordyn {
+/** \addtogroup interpolation
+ *  @{
+ */
+
+/** @brief 4-D data grid stored in a single contiguous buffer
+ *
+ * The data is sorted like a nested std::vector of 4 dimensions, i.e. the
+ * last index is the fastest one, so the time series of each grid point are
+ * contiguous. The items are addressed with strides, instead of chasing a
+ * pointer per dimension.
+ *
+ * 3-D grids are stored with a single point in the third dimension.
+ *
+ * The buffer might be either owned by the grid or provided externally, e.g.
+ * a memory mapped file
+ */
+template<class T>
+class Grid4D
+{
+  public:
+	/** @brief Constructor of an empty grid
+	 */
+	Grid4D()
+	  : ni(0)
+	  , nj(0)
+	  , nk(0)
+	  , nl(0)
+	  , ext(nullptr)
+	{
+	}
+
+	/** @brief Constructor
+	 * @param ni Number of components in the first dimension
+	 * @param nj Number of components in the second dimension
+	 * @param nk Number of components in the third dimension
+	 * @param nl Number of components in the fourth dimension
+	 * @param value Initial value of all the components
+	 */
+	Grid4D(unsigned int ni,
+	       unsigned int nj,
+	       unsigned int nk,
+	       unsigned int nl,
+	       const T& value)
+	  : ni(ni)
+	  , nj(nj)
+	  , nk(nk)
+	  , nl(nl)
+	  , ext(nullptr)
+	  , values((std::size_t)ni * nj * nk * nl, value)
+	{
+	}
+
+	/** @brief Constructor of a view on an external buffer
+	 *
+	 * The buffer is not copied, so it shall outlive the grid
+	 * @param ni Number of components in the first dimension
+	 * @param nj Number of components in the second dimension
+	 * @param nk Number of components in the third dimension
+	 * @param nl Number of components in the fourth dimension
+	 * @param buffer The components
+	 */
+	Grid4D(unsigned int ni,
+	       unsigned int nj,
+	       unsigned int nk,
+	       unsigned int nl,
+	       T* buffer)
+	  : ni(ni)
+	  , nj(nj)
+	  , nk(nk)
+	  , nl(nl)
+	  , ext(buffer)
+	{
+	}
+
+	/** @brief Access a component
+	 * @param i The index in the first dimension
+	 * @param j The index in the second dimension
+	 * @param k The index in the third dimension
+	 * @param l The index in the fourth dimension
+	 * @return The component
+	 */
+	inline T& operator()(unsigned int i,
+	                     unsigned int j,
+	                     unsigned int k,
+	                     unsigned int l)
+	{
+		return data()[index(i, j, k, l)];
+	}
+
+	/** @brief Access a component
+	 * @param i The index in the first dimension
+	 * @param j The index in the second dimension
+	 * @param k The index in the third dimension
+	 * @param l The index in the fourth dimension
+	 * @return The component
+	 */
+	inline const T& operator()(unsigned int i,
+	                           unsigned int j,
+	                           unsigned int k,
+	                           unsigned int l) const
+	{
+		return data()[index(i, j, k, l)];
+	}
+
+	/** @brief Get the underlying buffer
+	 * @return The buffer
+	 */
+	inline T* data() { return ext ? ext : values.data(); }
+
+	/** @brief Get the underlying buffer
+	 * @return The buffer
+	 */
+	inline const T* data() const { return ext ? ext : values.data(); }
+
+	/** @brief Get the total number of components
+	 * @return The number of components
+	 */
+	inline std::size_t size() const
+	{
+		return (std::size_t)ni * nj * nk * nl;
+	}
+
+	/** @brief Get the memory used to store the components
+	 * @return The number of bytes
+	 */
+	inline std::size_t bytes() const { return size() * sizeof(T); }
+
+	/** @brief Quadrilinear filter
+	 *
+	 * Equivalent to interp4() on a nested std::vector
+	 * @param i The upper bound index in the first dimension
+	 * @param j The upper bound index in the second dimension
+	 * @param k The upper bound index in the third dimension
+	 * @param l The upper bound index in the fourth dimension
+	 * @param fi The linear interplation factor in the first dimension
+	 * @param fj The linear interplation factor in the second dimension
+	 * @param fk The linear interplation factor in the third dimension
+	 * @param fl The linear interplation factor in the fourth dimension
+	 * @return The linearly interpolated value
+	 * @see interp_factor
+	 */
+	template<typename R>
+	inline T interp(unsigned int i,
+	                unsigned int j,
+	                unsigned int k,
+	                unsigned int l,
+	                R fi,
+	                R fj,
+	                R fk,
+	                R fl) const
+	{
+		const unsigned int i0 = i > 0 ? i - 1 : 0;
+		const unsigned int j0 = j > 0 ? j - 1 : 0;
+		const unsigned int k0 = k > 0 ? k - 1 : 0;
+		const unsigned int l0 = l > 0 ? l - 1 : 0;
+
+		// Time series of the 8 spatial corners
+		const std::size_t si = std::size_t(nj) * nk * nl, sj = nk * nl;
+		const T* v = data();
+		const T* v000 = v + i0 * si + j0 * sj + k0 * nl;
+		const T* v001 = v + i0 * si + j0 * sj + k * nl;
+		const T* v010 = v + i0 * si + j * sj + k0 * nl;
+		const T* v011 = v + i0 * si + j * sj + k * nl;
+		const T* v100 = v + i * si + j0 * sj + k0 * nl;
+		const T* v101 = v + i * si + j0 * sj + k * nl;
+		const T* v110 = v + i * si + j * sj + k0 * nl;
+		const T* v111 = v + i * si + j * sj + k * nl;
+
+		T c000 = v000[l0] * (1. - fl) + v000[l] * fl;
+		T c001 = v001[l0] * (1. - fl) + v001[l] * fl;
+		T c010 = v010[l0] * (1. - fl) + v010[l] * fl;
+		T c011 = v011[l0] * (1. - fl) + v011[l] * fl;
+		T c100 = v100[l0] * (1. - fl) + v100[l] * fl;
+		T c101 = v101[l0] * (1. - fl) + v101[l] * fl;
+		T c110 = v110[l0] * (1. - fl) + v110[l] * fl;
+		T c111 = v111[l0] * (1. - fl) + v111[l] * fl;
+
+		T c00 = c000 * (1. - fi) + c100 * fi;
+		T c01 = c001 * (1. - fi) + c101 * fi;
+		T c10 = c010 * (1. - fi) + c110 * fi;
+		T c11 = c011 * (1. - fi) + c111 * fi;
+
+		T c0 = c00 * (1. - fj) + c10 * fj;
+		T c1 = c01 * (1. - fj) + c11 * fj;
+
+		return c0 * (1 - fk) + c1 * fk;
+	}
+
+	/** @brief Trilinear filter on a grid with a single point in the third
+	 * dimension
+	 *
+	 * Equivalent to interp3() on a nested std::vector
+	 * @param i The upper bound index in the first dimension
+	 * @param j The upper bound index in the second dimension
+	 * @param l The upper bound index in the fourth dimension
+	 * @param fi The linear interplation factor in the first dimension
+	 * @param fj The linear interplation factor in the second dimension
+	 * @param fl The linear interplation factor in the fourth dimension
+	 * @return The linearly interpolated value
+	 * @see interp_factor
+	 */
+	template<typename R>
+	inline T interp(unsigned int i,
+	                unsigned int j,
+	                unsigned int l,
+	                R fi,
+	                R fj,
+	                R fl) const
+	{
+		const unsigned int i0 = i > 0 ? i - 1 : 0;
+		const unsigned int j0 = j > 0 ? j - 1 : 0;
+		const unsigned int l0 = l > 0 ? l - 1 : 0;
+
+		const T* v00 = data() + index(i0, j0, 0, 0);
+		const T* v01 = data() + index(i0, j, 0, 0);
+		const T* v10 = data() + index(i, j0, 0, 0);
+		const T* v11 = data() + index(i, j, 0, 0);
+
+		T c00 = v00[l0] * (1. - fi) + v10[l0] * fi;
+		T c01 = v00[l] * (1. - fi) + v10[l] * fi;
+		T c10 = v01[l0] * (1. - fi) + v11[l0] * fi;
+		T c11 = v01[l] * (1. - fi) + v11[l] * fi;
+
+		T c0 = c00 * (1. - fj) + c10 * fj;
+		T c1 = c01 * (1. - fj) + c11 * fj;
+
+		return c0 * (1 - fl) + c1 * fl;
+	}
+
+  private:
+	/** @brief Get the position of a component on the buffer
+	 * @param i The index in the first dimension
+	 * @param j The index in the second dimension
+	 * @param k The index in the third dimension
+	 * @param l The index in the fourth dimension
+	 * @return The position on the buffer
+	 */
+	inline std::size_t index(unsigned int i,
+	                         unsigned int j,
+	                         unsigned int k,
+	                         unsigned int l) const
+	{
+		return ((std::size_t(i) * nj + j) * nk + k) * nl + l;
+	}
+
+	/// Number of components in the first dimension
+	unsigned int ni;
+	/// Number of components in the second dimension
+	unsigned int nj;
+	/// Number of components in the third dimension
+	unsigned int nk;
+	/// Number of components in the fourth dimension
+	unsigned int nl;
+	/// The external buffer, nullptr if the components are owned
+	T* ext;
+	/// The owned components
+	std::vector<T> values;
+};
+
+/**
+ * @}
+ */
+}
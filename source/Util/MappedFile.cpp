@@ -0,0 +1,95 @@
+#include "MappedFile.hpp"
+#include "../Misc.hpp"
+
+#ifdef _WIN32
+#ifndef NOMINMAX
+#define NOMINMAX
+#endif
+#include <windows.h>
+#else
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
+
+namespace moordyn {
+
+#ifdef _WIN32
+
+MappedFile::MappedFile(const std::string& path)
+  : addr(nullptr)
+  , length(0)
+  , file(INVALID_HANDLE_VALUE)
+  , mapping(nullptr)
+{
+	file = CreateFileA(path.c_str(),
+	                   GENERIC_READ,
+	                   FILE_SHARE_READ,
+	                   NULL,
+	                   OPEN_EXISTING,
+	                   FILE_ATTRIBUTE_NORMAL,
+	                   NULL);
+	if (file == INVALID_HANDLE_VALUE)
+		throw moordyn::input_file_error(
+		    ("Cannot open the file '" + path + "'").c_str());
+	LARGE_INTEGER fsize;
+	if (!GetFileSizeEx(file, &fsize) || !fsize.QuadPart) {
+		CloseHandle(file);
+		throw moordyn::input_file_error(
+		    ("Cannot map the empty file '" + path + "'").c_str());
+	}
+	length = (std::size_t)fsize.QuadPart;
+	mapping = CreateFileMappingA(file, NULL, PAGE_WRITECOPY, 0, 0, NULL);
+	if (mapping)
+		addr = MapViewOfFile(mapping, FILE_MAP_COPY, 0, 0, 0);
+	if (!addr) {
+		if (mapping)
+			CloseHandle(mapping);
+		CloseHandle(file);
+		throw moordyn::input_file_error(
+		    ("Cannot map the file '" + path + "'").c_str());
+	}
+}
+
+MappedFile::~MappedFile()
+{
+	UnmapViewOfFile(addr);
+	CloseHandle(mapping);
+	CloseHandle(file);
+}
+
+#else
+
+MappedFile::MappedFile(const std::string& path)
+  : addr(nullptr)
+  , length(0)
+{
+	const int fd = open(path.c_str(), O_RDONLY);
+	if (fd < 0)
+		throw moordyn::input_file_error(
+		    ("Cannot open the file '" + path + "'").c_str());
+	struct stat st;
+	if ((fstat(fd, &st) != 0) || !st.st_size) {
+		close(fd);
+		throw moordyn::input_file_error(
+		    ("Cannot map the empty file '" + path + "'").c_str());
+	}
+	length = (std::size_t)st.st_size;
+	// A private mapping can be written, without modifying the file
+	addr = mmap(NULL, length, PROT_READ | PROT_WRITE, MAP_PRIVATE, fd, 0);
+	// The mapping keeps its own reference to the file
+	close(fd);
+	if (addr == MAP_FAILED)
+		throw moordyn::input_file_error(
+		    ("Cannot map the file '" + path + "'").c_str());
+}
+
+MappedFile::~MappedFile()
+{
+	munmap(addr, length);
+}
+
+#endif
+
+} // ::moordyn
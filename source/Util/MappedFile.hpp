@@ -0,0 +1,60 @@
+#pragma once
+
+#include <cstddef>
+#include <string>
+
+namespace moordyn {
+
+/** @class MappedFile MappedFile.hpp
+ * @brief A file mapped on memory
+ *
+ * The pages are loaded lazily by the operating system the first time they
+ * are accessed, and shared with the page cache. The mapping is private, i.e.
+ * the contents can be modified in memory (copy on write) but the changes are
+ * never written back to the file
+ */
+class MappedFile
+{
+  public:
+	/** @brief Map a file
+	 * @param path The file path
+	 * @throws moordyn::input_file_error If the file cannot be mapped
+	 */
+	MappedFile(const std::string& path);
+
+	/** @brief Destructor, which unmaps the file
+	 */
+	~MappedFile();
+
+	MappedFile(const MappedFile&) = delete;
+	MappedFile& operator=(const MappedFile&) = delete;
+
+	/** @brief Get the mapped contents
+	 * @return The first byte of the file
+	 */
+	inline char* data() { return static_cast<char*>(addr); }
+
+	/** @brief Get the mapped contents
+	 * @return The first byte of the file
+	 */
+	inline const char* data() const { return static_cast<const char*>(addr); }
+
+	/** @brief Get the file size
+	 * @return The number of bytes
+	 */
+	inline std::size_t size() const { return length; }
+
+  private:
+	/// The mapped contents
+	void* addr;
+	/// The number of mapped bytes
+	std::size_t length;
+#ifdef _WIN32
+	/// The file handle
+	void* file;
+	/// The file mapping handle
+	void* mapping;
+#endif
+};
+
+} // ::moordyn
@@ -0,0 +1,214 @@
+/*
+ * Copyright (c) 2023, Jose Luis Cercos-Pita & Matt Hall
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice,
+ *    this list of conditions and the following disclaimer.
+ *
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions and the following disclaimer in the documentation
+ *    and/or other materials provided with the distribution.
+ *
+ * 3. Neither the name of the copyright holder nor the names of its
+ *    contributors may be used to endorse or promote products derived from
+ *    this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+
+/** @file ThreadPool.hpp
+ * A minimal pool of persistent threads
+ */
+
+#pragma once
+
+#include <algorithm>
+#include <condition_variable>
+#include <exception>
+#include <functional>
+#include <mutex>
+#include <numeric>
+#include <thread>
+#include <vector>
+
+namespace moordyn {
+
+/** @class ThreadPool ThreadPool.hpp
+ * @brief A pool of persistent threads to run the same job on all of them
+ *
+ * The threads are kept alive between jobs, so the pool can be used on each
+ * time substep without paying the threads creation cost. The calling thread
+ * is also working, as the thread 0, so a pool of size 1 does not spawn any
+ * thread at all
+ */
+class ThreadPool
+{
+  public:
+	/** @brief Constructor
+	 * @param n The number of threads, including the calling one
+	 */
+	ThreadPool(unsigned int n)
+	  : _n((std::max)(n, 1u))
+	  , _generation(0)
+	  , _pending(0)
+	  , _stop(false)
+	  , _errors(_n)
+	{
+		for (unsigned int i = 1; i < _n; i++)
+			_threads.emplace_back(&ThreadPool::worker, this, i);
+	}
+
+	/** @brief Destructor
+	 */
+	~ThreadPool()
+	{
+		{
+			std::lock_guard<std::mutex> lock(_mutex);
+			_stop = true;
+		}
+		_start.notify_all();
+		for (auto& thread : _threads)
+			thread.join();
+	}
+
+	/** @brief Get the number of threads, including the calling one
+	 * @return The number of threads
+	 */
+	inline unsigned int size() const { return _n; }
+
+	/** @brief Run a job on all the threads, waiting for all of them to finish
+	 * @param job The job, which receives the thread index, from 0 to size()
+	 * @throws The exception raised by the job in the thread with the lowest
+	 * index, if any
+	 */
+	void run(const std::function<void(unsigned int)>& job)
+	{
+		{
+			std::lock_guard<std::mutex> lock(_mutex);
+			_job = &job;
+			_pending = _n - 1;
+			_generation++;
+		}
+		_start.notify_all();
+		execute(0);
+		{
+			std::unique_lock<std::mutex> lock(_mutex);
+			_done.wait(lock, [this] { return _pending == 0; });
+			_job = nullptr;
+		}
+		for (auto& err : _errors) {
+			if (err) {
+				std::exception_ptr e = err;
+				std::fill(_errors.begin(), _errors.end(), nullptr);
+				std::rethrow_exception(e);
+			}
+		}
+	}
+
+	/** @brief Split a set of weighted tasks among the threads
+	 *
+	 * The tasks are sorted by weight and each one is assigned to the least
+	 * loaded thread (longest processing time first). The partition only
+	 * depends on the weights, so it is deterministic. Within each thread the
+	 * tasks are sorted by index
+	 * @param weights The weight of each task
+	 * @param n The number of threads
+	 * @return The list of task indexes for each thread
+	 */
+	static std::vector<std::vector<unsigned int>> partition(
+	    const std::vector<unsigned int>& weights,
+	    unsigned int n)
+	{
+		n = (std::max)(n, 1u);
+		std::vector<unsigned int> order(weights.size());
+		std::iota(order.begin(), order.end(), 0);
+		std::stable_sort(
+		    order.begin(), order.end(), [&weights](unsigned int a, unsigned int b) {
+			    return weights[a] > weights[b];
+		    });
+		std::vector<std::vector<unsigned int>> buckets(n);
+		std::vector<unsigned long> loads(n, 0);
+		for (auto i : order) {
+			const auto j = std::distance(
+			    loads.begin(), std::min_element(loads.begin(), loads.end()));
+			buckets[j].push_back(i);
+			loads[j] += weights[i];
+		}
+		for (auto& bucket : buckets)
+			std::sort(bucket.begin(), bucket.end());
+		return buckets;
+	}
+
+  private:
+	/** @brief Run the current job, storing the exception if any
+	 * @param i The thread index
+	 */
+	inline void execute(unsigned int i)
+	{
+		try {
+			(*_job)(i);
+		} catch (...) {
+			_errors[i] = std::current_exception();
+		}
+	}
+
+	/** @brief The loop of the spawned threads
+	 * @param i The thread index
+	 */
+	void worker(unsigned int i)
+	{
+		unsigned long generation = 0;
+		while (true) {
+			{
+				std::unique_lock<std::mutex> lock(_mutex);
+				_start.wait(lock, [this, generation] {
+					return _stop || (_generation != generation);
+				});
+				if (_stop)
+					return;
+				generation = _generation;
+			}
+			execute(i);
+			{
+				std::lock_guard<std::mutex> lock(_mutex);
+				_pending--;
+			}
+			_done.notify_one();
+		}
+	}
+
+	/// Number of threads, including the calling one
+	unsigned int _n;
+	/// The spawned threads
+	std::vector<std::thread> _threads;
+	/// The job being executed
+	const std::function<void(unsigned int)>* _job = nullptr;
+	/// Job counter, to wake up the threads
+	unsigned long _generation;
+	/// Number of spawned threads still working on the current job
+	unsigned int _pending;
+	/// Flag to stop the threads
+	bool _stop;
+	/// The exceptions raised by each thread on the current job
+	std::vector<std::exception_ptr> _errors;
+	/// Mutex to protect the shared data
+	std::mutex _mutex;
+	/// Condition to start a new job
+	std::condition_variable _start;
+	/// Condition to notify that a thread has finished the job
+	std::condition_variable _done;
+};
+
+} // ::moordyn
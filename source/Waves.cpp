@@ -34,7 +34,10 @@
 #include "Seafloor.hpp"
 #include "Waves/WaveGrid.hpp"
 #include "Util/Interp.hpp"
+#include <exception>
 #include <filesystem>
+#include <system_error>
+#include <thread>
 
 #if defined WIN32 && defined max
 // We must avoid max messes up with std::numeric_limits<>::max()
@@ -112,12 +115,32 @@ WaveGrid::allocateKinematicArrays()
 		throw moordyn::invalid_value_error("Uninitialized values");
 	}
 
-	zetas = init3DArray(nx, ny, nt);
-	pDyn = init4DArray(nx, ny, nz, nt);
-	wave_vel = init4DArrayVec(nx, ny, nz, nt);
-	wave_acc = init4DArrayVec(nx, ny, nz, nt);
+	zetas = Grid4D<real>(nx, ny, 1, nt, 0.0);
+	pDyn = Grid4D<real>(nx, ny, nz, nt, 0.0);
+	wave_vel = Grid4D<vec3>(nx, ny, nz, nt, vec3::Zero());
+	wave_acc = Grid4D<vec3>(nx, ny, nz, nt, vec3::Zero());
 
-	LOGDBG << "Allocated the waves data grid";
+	LOGDBG << "Allocated the waves data grid (" << bytes() << " bytes)"
+	       << endl;
+}
+
+void
+WaveGrid::mapKinematicArrays(std::shared_ptr<MappedFile> file, real* data)
+{
+	static_assert(sizeof(vec3) == 3 * sizeof(real),
+	              "vec3 shall be stored as 3 consecutive reals");
+	const std::size_t n = (std::size_t)nx * ny * nz * nt;
+	zetas = Grid4D<real>(nx, ny, 1, nt, data);
+	data += (std::size_t)nx * ny * nt;
+	pDyn = Grid4D<real>(nx, ny, nz, nt, data);
+	data += n;
+	wave_vel = Grid4D<vec3>(nx, ny, nz, nt, reinterpret_cast<vec3*>(data));
+	data += 3 * n;
+	wave_acc = Grid4D<vec3>(nx, ny, nz, nt, reinterpret_cast<vec3*>(data));
+	mapping = file;
+
+	LOGDBG << "Mapped the waves data grid (" << bytes() << " bytes)"
+	       << endl;
 }
 
 void
@@ -131,22 +154,14 @@ WaveGrid::getWaveKin(const vec3& pos,
 {
 	real fx, fy, fz;
 
-	auto ix = interp_factor(px, pos.x(), fx);
-	auto iy = interp_factor(py, pos.y(), fy);
+	auto ix = axisFactor(0, pos.x(), fx);
+	auto iy = axisFactor(1, pos.y(), fy);
 
-	unsigned int it = 0;
-	real ft = 0.0;
-	if (nt > 1) {
-		real quot = time / dtWave;
-		it = floor(quot);
-		ft = quot - it;
-		it++; // We use the upper bound
-		while (it > nt - 1)
-			it -= nt;
-	}
+	real ft;
+	const auto it = timeFactor(time, ft);
 
 	// wave elevation
-	auto wave_elev = interp3(zetas, ix, iy, it, fx, fy, ft);
+	auto wave_elev = zetas.interp(ix, iy, it, fx, fy, ft);
 
 	if (zeta) {
 		*zeta = wave_elev;
@@ -169,16 +184,16 @@ WaveGrid::getWaveKin(const vec3& pos,
 	}
 	// LOGMSG << "WaveGrid::getWaveKin - stretched_z = " << stretched_z << endl;
 
-	auto iz = interp_factor(pz, stretched_z, fz);
+	auto iz = axisFactor(2, stretched_z, fz);
 
 	if (vel) {
-		*vel = interp4Vec(wave_vel, ix, iy, iz, it, fx, fy, fz, ft);
+		*vel = wave_vel.interp(ix, iy, iz, it, fx, fy, fz, ft);
 	}
 	if (acc) {
-		*acc = interp4Vec(wave_acc, ix, iy, iz, it, fx, fy, fz, ft);
+		*acc = wave_acc.interp(ix, iy, iz, it, fx, fy, fz, ft);
 	}
 	if (pdyn) {
-		*pdyn = interp4(pDyn, ix, iy, iz, it, fx, fy, fz, ft);
+		*pdyn = pDyn.interp(ix, iy, iz, it, fx, fy, fz, ft);
 	}
 }
 
@@ -194,10 +209,26 @@ CurrentGrid::allocateKinematicArrays()
 		throw moordyn::invalid_value_error("Uninitialized values");
 	}
 
-	current_vel = init4DArrayVec(nx, ny, nz, nt);
-	current_acc = init4DArrayVec(nx, ny, nz, nt);
+	current_vel = Grid4D<vec3>(nx, ny, nz, nt, vec3::Zero());
+	current_acc = Grid4D<vec3>(nx, ny, nz, nt, vec3::Zero());
+
+	LOGDBG << "Allocated the current data grid (" << bytes() << " bytes)"
+	       << endl;
+}
 
-	LOGDBG << "Allocated the current data grid";
+void
+CurrentGrid::mapKinematicArrays(std::shared_ptr<MappedFile> file, real* data)
+{
+	static_assert(sizeof(vec3) == 3 * sizeof(real),
+	              "vec3 shall be stored as 3 consecutive reals");
+	const std::size_t n = (std::size_t)nx * ny * nz * nt;
+	current_vel = Grid4D<vec3>(nx, ny, nz, nt, reinterpret_cast<vec3*>(data));
+	data += 3 * n;
+	current_acc = Grid4D<vec3>(nx, ny, nz, nt, reinterpret_cast<vec3*>(data));
+	mapping = file;
+
+	LOGDBG << "Mapped the current data grid (" << bytes() << " bytes)"
+	       << endl;
 }
 
 void
@@ -209,19 +240,11 @@ CurrentGrid::getCurrentKin(const vec3& pos,
 {
 	real fx, fy, fz;
 
-	auto ix = interp_factor(px, pos.x(), fx);
-	auto iy = interp_factor(py, pos.y(), fy);
+	auto ix = axisFactor(0, pos.x(), fx);
+	auto iy = axisFactor(1, pos.y(), fy);
 
-	unsigned int it = 0;
-	real ft = 0.0;
-	if (nt > 1) {
-		real quot = time / dtWave;
-		it = floor(quot);
-		ft = quot - it;
-		it++; // We use the upper bound
-		while (it > nt - 1)
-			it -= nt;
-	}
+	real ft;
+	const auto it = timeFactor(time, ft);
 
 	// real stretched_z = 0.0;
 	// const real bottom = seafloor.getDepth(vec2(pos.x(), pos.y()));
@@ -234,13 +257,13 @@ CurrentGrid::getCurrentKin(const vec3& pos,
 	// LOGMSG << "WaveGrid::getWaveKin - stretched_z = " << stretched_z << endl;
 
 	// TODO - current stretching?
-	auto iz = interp_factor(pz, pos.z(), fz);
+	auto iz = axisFactor(2, pos.z(), fz);
 
 	if (vel) {
-		*vel = interp4Vec(current_vel, ix, iy, iz, it, fx, fy, fz, ft);
+		*vel = current_vel.interp(ix, iy, iz, it, fx, fy, fz, ft);
 	}
 	if (acc) {
-		*acc = interp4Vec(current_acc, ix, iy, iz, it, fx, fy, fz, ft);
+		*acc = current_acc.interp(ix, iy, iz, it, fx, fy, fz, ft);
 	}
 }
 
@@ -257,18 +280,27 @@ void
 Waves::setup(EnvCondRef env_in,
              SeafloorRef seafloor,
              TimeScheme* t,
-             const char* folder)
+             const char* folder,
+             const Waves* shared)
 {
 	// make sure to reset the kinematics if setup gets called multiple times
 	// (like before dynamic relaxation and then before the main simulation)
 	waveKinematics.reset();
 	currentKinematics.reset();
+	nodesCache.reset();
 	this->env = env_in;
 	this->seafloor = seafloor;
 	rho_w = env->rho_w;
 	g = env->g;
 	_t_integrator = t;
 
+	if (shared) {
+		LOGDBG << "Sharing the waves and currents kinematics" << endl;
+		waveKinematics = shared->waveKinematics;
+		currentKinematics = shared->currentKinematics;
+		return;
+	}
+
 	// ------------------- start with wave kinematics -----------------------
 
 	// ======================== check compatibility of wave and current settings
@@ -371,22 +403,45 @@ Waves::setup(EnvCondRef env_in,
 			LOGERR << "The first shall be 0 rad/s" << endl;
 			throw moordyn::invalid_value_error("Invalid frequencies");
 		}
+		// The depth the wave components are ranked with
+		const real depth =
+		    seafloor ? -seafloor->getAverageDepth() : env->WtrDpth;
+		if (env->waterKinOptions.pruneTol > 0.0) {
+			const auto n_comps = waveSpectrum.size();
+			real err_zeta, err_u;
+			const auto n_removed =
+			    waveSpectrum.prune(env->waterKinOptions.pruneTol,
+			                       env->g,
+			                       depth,
+			                       err_zeta,
+			                       err_u);
+			const real speedup = (real)n_comps / waveSpectrum.size();
+			LOGMSG << n_removed << " of " << n_comps
+			       << " wave components were pruned, with a relative error of "
+			       << err_zeta << " on the wave elevation variance and "
+			       << err_u << " on the velocity variance. Expected "
+			       << "kinematics speed-up: " << speedup << "x" << endl;
+		}
 		SpectrumKin spectrumKin{};
 		spectrumKin.setup(waveSpectrum.getComponents(), env);
+		if (env->waterKinOptions.phaseTol > 0.0) {
+			LOGMSG << "The waves at the nodes are evaluated rotating the "
+			       << "phasors, with a phase tolerance of "
+			       << env->waterKinOptions.phaseTol << " rad" << endl;
+		}
 
 		waveKinematics =
 		    std::make_unique<SpectrumKinWrapper>(std::move(spectrumKin));
-	} else if (wave_mode == waves::WAVES_FFT_GRID) {
-		waveGrid = constructWaveGridSpectrumData((string)folder, env, _log);
-	} else if (wave_mode == waves::WAVES_GRID) {
-		// load wave elevation time series from file (similar to what's done in
-		// GenerateWaveExtnFile.py, and was previously in misc2.cpp)
-		waveGrid = constructWaveGridElevationData((string)folder, env, _log);
+	} else if (is_waves_grid(wave_mode)) {
+		// either the FFT of the wave spectrum or the wave elevation time
+		// series (similar to what's done in GenerateWaveExtnFile.py, and was
+		// previously in misc2.cpp), possibly mapped from a binary file
+		waveGrid = constructWaveGrid((string)folder, env, _log);
 	}
 
 	// Now add in current velocities (add to unsteady wave kinematics)
 	if (current_mode == CURRENTS_STEADY_GRID) {
-		auto currentGrid = constructSteadyCurrentGrid(folder, env, _log);
+		auto currentGrid = constructCurrentGrid(folder, env, _log);
 
 		// if there is an existing wave grid an we are set to unify the wave
 		// and current grids
@@ -401,8 +456,8 @@ Waves::setup(EnvCondRef env_in,
 				for (unsigned int ix = 0; ix < waveGrid->nx; ix++) {
 					for (unsigned int iy = 0; iy < waveGrid->ny; iy++) {
 						for (unsigned int it = 0; it < waveGrid->nt; it++) {
-							waveGrid->WaveVel()[ix][iy][iz][it] += curr_vel;
-							waveGrid->WaveAcc()[ix][iy][iz][it] += curr_acc;
+							waveGrid->WaveVel()(ix, iy, iz, it) += curr_vel;
+							waveGrid->WaveAcc()(ix, iy, iz, it) += curr_acc;
 						}
 					}
 				}
@@ -411,7 +466,7 @@ Waves::setup(EnvCondRef env_in,
 			currentKinematics = std::move(currentGrid);
 		}
 	} else if (current_mode == CURRENTS_DYNAMIC_GRID) {
-		auto currentGrid = constructDynamicCurrentGrid(folder, env, _log);
+		auto currentGrid = constructCurrentGrid(folder, env, _log);
 
 		if (waveGrid && env->waterKinOptions.unifyCurrentGrid) {
 			// interpolate currents on to wave existing wave grid
@@ -427,8 +482,8 @@ Waves::setup(EnvCondRef env_in,
 					                           &currentAcc);
 					for (unsigned int ix = 0; ix < waveGrid->nx; ix++) {
 						for (unsigned int iy = 0; iy < waveGrid->ny; iy++) {
-							waveGrid->WaveVel()[ix][iy][iz][it] += currentVel;
-							waveGrid->WaveVel()[ix][iy][iz][it] += currentAcc;
+							waveGrid->WaveVel()(ix, iy, iz, it) += currentVel;
+							waveGrid->WaveVel()(ix, iy, iz, it) += currentAcc;
 						}
 					}
 				}
@@ -437,7 +492,7 @@ Waves::setup(EnvCondRef env_in,
 			currentKinematics = std::move(currentGrid);
 		}
 	} else if (current_mode == CURRENTS_4D) {
-		auto currentGrid = construct4DCurrentGrid(folder, env, _log);
+		auto currentGrid = constructCurrentGrid(folder, env, _log);
 		if (waveGrid && env->waterKinOptions.unifyCurrentGrid) {
 			// interpolate read in data and add to existing grid
 			// (dtWave, px, etc are already set in the grid)
@@ -467,8 +522,8 @@ Waves::setup(EnvCondRef env_in,
 							                           floorProvider,
 							                           &currentVel,
 							                           &currentAcc);
-							waveGrid->WaveVel()[ix][iy][iz][it] += currentVel;
-							waveGrid->WaveAcc()[ix][iy][iz][it] += currentAcc;
+							waveGrid->WaveVel()(ix, iy, iz, it) += currentVel;
+							waveGrid->WaveAcc()(ix, iy, iz, it) += currentAcc;
 						}
 					}
 				}
@@ -608,6 +663,18 @@ Waves::getWaveKin(const vec3& pos,
                   vec3& acc,
                   real& pdyn,
                   Seafloor* seafloor)
+{
+	getWaveKin(pos, _t_integrator->GetTime(), zeta, vel, acc, pdyn, seafloor);
+}
+
+void
+Waves::getWaveKin(const vec3& pos,
+                  real t,
+                  real& zeta,
+                  vec3& vel,
+                  vec3& acc,
+                  real& pdyn,
+                  Seafloor* seafloor)
 {
 	if (!waveKinematics && !currentKinematics) {
 		zeta = 0;
@@ -634,7 +701,7 @@ Waves::getWaveKin(const vec3& pos,
 		real wave_zeta, wave_pdyn;
 		vec wave_vel{}, wave_acc{};
 		waveKinematics->getWaveKin(pos,
-		                           _t_integrator->GetTime(),
+		                           t,
 		                           floorProvider,
 		                           &wave_zeta,
 		                           &wave_vel,
@@ -649,7 +716,7 @@ Waves::getWaveKin(const vec3& pos,
 	if (currentKinematics) {
 		vec wave_vel{}, wave_acc{};
 		currentKinematics->getCurrentKin(
-		    pos, _t_integrator->GetTime(), floorProvider, &wave_vel, &wave_acc);
+		    pos, t, floorProvider, &wave_vel, &wave_acc);
 		vel_sum += wave_vel;
 		acc_sum += wave_acc;
 	}
@@ -659,6 +726,84 @@ Waves::getWaveKin(const vec3& pos,
 	acc = acc_sum;
 }
 
+void
+Waves::getWaveKinArray(unsigned int n,
+                       const double* pos,
+                       const double* t,
+                       double* zeta,
+                       double* vel,
+                       double* acc,
+                       double* pdyn,
+                       Seafloor* seafloor,
+                       unsigned int n_threads)
+{
+	const real t_now = _t_integrator->GetTime();
+	auto kernel = [&](unsigned int i0, unsigned int i1) {
+		real h, p;
+		vec3 u, ud;
+		for (unsigned int i = i0; i < i1; i++) {
+			vec3 r;
+			moordyn::array2vec(pos + 3 * i, r);
+			getWaveKin(r,
+			           t ? (real)t[i] : t_now,
+			           h,
+			           u,
+			           ud,
+			           p,
+			           seafloor);
+			if (zeta)
+				zeta[i] = (double)h;
+			if (vel)
+				moordyn::vec2array(u, vel + 3 * i);
+			if (acc)
+				moordyn::vec2array(ud, acc + 3 * i);
+			if (pdyn)
+				pdyn[i] = (double)p;
+		}
+	};
+
+	n_threads = std::max(1u, std::min(n_threads, n));
+	if (n_threads == 1) {
+		kernel(0, n);
+		return;
+	}
+	// The points are independent, so we can split them in contiguous chunks.
+	// The exceptions are not let escape the threads, but they are rethrown
+	// once all of them are joined
+	std::vector<std::thread> threads;
+	threads.reserve(n_threads - 1);
+	std::vector<std::exception_ptr> errors(n_threads);
+	auto job = [&](unsigned int i, unsigned int i0, unsigned int i1) {
+		try {
+			kernel(i0, i1);
+		} catch (...) {
+			errors[i] = std::current_exception();
+		}
+	};
+	const unsigned int chunk = n / n_threads, rem = n % n_threads;
+	unsigned int i0 = 0;
+	for (unsigned int i = 0; i < n_threads; i++) {
+		const unsigned int i1 = i0 + chunk + (i < rem ? 1 : 0);
+		if (i == n_threads - 1) {
+			job(i, i0, i1);
+		} else {
+			try {
+				threads.emplace_back(job, i, i0, i1);
+			} catch (const std::system_error&) {
+				// The thread cannot be launched, do the work on this one
+				job(i, i0, i1);
+			}
+		}
+		i0 = i1;
+	}
+	for (auto& thread : threads)
+		thread.join();
+	for (auto& err : errors) {
+		if (err)
+			std::rethrow_exception(err);
+	}
+}
+
 std::vector<vec3>
 Waves::getWaveKinematicsPoints()
 {
@@ -748,6 +893,30 @@ Waves::kinematicsForAllNodes(AllNodesKin& nodeKinematics, F f)
 	}
 }
 
+void
+Waves::waveKinAllNodes(const SeafloorProvider& floorProvider)
+{
+	nodesPos.clear();
+	kinematicsForAllNodes(
+	    nodeKin, [&](vec pos, vec& _U, vec& _Ud, real& _zeta, real& _pdyn) {
+		    nodesPos.push_back(pos);
+	    });
+	const unsigned int n = static_cast<unsigned int>(nodesPos.size());
+	nodesZeta.resize(n);
+	nodesU.resize(n);
+	nodesUd.resize(n);
+	nodesPdyn.resize(n);
+	waveKinematics->getWaveKinArray(n,
+	                                nodesPos.data(),
+	                                _t_integrator->GetTime(),
+	                                floorProvider,
+	                                nodesZeta.data(),
+	                                nodesU.data(),
+	                                nodesUd.data(),
+	                                nodesPdyn.data(),
+	                                nodesCache);
+}
+
 void
 Waves::updateWaves()
 {
@@ -823,38 +992,35 @@ Waves::updateWaves()
 	}
 	// if there are both waves and currents, then we calculate and sum
 	if (waveKinematics && currentKinematics) {
+		waveKinAllNodes(floorProvider);
+		unsigned int i = 0;
 		kinematicsForAllNodes(
 		    nodeKin, [&](vec pos, vec& U, vec& Ud, real& zeta, real& pdyn) {
-			    vec3 wave_U{}, wave_Ud{};
-			    waveKinematics->getWaveKin(pos,
-			                               _t_integrator->GetTime(),
-			                               floorProvider,
-			                               &zeta,
-			                               &wave_U,
-			                               &wave_Ud,
-			                               &pdyn);
 			    vec3 curr_U{}, curr_Ud{};
 			    currentKinematics->getCurrentKin(pos,
 			                                     _t_integrator->GetTime(),
 			                                     floorProvider,
 			                                     &curr_U,
 			                                     &curr_Ud);
-			    U = wave_U + curr_U;
-			    Ud = wave_Ud + curr_Ud;
+			    zeta = nodesZeta[i];
+			    pdyn = nodesPdyn[i];
+			    U = nodesU[i] + curr_U;
+			    Ud = nodesUd[i] + curr_Ud;
+			    i++;
 		    });
 		return;
 	}
 	// if there are just waves then we just do wave calculations
 	if (waveKinematics) {
+		waveKinAllNodes(floorProvider);
+		unsigned int i = 0;
 		kinematicsForAllNodes(
 		    nodeKin, [&](vec pos, vec& U, vec& Ud, real& zeta, real& pdyn) {
-			    waveKinematics->getWaveKin(pos,
-			                               _t_integrator->GetTime(),
-			                               floorProvider,
-			                               &zeta,
-			                               &U,
-			                               &Ud,
-			                               &pdyn);
+			    zeta = nodesZeta[i];
+			    pdyn = nodesPdyn[i];
+			    U = nodesU[i];
+			    Ud = nodesUd[i];
+			    i++;
 		    });
 		return;
 	}
@@ -916,6 +1082,46 @@ MoorDyn_GetWavesKin(MoorDynWaves waves,
 	return MOORDYN_SUCCESS;
 }
 
+int DECLDIR
+MoorDyn_GetWavesKinArray(MoorDynWaves waves,
+                         unsigned int n,
+                         const double* pos,
+                         const double* t,
+                         double* U,
+                         double* Ud,
+                         double* zeta,
+                         double* PDyn,
+                         MoorDynSeafloor seafloor,
+                         unsigned int n_threads)
+{
+	CHECK_WAVES(waves);
+	if (n && !pos) {
+		cerr << "Null positions array received in " << __FUNC_NAME__ << " ("
+		     << XSTR(__FILE__) << ":" << __LINE__ << ")" << endl;
+		return MOORDYN_INVALID_VALUE;
+	}
+	moordyn::error_id err = MOORDYN_SUCCESS;
+	string err_msg;
+	try {
+		((moordyn::Waves*)waves)
+		    ->getWaveKinArray(n,
+		                      pos,
+		                      t,
+		                      zeta,
+		                      U,
+		                      Ud,
+		                      PDyn,
+		                      (moordyn::Seafloor*)seafloor,
+		                      n_threads);
+	}
+	MOORDYN_CATCHER(err, err_msg);
+	if (err != MOORDYN_SUCCESS) {
+		cerr << "Error (" << err << ") at " << __FUNC_NAME__ << "():" << endl
+		     << err_msg << endl;
+	}
+	return err;
+}
+
 double DECLDIR
 WaveNumber(double Omega, double g, double h)
 {
@@ -76,6 +76,37 @@ extern "C"
 	                                double* PDyn,
 	                                MoorDynSeafloor seafloor);
 
+	/** @brief Get the velocity, acceleration, wave height and dynamic pressure
+	 * at a set of points
+	 *
+	 * The points are evaluated in a single loop, which can be split among
+	 * several threads
+	 * @param waves The Waves instance
+	 * @param n The number of points
+	 * @param pos The points coordinates, an array of 3 * \p n components
+	 * @param t The time at each point, an array of \p n components. If NULL
+	 * the current simulation time is considered for all the points
+	 * @param U The output velocities, 3 * \p n components. Not set if NULL
+	 * @param Ud The output accelerations, 3 * \p n components. Not set if NULL
+	 * @param zeta The output wave heights, \p n components. Not set if NULL
+	 * @param PDyn The output dynamic pressures, \p n components. Not set if
+	 * NULL
+	 * @param seafloor The seafloor instance, see MoorDyn_GetSeafloor()
+	 * @param n_threads The number of threads to use
+	 * @return 0 If the data is correctly set, an error code otherwise
+	 * (see @ref moordyn_errors)
+	 */
+	int DECLDIR MoorDyn_GetWavesKinArray(MoorDynWaves waves,
+	                                     unsigned int n,
+	                                     const double* pos,
+	                                     const double* t,
+	                                     double* U,
+	                                     double* Ud,
+	                                     double* zeta,
+	                                     double* PDyn,
+	                                     MoorDynSeafloor seafloor,
+	                                     unsigned int n_threads);
+
 	/** @brief Compute the wave number
 	 * @param Omega The wave angular frequency
 	 * @param g The gravity acceleration
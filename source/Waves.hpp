@@ -41,6 +41,10 @@
 #include "Body.hpp"
 #include "Rod.hpp"
 #include "Waves/SpectrumKin.hpp"
+#include "Util/Grid4D.hpp"
+#include "Util/MappedFile.hpp"
+#include "Util/Interp.hpp"
+#include <algorithm>
 #include <vector>
 
 namespace moordyn {
@@ -53,14 +57,6 @@ typedef std::shared_ptr<Seafloor> SeafloorRef;
 template<class T>
 using Vec2D = std::vector<std::vector<T>>;
 
-/// STL std::vector of 3 dimensions
-template<class T>
-using Vec3D = std::vector<std::vector<std::vector<T>>>;
-
-/// STL std::vector of 4 dimensions
-template<class T>
-using Vec4D = std::vector<std::vector<std::vector<std::vector<T>>>>;
-
 /** @brief Make a 2-D data grid
  * @param nx Number of components in the first dimension
  * @param ny Number of components in the second dimension
@@ -71,45 +67,6 @@ init2DArray(unsigned int nx, unsigned int ny)
 	return Vec2D<real>(nx, std::vector<real>(ny, 0.0));
 }
 
-/** @brief Make a 3-D data grid
- * @param nx Number of components in the first dimension
- * @param ny Number of components in the second dimension
- * @param nz Number of components in the third dimension
- */
-static inline Vec3D<real>
-init3DArray(unsigned int nx, unsigned int ny, unsigned int nz)
-{
-	return Vec3D<real>(nx, init2DArray(ny, nz));
-}
-
-/** @brief Make a 4-D data grid
- * @param nx Number of components in the first dimension
- * @param ny Number of components in the second dimension
- * @param nz Number of components in the third dimension
- * @param nw Number of components in the third dimension
- */
-static inline Vec4D<vec3>
-init4DArrayVec(unsigned int nx,
-               unsigned int ny,
-               unsigned int nz,
-               unsigned int nw)
-{
-	return Vec4D<vec3>(
-	    nx,
-	    Vec3D<vec3>(ny, Vec2D<vec3>(nz, std::vector<vec3>(nw, vec3::Zero()))));
-}
-/** @brief Make a 4-D data grid
- * @param nx Number of components in the first dimension
- * @param ny Number of components in the second dimension
- * @param nz Number of components in the third dimension
- * @param nw Number of components in the third dimension
- */
-static inline Vec4D<real>
-init4DArray(unsigned int nx, unsigned int ny, unsigned int nz, unsigned int nw)
-{
-	return Vec4D<real>(nx, init3DArray(ny, nz, nw));
-}
-
 /** @brief Helper for moordyn::AbstractCurrentKin
  */
 struct SeafloorProvider
@@ -153,6 +110,16 @@ class AbstractWaveKin
 {
   public:
 	virtual ~AbstractWaveKin(){};
+
+	/** @brief Data that a kinematics model keeps between evaluations at the
+	 * same set of positions, see getWaveKinArray()
+	 */
+	class ArrayCache
+	{
+	  public:
+		virtual ~ArrayCache() = default;
+	};
+
 	/** @brief Get the velocity, acceleration, wave height and dynamic pressure
 	 * at a specific position and time
 	 * @param pos The location
@@ -170,6 +137,44 @@ class AbstractWaveKin
 	                        vec3* vel,
 	                        vec3* acc,
 	                        real* pdyn) = 0;
+
+	/** @brief Get the velocity, acceleration, wave height and dynamic pressure
+	 * at a set of positions at the same time
+	 *
+	 * The default implementation calls getWaveKin() on each position, but
+	 * the kinematics models can evaluate all of them at once
+	 * @param n The number of positions
+	 * @param pos The locations
+	 * @param time The time
+	 * @param seafloor A SeafloorProvider used for kinematic stretching
+	 * @param zeta The output wave heights, not set if null
+	 * @param vel The output velocities, not set if null
+	 * @param acc The output accelerations, not set if null
+	 * @param pdyn The output dynamic pressures, not set if null
+	 * @param cache The data kept by the kinematics model between calls with
+	 * the same set of positions. It is owned by the caller, since the
+	 * kinematics might be shared by several systems
+	 */
+	virtual void getWaveKinArray(unsigned int n,
+	                             const vec3* pos,
+	                             real time,
+	                             const SeafloorProvider& seafloor,
+	                             real* zeta,
+	                             vec3* vel,
+	                             vec3* acc,
+	                             real* pdyn,
+	                             std::unique_ptr<ArrayCache>& cache)
+	{
+		for (unsigned int i = 0; i < n; i++) {
+			getWaveKin(pos[i],
+			           time,
+			           seafloor,
+			           zeta ? zeta + i : nullptr,
+			           vel ? vel + i : nullptr,
+			           acc ? acc + i : nullptr,
+			           pdyn ? pdyn + i : nullptr);
+		}
+	}
 };
 
 /**
@@ -217,6 +222,52 @@ class SpectrumKinWrapper : public AbstractWaveKin
 		spectrumKin.getWaveKin(
 		    pos, time, avgDepth, actualDepth, zeta, vel, acc);
 	}
+
+	/// The buffers and phasors of getWaveKinArray()
+	class SpectrumCache : public ArrayCache
+	{
+	  public:
+		/// The scratch buffers
+		waves::SpectrumKin::Scratch scratch;
+		/// The phasors at the positions
+		waves::SpectrumKin::Phasors phasors;
+		/// The seafloor depths at the positions
+		std::vector<real> depths;
+	};
+
+	void getWaveKinArray(unsigned int n,
+	                     const vec3* pos,
+	                     real time,
+	                     const SeafloorProvider& seafloor,
+	                     real* zeta,
+	                     vec3* vel,
+	                     vec3* acc,
+	                     real* pdyn,
+	                     std::unique_ptr<ArrayCache>& cache) override
+	{
+		if (pdyn) {
+			std::fill(pdyn, pdyn + n, 0.0);
+		}
+
+		auto data = dynamic_cast<SpectrumCache*>(cache.get());
+		if (!data) {
+			cache = std::make_unique<SpectrumCache>();
+			data = static_cast<SpectrumCache*>(cache.get());
+		}
+		data->depths.resize(n);
+		for (unsigned int i = 0; i < n; i++)
+			data->depths[i] = seafloor.getDepth(pos[i].head<2>());
+		spectrumKin.getWaveKin(n,
+		                       pos,
+		                       time,
+		                       seafloor.getAverageDepth(),
+		                       data->depths.data(),
+		                       zeta,
+		                       vel,
+		                       acc,
+		                       data->scratch,
+		                       &data->phasors);
+	}
 };
 /**
  * @brief A rectilinear grid with x, y, z, and t axes.
@@ -243,6 +294,9 @@ class GridXYZT
 	  , py(py)
 	  , pz(pz)
 	{
+		setupAxis(this->px, p0[0], inv_dp[0]);
+		setupAxis(this->py, p0[1], inv_dp[1]);
+		setupAxis(this->pz, p0[2], inv_dp[2]);
 	}
 	/// number of grid points in x direction
 	unsigned int nx;
@@ -255,6 +309,16 @@ class GridXYZT
 	/// time step for wave kinematics time series
 	real dtWave;
 
+	/** @brief Check whether an axis is equally spaced, so it is addressed
+	 * with index arithmetic
+	 * @param axis 0 for x, 1 for y and 2 for z
+	 * @return true if the axis is equally spaced, false otherwise
+	 */
+	inline bool isUniform(unsigned int axis) const
+	{
+		return inv_dp[axis] != 0.0;
+	}
+
   protected:
 	/// grid x coordinate arrays
 	std::vector<real> px;
@@ -262,6 +326,86 @@ class GridXYZT
 	std::vector<real> py;
 	/// grid z coordinate arrays
 	std::vector<real> pz;
+
+	/** @brief Get the upper bound index and the interpolation factor of a
+	 * point along an axis
+	 *
+	 * Equally spaced axes, like the GRID_LATTICE ones, are addressed with
+	 * index arithmetic, while the rest are scanned with interp_factor()
+	 * @param axis 0 for x, 1 for y and 2 for z
+	 * @param x The point coordinate
+	 * @param f The interpolation factor
+	 * @return The upper bound index
+	 */
+	inline unsigned int axisFactor(unsigned int axis, real x, real& f) const
+	{
+		const auto& p = axis == 0 ? px : (axis == 1 ? py : pz);
+		if (!isUniform(axis))
+			return interp_factor(p, x, f);
+		const auto n = static_cast<unsigned int>(p.size());
+		const real q = (x - p0[axis]) * inv_dp[axis];
+		if (q <= 0.0) {
+			f = 0.0;
+			return 1;
+		}
+		if (q >= n - 1) {
+			f = 1.0;
+			return n - 1;
+		}
+		const auto i = static_cast<unsigned int>(q);
+		f = q - i;
+		return i + 1;
+	}
+
+	/** @brief Get the upper bound index and the interpolation factor of a
+	 * time instant
+	 *
+	 * The time series are periodic
+	 * @param time The time instant
+	 * @param f The interpolation factor
+	 * @return The upper bound index
+	 */
+	inline unsigned int timeFactor(real time, real& f) const
+	{
+		f = 0.0;
+		if (nt <= 1)
+			return 0;
+		const real quot = time / dtWave;
+		const unsigned int it = floor(quot);
+		f = quot - it;
+		// We use the upper bound
+		return (it + 1) % nt;
+	}
+
+  private:
+	/** @brief Check if an axis is equally spaced
+	 * @param p The axis coordinates
+	 * @param start The first coordinate
+	 * @param inv_spacing The inverse of the spacing if the axis is equally
+	 * spaced, 0 otherwise
+	 */
+	static void setupAxis(const std::vector<real>& p,
+	                      real& start,
+	                      real& inv_spacing)
+	{
+		start = p.empty() ? 0.0 : p.front();
+		inv_spacing = 0.0;
+		if (p.size() < 2)
+			return;
+		const real dp = (p.back() - p.front()) / (p.size() - 1);
+		if (dp <= 0.0)
+			return;
+		for (unsigned int i = 1; i < p.size() - 1; i++) {
+			if (std::abs(p[i] - (start + i * dp)) > 1e-9 * dp)
+				return;
+		}
+		inv_spacing = 1.0 / dp;
+	}
+
+	/// First coordinate of each axis
+	real p0[3];
+	/// Inverse of the spacing of each axis, 0 if it is not equally spaced
+	real inv_dp[3];
 };
 
 /**
@@ -290,6 +434,17 @@ class WaveGrid
 
 	void allocateKinematicArrays();
 
+	/** @brief Use the kinematics stored on a memory mapped file, instead of
+	 * allocating them
+	 *
+	 * The wave elevation, dynamic pressure, velocity and acceleration arrays
+	 * are consecutively stored, with the same layout used in memory
+	 * @param file The mapped file, which is kept alive by the grid
+	 * @param data The first component of the arrays
+	 * @see waves::saveWaveGrid()
+	 */
+	void mapKinematicArrays(std::shared_ptr<MappedFile> file, real* data);
+
 	void getWaveKin(const vec3& pos,
 	                real time,
 	                const SeafloorProvider& seafloor,
@@ -298,31 +453,42 @@ class WaveGrid
 	                vec3* acc,
 	                real* pdyn) override;
 
-	inline Vec3D<real>& Zetas() { return zetas; }
-	inline const Vec3D<real>& getZetas() const { return zetas; }
+	inline Grid4D<real>& Zetas() { return zetas; }
+	inline const Grid4D<real>& getZetas() const { return zetas; }
 
-	inline Vec4D<real>& PDyn() { return pDyn; }
-	inline const Vec4D<real>& getPDyn() const { return pDyn; }
+	inline Grid4D<real>& PDyn() { return pDyn; }
+	inline const Grid4D<real>& getPDyn() const { return pDyn; }
 
-	inline Vec4D<vec3>& WaveVel() { return wave_vel; }
-	inline const Vec4D<vec3>& getWaveVel() const { return wave_vel; }
+	inline Grid4D<vec3>& WaveVel() { return wave_vel; }
+	inline const Grid4D<vec3>& getWaveVel() const { return wave_vel; }
 
-	inline Vec4D<vec3>& WaveAcc() { return wave_acc; }
-	inline const Vec4D<vec3>& getWaveAcc() const { return wave_acc; }
+	inline Grid4D<vec3>& WaveAcc() { return wave_acc; }
+	inline const Grid4D<vec3>& getWaveAcc() const { return wave_acc; }
+
+	/** @brief Get the memory used to store the kinematics
+	 * @return The number of bytes
+	 */
+	inline std::size_t bytes() const
+	{
+		return zetas.bytes() + pDyn.bytes() + wave_vel.bytes() +
+		       wave_acc.bytes();
+	}
 
 	inline const std::vector<real>& Px() const { return px; }
 	inline const std::vector<real>& Py() const { return py; }
 	inline const std::vector<real>& Pz() const { return pz; }
 
   private:
-	/// wave elevation [x,y,t]
-	Vec3D<real> zetas;
+	/// wave elevation [x, y, 1, t]
+	Grid4D<real> zetas;
 	/// dynamic pressure [x,y,z,t]
-	Vec4D<real> pDyn;
+	Grid4D<real> pDyn;
 	/// Wave velocity [x, y, z, t]
-	Vec4D<vec3> wave_vel;
+	Grid4D<vec3> wave_vel;
 	/// Wave acceleration [x, y, z, t]
-	Vec4D<vec3> wave_acc;
+	Grid4D<vec3> wave_acc;
+	/// The mapped file holding the arrays, if any
+	std::shared_ptr<MappedFile> mapping;
 };
 
 /**
@@ -351,17 +517,36 @@ class CurrentGrid
 
 	void allocateKinematicArrays();
 
+	/** @brief Use the kinematics stored on a memory mapped file, instead of
+	 * allocating them
+	 *
+	 * The velocity and acceleration arrays are consecutively stored, with the
+	 * same layout used in memory
+	 * @param file The mapped file, which is kept alive by the grid
+	 * @param data The first component of the arrays
+	 * @see waves::saveCurrentGrid()
+	 */
+	void mapKinematicArrays(std::shared_ptr<MappedFile> file, real* data);
+
 	void getCurrentKin(const vec3& pos,
 	                   real time,
 	                   const SeafloorProvider& seafloor,
 	                   vec3* vel,
 	                   vec3* acc) override;
 
-	inline Vec4D<vec3>& CurrentVel() { return current_vel; }
-	inline const Vec4D<vec3>& getCurrentVel() const { return current_vel; }
+	inline Grid4D<vec3>& CurrentVel() { return current_vel; }
+	inline const Grid4D<vec3>& getCurrentVel() const { return current_vel; }
 
-	inline Vec4D<vec3>& CurrentAcc() { return current_acc; }
-	inline const Vec4D<vec3>& getCurrentAcc() const { return current_acc; }
+	inline Grid4D<vec3>& CurrentAcc() { return current_acc; }
+	inline const Grid4D<vec3>& getCurrentAcc() const { return current_acc; }
+
+	/** @brief Get the memory used to store the kinematics
+	 * @return The number of bytes
+	 */
+	inline std::size_t bytes() const
+	{
+		return current_vel.bytes() + current_acc.bytes();
+	}
 
 	inline const std::vector<real>& Px() const { return px; }
 	inline const std::vector<real>& Py() const { return py; }
@@ -369,9 +554,11 @@ class CurrentGrid
 
   private:
 	/// Current velocity [x, y, z, t]
-	Vec4D<vec3> current_vel;
+	Grid4D<vec3> current_vel;
 	/// Current acceleration [x, y, z, t]
-	Vec4D<vec3> current_acc;
+	Grid4D<vec3> current_acc;
+	/// The mapped file holding the arrays, if any
+	std::shared_ptr<MappedFile> mapping;
 };
 
 /** @class Waves Waves.hpp
@@ -529,6 +716,52 @@ class Waves : public LogUser
 	                real& pdyn,
 	                Seafloor* seafloor = nullptr);
 
+	/**
+	 * @brief Get the wave kinematics at a point at a given time
+	 *
+	 * @param pos Point
+	 * @param t Time
+	 * @param zeta
+	 * @param vel
+	 * @param acc
+	 * @param pdyn
+	 * @param seafloor
+	 */
+	void getWaveKin(const vec3& pos,
+	                real t,
+	                real& zeta,
+	                vec3& vel,
+	                vec3& acc,
+	                real& pdyn,
+	                Seafloor* seafloor = nullptr);
+
+	/**
+	 * @brief Get the wave kinematics at a set of points
+	 *
+	 * The points are evaluated in a single loop, which is split in chunks
+	 * among \p n_threads threads
+	 *
+	 * @param n Number of points
+	 * @param pos Points, an array of 3 * n components
+	 * @param t Time at each point, an array of n components. If NULL the
+	 * current time is considered for all the points
+	 * @param zeta Output wave heights, n components. Not set if NULL
+	 * @param vel Output velocities, 3 * n components. Not set if NULL
+	 * @param acc Output accelerations, 3 * n components. Not set if NULL
+	 * @param pdyn Output dynamic pressures, n components. Not set if NULL
+	 * @param seafloor
+	 * @param n_threads Number of threads
+	 */
+	void getWaveKinArray(unsigned int n,
+	                     const double* pos,
+	                     const double* t,
+	                     double* zeta,
+	                     double* vel,
+	                     double* acc,
+	                     double* pdyn,
+	                     Seafloor* seafloor = nullptr,
+	                     unsigned int n_threads = 1);
+
   private:
 	/**
 	 * @brief Holds the water kinematics for all of the structures of a certain
@@ -606,9 +839,33 @@ class Waves : public LogUser
 	void kinematicsForAllNodes(AllNodesKin& nodeKinematics, F f);
 
 	/// The generic wave kinematics provider object
-	std::unique_ptr<AbstractWaveKin> waveKinematics{};
+	std::shared_ptr<AbstractWaveKin> waveKinematics{};
 	/// The generic current kinematics provider object
-	std::unique_ptr<AbstractCurrentKin> currentKinematics{};
+	std::shared_ptr<AbstractCurrentKin> currentKinematics{};
+
+	/// Positions of all the nodes, to evaluate the wave kinematics at once
+	std::vector<vec3> nodesPos;
+	/// Wave heights at all the nodes
+	std::vector<real> nodesZeta;
+	/// Wave velocities at all the nodes
+	std::vector<vec3> nodesU;
+	/// Wave accelerations at all the nodes
+	std::vector<vec3> nodesUd;
+	/// Wave dynamic pressures at all the nodes
+	std::vector<real> nodesPdyn;
+	/// Data kept by the wave kinematics model between evaluations at the
+	/// nodes
+	std::unique_ptr<AbstractWaveKin::ArrayCache> nodesCache;
+
+	/**
+	 * @brief Evaluate the wave kinematics at all the nodes at once
+	 *
+	 * The results are stored on ::nodesZeta, ::nodesU, ::nodesUd and
+	 * ::nodesPdyn, sorted as the nodes are traversed by
+	 * kinematicsForAllNodes()
+	 * @param floorProvider The seafloor
+	 */
+	void waveKinAllNodes(const SeafloorProvider& floorProvider);
 
 	/**
 	 * @brief A member for temporary storage of wave grids.
@@ -663,6 +920,10 @@ class Waves : public LogUser
 	 * @param env The enviromental options
 	 * @param t The time integration scheme
 	 * @param folder The root folder where the wave data can be found
+	 * @param shared Another instance whose wave and current kinematics
+	 * providers shall be shared, instead of reading and computing them again.
+	 * The providers are read-only after the setup, so they can be safely
+	 * shared among several systems with the same environmental options
 	 * @throws moordyn::input_file_error If an input file cannot be read, or if
 	 * a file is ill-formatted
 	 * @throws moordyn::invalid_value_error If invalid values are found
@@ -673,7 +934,8 @@ class Waves : public LogUser
 	void setup(EnvCondRef env,
 	           SeafloorRef seafloor,
 	           TimeScheme* t,
-	           const char* folder = "Mooring/");
+	           const char* folder = "Mooring/",
+	           const Waves* shared = nullptr);
 };
 
 // other relevant functions being thrown into this file for now (should move to
@@ -0,0 +1,266 @@
+#include "GridFile.hpp"
+#include "../Waves.hpp"
+#include "Util/MappedFile.hpp"
+#include <cstddef>
+#include <cstdint>
+#include <cstring>
+#include <filesystem>
+#include <fstream>
+#include <random>
+#include <sstream>
+
+namespace fs = std::filesystem;
+
+namespace moordyn {
+namespace waves {
+
+/// The first bytes of every grid file
+static const char GRID_FILE_MAGIC[8] = { 'M', 'D', 'G', 'R', 'I', 'D', 0, 0 };
+/// The format version
+static const uint32_t GRID_FILE_VERSION = 2;
+/// The byte order mark, to detect files written on other architectures
+static const uint32_t GRID_FILE_BOM = 0x01020304;
+/// The alignment of the kinematics arrays (bytes)
+static const std::size_t GRID_FILE_ALIGN = 64;
+
+/** @brief The header of the grid files
+ */
+struct GridFileHeader
+{
+	/// GRID_FILE_MAGIC
+	char magic[8];
+	/// GRID_FILE_VERSION
+	uint32_t version;
+	/// GRID_FILE_BOM
+	uint32_t bom;
+	/// The kind of kinematics, see grid_file_kind
+	uint32_t kind;
+	/// The size of the real numbers (bytes)
+	uint32_t real_size;
+	/// The number of points on each axis and time instants
+	uint32_t n[4];
+	/// The time step
+	double dt;
+	/// The hash of the inputs the grid was computed from
+	uint64_t key;
+};
+static_assert(sizeof(GridFileHeader) == 56, "Unexpected header padding");
+
+/** @brief Get the position of the kinematics arrays on the file
+ * @param h The header
+ * @return The offset (bytes)
+ */
+static std::size_t
+dataOffset(const GridFileHeader& h)
+{
+	const std::size_t axes = (std::size_t)h.n[0] + h.n[1] + h.n[2];
+	const std::size_t end = sizeof(GridFileHeader) + axes * h.real_size;
+	return (end + GRID_FILE_ALIGN - 1) / GRID_FILE_ALIGN * GRID_FILE_ALIGN;
+}
+
+/** @brief Get the number of reals stored on the kinematics arrays
+ * @param h The header
+ * @return The number of reals
+ */
+static std::size_t
+dataSize(const GridFileHeader& h)
+{
+	const std::size_t n2d = (std::size_t)h.n[0] * h.n[1] * h.n[3];
+	const std::size_t n3d = n2d * h.n[2];
+	if (h.kind == GRID_FILE_WAVES)
+		return n2d + n3d + 2 * 3 * n3d;
+	return 2 * 3 * n3d;
+}
+
+/** @brief Write a grid file
+ * @param path The file path
+ * @param kind The kind of kinematics
+ * @param grid The grid
+ * @param axes The x, y and z axes
+ * @param arrays The kinematics arrays, as pairs of buffer and size in bytes
+ * @param key The hash of the inputs the grid was computed from
+ * @throws moordyn::output_file_error If the file cannot be written
+ */
+static void
+saveGrid(const std::string& path,
+         grid_file_kind kind,
+         const GridXYZT& grid,
+         const std::vector<const std::vector<real>*>& axes,
+         const std::vector<std::pair<const void*, std::size_t>>& arrays,
+         uint64_t key)
+{
+	GridFileHeader h;
+	std::memcpy(h.magic, GRID_FILE_MAGIC, sizeof(h.magic));
+	h.version = GRID_FILE_VERSION;
+	h.bom = GRID_FILE_BOM;
+	h.kind = kind;
+	h.real_size = sizeof(real);
+	h.n[0] = grid.nx;
+	h.n[1] = grid.ny;
+	h.n[2] = grid.nz;
+	h.n[3] = grid.nt;
+	h.dt = grid.dtWave;
+	h.key = key;
+
+	// The file is written on a temporary file which is renamed afterwards,
+	// so other processes never map an incomplete file
+	std::stringstream tmpname;
+	tmpname << path << "." << std::hex << std::random_device()() << ".tmp";
+	const fs::path tmppath(tmpname.str());
+	{
+		std::ofstream f(tmppath, std::ios::out | std::ios::binary);
+		if (!f.is_open())
+			throw moordyn::output_file_error(
+			    ("Cannot create the file '" + tmppath.string() + "'")
+			        .c_str());
+		f.write((const char*)&h, sizeof(h));
+		for (auto axis : axes)
+			f.write((const char*)axis->data(), axis->size() * sizeof(real));
+		const std::size_t pos = sizeof(h) + (grid.nx + grid.ny + grid.nz) *
+		                                        sizeof(real);
+		const std::vector<char> padding(dataOffset(h) - pos, 0);
+		f.write(padding.data(), padding.size());
+		for (auto array : arrays)
+			f.write((const char*)array.first, array.second);
+		if (!f.good()) {
+			f.close();
+			std::error_code ec;
+			fs::remove(tmppath, ec);
+			throw moordyn::output_file_error(
+			    ("Cannot write the file '" + tmppath.string() + "'")
+			        .c_str());
+		}
+	}
+	std::error_code ec;
+	fs::rename(tmppath, path, ec);
+	if (ec) {
+		fs::remove(tmppath, ec);
+		throw moordyn::output_file_error(
+		    ("Cannot write the file '" + path + "'").c_str());
+	}
+}
+
+/** @brief Map a grid file and check its header
+ * @param path The file path
+ * @param kind The expected kind of kinematics
+ * @param h The header
+ * @param axes The axes
+ * @param key The hash of the inputs the grid shall be computed from
+ * @param _log Log pointer to allow logging from this function
+ * @return The mapped file, nullptr if the file was written by another format
+ * version or computed from different inputs
+ * @throws moordyn::input_file_error If the file cannot be mapped or it is not
+ * a valid grid file
+ */
+static std::shared_ptr<MappedFile>
+mapGrid(const std::string& path,
+        grid_file_kind kind,
+        GridFileHeader& h,
+        std::vector<real> axes[3],
+        uint64_t key,
+        moordyn::Log* _log)
+{
+	auto file = std::make_shared<MappedFile>(path);
+	const std::size_t header_v1 = offsetof(GridFileHeader, key);
+	if (file->size() < header_v1)
+		throw moordyn::input_file_error(
+		    ("The file '" + path + "' is not a grid file").c_str());
+	std::memcpy(&h, file->data(), header_v1);
+	if (std::memcmp(h.magic, GRID_FILE_MAGIC, sizeof(h.magic)))
+		throw moordyn::input_file_error(
+		    ("The file '" + path + "' is not a grid file").c_str());
+	if (h.version != GRID_FILE_VERSION) {
+		LOGMSG << "The grid file '" << path << "' has the format version "
+		       << h.version << ", while " << GRID_FILE_VERSION
+		       << " is expected" << std::endl;
+		return nullptr;
+	}
+	if (file->size() < sizeof(h))
+		throw moordyn::input_file_error(
+		    ("The grid file '" + path + "' is truncated").c_str());
+	std::memcpy(&h, file->data(), sizeof(h));
+	if ((h.bom != GRID_FILE_BOM) || (h.real_size != sizeof(real)))
+		throw moordyn::input_file_error(
+		    ("The grid file '" + path +
+		     "' was written with a different byte order or precision")
+		        .c_str());
+	if (h.kind != kind)
+		throw moordyn::input_file_error(
+		    ("The file '" + path + "' stores a different kind of grid")
+		        .c_str());
+	if (h.key != key) {
+		LOGMSG << "The grid file '" << path
+		       << "' was computed from different inputs" << std::endl;
+		return nullptr;
+	}
+	if (!h.n[0] || !h.n[1] || !h.n[2] || !h.n[3] ||
+	    (file->size() < dataOffset(h) + dataSize(h) * sizeof(real)))
+		throw moordyn::input_file_error(
+		    ("The grid file '" + path + "' is truncated").c_str());
+
+	const real* p = (const real*)(file->data() + sizeof(h));
+	for (unsigned int i = 0; i < 3; i++) {
+		axes[i].assign(p, p + h.n[i]);
+		p += h.n[i];
+	}
+	return file;
+}
+
+void
+saveWaveGrid(const std::string& path, const WaveGrid& grid, uint64_t key)
+{
+	saveGrid(path,
+	         GRID_FILE_WAVES,
+	         grid,
+	         { &grid.Px(), &grid.Py(), &grid.Pz() },
+	         { { grid.getZetas().data(), grid.getZetas().bytes() },
+	           { grid.getPDyn().data(), grid.getPDyn().bytes() },
+	           { grid.getWaveVel().data(), grid.getWaveVel().bytes() },
+	           { grid.getWaveAcc().data(), grid.getWaveAcc().bytes() } },
+	         key);
+}
+
+void
+saveCurrentGrid(const std::string& path,
+                const CurrentGrid& grid,
+                uint64_t key)
+{
+	saveGrid(path,
+	         GRID_FILE_CURRENTS,
+	         grid,
+	         { &grid.Px(), &grid.Py(), &grid.Pz() },
+	         { { grid.getCurrentVel().data(), grid.getCurrentVel().bytes() },
+	           { grid.getCurrentAcc().data(), grid.getCurrentAcc().bytes() } },
+	         key);
+}
+
+std::unique_ptr<WaveGrid>
+mapWaveGrid(const std::string& path, uint64_t key, moordyn::Log* _log)
+{
+	GridFileHeader h;
+	std::vector<real> axes[3];
+	auto file = mapGrid(path, GRID_FILE_WAVES, h, axes, key, _log);
+	if (!file)
+		return nullptr;
+	auto grid = std::make_unique<WaveGrid>(
+	    _log, axes[0], axes[1], axes[2], h.n[3], h.dt);
+	grid->mapKinematicArrays(file, (real*)(file->data() + dataOffset(h)));
+	return grid;
+}
+
+std::unique_ptr<CurrentGrid>
+mapCurrentGrid(const std::string& path, uint64_t key, moordyn::Log* _log)
+{
+	GridFileHeader h;
+	std::vector<real> axes[3];
+	auto file = mapGrid(path, GRID_FILE_CURRENTS, h, axes, key, _log);
+	if (!file)
+		return nullptr;
+	auto grid = std::make_unique<CurrentGrid>(
+	    _log, axes[0], axes[1], axes[2], h.n[3], h.dt);
+	grid->mapKinematicArrays(file, (real*)(file->data() + dataOffset(h)));
+	return grid;
+}
+
+} // ::waves
+} // ::moordyn
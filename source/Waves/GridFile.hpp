@@ -0,0 +1,88 @@
+#pragma once
+
+#include "Misc.hpp"
+#include <cstdint>
+#include <memory>
+#include <string>
+
+namespace moordyn {
+
+class Log;
+class WaveGrid;
+class CurrentGrid;
+
+namespace waves {
+
+/** @brief Kind of kinematics stored on a binary grid file
+ */
+typedef enum
+{
+	/// Wave elevation, dynamic pressure, velocity and acceleration
+	GRID_FILE_WAVES = 0,
+	/// Current velocity and acceleration
+	GRID_FILE_CURRENTS = 1,
+} grid_file_kind;
+
+/** @brief Write a wave grid on a binary file
+ *
+ * The file is written on a temporary file which is renamed afterwards, so
+ * the processes mapping an older version are not affected
+ * @param path The file path
+ * @param grid The wave grid
+ * @param key The hash of the inputs the grid was computed from
+ * @throws moordyn::output_file_error If the file cannot be written
+ * @see mapWaveGrid()
+ */
+void
+saveWaveGrid(const std::string& path, const WaveGrid& grid, uint64_t key);
+
+/** @brief Write a current grid on a binary file
+ *
+ * The file is written on a temporary file which is renamed afterwards, so
+ * the processes mapping an older version are not affected
+ * @param path The file path
+ * @param grid The current grid
+ * @param key The hash of the inputs the grid was computed from
+ * @throws moordyn::output_file_error If the file cannot be written
+ * @see mapCurrentGrid()
+ */
+void
+saveCurrentGrid(const std::string& path,
+                const CurrentGrid& grid,
+                uint64_t key);
+
+/** @brief Create a wave grid whose kinematics are mapped from a binary file
+ *
+ * Just the header and the axes are read, the kinematics are loaded on
+ * demand by the operating system
+ * @param path The file path
+ * @param key The hash of the inputs the grid shall be computed from
+ * @param _log Log pointer to allow logging from this function
+ * @return The wave grid, nullptr if the file was written by another format
+ * version or computed from different inputs, so it shall be written again
+ * @throws moordyn::input_file_error If the file cannot be mapped or it is not
+ * a valid wave grid file
+ * @see saveWaveGrid()
+ */
+std::unique_ptr<WaveGrid>
+mapWaveGrid(const std::string& path, uint64_t key, moordyn::Log* _log);
+
+/** @brief Create a current grid whose kinematics are mapped from a binary
+ * file
+ *
+ * Just the header and the axes are read, the kinematics are loaded on
+ * demand by the operating system
+ * @param path The file path
+ * @param key The hash of the inputs the grid shall be computed from
+ * @param _log Log pointer to allow logging from this function
+ * @return The current grid, nullptr if the file was written by another format
+ * version or computed from different inputs, so it shall be written again
+ * @throws moordyn::input_file_error If the file cannot be mapped or it is not
+ * a valid current grid file
+ * @see saveCurrentGrid()
+ */
+std::unique_ptr<CurrentGrid>
+mapCurrentGrid(const std::string& path, uint64_t key, moordyn::Log* _log);
+
+} // ::waves
+} // ::moordyn
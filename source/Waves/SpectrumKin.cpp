@@ -2,12 +2,54 @@
 #include "Waves.h"
 #include "Waves.hpp"
 #include "Waves/SpectrumKin.hpp"
+#include <algorithm>
 #include <complex>
+#include <limits>
+
+/// Number of points evaluated at once by the batched SpectrumKin::getWaveKin()
+#define SPECTRUM_KIN_BLOCK 64
+/// Lower bound of the exponents on the batched SpectrumKin::getWaveKin()
+#define SPECTRUM_KIN_MIN_EXP -700.0
 
 namespace moordyn {
 
 namespace waves {
 
+/** @brief Compute the depth attenuation factors of a wave component
+ * @param k The wave number
+ * @param z The stretched z coordinate
+ * @param h The positive water depth
+ * @param sinh_ratio sinh(k * (z + h)) / sinh(k * h)
+ * @param cosh_ratio cosh(k * (z + h)) / sinh(k * h)
+ */
+inline void
+depth_factors(real k, real z, real h, real& sinh_ratio, real& cosh_ratio)
+{
+	if (k == 0.0) {
+		// The shallow water formulation is ill-conditioned;
+		// thus, the known value of unity is returned.
+		sinh_ratio = 1.0;
+		cosh_ratio = 99999.0;
+	} else if (k * h > 89.4) {
+		// The shallow water formulation will trigger a
+		// floating point overflow error; however, for h
+		// > 14.23 * wavelength (since k = 2 * Pi /
+		// wavelength) we can use the numerically-stable
+		// deep water formulation instead.
+		sinh_ratio = exp(k * z);
+		cosh_ratio = exp(k * z);
+	} else if (-k * h > 89.4) {
+		// @mth: added negative k case
+		// NOTE: CHECK CORRECTNESS
+		sinh_ratio = -exp(-k * z);
+		cosh_ratio = -exp(-k * z);
+	} else {
+		// shallow water formulation
+		sinh_ratio = sinh(k * (z + h)) / sinh(k * h);
+		cosh_ratio = cosh(k * (z + h)) / sinh(k * h);
+	}
+}
+
 void
 SpectrumKin::setup(const std::vector<FrequencyComponent>& freqComps,
                    EnvCondRef env,
@@ -34,6 +76,29 @@ SpectrumKin::setup(const std::vector<FrequencyComponent>& freqComps,
 		               env->g,
 		               seafloor ? -seafloor->getAverageDepth() : env->WtrDpth);
 	}
+	betas_x = betas.cos();
+	betas_y = betas.sin();
+
+	// Constants of the batched evaluation
+	kx = kValues * betas_x;
+	ky = kValues * betas_y;
+	wa = omegas * amplitudes;
+	w2a = omegas * wa;
+	singular.clear();
+	for (unsigned int i = 0; i < num_freqs; i++) {
+		if (kValues[i] <= 0.0)
+			singular.push_back(i);
+	}
+
+	// The phasors of a displaced point are corrected with a second order
+	// expansion, so the phase error is (k d)^3 / 6
+	anchorRadius = 0.0;
+	const real tol = env->waterKinOptions.phaseTol;
+	if (tol > 0.0) {
+		const real k_max = num_freqs ? kValues.abs().maxCoeff() : 0.0;
+		anchorRadius = (k_max > 0.0) ? cbrt(6.0 * tol) / k_max
+		                             : std::numeric_limits<real>::max();
+	}
 }
 
 void
@@ -50,15 +115,13 @@ SpectrumKin::getWaveKin(vec3 pos,
 	const auto& x = pos.x();
 	const auto& y = pos.y();
 
-	const Eigen::ArrayX<real> betas_x = betas.cos();
-	const Eigen::ArrayX<real> betas_y = betas.sin();
-	const Eigen::ArrayX<real> distances = betas_x * x + betas_y * y;
-	const Eigen::ArrayX<real> sin_waves =
-	    amplitudes * (omegas * t - kValues * distances + phases).sin();
-	const Eigen::ArrayX<real> cos_waves =
-	    amplitudes * (omegas * t - kValues * distances + phases).cos();
+	// This function is called for every single node on each time step, so the
+	// phases are kept as a lazy expression to avoid allocating temporary
+	// arrays
+	const auto wave_phases =
+	    omegas * t - kValues * (betas_x * x + betas_y * y) + phases;
 
-	const real surface_height = sin_waves.sum();
+	const real surface_height = (amplitudes * wave_phases.sin()).sum();
 	const real bottom = actualDepth;
 	const real actual_depth = surface_height - bottom;
 
@@ -83,50 +146,22 @@ SpectrumKin::getWaveKin(vec3 pos,
 		for (unsigned int I = 0; I < omegas.size(); I++) {
 			real SINHNumOvrSIHNDen;
 			real COSHNumOvrSIHNDen;
-			real COSHNumOvrCOSHDen;
 			auto k = kValues[I];
 			real w = omegas[I];
-			if (k == 0.0) {
-				// The shallow water formulation is ill-conditioned;
-				// thus, the known value of unity is returned.
-				SINHNumOvrSIHNDen = 1.0;
-				COSHNumOvrSIHNDen = 99999.0;
-				COSHNumOvrCOSHDen = 1.0;
-			} else if (k * -avgDepth > 89.4) {
-				// The shallow water formulation will trigger a
-				// floating point overflow error; however, for h
-				// > 14.23 * wavelength (since k = 2 * Pi /
-				// wavelength) we can use the numerically-stable
-				// deep water formulation instead.
-				SINHNumOvrSIHNDen = exp(k * stretched_z);
-				COSHNumOvrSIHNDen = exp(k * stretched_z);
-				COSHNumOvrCOSHDen = exp(k * stretched_z) +
-				                    exp(-k * (stretched_z + 2.0 * -avgDepth));
-			} else if (-k * -avgDepth > 89.4) {
-				// @mth: added negative k case
-				// NOTE: CHECK CORRECTNESS
-				SINHNumOvrSIHNDen = -exp(-k * stretched_z);
-				COSHNumOvrSIHNDen = -exp(-k * stretched_z);
-				COSHNumOvrCOSHDen = -exp(-k * stretched_z) +
-				                    exp(-k * (stretched_z + 2.0 * -avgDepth));
-			} else {
-				// shallow water formulation
-				SINHNumOvrSIHNDen =
-				    sinh(k * (stretched_z + -avgDepth)) / sinh(k * -avgDepth);
-				COSHNumOvrSIHNDen =
-				    cosh(k * (stretched_z + -avgDepth)) / sinh(k * -avgDepth);
-				COSHNumOvrCOSHDen =
-				    cosh(k * (stretched_z + -avgDepth)) / cosh(k * -avgDepth);
-			}
-			real u_xy = w * sin_waves[I] * COSHNumOvrSIHNDen;
+			const real wave_phase = wave_phases[I];
+			const real sin_wave = amplitudes[I] * sin(wave_phase);
+			const real cos_wave = amplitudes[I] * cos(wave_phase);
+			depth_factors(
+			    k, stretched_z, -avgDepth, SINHNumOvrSIHNDen, COSHNumOvrSIHNDen);
+			real u_xy = w * sin_wave * COSHNumOvrSIHNDen;
 			real ux = u_xy * betas_x[I];
 			real uy = u_xy * betas_y[I];
-			real uz = w * cos_waves[I] * SINHNumOvrSIHNDen;
+			real uz = w * cos_wave * SINHNumOvrSIHNDen;
 			vel_sum += vec3(ux, uy, uz);
-			real a_xy = w * w * cos_waves[I] * COSHNumOvrSIHNDen;
+			real a_xy = w * w * cos_wave * COSHNumOvrSIHNDen;
 			real ax = a_xy * betas_x[I];
 			real ay = a_xy * betas_y[I];
-			real az = -w * w * sin_waves[I] * SINHNumOvrSIHNDen;
+			real az = -w * w * sin_wave * SINHNumOvrSIHNDen;
 			acc_sum += vec3(ax, ay, az);
 			// TODO Waves - calculate the dynamic pressure (rods use it)
 		}
@@ -137,5 +172,180 @@ SpectrumKin::getWaveKin(vec3 pos,
 			*acc = acc_sum;
 	}
 }
+
+void
+SpectrumKin::rotatePhasors(unsigned int i,
+                           const vec3& pos,
+                           Phasors& phasors,
+                           Scratch& scratch,
+                           unsigned int j) const
+{
+	auto s_re = phasors.re.col(i);
+	auto s_im = phasors.im.col(i);
+	auto sin_phase = scratch.sin_phase.col(j);
+	auto cos_phase = scratch.cos_phase.col(j);
+	vec3 d = pos - phasors.anchors[i];
+	d.z() = 0.0;
+	if (!(d.norm() <= anchorRadius)) {
+		auto phase = scratch.phase.col(j);
+		phase = -kx * pos.x() - ky * pos.y();
+		s_re = phase.cos();
+		s_im = phase.sin();
+		phasors.anchors[i] = pos;
+		d = vec3::Zero();
+	}
+
+	// exp(i (omega t + phase)) exp(-i k · x)
+	cos_phase = scratch.t_re * s_re - scratch.t_im * s_im;
+	sin_phase = scratch.t_re * s_im + scratch.t_im * s_re;
+	if ((d.x() == 0.0) && (d.y() == 0.0))
+		return;
+
+	// exp(-i k · d) ~ 1 - (k · d)^2 / 2 - i k · d
+	auto& shift = scratch.shift;
+	shift = kx * d.x() + ky * d.y();
+	auto re = scratch.phase.col(j);
+	re = cos_phase;
+	cos_phase = re * (1.0 - 0.5 * shift.square()) + sin_phase * shift;
+	sin_phase = sin_phase * (1.0 - 0.5 * shift.square()) - re * shift;
+}
+
+void
+SpectrumKin::getWaveKin(unsigned int n,
+                        const vec3* pos,
+                        real t,
+                        real avgDepth,
+                        const real* actualDepth,
+                        real* zeta,
+                        vec3* vel,
+                        vec3* acc,
+                        Scratch& scratch,
+                        Phasors* phasors) const
+{
+	const auto num_freqs = omegas.size();
+	// The depth constants and the phasors depend on the wave numbers, so
+	// the scratch buffers computed for another spectrum cannot be reused
+	const bool same_spectrum = (scratch.kx.size() == num_freqs) &&
+	                           (scratch.kx == kx).all() &&
+	                           (scratch.ky == ky).all();
+	if (!same_spectrum) {
+		scratch.kx = kx;
+		scratch.ky = ky;
+		scratch.inv_sinh.resize(num_freqs);
+		scratch.exp_2kh.resize(num_freqs);
+		scratch.phases_t.resize(num_freqs);
+		scratch.phase.resize(num_freqs, SPECTRUM_KIN_BLOCK);
+		scratch.sin_phase.resize(num_freqs, SPECTRUM_KIN_BLOCK);
+		scratch.cos_phase.resize(num_freqs, SPECTRUM_KIN_BLOCK);
+		scratch.exp_p.resize(num_freqs, SPECTRUM_KIN_BLOCK);
+		scratch.exp_m.resize(num_freqs, SPECTRUM_KIN_BLOCK);
+		scratch.z.resize(SPECTRUM_KIN_BLOCK);
+		scratch.t_re.resize(num_freqs);
+		scratch.t_im.resize(num_freqs);
+		scratch.shift.resize(num_freqs);
+	}
+	const bool rotate = phasors && (anchorRadius > 0.0);
+	if (rotate && (!same_spectrum || (phasors->anchors.size() != n) ||
+	               (phasors->re.rows() != num_freqs))) {
+		// Force all the points to be anchored
+		phasors->anchors.assign(
+		    n, vec3::Constant(std::numeric_limits<real>::infinity()));
+		phasors->re.resize(num_freqs, n);
+		phasors->im.resize(num_freqs, n);
+	}
+	if (!same_spectrum || (scratch.depth != avgDepth)) {
+		// sinh(k (z + h)) = exp(k h) (exp(k z) - exp(-k (z + 2 h))) / 2
+		// sinh(k h) = exp(k h) (1 - exp(-2 k h)) / 2
+		scratch.depth = avgDepth;
+		scratch.exp_2kh = (2.0 * avgDepth * kValues).exp();
+		scratch.inv_sinh = -(2.0 * avgDepth * kValues).expm1().inverse();
+		for (auto i : singular)
+			scratch.inv_sinh[i] = 0.0;
+	}
+	const real h = -avgDepth;
+	const bool kin = vel || acc;
+
+	scratch.phases_t = omegas * t + phases;
+	if (rotate) {
+		scratch.t_re = scratch.phases_t.cos();
+		scratch.t_im = scratch.phases_t.sin();
+	}
+	for (unsigned int i0 = 0; i0 < n; i0 += SPECTRUM_KIN_BLOCK) {
+		const unsigned int nb =
+		    (std::min)(n - i0, (unsigned int)SPECTRUM_KIN_BLOCK);
+		auto phase = scratch.phase.leftCols(nb);
+		auto sin_phase = scratch.sin_phase.leftCols(nb);
+		auto cos_phase = scratch.cos_phase.leftCols(nb);
+		if (rotate) {
+			for (unsigned int j = 0; j < nb; j++)
+				rotatePhasors(i0 + j, pos[i0 + j], *phasors, scratch, j);
+		} else {
+			for (unsigned int j = 0; j < nb; j++)
+				phase.col(j) = scratch.phases_t - kx * pos[i0 + j].x() -
+				               ky * pos[i0 + j].y();
+			sin_phase = phase.sin();
+		}
+
+		// The surface elevation is required to stretch the points
+		auto exp_p = scratch.exp_p.leftCols(nb);
+		auto exp_m = scratch.exp_m.leftCols(nb);
+		for (unsigned int j = 0; j < nb; j++) {
+			const real surface_height = (amplitudes * sin_phase.col(j)).sum();
+			if (zeta)
+				zeta[i0 + j] = surface_height;
+			if (!kin)
+				continue;
+			const real bottom = actualDepth[i0 + j];
+			const real actual_depth = surface_height - bottom;
+			real z = (-avgDepth * (pos[i0 + j].z() - bottom)) / actual_depth +
+			         avgDepth;
+			// See the pointwise getWaveKin()
+			if (z > 0.0)
+				z = 0.0;
+			scratch.z[j] = z;
+			// exp(k z) is clamped to avoid an underflow far below the
+			// surface, where the kinematics are negligible anyway
+			exp_p.col(j) = (kValues * z).max(SPECTRUM_KIN_MIN_EXP);
+		}
+		if (!kin)
+			continue;
+
+		if (!rotate)
+			cos_phase = phase.cos();
+		exp_p = exp_p.exp();
+		exp_m = exp_p.inverse().colwise() * scratch.exp_2kh;
+		// The phases are not needed anymore, so they are replaced by the
+		// depth factors
+		auto sinh_ratio = phase;
+		auto cosh_ratio = exp_m;
+		sinh_ratio = (exp_p - exp_m).colwise() * scratch.inv_sinh;
+		cosh_ratio = (exp_p + exp_m).colwise() * scratch.inv_sinh;
+		for (auto i : singular) {
+			for (unsigned int j = 0; j < nb; j++)
+				depth_factors(kValues[i],
+				              scratch.z[j],
+				              h,
+				              sinh_ratio(i, j),
+				              cosh_ratio(i, j));
+		}
+
+		for (unsigned int j = 0; j < nb; j++) {
+			if (vel) {
+				const auto u_xy = wa * sin_phase.col(j) * cosh_ratio.col(j);
+				vel[i0 + j] = vec3(
+				    (u_xy * betas_x).sum(),
+				    (u_xy * betas_y).sum(),
+				    (wa * cos_phase.col(j) * sinh_ratio.col(j)).sum());
+			}
+			if (acc) {
+				const auto a_xy = w2a * cos_phase.col(j) * cosh_ratio.col(j);
+				acc[i0 + j] = vec3(
+				    (a_xy * betas_x).sum(),
+				    (a_xy * betas_y).sum(),
+				    -(w2a * sin_phase.col(j) * sinh_ratio.col(j)).sum());
+			}
+		}
+	}
+}
 }
 }
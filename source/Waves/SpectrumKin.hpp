@@ -53,17 +53,160 @@ class SpectrumKin
 	                vec3* vel,
 	                vec3* acc) const;
 
+	/**
+	 * @brief Scratch buffers of the batched getWaveKin()
+	 *
+	 * The buffers are kept apart from the spectrum, so the same spectrum can
+	 * be evaluated from several threads, each one with its own buffers. The
+	 * buffers are tagged with the wave numbers of the spectrum they were
+	 * computed for, so they are computed again if they are used with a
+	 * different spectrum
+	 */
+	struct Scratch
+	{
+		/// x component of the wave numbers the buffers were computed for
+		Eigen::ArrayX<real> kx;
+		/// y component of the wave numbers the buffers were computed for
+		Eigen::ArrayX<real> ky;
+		/// Average seafloor depth the depth constants were computed for
+		real depth = 0.0;
+		/// exp(-2 k h) for each spectrum component
+		Eigen::ArrayX<real> exp_2kh;
+		/// 1 / (1 - exp(-2 k h)) for each spectrum component
+		Eigen::ArrayX<real> inv_sinh;
+		/// Time dependent part of the phases
+		Eigen::ArrayX<real> phases_t;
+		/// Wave phases on the block of components times points
+		Eigen::ArrayXX<real> phase;
+		/// Sine of the wave phases
+		Eigen::ArrayXX<real> sin_phase;
+		/// Cosine of the wave phases
+		Eigen::ArrayXX<real> cos_phase;
+		/// exp(k z) on the block
+		Eigen::ArrayXX<real> exp_p;
+		/// exp(-k (z + 2 h)) on the block
+		Eigen::ArrayXX<real> exp_m;
+		/// Stretched z coordinate of the points on the block
+		Eigen::ArrayX<real> z;
+		/// Real part of the time phasors exp(i (omega t + phase))
+		Eigen::ArrayX<real> t_re;
+		/// Imaginary part of the time phasors exp(i (omega t + phase))
+		Eigen::ArrayX<real> t_im;
+		/// Phase shifts k · d of the displaced points
+		Eigen::ArrayX<real> shift;
+	};
+
+	/**
+	 * @brief Spatial phasors of the spectrum components at a set of points
+	 *
+	 * The wave phases are split as (omega t + phase) - k · x, so the spatial
+	 * phasors exp(-i k · x) can be kept from one evaluation to the next, and
+	 * just rotated by the time phasors, which are shared by all the points.
+	 * While a point stays close to the position its phasors were anchored
+	 * at, the displacement d is taken into account with a second order
+	 * expansion of exp(-i k · d). The phasors are anchored again at the
+	 * current position as soon as the expected phase error exceeds the
+	 * tolerance, see EnvCond::waterKinOptions.
+	 *
+	 * Like the scratch buffers, the phasors are kept apart from the spectrum,
+	 * since each set of points requires its own ones
+	 */
+	struct Phasors
+	{
+		/// Positions the phasors were anchored at
+		std::vector<vec3> anchors;
+		/// Real part of exp(-i k · x) at the anchors
+		Eigen::ArrayXX<real> re;
+		/// Imaginary part of exp(-i k · x) at the anchors
+		Eigen::ArrayXX<real> im;
+	};
+
+	/**
+	 * @brief Get the Wave kinematics at a set of points at time t
+	 *
+	 * The whole block of spectrum components times points is evaluated at
+	 * once, in chunks of a fixed number of points, so no memory is allocated
+	 * once the scratch buffers are sized for this spectrum. The results are
+	 * equivalent to the ones of the pointwise getWaveKin() up to round-off
+	 * errors.
+	 *
+	 * If @p phasors is given, and a phase tolerance was set, the phasors of
+	 * the previous call are rotated instead of evaluating the sines and
+	 * cosines of the phases, see Phasors. In that case the set of points
+	 * shall be the same on every call.
+	 *
+	 * @param n The number of points
+	 * @param pos The (x, y, z) coordinates of the points
+	 * @param t The time to calculate the waves at
+	 * @param avgDepth A negative number representing the average seafloor depth
+	 * (used for calculating wave numbers)
+	 * @param actualDepth The negative actual seafloor depths at the points
+	 * @param zeta surface heights, only set if not null
+	 * @param vel water velocities, only set if not null
+	 * @param acc water accelerations, only set if not null
+	 * @param scratch The scratch buffers
+	 * @param phasors The phasors of the previous call, if any
+	 */
+	void getWaveKin(unsigned int n,
+	                const vec3* pos,
+	                real t,
+	                real avgDepth,
+	                const real* actualDepth,
+	                real* zeta,
+	                vec3* vel,
+	                vec3* acc,
+	                Scratch& scratch,
+	                Phasors* phasors = nullptr) const;
+
   private:
+	/**
+	 * @brief Get the sines and cosines of the wave phases at a point from
+	 * its phasors
+	 *
+	 * The phasors are anchored again at the point position if it moved too
+	 * far away
+	 * @param i The point index
+	 * @param pos The point position
+	 * @param phasors The phasors
+	 * @param scratch The scratch buffers, where the time phasors are
+	 * already computed
+	 * @param j The column of the block on the scratch buffers to fill
+	 */
+	void rotatePhasors(unsigned int i,
+	                   const vec3& pos,
+	                   Phasors& phasors,
+	                   Scratch& scratch,
+	                   unsigned int j) const;
+
 	/// Angular velocities of the spectrum components
 	Eigen::ArrayX<real> omegas;
 	/// Real amplitudes of spectrum components
 	Eigen::ArrayX<real> amplitudes;
 	/// Angle of the spectrum components (radians)
 	Eigen::ArrayX<real> betas;
+	/// Cosine of the angle of the spectrum components
+	Eigen::ArrayX<real> betas_x;
+	/// Sine of the angle of the spectrum components
+	Eigen::ArrayX<real> betas_y;
 	/// Phase offset (radians) of spectrum components
 	Eigen::ArrayX<real> phases;
 	/// Wave numbers of spectrum components
 	Eigen::ArrayX<real> kValues;
+
+	/// Wave number x components
+	Eigen::ArrayX<real> kx;
+	/// Wave number y components
+	Eigen::ArrayX<real> ky;
+	/// Velocity amplitudes of spectrum components
+	Eigen::ArrayX<real> wa;
+	/// Acceleration amplitudes of spectrum components
+	Eigen::ArrayX<real> w2a;
+	/// Spectrum components which cannot be evaluated with the exponential
+	/// depth factors, i.e. the ones with a null or negative wave number
+	std::vector<unsigned int> singular;
+	/// Maximum horizontal displacement of a point before its phasors are
+	/// anchored again, 0 if the phasors are not used
+	real anchorRadius = 0.0;
 };
 
 }
@@ -4,8 +4,12 @@
 #include "MoorDyn2.hpp"
 #include "Util/Interp.hpp"
 #include "WaveOptions.hpp"
+#include "GridFile.hpp"
 #include "kiss_fftr.h"
 #include <exception>
+#include <filesystem>
+#include <fstream>
+#include <iomanip>
 #include <memory>
 
 #if defined WIN32 && defined max
@@ -24,7 +28,7 @@ namespace waves {
  * @param cx_w_in KISS FFT frequency-domain data
  * @param cx_t_out KISS FFT time-domain output
  * @param inputs Input FFT values
- * @param outputs Output time-domain values
+ * @param outputs Output time-domain values, with at least nFFT components
  */
 void
 doIFFT(kiss_fftr_cfg cfg,
@@ -32,7 +36,7 @@ doIFFT(kiss_fftr_cfg cfg,
        std::vector<kiss_fft_cpx>& cx_w_in,
        std::vector<kiss_fft_scalar>& cx_t_out,
        const std::vector<moordyn::complex>& inputs,
-       std::vector<real>& outputs)
+       real* outputs)
 {
 	unsigned int nw = nFFT / 2 + 1;
 
@@ -158,8 +162,12 @@ fillWaveGrid(std::unique_ptr<WaveGrid> waveGrid,
 			}
 
 			// IFFT the wave elevation spectrum
-			doIFFT(
-			    cfg, nFFT, cx_w_in, cx_t_out, zetaC, waveGrid->Zetas()[ix][iy]);
+			doIFFT(cfg,
+			       nFFT,
+			       cx_w_in,
+			       cx_t_out,
+			       zetaC,
+			       &waveGrid->Zetas()(ix, iy, 0, 0));
 
 			// wave velocities and accelerations
 			for (unsigned int iz = 0; iz < waveGrid->nz; iz++) {
@@ -238,16 +246,16 @@ fillWaveGrid(std::unique_ptr<WaveGrid> waveGrid,
 				       cx_w_in,
 				       cx_t_out,
 				       PDynC,
-				       waveGrid->PDyn()[ix][iy][iz]);
+				       &waveGrid->PDyn()(ix, iy, iz, 0));
 				// IFFT the wave velocities
 				std::vector<real> x_vel(nt);
 				std::vector<real> y_vel(nt);
 				std::vector<real> z_vel(nt);
-				doIFFT(cfg, nFFT, cx_w_in, cx_t_out, UCx, x_vel);
-				doIFFT(cfg, nFFT, cx_w_in, cx_t_out, UCy, y_vel);
-				doIFFT(cfg, nFFT, cx_w_in, cx_t_out, UCz, z_vel);
+				doIFFT(cfg, nFFT, cx_w_in, cx_t_out, UCx, x_vel.data());
+				doIFFT(cfg, nFFT, cx_w_in, cx_t_out, UCy, y_vel.data());
+				doIFFT(cfg, nFFT, cx_w_in, cx_t_out, UCz, z_vel.data());
 				for (unsigned int i = 0; i < nt; i++) {
-					waveGrid->WaveVel()[ix][iy][iz][i] =
+					waveGrid->WaveVel()(ix, iy, iz, i) =
 					    vec3(x_vel[i], y_vel[i], z_vel[i]);
 				}
 
@@ -255,11 +263,11 @@ fillWaveGrid(std::unique_ptr<WaveGrid> waveGrid,
 				std::vector<real> x_acc(nt);
 				std::vector<real> y_acc(nt);
 				std::vector<real> z_acc(nt);
-				doIFFT(cfg, nFFT, cx_w_in, cx_t_out, UdCx, x_acc);
-				doIFFT(cfg, nFFT, cx_w_in, cx_t_out, UdCy, y_acc);
-				doIFFT(cfg, nFFT, cx_w_in, cx_t_out, UdCz, z_acc);
+				doIFFT(cfg, nFFT, cx_w_in, cx_t_out, UdCx, x_acc.data());
+				doIFFT(cfg, nFFT, cx_w_in, cx_t_out, UdCy, y_acc.data());
+				doIFFT(cfg, nFFT, cx_w_in, cx_t_out, UdCz, z_acc.data());
 				for (unsigned int i = 0; i < nt; i++) {
-					waveGrid->WaveAcc()[ix][iy][iz][i] =
+					waveGrid->WaveAcc()(ix, iy, iz, i) =
 					    vec3(x_acc[i], y_acc[i], z_acc[i]);
 				}
 				// NOTE: wave stretching stuff would maybe go here?? <<<
@@ -610,7 +618,7 @@ constructSteadyCurrentGrid(const std::string& folder,
 
 	// fill in output arrays
 	for (unsigned int i = 0; i < currentGrid->nz; i++) {
-		currentGrid->CurrentVel()[0][0][i][0] =
+		currentGrid->CurrentVel()(0, 0, i, 0) =
 		    vec3(UProfileUx[i], UProfileUy[i], UProfileUz[i]);
 	}
 	return currentGrid;
@@ -721,10 +729,10 @@ constructDynamicCurrentGrid(const std::string& folder,
 			auto x = lerp(UProfileUx[iz][iti - 1], UProfileUx[iz][iti], ft);
 			auto y = lerp(UProfileUy[iz][iti - 1], UProfileUy[iz][iti], ft);
 			auto z = lerp(UProfileUz[iz][iti - 1], UProfileUz[iz][iti], ft);
-			currentGrid->CurrentVel()[0][0][iz][it] = vec3(x, y, z);
+			currentGrid->CurrentVel()(0, 0, iz, it) = vec3(x, y, z);
 			// TODO: approximate fluid accelerations using finite
 			//       differences
-			currentGrid->CurrentAcc()[0][0][iz][it] = vec3::Zero();
+			currentGrid->CurrentAcc()(0, 0, iz, it) = vec3::Zero();
 		}
 	}
 
@@ -808,13 +816,9 @@ construct4DCurrentGrid(const std::string& folder,
 		TMap[entry[i]] = i;
 	}
 
-	// Need 3 4D grids - one for each component of current velocity:
-	Vec4D<real> currentGridUx =
-	    init4DArray(nxCurGrid, nyCurGrid, nzCurGrid, ntCurGrid);
-	Vec4D<real> currentGridUy =
-	    init4DArray(nxCurGrid, nyCurGrid, nzCurGrid, ntCurGrid);
-	Vec4D<real> currentGridUz =
-	    init4DArray(nxCurGrid, nyCurGrid, nzCurGrid, ntCurGrid);
+	// The velocities at the input grid points
+	Grid4D<vec3> currentGridU(
+	    nxCurGrid, nyCurGrid, nzCurGrid, ntCurGrid, vec3::Zero());
 
 	// Number of points in the current grid (important for iteration):
 	unsigned int nCurGridPoints = nxCurGrid * nyCurGrid * nzCurGrid * ntCurGrid;
@@ -836,11 +840,9 @@ construct4DCurrentGrid(const std::string& folder,
 		auto iz = ZMap[entry[2]];
 		auto it = TMap[entry[3]];
 
-		// Need to set velocity components in three separate vectors
-		// at the coordinate above
-		currentGridUx[ix][iy][iz][it] = stod(entry[4]);
-		currentGridUy[ix][iy][iz][it] = stod(entry[5]);
-		currentGridUz[ix][iy][iz][it] = stod(entry[6]);
+		// Set the velocity at the coordinate above
+		currentGridU(ix, iy, iz, it) =
+		    vec3(stod(entry[4]), stod(entry[5]), stod(entry[6]));
 	}
 
 	// set the time step size to be the smallest interval in the
@@ -866,19 +868,13 @@ construct4DCurrentGrid(const std::string& folder,
 				for (unsigned int it = 0; it < currentGrid->nt; it++) {
 					iti = interp_factor(UProfileT, iti, it * dtWave, ft);
 
-					auto x = lerp(currentGridUx[ix][iy][iz][iti - 1],
-					              currentGridUx[ix][iy][iz][iti],
-					              ft);
-					auto y = lerp(currentGridUy[ix][iy][iz][iti - 1],
-					              currentGridUy[ix][iy][iz][iti],
-					              ft);
-					auto z = lerp(currentGridUz[ix][iy][iz][iti - 1],
-					              currentGridUz[ix][iy][iz][iti],
-					              ft);
-					currentGrid->CurrentVel()[ix][iy][iz][it] = vec3(x, y, z);
+					currentGrid->CurrentVel()(ix, iy, iz, it) =
+					    lerp(currentGridU(ix, iy, iz, iti - 1),
+					         currentGridU(ix, iy, iz, iti),
+					         ft);
 					// TODO: approximate fluid accelerations using finite
 					//       differences
-					currentGrid->CurrentAcc()[ix][iy][iz][it] = vec3::Zero();
+					currentGrid->CurrentAcc()(ix, iy, iz, it) = vec3::Zero();
 				}
 			}
 		}
@@ -886,5 +882,122 @@ construct4DCurrentGrid(const std::string& folder,
 	return currentGrid;
 }
 
+/** @brief Hash the inputs a grid is computed from, to key its binary file
+ * @param files The text inputs
+ * @param options The options the grid depends on
+ * @return The key of the binary grid file
+ */
+static uint64_t
+gridFileKey(const std::vector<std::string>& files, const std::string& options)
+{
+	uint64_t key = FNV1A_OFFSET;
+	for (auto filename : files) {
+		std::ifstream f(filename, std::ios::in | std::ios::binary);
+		std::stringstream text;
+		if (f.is_open())
+			text << f.rdbuf();
+		key = fnv1a(key, filename + "\n" + text.str());
+	}
+	return fnv1a(key, options);
+}
+
+std::unique_ptr<WaveGrid>
+constructWaveGrid(const std::string& folder,
+                  const EnvCondRef env,
+                  moordyn::Log* _log)
+{
+	const string& filename = env->waterKinOptions.waveGridFile;
+	std::stringstream options;
+	options << std::setprecision(17) << env->waterKinOptions.waveMode << " "
+	        << env->waterKinOptions.dtWave << " " << env->g << " "
+	        << env->WtrDpth << " " << env->rho_w;
+	const uint64_t key = gridFileKey(
+	    { folder + (env->waterKinOptions.waveMode == WAVES_FFT_GRID
+	                    ? "/wave_frequencies.txt"
+	                    : "/wave_elevation.txt"),
+	      folder + "/water_grid.txt" },
+	    options.str());
+	if (!filename.empty() && std::filesystem::exists(filename)) {
+		LOGMSG << "Mapping the waves grid from '" << filename << "'..."
+		       << endl;
+		std::unique_ptr<WaveGrid> waveGrid;
+		try {
+			waveGrid = mapWaveGrid(filename, key, _log);
+		} catch (const moordyn::input_file_error& e) {
+			LOGERR << e.what() << endl;
+			throw;
+		}
+		if (waveGrid)
+			return waveGrid;
+		LOGMSG << "The waves grid will be computed again" << endl;
+	}
+
+	std::unique_ptr<WaveGrid> waveGrid;
+	if (env->waterKinOptions.waveMode == WAVES_FFT_GRID)
+		waveGrid = constructWaveGridSpectrumData(folder, env, _log);
+	else
+		waveGrid = constructWaveGridElevationData(folder, env, _log);
+	if (filename.empty())
+		return waveGrid;
+
+	try {
+		saveWaveGrid(filename, *waveGrid, key);
+	} catch (const moordyn::output_file_error& e) {
+		LOGWRN << "The waves grid cannot be saved: " << e.what() << endl;
+		return waveGrid;
+	}
+	LOGMSG << "Waves grid saved on '" << filename << "'" << endl;
+	return waveGrid;
+}
+
+std::unique_ptr<CurrentGrid>
+constructCurrentGrid(const std::string& folder,
+                     const EnvCondRef env,
+                     moordyn::Log* _log)
+{
+	const string& filename = env->waterKinOptions.currentGridFile;
+	string source = folder + "current_profile_4d.txt";
+	if (env->waterKinOptions.currentMode == CURRENTS_STEADY_GRID)
+		source = folder + "/current_profile.txt";
+	else if (env->waterKinOptions.currentMode == CURRENTS_DYNAMIC_GRID)
+		source = folder + "/current_profile_dynamic.txt";
+	// The current grids just depend on the text inputs
+	const uint64_t key = gridFileKey(
+	    { source }, std::to_string(env->waterKinOptions.currentMode));
+	if (!filename.empty() && std::filesystem::exists(filename)) {
+		LOGMSG << "Mapping the currents grid from '" << filename << "'..."
+		       << endl;
+		std::unique_ptr<CurrentGrid> currentGrid;
+		try {
+			currentGrid = mapCurrentGrid(filename, key, _log);
+		} catch (const moordyn::input_file_error& e) {
+			LOGERR << e.what() << endl;
+			throw;
+		}
+		if (currentGrid)
+			return currentGrid;
+		LOGMSG << "The currents grid will be computed again" << endl;
+	}
+
+	std::unique_ptr<CurrentGrid> currentGrid;
+	if (env->waterKinOptions.currentMode == CURRENTS_STEADY_GRID)
+		currentGrid = constructSteadyCurrentGrid(folder, env, _log);
+	else if (env->waterKinOptions.currentMode == CURRENTS_DYNAMIC_GRID)
+		currentGrid = constructDynamicCurrentGrid(folder, env, _log);
+	else
+		currentGrid = construct4DCurrentGrid(folder, env, _log);
+	if (filename.empty())
+		return currentGrid;
+
+	try {
+		saveCurrentGrid(filename, *currentGrid, key);
+	} catch (const moordyn::output_file_error& e) {
+		LOGWRN << "The currents grid cannot be saved: " << e.what() << endl;
+		return currentGrid;
+	}
+	LOGMSG << "Currents grid saved on '" << filename << "'" << endl;
+	return currentGrid;
+}
+
 } // namespace waves
 } // namespace moordyn
@@ -84,5 +84,45 @@ std::unique_ptr<CurrentGrid>
 construct4DCurrentGrid(const std::string& folder,
                        const EnvCondRef env,
                        moordyn::Log* _log);
+
+/**
+ * @brief Does the setup for the grid wave modes, WAVE_FFT_GRID and
+ * WAVE_GRID
+ *
+ * If the WaveGridFile option is set and the file exists, the grid is
+ * mapped from it. Otherwise, or if the file was computed from different text
+ * inputs or options, the grid is computed from the text inputs and saved on
+ * such file
+ * @param folder The folder to look for the text inputs in
+ * @param env The environment options
+ * @param _log Log pointer to allow logging from this function
+ * @return std::unique_ptr<WaveGrid> A wave grid object containing the
+ * precalculated wave data
+ * @throws moordyn::input_file_error If the binary file is not valid
+ */
+std::unique_ptr<WaveGrid>
+constructWaveGrid(const std::string& folder,
+                  const EnvCondRef env,
+                  moordyn::Log* _log);
+
+/**
+ * @brief Does the setup for the grid current modes, CURRENTS_STEADY_GRID,
+ * CURRENTS_DYNAMIC_GRID and CURRENTS_4D
+ *
+ * If the CurrentGridFile option is set and the file exists, the grid is
+ * mapped from it. Otherwise, or if the file was computed from different text
+ * inputs or options, the grid is read from the text inputs and saved on such
+ * file
+ * @param folder The folder to look for the text inputs in
+ * @param env The environment options
+ * @param _log Log pointer to allow logging from this function
+ * @return std::unique_ptr<CurrentGrid> A current grid object containing the
+ * precalculated current data
+ * @throws moordyn::input_file_error If the binary file is not valid
+ */
+std::unique_ptr<CurrentGrid>
+constructCurrentGrid(const std::string& folder,
+                     const EnvCondRef env,
+                     moordyn::Log* _log);
 }
 }
@@ -1,6 +1,8 @@
 
 #pragma once
 
+#include <string>
+
 namespace moordyn {
 namespace waves {
 
@@ -80,19 +82,55 @@ struct WaterKinOptions
 	bool unifyCurrentGrid;
 	/// dtWaveOption
 	double dtWave;
+	/**
+	 * WavePhaseTol Option
+	 *
+	 * Maximum phase error (rad) allowed when the component summing waves
+	 * (WaveKin = 7) are evaluated at the nodes rotating the phasors of the
+	 * previous evaluation. 0 means to evaluate the phases exactly
+	 */
+	double phaseTol;
+	/**
+	 * WavePruneTol Option
+	 *
+	 * Maximum relative error on the variances of the surface elevation and
+	 * the velocity when the least energetic components of the component
+	 * summing waves (WaveKin = 7) are dropped. 0 means to keep all the
+	 * components
+	 */
+	double pruneTol;
+	/**
+	 * WaveGridFile Option
+	 *
+	 * Binary file storing the wave grid kinematics (WaveKin = 2 or 3). If the
+	 * file exists it is memory mapped, otherwise it is written after
+	 * computing the kinematics from the text inputs. Empty to not use it
+	 */
+	std::string waveGridFile;
+	/**
+	 * CurrentGridFile Option
+	 *
+	 * Binary file storing the current grid kinematics (Currents = 1, 2 or 5).
+	 * If the file exists it is memory mapped, otherwise it is written after
+	 * reading the text inputs. Empty to not use it
+	 */
+	std::string currentGridFile;
 
 	/**
 	 * @brief Construct a new Water Kin Options object with default values
 	 *
 	 * By default waves and currents are off,
 	 * the update frequency is at every substep,
-	 * and to unify wave and current grids
+	 * to unify wave and current grids, to evaluate the wave phases exactly, and
+	 * to keep all the wave components
 	 */
 	WaterKinOptions()
 	  : waveMode(WAVES_NONE)
 	  , currentMode(CURRENTS_NONE)
 	  , unifyCurrentGrid(true)
 	  , dtWave(0.25)
+	  , phaseTol(0.0)
+	  , pruneTol(0.0)
 	{
 	}
 };
@@ -2,8 +2,11 @@
 #include "Misc.hpp"
 #include "Waves/WaveSpectrum.hpp"
 #include "Util/Interp.hpp"
+#include "Waves.h"
+#include <algorithm>
 #include <cmath>
 #include <limits>
+#include <numeric>
 
 namespace moordyn {
 
@@ -69,6 +72,70 @@ DiscreteWaveSpectrum::interpEvenlySpaced()
 	return freqComps;
 }
 
+unsigned int
+DiscreteWaveSpectrum::prune(real tol,
+                            real g,
+                            real depth,
+                            real& err_zeta,
+                            real& err_u)
+{
+	err_zeta = err_u = 0.0;
+	const auto n = components.size();
+	// Twice the variances of the surface elevation, a^2, and of the velocity
+	// at the surface, (omega a)^2 (1 + coth^2(k h)), of each component
+	std::vector<real> e_zeta(n), e_u(n);
+	for (unsigned int i = 0; i < n; i++) {
+		const auto& comp = components[i];
+		const real a2 = std::norm(comp.amplitude);
+		e_zeta[i] = a2;
+		e_u[i] = 0.0;
+		if (comp.omega == 0.0)
+			continue;
+		const real k = WaveNumber(comp.omega, g, depth);
+		const real coth = 1.0 / tanh(k * depth);
+		e_u[i] = comp.omega * comp.omega * a2 * (1.0 + coth * coth);
+	}
+	const real var_zeta = std::accumulate(e_zeta.begin(), e_zeta.end(), 0.0);
+	const real var_u = std::accumulate(e_u.begin(), e_u.end(), 0.0);
+	if ((tol <= 0.0) || (var_zeta <= 0.0) || (var_u <= 0.0))
+		return 0;
+
+	// Rank the components by their largest relative contribution
+	std::vector<real> score(n);
+	for (unsigned int i = 0; i < n; i++)
+		score[i] = (std::max)(e_zeta[i] / var_zeta, e_u[i] / var_u);
+	std::vector<unsigned int> order(n);
+	std::iota(order.begin(), order.end(), 0);
+	std::stable_sort(order.begin(), order.end(), [&](auto a, auto b) {
+		return score[a] < score[b];
+	});
+
+	std::vector<bool> removed(n, false);
+	unsigned int n_removed = 0;
+	for (auto i : order) {
+		// At least one component is kept
+		if (n_removed + 1 >= n)
+			break;
+		const real new_err_zeta = err_zeta + e_zeta[i] / var_zeta;
+		const real new_err_u = err_u + e_u[i] / var_u;
+		if ((new_err_zeta > tol) || (new_err_u > tol))
+			break;
+		err_zeta = new_err_zeta;
+		err_u = new_err_u;
+		removed[i] = true;
+		n_removed++;
+	}
+
+	std::vector<FrequencyComponent> kept;
+	kept.reserve(n - n_removed);
+	for (unsigned int i = 0; i < n; i++) {
+		if (!removed[i])
+			kept.push_back(components[i]);
+	}
+	components = std::move(kept);
+	return n_removed;
+}
+
 moordyn::waves::DiscreteWaveSpectrum
 spectrumFromFile(const std::string& path, moordyn::Log* _log)
 {
@@ -125,6 +125,29 @@ class DiscreteWaveSpectrum
 	 */
 	std::vector<FrequencyComponent> interpEvenlySpaced();
 
+	/**
+	 * @brief Drop the frequency components carrying the least energy
+	 *
+	 * The components are ranked by their contribution to the variance of the
+	 * surface elevation and to the variance of the water velocity at the
+	 * surface, and the least energetic ones are removed while the variance
+	 * removed from both stays below the tolerance. The remaining components
+	 * keep their order.
+	 *
+	 * @param tol Maximum relative error on the variances
+	 * @param g Gravity acceleration
+	 * @param depth Positive water depth
+	 * @param err_zeta Achieved relative error on the variance of the surface
+	 * elevation
+	 * @param err_u Achieved relative error on the variance of the velocity
+	 * @return The number of removed components
+	 */
+	unsigned int prune(real tol,
+	                   real g,
+	                   real depth,
+	                   real& err_zeta,
+	                   real& err_u);
+
   private:
 	/// List of frequency components
 	std::vector<FrequencyComponent> components;
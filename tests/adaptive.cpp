@@ -0,0 +1,118 @@
+/*
+ * Copyright (c) 2023 Jose Luis Cercos-Pita <jlc@core-marine.com>
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice,
+ * this list of conditions and the following disclaimer.
+ *
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions and the following disclaimer in the documentation
+ *    and/or other materials provided with the distribution.
+ *
+ * 3. Neither the name of the copyright holder nor the names of its
+ *    contributors may be used to endorse or promote products derived from
+ *    this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+
+/** @file adaptive.cpp
+ * Tests ran with the adaptive time step schemes
+ */
+
+#define _USE_MATH_DEFINES
+
+#include "MoorDyn2.h"
+#include <cmath>
+#include <string>
+#include <vector>
+#include <catch2/catch_test_macros.hpp>
+#include "util.h"
+
+/// Coupling time step
+#define DT 0.1
+/// Simulated time
+#define T_END 5.0
+/// Surge motion amplitude
+#define AMPLITUDE 5.0
+/// Surge motion period
+#define PERIOD 8.0
+
+/** @brief Move the fairleads of the lines, returning the final positions of
+ * all the nodes
+ * @param scheme The time scheme
+ * @param cfl The CFL factor
+ * @return The positions of all the nodes
+ */
+std::vector<double>
+surge(const std::string& scheme, double cfl)
+{
+	MoorDyn system = MoorDyn_Create("Mooring/lines.txt");
+	REQUIRE(system);
+	unsigned int n_dof;
+	REQUIRE(MoorDyn_NCoupledDOF(system, &n_dof) == MOORDYN_SUCCESS);
+	REQUIRE(n_dof == 9);
+	std::vector<double> x0(n_dof), x(n_dof), v(n_dof, 0.0), f(n_dof);
+	for (unsigned int i = 0; i < 3; i++) {
+		const auto point = MoorDyn_GetPoint(system, i + 4);
+		REQUIRE(MoorDyn_GetPointPos(point, x0.data() + 3 * i) ==
+		        MOORDYN_SUCCESS);
+	}
+	REQUIRE(MoorDyn_Init(system, x0.data(), v.data()) == MOORDYN_SUCCESS);
+	REQUIRE(MoorDyn_SetTimeScheme(system, scheme.c_str()) == MOORDYN_SUCCESS);
+	REQUIRE(MoorDyn_SetCFL(system, cfl) == MOORDYN_SUCCESS);
+
+	const double w = 2.0 * M_PI / PERIOD;
+	double t = 0.0;
+	for (unsigned int i = 0; i < (unsigned int)std::round(T_END / DT); i++) {
+		double dt = DT;
+		const double t_next = (i + 1) * DT;
+		x = x0;
+		for (unsigned int j = 0; j < n_dof; j += 3) {
+			x[j] += AMPLITUDE * sin(w * t_next);
+			v[j] = AMPLITUDE * w * cos(w * t_next);
+		}
+		REQUIRE(MoorDyn_Step(system, x.data(), v.data(), f.data(), &t, &dt) ==
+		        MOORDYN_SUCCESS);
+		// The coupling time shall be exactly reached
+		REQUIRE(std::abs(t - t_next) < 1e-10);
+	}
+
+	std::vector<double> r;
+	for (unsigned int i = 1; i <= 3; i++) {
+		const auto line = MoorDyn_GetLine(system, i);
+		unsigned int n_nodes;
+		REQUIRE(MoorDyn_GetLineNumberNodes(line, &n_nodes) == MOORDYN_SUCCESS);
+		for (unsigned int j = 0; j < n_nodes; j++) {
+			double pos[3];
+			REQUIRE(MoorDyn_GetLineNodePos(line, j, pos) == MOORDYN_SUCCESS);
+			r.insert(r.end(), pos, pos + 3);
+		}
+	}
+	REQUIRE(MoorDyn_Close(system) == MOORDYN_SUCCESS);
+	return r;
+}
+
+TEST_CASE("Adaptive schemes with a large maximum time step")
+{
+	// The RK4 scheme with the default time step, dtM = 0.002 s, as reference
+	const auto r_ref = surge("RK4", 0.0157);
+	// The adaptive schemes are taking a 4 times larger time step as the
+	// maximum one, reducing it as much as required
+	for (auto scheme : { "RK23", "RK45" }) {
+		INFO("Time scheme " << scheme);
+		REQUIRE(max_diff(surge(scheme, 0.06), r_ref) < 0.01);
+	}
+}
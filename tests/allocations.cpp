@@ -0,0 +1,212 @@
+/*
+ * Copyright (c) 2023 Jose Luis Cercos-Pita <jlc@core-marine.com>
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice,
+ * this list of conditions and the following disclaimer.
+ *
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions and the following disclaimer in the documentation
+ *    and/or other materials provided with the distribution.
+ *
+ * 3. Neither the name of the copyright holder nor the names of its
+ *    contributors may be used to endorse or promote products derived from
+ *    this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+
+/** @file allocations.cpp
+ * Check that the time integration does not allocate memory once the system
+ * has been initialized
+ */
+
+#include "MoorDyn2.h"
+#include <array>
+#include <atomic>
+#include <cstdlib>
+#include <new>
+#include <string>
+#include <vector>
+#include <catch2/catch_test_macros.hpp>
+
+/// Whether the allocations shall be counted or not
+static std::atomic<bool> counting(false);
+/// Number of allocations counted so far
+static std::atomic<unsigned long> allocations(0);
+
+/** @brief Count an allocation, if the counter is enabled
+ */
+static inline void
+count_allocation()
+{
+	if (counting)
+		allocations++;
+}
+
+#ifdef __GLIBC__
+// On glibc we can hook malloc itself, so the Eigen allocations, which are
+// not using the new operator, are caught as well
+extern "C"
+{
+	void* __libc_malloc(size_t size);
+	void* __libc_calloc(size_t n, size_t size);
+	void* __libc_realloc(void* ptr, size_t size);
+
+	void* malloc(size_t size)
+	{
+		count_allocation();
+		return __libc_malloc(size);
+	}
+
+	void* calloc(size_t n, size_t size)
+	{
+		count_allocation();
+		return __libc_calloc(n, size);
+	}
+
+	void* realloc(void* ptr, size_t size)
+	{
+		count_allocation();
+		return __libc_realloc(ptr, size);
+	}
+}
+#else
+void*
+operator new(std::size_t size)
+{
+	count_allocation();
+	void* ptr = std::malloc(size ? size : 1);
+	if (!ptr)
+		throw std::bad_alloc();
+	return ptr;
+}
+
+void
+operator delete(void* ptr) noexcept
+{
+	std::free(ptr);
+}
+
+void
+operator delete(void* ptr, std::size_t) noexcept
+{
+	std::free(ptr);
+}
+#endif
+
+/** @brief Count the allocations carried out on the steady state stepping
+ * @param filepath The input file
+ * @param scheme The time scheme, empty to keep the input file option
+ * @param n_threads The number of threads, 0 to keep the input file option
+ * @return The number of allocations
+ */
+unsigned long
+steady_state_allocations(const char* filepath,
+                         const std::string& scheme = "",
+                         unsigned int n_threads = 0)
+{
+	MoorDyn system = MoorDyn_Create(filepath);
+	REQUIRE(system);
+	if (!scheme.empty())
+		REQUIRE(MoorDyn_SetTimeScheme(system, scheme.c_str()) ==
+		        MOORDYN_SUCCESS);
+	if (n_threads)
+		REQUIRE(MoorDyn_SetThreads(system, n_threads) == MOORDYN_SUCCESS);
+	unsigned int n_dof;
+	REQUIRE(MoorDyn_NCoupledDOF(system, &n_dof) == MOORDYN_SUCCESS);
+	std::vector<double> x(n_dof, 0.0), v(n_dof, 0.0), f(n_dof, 0.0);
+	// The considered systems are just coupled by points
+	unsigned int n_points, n_coupled = 0;
+	REQUIRE(MoorDyn_GetNumberPoints(system, &n_points) == MOORDYN_SUCCESS);
+	for (unsigned int i = 1; i <= n_points; i++) {
+		const auto point = MoorDyn_GetPoint(system, i);
+		int t;
+		REQUIRE(MoorDyn_GetPointType(point, &t) == MOORDYN_SUCCESS);
+		if (t != -1)
+			continue;
+		REQUIRE(MoorDyn_GetPointPos(point, x.data() + 3 * n_coupled++) ==
+		        MOORDYN_SUCCESS);
+	}
+	REQUIRE(3 * n_coupled == n_dof);
+	REQUIRE(MoorDyn_Init(system, x.data(), v.data()) == MOORDYN_SUCCESS);
+
+	// The first step is not considered, since the integrator might still be
+	// setting up its own data
+	double t = 0.0, dt = 0.01;
+	REQUIRE(MoorDyn_Step(system, x.data(), v.data(), f.data(), &t, &dt) ==
+	        MOORDYN_SUCCESS);
+	// The results are checked afterwards, so the assertions themselves are
+	// not counted
+	std::array<int, 5> errs;
+	allocations = 0;
+	counting = true;
+	for (unsigned int i = 0; i < errs.size(); i++)
+		errs[i] = MoorDyn_Step(system, x.data(), v.data(), f.data(), &t, &dt);
+	counting = false;
+	for (auto err : errs)
+		REQUIRE(err == MOORDYN_SUCCESS);
+	REQUIRE(MoorDyn_Close(system) == MOORDYN_SUCCESS);
+	return allocations;
+}
+
+TEST_CASE("The allocations hook is working")
+{
+	counting = true;
+	auto ptr = new std::vector<double>(16, 0.0);
+	counting = false;
+	REQUIRE(allocations > 0);
+	delete ptr;
+}
+
+TEST_CASE("Lines and points stepping without allocations")
+{
+	for (auto scheme : { "Euler",
+	                     "Heun",
+	                     "RK2",
+	                     "RK4",
+	                     "RK23",
+	                     "RK45",
+	                     "MRK2",
+	                     "MRK4",
+	                     "AB3",
+	                     "BEuler5",
+	                     "Midpoint5",
+	                     "Anderson5",
+	                     "ACA5",
+	                     "Wilson5",
+	                     "Newton5" }) {
+		INFO("Time scheme " << scheme);
+		REQUIRE(steady_state_allocations("Mooring/lines.txt", scheme) == 0);
+	}
+}
+
+TEST_CASE("Rods and bodies stepping without allocations")
+{
+	REQUIRE(steady_state_allocations("Mooring/BodiesAndRods.dat") == 0);
+	REQUIRE(steady_state_allocations("Mooring/pendulum.txt") == 0);
+}
+
+TEST_CASE("Several threads stepping without allocations")
+{
+	REQUIRE(steady_state_allocations("Mooring/farm.txt", "", 3) == 0);
+}
+
+TEST_CASE("Waves stepping without allocations")
+{
+	REQUIRE(steady_state_allocations("Mooring/wavekin_7/wavekin_7.txt") == 0);
+	REQUIRE(steady_state_allocations(
+	            "Mooring/wavekin_7/wavekin_7_phasors.txt") == 0);
+}
@@ -135,6 +135,20 @@ main(int narg, char** arg)
 		printf("MoorDyn_Step() test failed...");
 		return 255;
 	}
+	ret_code = MoorDyn_StepMany(NULL, 0, NULL, NULL, 0.0, 0.0, NULL);
+	if (ret_code != MOORDYN_INVALID_VALUE) {
+		printf("MoorDyn_StepMany() test failed...");
+		return 255;
+	}
+	ret_code = MoorDyn_SetThreads(NULL, 2);
+	if (ret_code != MOORDYN_INVALID_VALUE) {
+		printf("MoorDyn_SetThreads() test failed...");
+		return 255;
+	}
+	if (MoorDyn_Clone(NULL)) {
+		printf("MoorDyn_Clone() test failed...");
+		return 255;
+	}
 	ret_code = MoorDyn_Close(NULL);
 	if (ret_code != MOORDYN_INVALID_VALUE) {
 		printf("MoorDyn_Close() test failed...");
@@ -220,6 +234,21 @@ main(int narg, char** arg)
 		printf("MoorDyn_GetLine() test failed...");
 		return 255;
 	}
+	ret_code = MoorDyn_GetSnapshotSize(NULL, &un, &un);
+	if (ret_code != MOORDYN_INVALID_VALUE) {
+		printf("MoorDyn_GetSnapshotSize() test failed...");
+		return 255;
+	}
+	ret_code = MoorDyn_GetSnapshotLayout(NULL, NULL, NULL, NULL, NULL);
+	if (ret_code != MOORDYN_INVALID_VALUE) {
+		printf("MoorDyn_GetSnapshotLayout() test failed...");
+		return 255;
+	}
+	ret_code = MoorDyn_GetSystemSnapshot(NULL, NULL, NULL, NULL);
+	if (ret_code != MOORDYN_INVALID_VALUE) {
+		printf("MoorDyn_GetSystemSnapshot() test failed...");
+		return 255;
+	}
 	ret_code = MoorDyn_GetFASTtens(NULL, &n, NULL, NULL, NULL, NULL);
 	if (ret_code != MOORDYN_INVALID_VALUE) {
 		printf("MoorDyn_GetFASTtens() test failed...");
@@ -532,6 +561,12 @@ main(int narg, char** arg)
 		printf("MoorDyn_GetWavesKin() test failed...");
 		return 255;
 	}
+	ret_code = MoorDyn_GetWavesKinArray(
+	    NULL, 0, NULL, NULL, NULL, NULL, NULL, NULL, NULL, 1);
+	if (ret_code != MOORDYN_INVALID_VALUE) {
+		printf("MoorDyn_GetWavesKinArray() test failed...");
+		return 255;
+	}
 	double k = WaveNumber(0.0, 0.0, 0.0);
 
 	return 0;
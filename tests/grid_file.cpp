@@ -0,0 +1,183 @@
+/*
+ * Copyright (c) 2023 Jose Luis Cercos-Pita <jlc@core-marine.com>
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice,
+ * this list of conditions and the following disclaimer.
+ *
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions and the following disclaimer in the documentation
+ *    and/or other materials provided with the distribution.
+ *
+ * 3. Neither the name of the copyright holder nor the names of its
+ *    contributors may be used to endorse or promote products derived from
+ *    this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+
+/** @file grid_file.cpp
+ * Tests on the memory mapped binary wave and current grids
+ */
+
+#include "MoorDyn2.h"
+#include <cmath>
+#include <filesystem>
+#include <fstream>
+#include <string>
+#include <vector>
+#include <catch2/catch_test_macros.hpp>
+
+/// The number of points on each direction where the kinematics are sampled
+#define NSAMPLES 7
+
+/** @brief Sample the wave and current kinematics
+ * @param input The input file
+ * @param data The sampled velocities, accelerations, wave elevations and
+ * dynamic pressures
+ */
+void
+sample(const std::string& input, std::vector<double>& data)
+{
+	MoorDyn system = MoorDyn_Create(input.c_str());
+	REQUIRE(system);
+	// The waves are set up at the initialization
+	double r[3] = { 0.0, 0.0, 0.0 }, v[3] = { 0.0, 0.0, 0.0 };
+	REQUIRE(MoorDyn_Init_NoIC(system, r, v) == MOORDYN_SUCCESS);
+	MoorDynWaves waves = MoorDyn_GetWaves(system);
+	REQUIRE(waves);
+
+	// Points out of the grid nodes and also beyond its bounds, at several
+	// time instants out of the time series ones
+	std::vector<double> pos, t;
+	for (unsigned int i = 0; i < NSAMPLES; i++) {
+		for (unsigned int j = 0; j < NSAMPLES; j++) {
+			for (unsigned int k = 0; k < NSAMPLES; k++) {
+				pos.push_back(-460.0 + i * 83.3);
+				pos.push_back(-3.0 + j * 1.05);
+				pos.push_back(-52.0 + k * 9.1);
+				t.push_back(0.37 * (i + j + k));
+			}
+		}
+	}
+	const unsigned int n = t.size();
+	data.assign(8 * n, 0.0);
+	REQUIRE(MoorDyn_GetWavesKinArray(waves,
+	                                 n,
+	                                 pos.data(),
+	                                 t.data(),
+	                                 data.data(),
+	                                 data.data() + 3 * n,
+	                                 data.data() + 6 * n,
+	                                 data.data() + 7 * n,
+	                                 NULL,
+	                                 1) == MOORDYN_SUCCESS);
+	REQUIRE(MoorDyn_Close(system) == MOORDYN_SUCCESS);
+}
+
+/** @brief Check that the mapped grids give the same kinematics than the ones
+ * read from the text files
+ * @param name The input file name, without the "_mapped.txt" suffix
+ */
+void
+compare(const std::string& name)
+{
+	const std::string prefix = "Mooring/wavekin_2/" + name;
+	std::filesystem::remove(prefix + ".waves");
+	std::filesystem::remove(prefix + ".currents");
+
+	std::vector<double> ref, saved, mapped;
+	sample(prefix + ".txt", ref);
+	// The first run converts the text inputs
+	sample(prefix + "_mapped.txt", saved);
+	REQUIRE(std::filesystem::exists(prefix + ".waves"));
+	REQUIRE(std::filesystem::exists(prefix + ".currents"));
+	// The next ones map the binary files, which shall be left untouched
+	sample(prefix + "_mapped.txt", mapped);
+	sample(prefix + "_mapped.txt", mapped);
+
+	REQUIRE(saved.size() == ref.size());
+	REQUIRE(mapped.size() == ref.size());
+	double norm = 0.0;
+	for (unsigned int i = 0; i < ref.size(); i++) {
+		REQUIRE(saved[i] == ref[i]);
+		REQUIRE(mapped[i] == ref[i]);
+		norm += std::abs(ref[i]);
+	}
+	// Just to be sure that there is something to compare
+	REQUIRE(norm > 0.0);
+
+	std::filesystem::remove(prefix + ".waves");
+	std::filesystem::remove(prefix + ".currents");
+}
+
+TEST_CASE("Separated wave and current grids")
+{
+	compare("wavekin_3_curr5");
+}
+
+TEST_CASE("Currents unified on the mapped wave grid")
+{
+	// The currents are added to the wave grid after saving it. The mapping is
+	// private, so such additions never reach the file
+	compare("wavekin_2_curr2");
+}
+
+TEST_CASE("Stale grid files")
+{
+	// Grid files computed from other inputs shall be replaced
+	const std::string other = "Mooring/wavekin_2/wavekin_2_curr2";
+	const std::string prefix = "Mooring/wavekin_2/wavekin_3_curr5";
+	std::vector<double> ref, data;
+	sample(other + "_mapped.txt", data);
+	std::filesystem::copy_file(
+	    other + ".waves",
+	    prefix + ".waves",
+	    std::filesystem::copy_options::overwrite_existing);
+	std::filesystem::copy_file(
+	    other + ".currents",
+	    prefix + ".currents",
+	    std::filesystem::copy_options::overwrite_existing);
+
+	sample(prefix + ".txt", ref);
+	sample(prefix + "_mapped.txt", data);
+	REQUIRE(data.size() == ref.size());
+	for (unsigned int i = 0; i < ref.size(); i++)
+		REQUIRE(data[i] == ref[i]);
+	// The replaced files shall be mapped on the next runs
+	sample(prefix + "_mapped.txt", data);
+	for (unsigned int i = 0; i < ref.size(); i++)
+		REQUIRE(data[i] == ref[i]);
+
+	for (auto name : { other, prefix }) {
+		std::filesystem::remove(name + ".waves");
+		std::filesystem::remove(name + ".currents");
+	}
+}
+
+TEST_CASE("Invalid grid file")
+{
+	const std::string prefix = "Mooring/wavekin_2/wavekin_3_curr5";
+	std::filesystem::remove(prefix + ".currents");
+	{
+		std::ofstream f(prefix + ".waves", std::ios::binary);
+		f << "This is not a grid file";
+	}
+	MoorDyn system = MoorDyn_Create((prefix + "_mapped.txt").c_str());
+	REQUIRE(system);
+	double r[3] = { 0.0, 0.0, 0.0 }, v[3] = { 0.0, 0.0, 0.0 };
+	REQUIRE(MoorDyn_Init_NoIC(system, r, v) != MOORDYN_SUCCESS);
+	REQUIRE(MoorDyn_Close(system) == MOORDYN_SUCCESS);
+	std::filesystem::remove(prefix + ".waves");
+}
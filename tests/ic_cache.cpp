@@ -0,0 +1,188 @@
+/*
+ * Copyright (c) 2023 Jose Luis Cercos-Pita <jlc@core-marine.com>
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice,
+ * this list of conditions and the following disclaimer.
+ *
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions and the following disclaimer in the documentation
+ *    and/or other materials provided with the distribution.
+ *
+ * 3. Neither the name of the copyright holder nor the names of its
+ *    contributors may be used to endorse or promote products derived from
+ *    this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+
+/** @file ic_cache.cpp
+ * Tests on the on-disk initial conditions cache
+ */
+
+#include "MoorDyn2.h"
+#include <filesystem>
+#include <fstream>
+#include <set>
+#include <string>
+#include <catch2/catch_test_macros.hpp>
+
+/// The input file
+#define INPUT "Mooring/WD0200_Chain_Cache.txt"
+/// The cache folder, as set on the input file
+#define CACHE "Mooring/ic_cache/"
+/// An input file derived from INPUT, with a 3D seafloor
+#define SEAFLOOR_INPUT "Mooring/WD0200_Chain_Cache_Seafloor.txt"
+/// The 3D seafloor file
+#define SEAFLOOR "Mooring/WD0200_Chain_Cache_Seafloor.dat"
+
+/** @brief Compute the initial condition and get the fairlead force
+ * @param x The fairlead surge
+ * @param f The fairlead force at the initial condition
+ * @param filepath The input file
+ */
+void
+init(double x, double f[3], const char* filepath = INPUT)
+{
+	MoorDyn system = MoorDyn_Create(filepath);
+	REQUIRE(system);
+	double r[3] = { x, 0.0, 0.0 }, v[3] = { 0.0, 0.0, 0.0 };
+	REQUIRE(MoorDyn_Init(system, r, v) == MOORDYN_SUCCESS);
+	const auto point = MoorDyn_GetPoint(system, 2);
+	REQUIRE(point);
+	REQUIRE(MoorDyn_GetPointForce(point, f) == MOORDYN_SUCCESS);
+	REQUIRE(MoorDyn_Close(system) == MOORDYN_SUCCESS);
+}
+
+/** @brief Get the cache entries
+ * @return The entries file names
+ */
+std::set<std::string>
+entries()
+{
+	std::set<std::string> names;
+	for (const auto& f : std::filesystem::directory_iterator(CACHE))
+		names.insert(f.path().filename().string());
+	return names;
+}
+
+TEST_CASE("Cache hit")
+{
+	std::filesystem::remove_all(CACHE);
+	double f0[3], f1[3], f2[3];
+	init(0.0, f0);
+	REQUIRE(entries().size() == 1);
+
+	// The restored initial condition is exactly the computed one
+	init(0.0, f1);
+	REQUIRE(entries().size() == 1);
+	for (unsigned int i = 0; i < 3; i++)
+		REQUIRE(f1[i] == f0[i]);
+
+	// Positions below the rounding reuse the same entry
+	init(1.0e-4, f2);
+	REQUIRE(entries().size() == 1);
+	for (unsigned int i = 0; i < 3; i++)
+		REQUIRE(f2[i] == f0[i]);
+	std::filesystem::remove_all(CACHE);
+}
+
+TEST_CASE("LRU eviction")
+{
+	std::filesystem::remove_all(CACHE);
+	double f[3];
+	init(0.0, f);
+	const auto a = entries();
+	REQUIRE(a.size() == 1);
+	init(1.0, f);
+	const auto ab = entries();
+	REQUIRE(ab.size() == 2);
+
+	// Use the first entry again, so the second one becomes the least recently
+	// used one, which is evicted when the third one does not fit
+	init(0.0, f);
+	REQUIRE(entries() == ab);
+	init(2.0, f);
+	const auto ac = entries();
+	REQUIRE(ac.size() == 2);
+	REQUIRE(ac.count(*a.begin()) == 1);
+	for (auto name : ab)
+		if (name != *a.begin())
+			REQUIRE(ac.count(name) == 0);
+	std::filesystem::remove_all(CACHE);
+}
+
+/** @brief Write the input file with a 3D seafloor
+ * @param title The input file title
+ * @param extra_spaces Spaces added between the columns, and at the end of
+ * the lines
+ * @param depth The seafloor depth
+ */
+void
+write_seafloor_input(const std::string& title,
+                     const std::string& extra_spaces,
+                     double depth)
+{
+	std::ifstream in(INPUT);
+	std::ofstream out(SEAFLOOR_INPUT);
+	std::string line;
+	unsigned int i = 0;
+	while (std::getline(in, line)) {
+		if (i++ == 1)
+			line = title;
+		else if (line.find("FrictionCoefficient") != std::string::npos)
+			out << SEAFLOOR << "   SeafloorFile   seafloor" << std::endl;
+		if (line.find("---") != std::string::npos) {
+			out << line << std::endl;
+			continue;
+		}
+		std::string spaced;
+		for (auto c : line)
+			spaced += (c == ' ') ? " " + extra_spaces : std::string(1, c);
+		out << spaced << extra_spaces << std::endl;
+	}
+	std::ofstream seafloor(SEAFLOOR);
+	seafloor << "2 2" << std::endl
+	         << "-1000.0 1000.0" << std::endl
+	         << "-1000.0 1000.0" << std::endl;
+	for (auto x : { -1000.0, 1000.0 })
+		for (auto y : { -1000.0, 1000.0 })
+			seafloor << x << " " << y << " " << -depth << std::endl;
+}
+
+TEST_CASE("Cache keys")
+{
+	std::filesystem::remove_all(CACHE);
+	double f0[3], f1[3];
+	write_seafloor_input("A title", "", 200.0);
+	init(0.0, f0, SEAFLOOR_INPUT);
+	const auto a = entries();
+	REQUIRE(a.size() == 1);
+
+	// Neither the comments nor the whitespace are affecting the key
+	write_seafloor_input("Another title", "  ", 200.0);
+	init(0.0, f1, SEAFLOOR_INPUT);
+	REQUIRE(entries() == a);
+	for (unsigned int i = 0; i < 3; i++)
+		REQUIRE(f1[i] == f0[i]);
+
+	// While the files the input file refers to are affecting it
+	write_seafloor_input("A title", "", 201.0);
+	init(0.0, f1, SEAFLOOR_INPUT);
+	REQUIRE(entries().size() == 2);
+	std::filesystem::remove_all(CACHE);
+	std::filesystem::remove(SEAFLOOR_INPUT);
+	std::filesystem::remove(SEAFLOOR);
+}
@@ -0,0 +1,114 @@
+/*
+ * Copyright (c) 2023 Jose Luis Cercos-Pita <jlc@core-marine.com>
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice,
+ * this list of conditions and the following disclaimer.
+ *
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions and the following disclaimer in the documentation
+ *    and/or other materials provided with the distribution.
+ *
+ * 3. Neither the name of the copyright holder nor the names of its
+ *    contributors may be used to endorse or promote products derived from
+ *    this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+
+/** @file line_kernels.cpp
+ * Check that the node by node and the batched lines kernels are computing
+ * the same state derivatives
+ */
+
+#include "MoorDyn2.hpp"
+#include <string>
+#include <vector>
+#include <catch2/catch_test_macros.hpp>
+
+/** @brief Compute the lines state derivatives with both kernels, after a
+ * short simulation, and check they are matching
+ * @param filepath The input file
+ * @param skip_ic true to skip computing the initial condition
+ */
+void
+compare_kernels(const char* filepath, bool skip_ic = true)
+{
+	moordyn::MoorDyn system(filepath, MOORDYN_NO_OUTPUT);
+	const unsigned int n_dof = system.NCoupledDOF();
+	std::vector<double> x(n_dof, 0.0), v(n_dof, 0.0), f(n_dof, 0.0);
+	unsigned int i_dof = 0;
+	for (auto point : system.GetPoints()) {
+		if (point->type != moordyn::Point::COUPLED)
+			continue;
+		const auto r = point->getPosition();
+		for (unsigned int j = 0; j < 3; j++)
+			x[i_dof++] = r[j];
+	}
+	REQUIRE(i_dof == n_dof);
+	REQUIRE(system.Init(x.data(), v.data(), skip_ic) == MOORDYN_SUCCESS);
+	double t = 0.0, dt = 0.05;
+	REQUIRE(system.Step(x.data(), v.data(), f.data(), t, dt) ==
+	        MOORDYN_SUCCESS);
+
+	for (auto line : system.GetLines()) {
+		INFO("Line " << line->number);
+		REQUIRE(line->isBatched() ==
+		        (line->getN() >= moordyn::Line::BATCH_MIN_SEGMENTS));
+		const unsigned int n = line->getN() - 1;
+		Eigen::Matrix3Xr u_ref(3, n), a_ref(3, n), u(3, n), a(3, n);
+		line->setBatched(false);
+		line->getStateDeriv(u_ref, a_ref);
+		line->setBatched(true);
+		line->getStateDeriv(u, a);
+		REQUIRE(u == u_ref);
+		// The accelerations are computed with a different arithmetic, so they
+		// are just equal up to the round-off errors of the forces, which
+		// might be way larger than the accelerations close to the equilibrium.
+		// The tension is specially sensitive, since a round-off error on the
+		// stretched length is scaled by the stiffness
+		const moordyn::real EA = line->getConstantEA();
+		for (unsigned int i = 0; i < n; i++) {
+			INFO("Node " << i + 1);
+			const moordyn::real force =
+			    2.0 * line->getNodeTen(i + 1).norm() +
+			    line->getNodeBendStiff(i + 1).norm() +
+			    line->getNodeWeight(i + 1).norm();
+			const moordyn::real mass = line->getNodeM(i + 1).diagonal().minCoeff();
+			const moordyn::real tol = 1e-12 * (1.0 + (force + EA) / mass);
+			REQUIRE((a.col(i) - a_ref.col(i)).norm() <= tol);
+		}
+	}
+}
+
+TEST_CASE("Batched kernel on hanging lines")
+{
+	compare_kernels("Mooring/lines.txt");
+}
+
+TEST_CASE("Batched kernel with bending stiffness")
+{
+	compare_kernels("Mooring/BeamCantilevered.txt", false);
+}
+
+TEST_CASE("Batched kernel with nonlinear stiffness and damping")
+{
+	compare_kernels("Mooring/polyester/simple.txt");
+}
+
+TEST_CASE("Batched kernel on a 3D seafloor")
+{
+	compare_kernels("Mooring/seafloor.txt");
+}
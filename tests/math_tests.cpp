@@ -2,6 +2,10 @@
 #include <sstream>
 
 #include "Misc.hpp"
+#include "Util/Grid4D.hpp"
+#include "Util/Interp.hpp"
+#include <cmath>
+#include <vector>
 #include <catch2/catch_test_macros.hpp>
 #include "catch2/catch_tostring.hpp"
 #include "catch2/matchers/catch_matchers_templated.hpp"
@@ -211,3 +215,39 @@ TEST_CASE("rotateMass simple")
 
 	REQUIRE_THAT(acc, IsClose(expectedAcc));
 }
+
+TEST_CASE("Grid4D interpolation matches the nested storage")
+{
+	const unsigned int ni = 3, nj = 4, nk = 5, nl = 6;
+	Grid4D<vec3> grid(ni, nj, nk, nl, vec3::Zero());
+	Grid4D<md::real> grid3(ni, nj, 1, nl, 0.0);
+	std::vector<std::vector<std::vector<std::vector<vec3>>>> nested(
+	    ni,
+	    std::vector<std::vector<std::vector<vec3>>>(
+	        nj, std::vector<std::vector<vec3>>(nk, std::vector<vec3>(nl))));
+	std::vector<std::vector<std::vector<md::real>>> nested3(
+	    ni, std::vector<std::vector<md::real>>(nj, std::vector<md::real>(nl)));
+	for (unsigned int i = 0; i < ni; i++) {
+		for (unsigned int j = 0; j < nj; j++) {
+			for (unsigned int l = 0; l < nl; l++) {
+				const md::real z = sin(i + 2.0 * j + 3.0 * l);
+				nested3[i][j][l] = grid3(i, j, 0, l) = z;
+				for (unsigned int k = 0; k < nk; k++) {
+					const vec3 v(i + 0.1 * l, j - 0.2 * k, cos(k + l));
+					nested[i][j][k][l] = grid(i, j, k, l) = v;
+				}
+			}
+		}
+	}
+
+	for (unsigned int i = 0; i < ni; i++) {
+		for (unsigned int l = 0; l < nl; l++) {
+			const unsigned int j = (i + l) % nj, k = (i * l) % nk;
+			const md::real fi = 0.3, fj = 0.7, fk = 0.1, fl = 0.6;
+			REQUIRE(grid.interp(i, j, k, l, fi, fj, fk, fl) ==
+			        interp4Vec(nested, i, j, k, l, fi, fj, fk, fl));
+			REQUIRE(grid3.interp(i, j, l, fi, fj, fl) ==
+			        interp3(nested3, i, j, l, fi, fj, fl));
+		}
+	}
+}
@@ -39,7 +39,9 @@
 #include <iostream>
 #include <iomanip>
 #include <algorithm>
+#include <vector>
 #include <cmath>
+#include <filesystem>
 
 #define TOL 1.0e-2
 #define POSX -203.22
@@ -244,6 +246,44 @@ minimal()
 	err = MoorDyn_GetLineNodeCurv(line, node, &curv);
 	CHECK_VALUE("CURV", CURV, curv);
 
+	// Check the same node on the whole system snapshot
+	unsigned int n_objects, n_nodes;
+	err = MoorDyn_GetSnapshotSize(system, &n_objects, &n_nodes);
+	if (err != MOORDYN_SUCCESS) {
+		cerr << "Failure getting the snapshot size: " << err << endl;
+		MoorDyn_Close(system);
+		return false;
+	}
+	std::vector<int> types(n_objects);
+	std::vector<unsigned int> ids(n_objects), offsets(n_objects),
+	    counts(n_objects);
+	err = MoorDyn_GetSnapshotLayout(
+	    system, types.data(), ids.data(), offsets.data(), counts.data());
+	if ((err != MOORDYN_SUCCESS) ||
+	    (offsets.back() + counts.back() != n_nodes)) {
+		cerr << "Failure getting the snapshot layout: " << err << endl;
+		MoorDyn_Close(system);
+		return false;
+	}
+	std::vector<double> r(3 * n_nodes), snap_f(3 * n_nodes);
+	err = MoorDyn_GetSystemSnapshot(system, r.data(), NULL, snap_f.data());
+	if (err != MOORDYN_SUCCESS) {
+		cerr << "Failure getting the snapshot: " << err << endl;
+		MoorDyn_Close(system);
+		return false;
+	}
+	for (unsigned int i = 0; i < n_objects; i++) {
+		if ((types[i] != MOORDYN_OBJECT_LINE) || (ids[i] != 2))
+			continue;
+		const unsigned int j = 3 * (offsets[i] + node);
+		CHECK_VALUE("Snapshot POSX", POSX, r[j]);
+		CHECK_VALUE("Snapshot POSY", POSY, r[j + 1]);
+		CHECK_VALUE("Snapshot POSZ", POSZ, r[j + 2]);
+		CHECK_VALUE("Snapshot TENX", TENX, snap_f[j]);
+		CHECK_VALUE("Snapshot TENY", TENY, snap_f[j + 1]);
+		CHECK_VALUE("Snapshot TENZ", TENZ, snap_f[j + 2]);
+	}
+
 	err = MoorDyn_Close(system);
 	if (err != MOORDYN_SUCCESS) {
 		cerr << "Failure closing Moordyn: " << err << endl;
@@ -253,6 +293,188 @@ minimal()
 	return true;
 }
 
+/** @brief Create and initialize a mooring system
+ * @param tscheme The time scheme, NULL to keep the one of the input file
+ * @return The mooring system, NULL if errors are detected
+ */
+MoorDyn
+init_system(const char* tscheme = NULL)
+{
+	MoorDyn system = MoorDyn_Create("Mooring/lines.txt");
+	if (!system) {
+		cerr << "Failure Creating the Mooring system" << endl;
+		return NULL;
+	}
+	if (tscheme && (MoorDyn_SetTimeScheme(system, tscheme) != MOORDYN_SUCCESS)) {
+		cerr << "Failure setting the time scheme" << endl;
+		MoorDyn_Close(system);
+		return NULL;
+	}
+	double x[9], dx[9];
+	for (unsigned int i = 0; i < 3; i++) {
+		auto point = MoorDyn_GetPoint(system, i + 4);
+		MoorDyn_GetPointPos(point, x + 3 * i);
+	}
+	std::fill(dx, dx + 9, 0.0);
+	if (MoorDyn_Init(system, x, dx) != MOORDYN_SUCCESS) {
+		cerr << "Failure during the mooring initialization" << endl;
+		MoorDyn_Close(system);
+		return NULL;
+	}
+	return system;
+}
+
+/** @brief Check that integrating a trajectory with MoorDyn_StepMany() gives
+ * the same forces than calling MoorDyn_Step() on each coupling time step
+ * @return true if the test worked, false otherwise
+ */
+bool
+step_many()
+{
+	cout << endl << " => " << __PRETTY_FUNC_NAME__ << "..." << endl;
+
+	const unsigned int n = 10, n_dof = 9;
+	const double t0 = 0.0, dt = 0.1;
+	std::vector<double> x(n * n_dof), dx(n * n_dof, 0.0);
+	std::vector<double> f_ref(n * n_dof), f(n * n_dof);
+
+	MoorDyn system = init_system();
+	if (!system)
+		return false;
+	for (unsigned int i = 0; i < 3; i++) {
+		auto point = MoorDyn_GetPoint(system, i + 4);
+		MoorDyn_GetPointPos(point, x.data() + 3 * i);
+	}
+	// A prescribed surge motion of the fairleads
+	for (unsigned int i = 0; i < n; i++) {
+		for (unsigned int j = 0; j < n_dof; j++)
+			x[i * n_dof + j] = x[j];
+		for (unsigned int j = 0; j < 3; j++) {
+			x[i * n_dof + 3 * j] += 0.1 * (i + 1) * dt;
+			dx[i * n_dof + 3 * j] = 0.1;
+		}
+	}
+	for (unsigned int i = 0; i < n; i++) {
+		double t = t0 + i * dt, dt_step = dt;
+		const int err = MoorDyn_Step(system,
+		                             x.data() + i * n_dof,
+		                             dx.data() + i * n_dof,
+		                             f_ref.data() + i * n_dof,
+		                             &t,
+		                             &dt_step);
+		if (err != MOORDYN_SUCCESS) {
+			cerr << "Failure during the mooring step: " << err << endl;
+			MoorDyn_Close(system);
+			return false;
+		}
+	}
+	MoorDyn_Close(system);
+
+	system = init_system();
+	if (!system)
+		return false;
+	const int err = MoorDyn_StepMany(
+	    system, n, x.data(), dx.data(), t0, dt, f.data());
+	MoorDyn_Close(system);
+	if (err != MOORDYN_SUCCESS) {
+		cerr << "Failure during the mooring steps: " << err << endl;
+		return false;
+	}
+
+	for (unsigned int i = 0; i < n * n_dof; i++) {
+		if (f[i] != f_ref[i]) {
+			cerr << "Force component " << i % n_dof << " at step "
+			     << i / n_dof << " is " << f[i] << " instead of " << f_ref[i]
+			     << endl;
+			return false;
+		}
+	}
+
+	return true;
+}
+
+/** @brief Check that a cloned system evolves exactly as the original one
+ * @param modified true to change the time scheme and the unstretched length
+ * of a line before cloning, and to clone from a different working directory
+ * @return true if the test worked, false otherwise
+ */
+bool
+clone(bool modified = false)
+{
+	cout << endl << " => " << __PRETTY_FUNC_NAME__ << "..." << endl;
+
+	const unsigned int n_dof = 9;
+	double x[n_dof], dx[n_dof], f[n_dof], f_clone[n_dof];
+	double t = 0.0, dt = 0.1;
+
+	MoorDyn system = init_system(modified ? "RK4" : NULL);
+	if (!system)
+		return false;
+	for (unsigned int i = 0; i < 3; i++) {
+		auto point = MoorDyn_GetPoint(system, i + 4);
+		MoorDyn_GetPointPos(point, x + 3 * i);
+		dx[3 * i] = 0.1;
+		dx[3 * i + 1] = dx[3 * i + 2] = 0.0;
+	}
+	// Evolve the system a bit, so the clone does not start from the ICs
+	for (unsigned int i = 0; i < 3; i++) {
+		for (unsigned int j = 0; j < 3; j++)
+			x[3 * j] += dx[3 * j] * dt;
+		if (MoorDyn_Step(system, x, dx, f, &t, &dt) != MOORDYN_SUCCESS) {
+			MoorDyn_Close(system);
+			return false;
+		}
+	}
+
+	const auto cwd = std::filesystem::current_path();
+	if (modified) {
+		MoorDynLine line = MoorDyn_GetLine(system, 1);
+		double l;
+		if (!line ||
+		    (MoorDyn_GetLineUnstretchedLength(line, &l) != MOORDYN_SUCCESS) ||
+		    (MoorDyn_SetLineUnstretchedLength(line, 1.01 * l) !=
+		     MOORDYN_SUCCESS)) {
+			cerr << "Failure changing the line unstretched length" << endl;
+			MoorDyn_Close(system);
+			return false;
+		}
+		std::filesystem::current_path(cwd.root_path());
+	}
+	MoorDyn cloned = MoorDyn_Clone(system);
+	std::filesystem::current_path(cwd);
+	if (!cloned) {
+		cerr << "Failure cloning the system" << endl;
+		MoorDyn_Close(system);
+		return false;
+	}
+
+	bool ok = true;
+	for (unsigned int i = 0; i < 5 && ok; i++) {
+		for (unsigned int j = 0; j < 3; j++)
+			x[3 * j] += dx[3 * j] * dt;
+		double t_clone = t, dt_clone = dt;
+		if ((MoorDyn_Step(system, x, dx, f, &t, &dt) != MOORDYN_SUCCESS) ||
+		    (MoorDyn_Step(cloned, x, dx, f_clone, &t_clone, &dt_clone) !=
+		     MOORDYN_SUCCESS)) {
+			cerr << "Failure during the mooring step" << endl;
+			ok = false;
+			break;
+		}
+		for (unsigned int j = 0; j < n_dof; j++) {
+			if (f[j] != f_clone[j]) {
+				cerr << "Force component " << j << " at step " << i << " is "
+				     << f_clone[j] << " on the clone instead of " << f[j]
+				     << endl;
+				ok = false;
+			}
+		}
+	}
+
+	MoorDyn_Close(cloned);
+	MoorDyn_Close(system);
+	return ok;
+}
+
 /** @brief Runs all the test
  * @return 0 if the tests have ran just fine. The index of the failing test
  * otherwise
@@ -268,5 +490,11 @@ main(int, char**)
 		return 3;
 	if (!minimal())
 		return 4;
+	if (!step_many())
+		return 5;
+	if (!clone())
+		return 6;
+	if (!clone(true))
+		return 7;
 	return 0;
 }
@@ -0,0 +1,80 @@
+/*
+ * Copyright (c) 2023 Jose Luis Cercos-Pita <jlc@core-marine.com>
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice,
+ * this list of conditions and the following disclaimer.
+ *
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions and the following disclaimer in the documentation
+ *    and/or other materials provided with the distribution.
+ *
+ * 3. Neither the name of the copyright holder nor the names of its
+ *    contributors may be used to endorse or promote products derived from
+ *    this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+
+/** @file multirate.cpp
+ * Tests ran with the multirate time schemes
+ */
+
+#define _USE_MATH_DEFINES
+
+#include "MoorDyn2.h"
+#include <cmath>
+#include <string>
+#include <vector>
+#include <catch2/catch_test_macros.hpp>
+#include "util.h"
+
+/// Coupling time step
+#define DT 0.1
+/// Simulated time
+#define T_END 5.0
+/// Sway motion amplitude
+#define AMPLITUDE 2.0
+/// Sway motion period
+#define PERIOD 12.0
+
+/** @brief Compare the multirate schemes with the RK4 one
+ * @param filepath The input file
+ */
+void
+compare_schemes(const char* filepath)
+{
+	const auto ic = initial_condition(filepath);
+	const auto r_ref = sway(filepath, ic, "RK4", DT, T_END, AMPLITUDE, PERIOD);
+	for (auto scheme : { "MRK2", "MRK4" }) {
+		INFO("Time scheme " << scheme);
+		const auto r = sway(filepath, ic, scheme, DT, T_END, AMPLITUDE, PERIOD);
+		REQUIRE(max_diff(r, r_ref) < 1e-3);
+	}
+}
+
+TEST_CASE("Multirate schemes on a split hanging line")
+{
+	// The line with less segments takes a twice larger time step, and the
+	// point joining both lines is fed with extrapolated forces
+	compare_schemes("Mooring/local_euler/hanging.txt");
+}
+
+TEST_CASE("Multirate schemes on a complex system")
+{
+	// The lines time steps range from 1 to 16 times the base one, and the
+	// rods and the body are attached to lines with different time steps
+	compare_schemes("Mooring/local_euler/complex_system.txt");
+}
@@ -0,0 +1,82 @@
+/*
+ * Copyright (c) 2023 Jose Luis Cercos-Pita <jlc@core-marine.com>
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice,
+ * this list of conditions and the following disclaimer.
+ *
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions and the following disclaimer in the documentation
+ *    and/or other materials provided with the distribution.
+ *
+ * 3. Neither the name of the copyright holder nor the names of its
+ *    contributors may be used to endorse or promote products derived from
+ *    this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+
+/** @file newton_krylov.cpp
+ * Tests ran with the Newton-Krylov implicit time scheme
+ */
+
+#define _USE_MATH_DEFINES
+
+#include "MoorDyn2.h"
+#include <cmath>
+#include <string>
+#include <vector>
+#include <catch2/catch_test_macros.hpp>
+#include "util.h"
+
+/// Coupling time step
+#define DT 0.5
+/// Sway motion amplitude
+#define AMPLITUDE 5.0
+/// Sway motion period
+#define PERIOD 12.0
+
+TEST_CASE("Newton-Krylov on a stiff polyester line")
+{
+	// The RK4 scheme is already unstable with a twice larger time step than
+	// the one set on the input file, while the Newton-Krylov scheme can take
+	// a 10 times larger one
+	const char* filepath = "Mooring/polyester/simple.txt";
+	const auto ic = initial_condition(filepath);
+	std::vector<double> f_ref, f;
+	const auto r_ref =
+	    sway(filepath, ic, "RK4", DT, 20.0, AMPLITUDE, PERIOD, 0.005, &f_ref);
+	const auto r =
+	    sway(filepath, ic, "Newton10", DT, 20.0, AMPLITUDE, PERIOD, 0.05, &f);
+	REQUIRE(max_diff(r, r_ref) < 0.05);
+	double f_norm = 0.0;
+	for (auto fi : f_ref)
+		f_norm = (std::max)(f_norm, std::abs(fi));
+	REQUIRE(max_diff(f, f_ref) < 0.01 * f_norm);
+}
+
+TEST_CASE("Newton-Krylov on a complex system")
+{
+	// The Krylov iterations are taking care of the coupling between the lines
+	// and the rods and the body, including zero-length rods, which are
+	// getting their orientation from the attached lines
+	const char* filepath = "Mooring/local_euler/complex_system.txt";
+	const auto ic = initial_condition(filepath);
+	const auto r_ref =
+	    sway(filepath, ic, "RK4", DT, 5.0, AMPLITUDE, PERIOD, 0.0005);
+	const auto r =
+	    sway(filepath, ic, "Newton10", DT, 5.0, AMPLITUDE, PERIOD, 0.002);
+	REQUIRE(max_diff(r, r_ref) < 0.1);
+}
@@ -0,0 +1,48 @@
+#include <vector>
+#include "MoorDyn2.h"
+#include <catch2/catch_test_macros.hpp>
+
+/** @brief Simulate the farm, returning the positions of all the nodes
+ * @param n_threads The number of threads, 0 to keep the input file option
+ * @return The positions of all the nodes
+ */
+std::vector<double>
+simulate_farm(unsigned int n_threads)
+{
+	MoorDyn system = MoorDyn_Create("Mooring/farm.txt");
+	REQUIRE(system);
+	unsigned int n;
+	REQUIRE(MoorDyn_GetThreads(system, &n) == MOORDYN_SUCCESS);
+	REQUIRE(n == 3);
+	if (n_threads) {
+		REQUIRE(MoorDyn_SetThreads(system, n_threads) == MOORDYN_SUCCESS);
+		REQUIRE(MoorDyn_GetThreads(system, &n) == MOORDYN_SUCCESS);
+		REQUIRE(n == n_threads);
+	}
+	REQUIRE(MoorDyn_Init(system, NULL, NULL) == MOORDYN_SUCCESS);
+	unsigned int n_nodes;
+	REQUIRE(MoorDyn_GetSnapshotSize(system, NULL, &n_nodes) ==
+	        MOORDYN_SUCCESS);
+	std::vector<double> r0(3 * n_nodes), r(3 * n_nodes);
+	REQUIRE(MoorDyn_GetSystemSnapshot(system, r0.data(), NULL, NULL) ==
+	        MOORDYN_SUCCESS);
+
+	double t = 0.0, dt = 0.5;
+	REQUIRE(MoorDyn_Step(system, NULL, NULL, NULL, &t, &dt) ==
+	        MOORDYN_SUCCESS);
+	REQUIRE(MoorDyn_GetSystemSnapshot(system, r.data(), NULL, NULL) ==
+	        MOORDYN_SUCCESS);
+	// The lines are hanging, so they shall be moving
+	REQUIRE(r != r0);
+	REQUIRE(MoorDyn_Close(system) == MOORDYN_SUCCESS);
+	return r;
+}
+
+TEST_CASE("Lines and rods computed by several threads")
+{
+	const auto r_ref = simulate_farm(1);
+	// Bitwise equal results, no matter the number of threads
+	REQUIRE(simulate_farm(0) == r_ref);
+	REQUIRE(simulate_farm(2) == r_ref);
+	REQUIRE(simulate_farm(5) == r_ref);
+}
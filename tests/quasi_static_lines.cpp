@@ -0,0 +1,119 @@
+/*
+ * Copyright (c) 2023 Jose Luis Cercos-Pita <jlc@core-marine.com>
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice,
+ * this list of conditions and the following disclaimer.
+ *
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions and the following disclaimer in the documentation
+ *    and/or other materials provided with the distribution.
+ *
+ * 3. Neither the name of the copyright holder nor the names of its
+ *    contributors may be used to endorse or promote products derived from
+ *    this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+
+/** @file quasi_static_lines.cpp
+ * Tests on the lines modelled as quasi-static catenaries
+ */
+
+#define _USE_MATH_DEFINES
+
+#include "MoorDyn2.h"
+#include <cmath>
+#include <vector>
+#include <catch2/catch_test_macros.hpp>
+
+/// Static tension at the fairlead predicted by quasi-static codes (kN)
+#define STATIC_FAIR_TENSION 2065.4
+/// Static tension at the anchor predicted by quasi-static codes (kN)
+#define STATIC_ANCHOR_TENSION 1402.2
+/// Coupling time step
+#define DT 0.5
+/// Surge offset of the fairlead
+#define OFFSET 10.0
+/// Time to reach the surge offset
+#define RAMP 100.0
+
+/** @brief Slowly move the fairlead, so the dynamic effects are negligible
+ * @param filepath The input file
+ * @param f The fairlead force at the end of the simulation
+ * @param r The middle node position at the end of the simulation
+ * @return The model time step
+ */
+double
+surge(const char* filepath, double f[3], double r[3])
+{
+	MoorDyn system = MoorDyn_Create(filepath);
+	REQUIRE(system);
+	double x[3] = { 0.0, 0.0, 0.0 }, v[3] = { 0.0, 0.0, 0.0 };
+	REQUIRE(MoorDyn_Init(system, x, v) == MOORDYN_SUCCESS);
+	double t = 0.0, dt;
+	while (t < RAMP + 10.0 - 0.5 * DT) {
+		dt = DT;
+		const double s = (std::min)(t / RAMP, 1.0);
+		x[0] = OFFSET * (s - std::sin(2.0 * M_PI * s) / (2.0 * M_PI));
+		v[0] = (t < RAMP) ?
+		    OFFSET * (1.0 - std::cos(2.0 * M_PI * s)) / RAMP : 0.0;
+		REQUIRE(MoorDyn_Step(system, x, v, f, &t, &dt) == MOORDYN_SUCCESS);
+	}
+	const auto line = MoorDyn_GetLine(system, 1);
+	REQUIRE(line);
+	unsigned int n;
+	REQUIRE(MoorDyn_GetLineN(line, &n) == MOORDYN_SUCCESS);
+	REQUIRE(MoorDyn_GetLineNodePos(line, n / 2, r) == MOORDYN_SUCCESS);
+	REQUIRE(MoorDyn_GetDt(system, &dt) == MOORDYN_SUCCESS);
+	REQUIRE(MoorDyn_Close(system) == MOORDYN_SUCCESS);
+	return dt;
+}
+
+TEST_CASE("Static tension")
+{
+	MoorDyn system = MoorDyn_Create("Mooring/WD0200_Chain_QS.txt");
+	REQUIRE(system);
+	double x[3] = { 0.0, 0.0, 0.0 }, v[3] = { 0.0, 0.0, 0.0 };
+	REQUIRE(MoorDyn_Init(system, x, v) == MOORDYN_SUCCESS);
+	int num_lines = 1;
+	float fh, fv, ah, av;
+	REQUIRE(MoorDyn_GetFASTtens(system, &num_lines, &fh, &fv, &ah, &av) ==
+	        MOORDYN_SUCCESS);
+	const double ffair = 1.e-3 * std::sqrt(fh * fh + fv * fv);
+	const double fanch = 1.e-3 * std::sqrt(ah * ah + av * av);
+	REQUIRE(std::abs(ffair - STATIC_FAIR_TENSION) <
+	        0.02 * STATIC_FAIR_TENSION);
+	REQUIRE(std::abs(fanch - STATIC_ANCHOR_TENSION) <
+	        0.02 * STATIC_ANCHOR_TENSION);
+	REQUIRE(MoorDyn_Close(system) == MOORDYN_SUCCESS);
+}
+
+TEST_CASE("Quasi-static vs lumped-mass")
+{
+	double f_qs[3], r_qs[3], f_lm[3], r_lm[3];
+	const double dt_qs = surge("Mooring/WD0200_Chain_QS.txt", f_qs, r_qs);
+	const double dt_lm = surge("Mooring/WD0200_Chain.txt", f_lm, r_lm);
+
+	// The quasi-static line is not limiting the time step
+	REQUIRE(dt_qs > 100.0 * dt_lm);
+
+	const double f = std::sqrt(f_lm[0] * f_lm[0] + f_lm[1] * f_lm[1] +
+	                           f_lm[2] * f_lm[2]);
+	for (unsigned int i = 0; i < 3; i++) {
+		REQUIRE(std::abs(f_qs[i] - f_lm[i]) < 0.01 * f);
+		REQUIRE(std::abs(r_qs[i] - r_lm[i]) < 0.5);
+	}
+}
@@ -0,0 +1,133 @@
+/*
+ * Copyright (c) 2023 Jose Luis Cercos-Pita <jlc@core-marine.com>
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice,
+ * this list of conditions and the following disclaimer.
+ *
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions and the following disclaimer in the documentation
+ *    and/or other materials provided with the distribution.
+ *
+ * 3. Neither the name of the copyright holder nor the names of its
+ *    contributors may be used to endorse or promote products derived from
+ *    this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+
+/** @file state.cpp
+ * Check the flat storage of the states and their derivatives
+ */
+
+#include "State.hpp"
+#include <catch2/catch_test_macros.hpp>
+
+using namespace moordyn;
+
+/** @brief Register the same entities on a state or a state derivative
+ * @param s The state or state derivative
+ */
+template<typename T>
+void
+populate(T& s)
+{
+	s.AddLine(3);
+	s.AddPoint();
+	s.AddRod();
+	s.AddLine(2);
+	s.AddBody();
+	s.values = Eigen::VectorXr::LinSpaced(s.values.size(), 1.0, 2.0);
+}
+
+TEST_CASE("Entities packed on a single buffer")
+{
+	MoorDynState r;
+	populate(r);
+	REQUIRE(r.values.size() == 6 * 3 + 6 + 13 + 6 * 2 + 13);
+
+	const Eigen::Matrix3Xr line = r.line(1).vel;
+	const vec point = r.point(0).pos;
+	const vec7 rod = r.rod(0).pos;
+	const vec6 body = r.body(0).vel;
+	REQUIRE(line.cols() == 2);
+	// The views are writing on the buffer
+	r.line(0).pos.setZero();
+	REQUIRE(r.values.head(9).isZero());
+
+	// Removing an entity shall not alter the others
+	r.RemoveLine(0);
+	REQUIRE(r.values.size() == 6 + 13 + 6 * 2 + 13);
+	REQUIRE(r.LineNodes(0) == 2);
+	REQUIRE(r.line(0).vel == line);
+	REQUIRE(r.point(0).pos == point);
+	REQUIRE(r.rod(0).pos == rod);
+	REQUIRE(r.body(0).vel == body);
+	r.RemovePoint(0);
+	REQUIRE(r.line(0).vel == line);
+	REQUIRE(r.body(0).vel == body);
+}
+
+TEST_CASE("Fused integration of the states")
+{
+	MoorDynState r0, r;
+	DMoorDynStateDt rd0, rd1;
+	populate(r0);
+	populate(rd0);
+	populate(rd1);
+	rd1.values *= 2.0;
+	r = r0;
+	const moordyn::real dt = 0.1, gamma = 0.5, beta = 0.25;
+
+	r.values = r0.values + dt * rd0.values;
+	REQUIRE(r.line(0).pos == r0.line(0).pos + dt * rd0.line(0).vel);
+	REQUIRE(r.point(0).vel == r0.point(0).vel + dt * rd0.point(0).acc);
+
+	r.Newmark(r0, rd0, rd1, dt, gamma, beta);
+	const vec acc_beta =
+	    (0.5 - beta) * rd0.point(0).acc + beta * rd1.point(0).acc;
+	const vec acc_gamma =
+	    (1 - gamma) * rd0.point(0).acc + gamma * rd1.point(0).acc;
+	REQUIRE(r.point(0).pos ==
+	        r0.point(0).pos + (rd0.point(0).vel + dt * acc_beta) * dt);
+	REQUIRE(r.point(0).vel == r0.point(0).vel + acc_gamma * dt);
+	const vec6 rod_beta = (0.5 - beta) * rd0.rod(0).acc + beta * rd1.rod(0).acc;
+	const XYZQuat rod_pos =
+	    XYZQuat::fromVec7(r0.rod(0).pos) +
+	    (XYZQuat::fromVec7(rd0.rod(0).vel) + XYZQuat::fromVec6(dt * rod_beta)) *
+	        dt;
+	REQUIRE(r.rod(0).pos.isApprox(rod_pos.toVec7()));
+}
+
+TEST_CASE("Stationary state derivatives")
+{
+	DMoorDynStateDt rd;
+	populate(rd);
+	const Eigen::Matrix3Xr acc = rd.line(1).acc;
+	const vec6 body = rd.body(0).acc;
+	const moordyn::real dt = 0.1;
+	const moordyn::real expected =
+	    rd.line(0).acc.colwise().norm().sum() + acc.colwise().norm().sum() +
+	    rd.point(0).acc.norm() + rd.rod(0).acc.head<3>().norm() +
+	    body.head<3>().norm();
+
+	const moordyn::real err = rd.MakeStationary(dt);
+	REQUIRE(std::abs(err - expected) < 1e-10);
+	REQUIRE(rd.line(1).vel == 0.5 * dt * acc);
+	REQUIRE(rd.line(1).acc.isZero());
+	REQUIRE(rd.body(0).vel.isApprox(
+	    XYZQuat::fromVec6(0.5 * dt * body).toVec7()));
+	REQUIRE(rd.body(0).acc.isZero());
+}
@@ -0,0 +1,99 @@
+/*
+ * Copyright (c) 2023 Jose Luis Cercos-Pita <jlc@core-marine.com>
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice,
+ * this list of conditions and the following disclaimer.
+ *
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions and the following disclaimer in the documentation
+ *    and/or other materials provided with the distribution.
+ *
+ * 3. Neither the name of the copyright holder nor the names of its
+ *    contributors may be used to endorse or promote products derived from
+ *    this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+
+/** @file static_newton.cpp
+ * Tests on the Newton static solver for the initial condition
+ */
+
+#include "MoorDyn2.h"
+#include <cmath>
+#include <catch2/catch_test_macros.hpp>
+
+/// Coupling time step
+#define DT 0.5
+/// Simulated time to check the equilibrium
+#define TMAX 10.0
+
+/** @brief Compute the initial condition and get the fairlead force
+ * @param filepath The input file
+ * @param f The fairlead force at the initial condition
+ * @return The MoorDyn system, already initialized
+ */
+MoorDyn
+init(const char* filepath, double f[3])
+{
+	MoorDyn system = MoorDyn_Create(filepath);
+	REQUIRE(system);
+	double x[3] = { 0.0, 0.0, 0.0 }, v[3] = { 0.0, 0.0, 0.0 };
+	REQUIRE(MoorDyn_Init(system, x, v) == MOORDYN_SUCCESS);
+	const auto point = MoorDyn_GetPoint(system, 2);
+	REQUIRE(point);
+	REQUIRE(MoorDyn_GetPointForce(point, f) == MOORDYN_SUCCESS);
+	return system;
+}
+
+TEST_CASE("Newton vs stationary")
+{
+	double f_nw[3], f_st[3];
+	MoorDyn nw = init("Mooring/WD0200_Chain_Newton.txt", f_nw);
+	MoorDyn st = init("Mooring/WD0200_Chain.txt", f_st);
+	// Make sure the Newton solver converged, instead of falling back to the
+	// stationary solver
+	int iters;
+	REQUIRE(MoorDyn_GetICNewtonIters(nw, &iters) == MOORDYN_SUCCESS);
+	REQUIRE(iters >= 0);
+	REQUIRE(MoorDyn_GetICNewtonIters(st, &iters) == MOORDYN_SUCCESS);
+	REQUIRE(iters == -1);
+	REQUIRE(MoorDyn_Close(nw) == MOORDYN_SUCCESS);
+	REQUIRE(MoorDyn_Close(st) == MOORDYN_SUCCESS);
+
+	const double f = std::sqrt(f_st[0] * f_st[0] + f_st[1] * f_st[1] +
+	                           f_st[2] * f_st[2]);
+	for (unsigned int i = 0; i < 3; i++)
+		REQUIRE(std::abs(f_nw[i] - f_st[i]) < 0.01 * f);
+}
+
+TEST_CASE("Newton equilibrium")
+{
+	double f0[3];
+	MoorDyn system = init("Mooring/WD0200_Chain_Newton.txt", f0);
+	const double f = std::sqrt(f0[0] * f0[0] + f0[1] * f0[1] + f0[2] * f0[2]);
+
+	// The system shall remain at rest when the fairlead is not moved
+	double x[3] = { 0.0, 0.0, 0.0 }, v[3] = { 0.0, 0.0, 0.0 }, f1[3];
+	double t = 0.0, dt;
+	while (t < TMAX - 0.5 * DT) {
+		dt = DT;
+		REQUIRE(MoorDyn_Step(system, x, v, f1, &t, &dt) == MOORDYN_SUCCESS);
+		for (unsigned int i = 0; i < 3; i++)
+			REQUIRE(std::abs(f1[i] - f0[i]) < 0.01 * f);
+	}
+	REQUIRE(MoorDyn_Close(system) == MOORDYN_SUCCESS);
+}
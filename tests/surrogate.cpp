@@ -0,0 +1,136 @@
+/*
+ * Copyright (c) 2023 Jose Luis Cercos-Pita <jlc@core-marine.com>
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice,
+ * this list of conditions and the following disclaimer.
+ *
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions and the following disclaimer in the documentation
+ *    and/or other materials provided with the distribution.
+ *
+ * 3. Neither the name of the copyright holder nor the names of its
+ *    contributors may be used to endorse or promote products derived from
+ *    this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+
+/** @file surrogate.cpp
+ * Tests on the quasi-static surrogate tables
+ */
+
+#include "MoorDyn2.h"
+#include <cmath>
+#include <cstdio>
+#include <fstream>
+#include <catch2/catch_test_macros.hpp>
+
+/// The input file with the surrogate section
+#define SURROGATE_FILE "Mooring/surrogate.txt"
+/// The surrogate table cache
+#define SURROGATE_CACHE "Mooring/surrogate.srg"
+/// The same mooring system, without the surrogate section
+#define REFERENCE_FILE "Mooring/WD0200_Chain_QS.txt"
+
+/** @brief Compute the fairlead force on the reference system
+ * @param x The fairlead position
+ * @param f The fairlead force
+ */
+void
+reference(const double x[3], double f[3])
+{
+	MoorDyn system = MoorDyn_Create(REFERENCE_FILE);
+	REQUIRE(system);
+	double r[3] = { x[0], x[1], x[2] }, v[3] = { 0.0, 0.0, 0.0 };
+	REQUIRE(MoorDyn_Init(system, r, v) == MOORDYN_SUCCESS);
+	double t = 0.0, dt = 0.0;
+	REQUIRE(MoorDyn_Step(system, r, v, f, &t, &dt) == MOORDYN_SUCCESS);
+	REQUIRE(MoorDyn_Close(system) == MOORDYN_SUCCESS);
+}
+
+/** @brief Compute the fairlead force with the surrogate table
+ * @param system The surrogate system
+ * @param x The fairlead position
+ * @param f The fairlead force
+ */
+void
+surrogate(MoorDyn system, const double x[3], double f[3])
+{
+	double r[3] = { x[0], x[1], x[2] }, v[3] = { 0.0, 0.0, 0.0 };
+	double t = 0.0, dt = 0.1;
+	REQUIRE(MoorDyn_Step(system, r, v, f, &t, &dt) == MOORDYN_SUCCESS);
+}
+
+/** @brief Check that two forces are equal up to a relative tolerance
+ * @param a The first force
+ * @param b The second force
+ * @param tol The relative tolerance
+ */
+bool
+compare(const double a[3], const double b[3], double tol)
+{
+	const double f = std::sqrt(b[0] * b[0] + b[1] * b[1] + b[2] * b[2]);
+	for (unsigned int i = 0; i < 3; i++) {
+		if (std::abs(a[i] - b[i]) > tol * f)
+			return false;
+	}
+	return true;
+}
+
+TEST_CASE("Surrogate table")
+{
+	// A corrupted cache shall be ignored and overwritten
+	{
+		std::ofstream junk(SURROGATE_CACHE);
+		junk << "This is not a surrogate table";
+	}
+
+	MoorDyn system = MoorDyn_Create(SURROGATE_FILE);
+	REQUIRE(system);
+	unsigned int n_dof;
+	REQUIRE(MoorDyn_NCoupledDOF(system, &n_dof) == MOORDYN_SUCCESS);
+	REQUIRE(n_dof == 3);
+	double x[3] = { 0.0, 0.0, 0.0 }, v[3] = { 0.0, 0.0, 0.0 };
+	REQUIRE(MoorDyn_Init(system, x, v) == MOORDYN_SUCCESS);
+
+	double f[3], f_ref[3];
+	// On the grid nodes the static solution is recovered
+	const double nodes[3][3] = { { -10.0, 0.0, -2.0 },
+		                         { 5.0, 0.0, 0.0 },
+		                         { 10.0, 0.0, 2.0 } };
+	for (auto node : nodes) {
+		surrogate(system, node, f);
+		reference(node, f_ref);
+		REQUIRE(compare(f, f_ref, 1e-6));
+	}
+	// In between, the multilinear interpolation is still accurate
+	const double r[3] = { 2.5, 0.0, 1.0 };
+	surrogate(system, r, f);
+	reference(r, f_ref);
+	REQUIRE(compare(f, f_ref, 0.05));
+	REQUIRE(MoorDyn_Close(system) == MOORDYN_SUCCESS);
+
+	// The second time the table is loaded from the cache
+	double f_cached[3];
+	system = MoorDyn_Create(SURROGATE_FILE);
+	REQUIRE(system);
+	REQUIRE(MoorDyn_Init(system, x, v) == MOORDYN_SUCCESS);
+	surrogate(system, r, f_cached);
+	REQUIRE(MoorDyn_Close(system) == MOORDYN_SUCCESS);
+	for (unsigned int i = 0; i < 3; i++)
+		REQUIRE(f_cached[i] == f[i]);
+
+	std::remove(SURROGATE_CACHE);
+}
@@ -0,0 +1,122 @@
+import sys
+import subprocess
+from multiprocessing import shared_memory
+from unittest import TestCase, main as unittest_main
+import os
+import numpy as np
+import moordyn
+import moordyn.ensemble
+from test_minimal import setup_case
+
+
+class EnsembleTests(TestCase):
+    def test_override_options(self):
+        text = ("--- OPTIONS ---\n"
+                "0.002    dtM    time step\n"
+                "320    WtrDpth    water depth\n"
+                "--- OUTPUTS ---\n")
+        text = moordyn.ensemble.override_options(
+            text, {"WtrDpth": 50.0, "TmaxIC": 10})
+        self.assertEqual(text, ("--- OPTIONS ---\n"
+                                "0.002    dtM    time step\n"
+                                "50.0    WtrDpth\n"
+                                "10    TmaxIC\n"
+                                "--- OUTPUTS ---\n"))
+
+    def test_run(self):
+        n, dt = 5, 0.1
+        tmp_folder = setup_case("lines.txt")
+        filepath = os.path.join(tmp_folder, "Mooring", "lines.txt")
+        system = moordyn.Create(filepath)
+        x0 = np.array([moordyn.GetPointPos(moordyn.GetPoint(system, i))
+                       for i in range(4, 7)]).flatten()
+        v = np.zeros((n, 9))
+        v[:, ::3] = 0.1
+        x = x0 + dt * np.cumsum(v, axis=0)
+        self.assertEqual(moordyn.Init(system, x0, np.zeros(9)), 0)
+        f_ref = moordyn.StepMany(system, x, v, 0.0, dt)
+        line = moordyn.GetLine(system, 1)
+        t_ref = moordyn.GetLineFairTen(line)
+        self.assertEqual(moordyn.Close(system), 0)
+        files = sorted(os.listdir(os.path.dirname(filepath)))
+
+        cases = [moordyn.ensemble.Case(x, v, x0=x0),
+                 moordyn.ensemble.Case(x, v, x0=x0, options={"dtM": 0.001}),
+                 moordyn.ensemble.Case(x, v, x0=x0)]
+        progress = []
+        results = moordyn.ensemble.run(
+            filepath, cases, dt, channels=("forces", "FairTen1"),
+            max_workers=1,
+            progress=lambda i, n: progress.append((i, n)))
+        self.assertEqual(results.shape, (3, n, 10))
+        self.assertEqual(progress, [(1, 3), (2, 3), (3, 3)])
+        # The first and last cases are computed by the same worker, reusing
+        # the system
+        for i in (0, 2):
+            self.assertTrue(np.array_equal(results[i, :, :9], f_ref))
+            self.assertEqual(results[i, -1, 9], t_ref)
+        self.assertFalse(np.array_equal(results[1, :, :9], f_ref))
+        self.assertTrue(np.allclose(results[1, :, :9], f_ref, rtol=1e-2))
+        # No files shall be left behind
+        self.assertEqual(sorted(os.listdir(os.path.dirname(filepath))), files)
+
+        # Just the forces, integrated at once
+        results = moordyn.ensemble.run(filepath, cases[:1], dt, max_workers=2)
+        self.assertTrue(np.array_equal(results[0], f_ref))
+
+    def test_stale_files(self):
+        dt = 0.1
+        tmp_folder = setup_case("lines.txt")
+        filepath = os.path.join(tmp_folder, "Mooring", "lines.txt")
+        folder = os.path.dirname(filepath)
+        files = sorted(os.listdir(folder))
+        # Files left behind by a killed worker, and by a running one
+        dead = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead.wait()
+        stale = ["lines_ensemble_{}_tmp.txt".format(dead.pid),
+                 "lines_ensemble_{}_tmp_Line1.out".format(dead.pid)]
+        alive = "lines_ensemble_{}_tmp.txt".format(os.getpid())
+        for fname in stale + [alive]:
+            open(os.path.join(folder, fname), "w").close()
+        moordyn.ensemble.run(filepath, [], dt)
+        self.assertEqual(sorted(os.listdir(folder)), sorted(files + [alive]))
+        os.remove(os.path.join(folder, alive))
+
+    def test_worker_close(self):
+        tmp_folder = setup_case("lines.txt")
+        filepath = os.path.join(tmp_folder, "Mooring", "lines.txt")
+        with open(filepath, "r") as f:
+            text = f.read()
+        system = moordyn.Create(filepath)
+        x0 = np.array([moordyn.GetPointPos(moordyn.GetPoint(system, i))
+                       for i in range(4, 7)]).flatten()
+        self.assertEqual(moordyn.Close(system), 0)
+        shm = shared_memory.SharedMemory(create=True, size=8)
+        try:
+            moordyn.ensemble._worker_init(shm.name, (1,), 1)
+            moordyn.ensemble._get_system(text, filepath, x0, np.zeros(9))
+            self.assertEqual(len(moordyn.ensemble._systems), 1)
+            moordyn.ensemble._worker_close()
+            self.assertEqual(len(moordyn.ensemble._systems), 0)
+            self.assertIsNone(moordyn.ensemble._shm)
+            self.assertIsNone(moordyn.ensemble._results)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def test_bad_cases(self):
+        tmp_folder = setup_case("lines.txt")
+        filepath = os.path.join(tmp_folder, "Mooring", "lines.txt")
+        x = np.zeros((5, 9))
+        with self.assertRaises(ValueError):
+            moordyn.ensemble.run(filepath,
+                                 [moordyn.ensemble.Case(x),
+                                  moordyn.ensemble.Case(x[:4])],
+                                 0.1)
+        with self.assertRaises(ValueError):
+            moordyn.ensemble.run(filepath, [moordyn.ensemble.Case(x)], 0.1,
+                                 channels=("tension",))
+
+
+if __name__ == '__main__':
+    unittest_main()
@@ -2,6 +2,7 @@ import sys
 from unittest import TestCase, main as unittest_main
 import os
 import tempfile
+from array import array
 import moordyn
 
 
@@ -64,6 +65,189 @@ class MinimalTests(TestCase):
         self.assertTrue(abs(forces[0] - f_ref) / f_ref < 0.01,
                         "Wrong surge force")
 
+    def test_buffers(self):
+        tmp_folder = setup_case("lines.txt")
+        cwd = os.getcwd()
+        os.chdir(tmp_folder)
+        system = moordyn.Create()
+        os.chdir(cwd)
+        x = array('d')
+        for i in range(4, 7):
+            point = moordyn.GetPoint(system, i)
+            x.extend(moordyn.GetPointPos(point))
+        v = array('d', [0, ] * 9)
+        self.assertEqual(moordyn.Init(system, x, v), 0,
+                         "Failure initializing the lines")
+        v[0] = 0.1
+        forces = array('d', [0, ] * 9)
+        out = moordyn.Step(system, x, v, 0.0, 0.5, out=forces)
+        self.assertIs(out, forces, "The output buffer shall be returned")
+        with self.assertRaises(ValueError):
+            moordyn.Step(system, x[:6], v, 0.5, 0.5)
+        with self.assertRaises(TypeError):
+            moordyn.Step(system, x, v, 0.5, 0.5, out=array('f', [0, ] * 9))
+        self.assertEqual(moordyn.Close(system),
+                         0, "Failure finishing MoorDyn")
+        f_ref = 7.2e5
+        self.assertTrue(abs(forces[0] - f_ref) / f_ref < 0.01,
+                        "Wrong surge force")
+
+    def test_snapshot(self):
+        tmp_folder = setup_case("lines.txt")
+        cwd = os.getcwd()
+        os.chdir(tmp_folder)
+        system = moordyn.Create()
+        os.chdir(cwd)
+        x = []
+        for i in range(4, 7):
+            point = moordyn.GetPoint(system, i)
+            x = x + list(moordyn.GetPointPos(point))
+        v = [0, ] * 9
+        self.assertEqual(moordyn.Init(system, x, v), 0,
+                         "Failure initializing the lines")
+        layout = moordyn.GetSnapshotLayout(system)
+        n = layout[-1][2] + layout[-1][3]
+        r, rd, f = array('d', [0, ] * 3 * n), None, array('d', [0, ] * 3 * n)
+        moordyn.GetSystemSnapshot(system, r=r, rd=rd, f=f)
+        for obj_type, obj_id, offset, n_nodes in layout:
+            if obj_type != moordyn.OBJECT_LINE:
+                continue
+            line = moordyn.GetLine(system, obj_id)
+            self.assertEqual(n_nodes, moordyn.GetLineN(line) + 1)
+            for i in range(n_nodes):
+                j = 3 * (offset + i)
+                self.assertEqual(tuple(r[j:j + 3]),
+                                 tuple(moordyn.GetLineNodePos(line, i)))
+                self.assertEqual(tuple(f[j:j + 3]),
+                                 tuple(moordyn.GetLineNodeTen(line, i)))
+        self.assertEqual(moordyn.Close(system),
+                         0, "Failure finishing MoorDyn")
+
+    def test_step_many(self):
+        import numpy as np
+        n, t0, dt = 10, 0.0, 0.1
+        systems = []
+        for i in range(2):
+            tmp_folder = setup_case("lines.txt")
+            system = moordyn.Create(
+                os.path.join(tmp_folder, "Mooring", "lines.txt"))
+            x = []
+            for j in range(4, 7):
+                point = moordyn.GetPoint(system, j)
+                x = x + list(moordyn.GetPointPos(point))
+            self.assertEqual(moordyn.Init(system, x, [0, ] * 9), 0,
+                             "Failure initializing the lines")
+            systems.append(system)
+        v = np.zeros((n, 9))
+        v[:, ::3] = 0.1
+        x = np.array([x, ] * n) + dt * np.cumsum(v, axis=0)
+        f_ref = np.array([moordyn.Step(systems[0], x[i], v[i], t0 + i * dt, dt)
+                          for i in range(n)])
+        f = moordyn.StepMany(systems[1], x, v, t0, dt)
+        self.assertEqual(f.shape, (n, 9))
+        self.assertTrue(np.array_equal(f, f_ref))
+        with self.assertRaises(ValueError):
+            moordyn.StepMany(systems[1], x[:, :3], v[:, :3], t0 + n * dt, dt)
+        for system in systems:
+            self.assertEqual(moordyn.Close(system),
+                             0, "Failure finishing MoorDyn")
+
+    def test_clone(self):
+        import numpy as np
+        tmp_folder = setup_case("lines.txt")
+        system = moordyn.Create(
+            os.path.join(tmp_folder, "Mooring", "lines.txt"))
+        x = []
+        for i in range(4, 7):
+            point = moordyn.GetPoint(system, i)
+            x = x + list(moordyn.GetPointPos(point))
+        self.assertEqual(moordyn.Init(system, x, [0, ] * 9), 0,
+                         "Failure initializing the lines")
+        v = np.zeros(9)
+        v[::3] = 0.1
+        x = np.array(x)
+        dt = 0.1
+        for i in range(3):
+            x = x + dt * v
+            moordyn.Step(system, x, v, i * dt, dt)
+        cloned = moordyn.Clone(system)
+        for i in range(3, 6):
+            x = x + dt * v
+            f_ref = moordyn.Step(system, x, v, i * dt, dt)
+            f = moordyn.Step(cloned, x, v, i * dt, dt)
+            self.assertEqual(f, f_ref)
+        for s in (cloned, system):
+            self.assertEqual(moordyn.Close(s), 0, "Failure finishing MoorDyn")
+
+    def test_waves_kin_array(self):
+        import numpy as np
+        tmp_folder = setup_case("lines.txt")
+        system = moordyn.Create(
+            os.path.join(tmp_folder, "Mooring", "lines.txt"))
+        x = []
+        for i in range(4, 7):
+            point = moordyn.GetPoint(system, i)
+            x = x + list(moordyn.GetPointPos(point))
+        self.assertEqual(moordyn.Init(system, x, [0, ] * 9), 0,
+                         "Failure initializing the lines")
+        waves = moordyn.GetWaves(system)
+        points = np.random.uniform(-50, 0, size=(20, 3))
+        t = np.linspace(0, 1, 20)
+        u, ud, zeta, pdyn = moordyn.GetWavesKinArray(
+            waves, points, t=t, n_threads=2)
+        self.assertEqual(u.shape, (20, 3))
+        self.assertEqual(ud.shape, (20, 3))
+        self.assertEqual(zeta.shape, (20,))
+        self.assertEqual(pdyn.shape, (20,))
+        for i, p in enumerate(points):
+            kin = moordyn.GetWavesKin(waves, p[0], p[1], p[2], t[i])
+            self.assertEqual(tuple(u[i]), kin[0])
+            self.assertEqual(tuple(ud[i]), kin[1])
+            self.assertEqual(zeta[i], kin[2])
+            self.assertEqual(pdyn[i], kin[3])
+        with self.assertRaises(ValueError):
+            moordyn.GetWavesKinArray(waves, points[:, :2])
+        self.assertEqual(moordyn.Close(system),
+                         0, "Failure finishing MoorDyn")
+
+    def test_ext_wave_kin(self):
+        import numpy as np
+        systems = []
+        for i in range(2):
+            tmp_folder = setup_case("wavekin_wave_1.txt")
+            system = moordyn.Create(
+                os.path.join(tmp_folder, "Mooring", "lines.txt"))
+            self.assertEqual(moordyn.Init(system, [0, ] * 3, [0, ] * 3), 0,
+                             "Failure initializing the lines")
+            self.assertEqual(moordyn.ExternalWaveKinInit(system), 0)
+            systems.append(system)
+        n = moordyn.ExternalWaveKinGetN(systems[0])
+        self.assertGreater(n, 0)
+        # The second system reads the kinematics from registered arrays
+        u_reg, a_reg = np.zeros((n, 3)), np.zeros((n, 3))
+        moordyn.RegisterWaveKin(systems[1], u_reg, a_reg)
+        with self.assertRaises(TypeError):
+            moordyn.RegisterWaveKin(systems[1], [0, ] * 3 * n, a_reg)
+        r = np.empty((n, 3))
+        t, dt = 0.0, 0.1
+        for i in range(5):
+            coords = moordyn.GetWaveKinCoordinates(systems[0])
+            self.assertEqual(coords.shape, (n, 3))
+            self.assertIs(moordyn.GetWaveKinCoordinates(systems[1], out=r), r)
+            self.assertTrue(np.array_equal(coords, r))
+            u = 0.1 * np.sin(t) * np.ones((n, 3))
+            a = 0.1 * np.cos(t) * np.ones((n, 3))
+            self.assertEqual(moordyn.SetWaveKin(systems[0], u, a, t), 0)
+            u_reg[:], a_reg[:] = u, a
+            self.assertEqual(moordyn.SetWaveKin(systems[1], None, None, t), 0)
+            f = [moordyn.Step(system, [0, ] * 3, [0, ] * 3, t, dt)
+                 for system in systems]
+            self.assertEqual(f[0], f[1])
+            t += dt
+        for system in systems:
+            self.assertEqual(moordyn.Close(system),
+                             0, "Failure finishing MoorDyn")
+
 
 if __name__ == '__main__':
     unittest_main()
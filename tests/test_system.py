@@ -0,0 +1,113 @@
+import sys
+from unittest import TestCase, main as unittest_main
+import os
+import time
+import numpy as np
+import moordyn
+from test_minimal import setup_case
+
+
+def create_system():
+    """Create a moordyn.System in a temporal folder
+
+    Returns:
+    moordyn.System: The system
+    """
+    tmp_folder = setup_case("lines.txt")
+    return moordyn.System(os.path.join(tmp_folder, "Mooring", "lines.txt"))
+
+
+class SystemTests(TestCase):
+    def test_objects(self):
+        with create_system() as system:
+            self.assertEqual(system.n_dof, 9)
+            self.assertEqual(len(system.points), 6)
+            self.assertEqual(len(system.lines), 3)
+            self.assertEqual([p.id for p in system.points],
+                             list(range(1, 7)))
+            x = np.concatenate([p.r[0] for p in system.points[3:]])
+            self.assertEqual(system.init(x, np.zeros(9)), 0)
+            for point in system.points:
+                self.assertEqual(
+                    tuple(point.r[0]),
+                    moordyn.GetPointPos(moordyn.GetPoint(system.capsule,
+                                                         point.id)))
+            for line in system.lines:
+                self.assertEqual(line.r.shape, (line.n + 1, 3))
+
+    def test_step(self):
+        ref = create_system()
+        x = np.concatenate([p.r[0] for p in ref.points[3:]])
+        v = np.zeros(9)
+        v[::3] = 0.1
+        self.assertEqual(moordyn.Init(ref.capsule, x, np.zeros(9)), 0)
+        with create_system() as system:
+            self.assertEqual(system.init(x, np.zeros(9)), 0)
+            f = np.empty(9)
+            for i in range(5):
+                t, dt = i * 0.1, 0.1
+                x = x + dt * v
+                f_ref = moordyn.Step(ref.capsule, x, v, t, dt)
+                self.assertIs(system.step(x, v, t, dt, out=f), f)
+                self.assertEqual(tuple(f), f_ref)
+                # The snapshot shall be updated after each time step
+                for line in system.lines:
+                    l_ref = moordyn.GetLine(ref.capsule, line.id)
+                    self.assertEqual(
+                        tuple(line.f[-1]),
+                        moordyn.GetLineNodeTen(l_ref, line.n))
+        self.assertEqual(ref.close(), 0)
+
+    def test_clone(self):
+        with create_system() as system:
+            x = np.concatenate([p.r[0] for p in system.points[3:]])
+            self.assertEqual(system.init(x, np.zeros(9)), 0)
+            system.step(x, np.zeros(9), 0.0, 0.1)
+            with system.clone() as cloned:
+                self.assertEqual(len(cloned.lines), len(system.lines))
+                self.assertTrue(np.array_equal(cloned.lines[0].r,
+                                               system.lines[0].r))
+                self.assertEqual(cloned.step(x, np.zeros(9), 0.1, 0.1),
+                                 system.step(x, np.zeros(9), 0.1, 0.1))
+
+    def test_functions_interop(self):
+        with create_system() as system:
+            x = np.concatenate([p.r[0] for p in system.points[3:]])
+            self.assertEqual(system.init(x, np.zeros(9)), 0)
+            r0 = system.lines[0].r.copy()
+            # Integrating with the moordyn module functions shall also
+            # refresh the snapshot
+            v = np.zeros(9)
+            v[::3] = 1.0
+            moordyn.Step(system.capsule, x + 0.1 * v, v, 0.0, 0.1)
+            line = system.lines[0]
+            self.assertFalse(np.array_equal(line.r, r0))
+            for i in range(line.n + 1):
+                self.assertEqual(tuple(line.r[i]),
+                                 moordyn.GetLineNodePos(line.capsule, i))
+
+    def test_overhead(self):
+        # The nodes positions of all the lines, read after each time step
+        n = 20
+        with create_system() as system:
+            x = np.concatenate([p.r[0] for p in system.points[3:]])
+            v = np.zeros(9)
+            self.assertEqual(system.init(x, v), 0)
+            t_functions, t_system = 0.0, 0.0
+            for i in range(n):
+                system.step(x, v, i * 0.1, 0.1)
+                t0 = time.perf_counter()
+                r_functions = [
+                    [moordyn.GetLineNodePos(line.capsule, j)
+                     for j in range(line.n + 1)] for line in system.lines]
+                t1 = time.perf_counter()
+                r_system = [line.r for line in system.lines]
+                t2 = time.perf_counter()
+                t_functions += t1 - t0
+                t_system += t2 - t1
+                for a, b in zip(r_functions, r_system):
+                    self.assertTrue(np.array_equal(np.array(a), b))
+        self.assertLess(t_system, t_functions)
+
+if __name__ == '__main__':
+    unittest_main()
@@ -0,0 +1,135 @@
+import sys
+from unittest import TestCase, main as unittest_main, skipIf
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import moordyn
+from test_minimal import setup_case
+
+
+N_INSTANCES = min(4, os.cpu_count() or 1)
+N_STEPS = 20
+
+
+def create_system():
+    """Create and initialize a MoorDyn system in a temporal folder
+
+    Returns:
+    cmoordyn.MoorDyn: The MoorDyn instance
+    list: The coupled points positions
+    """
+    tmp_folder = setup_case("lines.txt")
+    system = moordyn.Create(
+        os.path.join(tmp_folder, "Mooring", "lines.txt"))
+    x = []
+    for i in range(4, 7):
+        point = moordyn.GetPoint(system, i)
+        x = x + list(moordyn.GetPointPos(point))
+    v = [0, ] * 9
+    assert moordyn.Init(system, x, v) == 0
+    return system, x
+
+
+def run(system, x):
+    """Integrate a few time steps
+
+    Parameters:
+    system (cmoordyn.MoorDyn): The MoorDyn instance
+    x (list): The coupled points positions
+
+    Returns:
+    list: The last forces
+    """
+    v = [0.1, ] + [0, ] * 8
+    t, dt = 0.0, 0.1
+    for i in range(N_STEPS):
+        forces = moordyn.Step(system, x, v, t, dt)
+        t += dt
+    return forces
+
+
+class ThreadsTests(TestCase):
+    def setUp(self):
+        self.systems = [create_system() for i in range(N_INSTANCES)]
+
+    def tearDown(self):
+        for system, x in self.systems:
+            self.assertEqual(moordyn.Close(system), 0)
+
+    @skipIf(N_INSTANCES < 2, "Not enough CPUs to test threads scaling")
+    def test_scaling(self):
+        # Serial execution, on its own systems
+        serial = [create_system() for i in range(N_INSTANCES)]
+        t0 = time.perf_counter()
+        forces_serial = [run(system, x) for system, x in serial]
+        t_serial = time.perf_counter() - t0
+        for system, x in serial:
+            self.assertEqual(moordyn.Close(system), 0)
+        # Each thread is integrating its own system
+        with ThreadPoolExecutor(max_workers=N_INSTANCES) as pool:
+            t0 = time.perf_counter()
+            futures = [pool.submit(run, system, x)
+                       for system, x in self.systems]
+            forces = [future.result() for future in futures]
+            t_threads = time.perf_counter() - t0
+        self.assertEqual(forces, forces_serial)
+        # The threads shall actually run in parallel. If the GIL were kept
+        # while integrating, the threads would take as long as the serial
+        # execution
+        self.assertLess(t_threads, 0.75 * t_serial)
+
+    def test_gil_released(self):
+        # Other Python threads shall keep running while a system is being
+        # integrated, even on a single CPU
+        system, x = self.systems[0]
+        v = [0.1, ] + [0, ] * 8
+        span = []
+
+        def step():
+            t0 = time.perf_counter()
+            moordyn.Step(system, x, v, 0.0, 20.0)
+            span.extend([t0, time.perf_counter()])
+
+        ticks = []
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(step)
+            while not future.done():
+                ticks.append(time.perf_counter())
+            future.result()
+        t0, t1 = span
+        ticks = [tick for tick in ticks if t0 <= tick <= t1]
+        # The main thread shall run along the whole step, not just before
+        # entering MoorDyn
+        self.assertTrue(ticks)
+        self.assertGreater(ticks[-1] - ticks[0], 0.5 * (t1 - t0))
+
+    def test_same_instance(self):
+        # Several threads working on the same instance shall be serialized
+        system, x = self.systems[0]
+        with ThreadPoolExecutor(max_workers=N_INSTANCES) as pool:
+            futures = [pool.submit(run, system, x)
+                       for i in range(N_INSTANCES)]
+            for future in futures:
+                future.result()
+
+    def test_read_while_integrating(self):
+        # Reading a system while another thread integrates it shall not
+        # modify the results
+        ref, x_ref = self.systems[0]
+        forces_ref = run(ref, x_ref)
+        system, x = self.systems[1 % N_INSTANCES] if N_INSTANCES > 1 \
+            else create_system()
+        line = moordyn.GetLine(system, 1)
+        n = moordyn.GetLineN(line)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(run, system, x)
+            while not future.done():
+                for i in range(n + 1):
+                    moordyn.GetLineNodePos(line, i)
+            forces = future.result()
+        self.assertEqual(forces, forces_ref)
+        if N_INSTANCES == 1:
+            self.assertEqual(moordyn.Close(system), 0)
+
+if __name__ == '__main__':
+    unittest_main()
@@ -159,4 +159,142 @@ isclose(const double& a,
         const double& atol = std::numeric_limits<double>::epsilon())
 {
 	return std::abs(a - b) <= (atol + rtol * std::abs(b));
-}
\ No newline at end of file
+}
+#ifdef REQUIRE
+
+// Helpers for the Catch2 tests comparing time schemes, which shall include
+// the Catch2 headers before this one
+
+#include "MoorDyn2.h"
+#include <cmath>
+#include <string>
+
+/** @brief Get the coupled points positions
+ * @param system The system
+ * @return The positions
+ */
+std::vector<double>
+coupled_positions(MoorDyn system)
+{
+	unsigned int n_dof;
+	REQUIRE(MoorDyn_NCoupledDOF(system, &n_dof) == MOORDYN_SUCCESS);
+	std::vector<double> x(n_dof);
+	unsigned int n_points, n_coupled = 0;
+	REQUIRE(MoorDyn_GetNumberPoints(system, &n_points) == MOORDYN_SUCCESS);
+	for (unsigned int i = 1; i <= n_points; i++) {
+		const auto point = MoorDyn_GetPoint(system, i);
+		int t;
+		REQUIRE(MoorDyn_GetPointType(point, &t) == MOORDYN_SUCCESS);
+		if (t != -1)
+			continue;
+		REQUIRE(MoorDyn_GetPointPos(point, x.data() + 3 * n_coupled++) ==
+		        MOORDYN_SUCCESS);
+	}
+	REQUIRE(3 * n_coupled == n_dof);
+	return x;
+}
+
+/** @brief Compute the initial condition, with the RK4 time scheme
+ * @param filepath The input file
+ * @return The serialized system
+ */
+std::vector<uint64_t>
+initial_condition(const char* filepath)
+{
+	MoorDyn system = MoorDyn_Create(filepath);
+	REQUIRE(system);
+	REQUIRE(MoorDyn_SetTimeScheme(system, "RK4") == MOORDYN_SUCCESS);
+	auto x = coupled_positions(system);
+	std::vector<double> v(x.size(), 0.0);
+	REQUIRE(MoorDyn_Init(system, x.data(), v.data()) == MOORDYN_SUCCESS);
+	size_t size;
+	REQUIRE(MoorDyn_Serialize(system, &size, NULL) == MOORDYN_SUCCESS);
+	std::vector<uint64_t> data(size / sizeof(uint64_t));
+	REQUIRE(MoorDyn_Serialize(system, NULL, data.data()) == MOORDYN_SUCCESS);
+	REQUIRE(MoorDyn_Close(system) == MOORDYN_SUCCESS);
+	return data;
+}
+
+/** @brief Move the coupled points with a sinusoidal motion along x
+ * @param filepath The input file
+ * @param ic The initial condition, see initial_condition()
+ * @param scheme The time scheme
+ * @param dt The coupling time step
+ * @param t_end The simulated time
+ * @param amplitude The motion amplitude
+ * @param period The motion period
+ * @param dt_model The model time step. If it is 0, the one on the input file
+ * is kept
+ * @param f If not NULL, the forces on the coupled points at the end of the
+ * simulation
+ * @return The positions of all the nodes at the end of the simulation
+ */
+std::vector<double>
+sway(const char* filepath,
+     const std::vector<uint64_t>& ic,
+     const std::string& scheme,
+     double dt,
+     double t_end,
+     double amplitude,
+     double period,
+     double dt_model = 0.0,
+     std::vector<double>* f = NULL)
+{
+	MoorDyn system = MoorDyn_Create(filepath);
+	REQUIRE(system);
+	REQUIRE(MoorDyn_SetTimeScheme(system, "RK4") == MOORDYN_SUCCESS);
+	const auto x0 = coupled_positions(system);
+	const unsigned int n_dof = x0.size();
+	std::vector<double> x(x0), v(n_dof, 0.0), forces(n_dof);
+	REQUIRE(MoorDyn_Init_NoIC(system, x.data(), v.data()) == MOORDYN_SUCCESS);
+	REQUIRE(MoorDyn_Deserialize(system, ic.data()) == MOORDYN_SUCCESS);
+	REQUIRE(MoorDyn_SetTimeScheme(system, scheme.c_str()) == MOORDYN_SUCCESS);
+	if (dt_model > 0.0)
+		REQUIRE(MoorDyn_SetDt(system, dt_model) == MOORDYN_SUCCESS);
+
+	const double w = 2.0 * M_PI / period;
+	double t = 0.0;
+	for (unsigned int i = 0; i < (unsigned int)std::round(t_end / dt); i++) {
+		double dt_step = dt;
+		const double t_next = (i + 1) * dt;
+		x = x0;
+		for (unsigned int j = 0; j < n_dof; j += 3) {
+			x[j] += amplitude * sin(w * t_next);
+			v[j] = amplitude * w * cos(w * t_next);
+		}
+		REQUIRE(MoorDyn_Step(system,
+		                     x.data(),
+		                     v.data(),
+		                     forces.data(),
+		                     &t,
+		                     &dt_step) == MOORDYN_SUCCESS);
+	}
+	if (f)
+		*f = forces;
+
+	unsigned int n_nodes;
+	REQUIRE(MoorDyn_GetSnapshotSize(system, NULL, &n_nodes) ==
+	        MOORDYN_SUCCESS);
+	std::vector<double> r(3 * n_nodes);
+	REQUIRE(MoorDyn_GetSystemSnapshot(system, r.data(), NULL, NULL) ==
+	        MOORDYN_SUCCESS);
+	REQUIRE(MoorDyn_Close(system) == MOORDYN_SUCCESS);
+	return r;
+}
+
+/** @brief Get the maximum difference between two lists of values
+ * @param a The first list
+ * @param b The second list
+ * @return The maximum difference
+ */
+double
+max_diff(const std::vector<double>& a, const std::vector<double>& b)
+{
+	REQUIRE(a.size() == b.size());
+	double diff = 0.0;
+	for (unsigned int i = 0; i < a.size(); i++)
+		diff = (std::max)(diff, std::abs(a[i] - b[i]));
+	return diff;
+}
+
+#endif
@@ -0,0 +1,119 @@
+/*
+ * Copyright (c) 2023 Jose Luis Cercos-Pita <jlc@core-marine.com>
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * 1. Redistributions of source code must retain the above copyright notice,
+ * this list of conditions and the following disclaimer.
+ *
+ * 2. Redistributions in binary form must reproduce the above copyright notice,
+ *    this list of conditions and the following disclaimer in the documentation
+ *    and/or other materials provided with the distribution.
+ *
+ * 3. Neither the name of the copyright holder nor the names of its
+ *    contributors may be used to endorse or promote products derived from
+ *    this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+
+/** @file wave_pruning.cpp
+ * Tests on the energy based pruning of the wave components
+ */
+
+#include "Waves/WaveSpectrum.hpp"
+#include "Waves.h"
+#include <cmath>
+#include <catch2/catch_test_macros.hpp>
+
+namespace waves = moordyn::waves;
+
+/// Water depth
+#define DEPTH 50.0
+/// Gravity acceleration
+#define G 9.81
+
+/** @brief Build a Pierson-Moskowitz like spectrum of many components
+ * @param n The number of components
+ * @return The spectrum
+ */
+waves::DiscreteWaveSpectrum
+spectrum(unsigned int n)
+{
+	const moordyn::real hs = 2.0, wp = 0.6, dw = 4.0 / n;
+	waves::DiscreteWaveSpectrum s;
+	s.addFreqComp(0.0, 0.0, 0.0);
+	for (unsigned int i = 1; i < n; i++) {
+		const moordyn::real w = i * dw;
+		const moordyn::real S = 5.0 / 16.0 * hs * hs * pow(wp, 4) /
+		                        pow(w, 5) * exp(-1.25 * pow(wp / w, 4));
+		s.addFreqComp(waves::FrequencyComponent(
+		    w, std::polar(sqrt(2.0 * S * dw), 0.1 * i)));
+	}
+	return s;
+}
+
+/** @brief Variances of the surface elevation and the surface velocity
+ * @param s The spectrum
+ * @param var_zeta The surface elevation variance
+ * @param var_u The velocity variance
+ */
+void
+variances(waves::DiscreteWaveSpectrum& s,
+          moordyn::real& var_zeta,
+          moordyn::real& var_u)
+{
+	var_zeta = var_u = 0.0;
+	for (const auto& c : s.getComponents()) {
+		const moordyn::real a2 = std::norm(c.amplitude);
+		var_zeta += 0.5 * a2;
+		if (c.omega == 0.0)
+			continue;
+		const moordyn::real k = WaveNumber(c.omega, G, DEPTH);
+		const moordyn::real coth = 1.0 / tanh(k * DEPTH);
+		var_u += 0.5 * c.omega * c.omega * a2 * (1.0 + coth * coth);
+	}
+}
+
+TEST_CASE("Pruning error bound")
+{
+	auto s = spectrum(400);
+	moordyn::real var_zeta, var_u;
+	variances(s, var_zeta, var_u);
+
+	const moordyn::real tol = 1e-2;
+	moordyn::real err_zeta, err_u;
+	const auto n_removed = s.prune(tol, G, DEPTH, err_zeta, err_u);
+	REQUIRE(n_removed > 50);
+	REQUIRE(s.size() == 400 - n_removed);
+	REQUIRE(err_zeta <= tol);
+	REQUIRE(err_u <= tol);
+	for (unsigned int i = 1; i < s.size(); i++)
+		REQUIRE(s[i].omega > s[i - 1].omega);
+
+	moordyn::real pruned_zeta, pruned_u;
+	variances(s, pruned_zeta, pruned_u);
+	REQUIRE(std::abs(1.0 - pruned_zeta / var_zeta - err_zeta) < 1e-12);
+	REQUIRE(std::abs(1.0 - pruned_u / var_u - err_u) < 1e-12);
+}
+
+TEST_CASE("Null tolerance")
+{
+	auto s = spectrum(100);
+	moordyn::real err_zeta, err_u;
+	REQUIRE(s.prune(0.0, G, DEPTH, err_zeta, err_u) == 0);
+	REQUIRE(s.size() == 100);
+	REQUIRE(err_zeta == 0.0);
+	REQUIRE(err_u == 0.0);
+}
@@ -4,9 +4,13 @@
  */
 #include "MoorDyn2.hpp"
 #include "MoorDynAPI.h"
+#include "MoorDyn2.h"
 #include <iostream>
 #include <algorithm>
+#include <vector>
+#include <cmath>
 #include "util.h"
+#include "Waves/SpectrumKin.hpp"
 using namespace std;
 
 /** @brief Runs a simulation
@@ -53,6 +57,249 @@ api()
 	return true;
 }
 
+/** @brief Check that the wave kinematics on a set of points matches the
+ * pointwise evaluation
+ *
+ * @return true if the test is passed, false if problems are detected
+ */
+bool
+kin_array()
+{
+	MoorDyn system = MoorDyn_Create("Mooring/wavekin_7/wavekin_7.txt");
+	if (!system) {
+		cerr << "Failure Creating the Mooring system" << endl;
+		return false;
+	}
+	double x[3], dx[3], f[3];
+	std::fill(x, x + 3, 0.0);
+	std::fill(dx, dx + 3, 0.0);
+	if (MoorDyn_Init(system, x, dx) != MOORDYN_SUCCESS) {
+		MoorDyn_Close(system);
+		return false;
+	}
+	double t = 0.0, dt = 0.5;
+	if (MoorDyn_Step(system, x, dx, f, &t, &dt) != MOORDYN_SUCCESS) {
+		MoorDyn_Close(system);
+		return false;
+	}
+
+	MoorDynWaves waves = MoorDyn_GetWaves(system);
+	MoorDynSeafloor seafloor = MoorDyn_GetSeafloor(system);
+	const unsigned int n = 11;
+	std::vector<double> pos(3 * n), times(n, t);
+	for (unsigned int i = 0; i < n; i++) {
+		pos[3 * i] = 10.0 * i;
+		pos[3 * i + 1] = -5.0 * i;
+		pos[3 * i + 2] = -2.0 * i;
+	}
+	std::vector<double> u(3 * n), ud(3 * n), zeta(n), pdyn(n);
+	std::vector<double> u_t(3 * n), zeta_t(n);
+	if ((MoorDyn_GetWavesKinArray(waves,
+	                              n,
+	                              pos.data(),
+	                              NULL,
+	                              u.data(),
+	                              ud.data(),
+	                              zeta.data(),
+	                              pdyn.data(),
+	                              seafloor,
+	                              1) != MOORDYN_SUCCESS) ||
+	    (MoorDyn_GetWavesKinArray(waves,
+	                              n,
+	                              pos.data(),
+	                              times.data(),
+	                              u_t.data(),
+	                              NULL,
+	                              zeta_t.data(),
+	                              NULL,
+	                              seafloor,
+	                              4) != MOORDYN_SUCCESS)) {
+		cerr << "Failure getting the wave kinematics array" << endl;
+		MoorDyn_Close(system);
+		return false;
+	}
+
+	for (unsigned int i = 0; i < n; i++) {
+		double u_ref[3], ud_ref[3], zeta_ref, pdyn_ref;
+		MoorDyn_GetWavesKin(waves,
+		                    pos[3 * i],
+		                    pos[3 * i + 1],
+		                    pos[3 * i + 2],
+		                    u_ref,
+		                    ud_ref,
+		                    &zeta_ref,
+		                    &pdyn_ref,
+		                    seafloor);
+		bool ok = (zeta[i] == zeta_ref) && (zeta_t[i] == zeta_ref) &&
+		          (pdyn[i] == pdyn_ref);
+		for (unsigned int j = 0; j < 3; j++) {
+			ok = ok && (u[3 * i + j] == u_ref[j]) &&
+			     (u_t[3 * i + j] == u_ref[j]) && (ud[3 * i + j] == ud_ref[j]);
+		}
+		if (!ok) {
+			cerr << "Mismatching wave kinematics at point " << i << endl;
+			MoorDyn_Close(system);
+			return false;
+		}
+	}
+
+	MoorDyn_Close(system);
+	return true;
+}
+
+/** @brief Check that the wave kinematics at the nodes, which are evaluated
+ * all at once, match the pointwise evaluation
+ *
+ * @return true if the test is passed, false if problems are detected
+ */
+bool
+nodes_kin()
+{
+	moordyn::MoorDyn system("Mooring/wavekin_7/wavekin_7.txt");
+	double x[3], dx[3], f[3];
+	std::fill(x, x + 3, 0.0);
+	std::fill(dx, dx + 3, 0.0);
+	if (system.Init(x, dx) != MOORDYN_SUCCESS)
+		return false;
+	double t = 0.0, dt = 0.5;
+	if (system.Step(x, dx, f, t, dt) != MOORDYN_SUCCESS)
+		return false;
+
+	auto waves = system.GetWaves();
+	waves->updateWaves();
+	for (auto line : system.GetLines()) {
+		const auto [zetas, U, Ud, pdyns] = waves->getWaveKinLine(line->lineId);
+		for (unsigned int i = 0; i <= line->getN(); i++) {
+			moordyn::real zeta, pdyn;
+			moordyn::vec3 u, ud;
+			waves->getWaveKin(line->getNodePos(i),
+			                  zeta,
+			                  u,
+			                  ud,
+			                  pdyn,
+			                  system.GetSeafloor().get());
+			const double tol = 1e-10;
+			if ((std::abs(zetas[i] - zeta) > tol * (1.0 + std::abs(zeta))) ||
+			    ((U[i] - u).norm() > tol * (1.0 + u.norm())) ||
+			    ((Ud[i] - ud).norm() > tol * (1.0 + ud.norm())) ||
+			    (pdyns[i] != pdyn)) {
+				cerr << "Mismatching wave kinematics at line " << line->number
+				     << " node " << i << endl;
+				return false;
+			}
+		}
+	}
+	return true;
+}
+
+/** @brief Check that the wave kinematics at the moving nodes, evaluated
+ * rotating the phasors, match the pointwise evaluation within the tolerance
+ *
+ * @return true if the test is passed, false if problems are detected
+ */
+bool
+phasors()
+{
+	moordyn::MoorDyn system("Mooring/wavekin_7/wavekin_7_phasors.txt");
+	double x[3], dx[3], f[3];
+	std::fill(x, x + 3, 0.0);
+	std::fill(dx, dx + 3, 0.0);
+	if (system.Init(x, dx) != MOORDYN_SUCCESS)
+		return false;
+
+	auto waves = system.GetWaves();
+	double t = 0.0;
+	while (t < 10.0) {
+		double dt = 0.1;
+		// Move the fairlead, so the nodes are displaced
+		x[1] = 20.0 * sin(0.5 * (t + dt));
+		dx[1] = 10.0 * cos(0.5 * (t + dt));
+		if (system.Step(x, dx, f, t, dt) != MOORDYN_SUCCESS)
+			return false;
+
+		waves->updateWaves();
+		for (auto line : system.GetLines()) {
+			const auto [zetas, U, Ud, pdyns] =
+			    waves->getWaveKinLine(line->lineId);
+			for (unsigned int i = 0; i <= line->getN(); i++) {
+				moordyn::real zeta, pdyn;
+				moordyn::vec3 u, ud;
+				waves->getWaveKin(line->getNodePos(i),
+				                  zeta,
+				                  u,
+				                  ud,
+				                  pdyn,
+				                  system.GetSeafloor().get());
+				const double tol = 1e-5;
+				if ((std::abs(zetas[i] - zeta) > tol * (1.0 + std::abs(zeta))) ||
+				    ((U[i] - u).norm() > tol * (1.0 + u.norm())) ||
+				    ((Ud[i] - ud).norm() > tol * (1.0 + ud.norm()))) {
+					cerr << "Mismatching wave kinematics at t = " << t
+					     << ", line " << line->number << " node " << i << endl;
+					return false;
+				}
+			}
+		}
+	}
+	return true;
+}
+
+/** @brief Check that the scratch buffers and phasors of the batched
+ * evaluation are not reused between different spectra
+ *
+ * @return true if the test is passed, false if problems are detected
+ */
+bool
+shared_scratch()
+{
+	auto env = std::make_shared<EnvCond>();
+	env->g = 9.81;
+	env->WtrDpth = 50.0;
+	env->waterKinOptions.phaseTol = 1e-6;
+	// Same number of components and depth, but different wave numbers
+	moordyn::waves::SpectrumKin spectra[2];
+	spectra[0].setup({ { 0.5, 1.0, 0.0 }, { 1.0, 0.5, 0.3 } }, env);
+	spectra[1].setup({ { 0.7, 0.8, 1.2 }, { 1.3, 0.4, -0.6 } }, env);
+
+	const std::vector<moordyn::vec3> pos = { { 0.0, 0.0, -5.0 },
+		                                     { 12.0, -7.0, -20.0 },
+		                                     { -30.0, 4.0, -45.0 } };
+	const unsigned int n = pos.size();
+	const std::vector<moordyn::real> depths(n, -env->WtrDpth);
+	moordyn::waves::SpectrumKin::Scratch scratch;
+	moordyn::waves::SpectrumKin::Phasors phasors;
+	std::vector<moordyn::real> zetas(n);
+	std::vector<moordyn::vec3> U(n), Ud(n);
+	for (auto& spectrum : spectra) {
+		const moordyn::real t = 1.5;
+		spectrum.getWaveKin(n,
+		                    pos.data(),
+		                    t,
+		                    -env->WtrDpth,
+		                    depths.data(),
+		                    zetas.data(),
+		                    U.data(),
+		                    Ud.data(),
+		                    scratch,
+		                    &phasors);
+		for (unsigned int i = 0; i < n; i++) {
+			moordyn::real zeta;
+			moordyn::vec3 u, ud;
+			spectrum.getWaveKin(
+			    pos[i], t, -env->WtrDpth, depths[i], &zeta, &u, &ud);
+			const double tol = 1e-10;
+			if ((std::abs(zetas[i] - zeta) > tol * (1.0 + std::abs(zeta))) ||
+			    ((U[i] - u).norm() > tol * (1.0 + u.norm())) ||
+			    ((Ud[i] - ud).norm() > tol * (1.0 + ud.norm()))) {
+				cerr << "Mismatching wave kinematics at point " << i
+				     << " with shared scratch buffers" << endl;
+				return false;
+			}
+		}
+	}
+	return true;
+}
+
 /** @brief Runs all the test
  * @return 0 if the tests have ran just fine, 1 otherwise
  */
@@ -61,6 +308,14 @@ main(int, char**)
 {
 	if (!api())
 		return 1;
+	if (!kin_array())
+		return 2;
+	if (!nodes_kin())
+		return 3;
+	if (!phasors())
+		return 4;
+	if (!shared_scratch())
+		return 5;
 
 	return 0;
 }
@@ -29,8 +29,10 @@
  */
 
 #include <string>
+#include <cstring>
 #include <sstream>
 #include <Python.h>
+#include <pythread.h>
 #include "MoorDyn2.h"
 
 const char moordyn_capsule_name[] = "MoorDyn";
@@ -74,9 +76,349 @@ py_iterable_to_double(PyObject* lst)
 	return arr;
 }
 
+/** @brief A C array of doubles, either borrowed from a Python object
+ * implementing the buffer protocol or allocated and filled from a Python
+ * iterable
+ * @see py_doubles_get()
+ * @see py_doubles_release()
+ */
+typedef struct
+{
+	/// The C array
+	double* data;
+	/// The buffer view, if the object is exposing one
+	Py_buffer view;
+	/// true if the data is borrowed from view, false if it was allocated
+	bool borrowed;
+} py_doubles;
+
+/** @brief Get a C array of doubles from a Python object
+ *
+ * C contiguous float64 buffers (like NumPy arrays or array.array('d')) are
+ * used directly, without copying the data. Any other iterable is converted
+ * using py_iterable_to_double()
+ * @param obj The Python object
+ * @param n The expected number of components
+ * @param name The argument name, for the error messages
+ * @param arr The output array, which shall be released with
+ * py_doubles_release()
+ * @param writable true if the data is an output, so it shall be a writable
+ * buffer, false otherwise
+ * @return true upon success, false otherwise. In case of failure a Python
+ * exception is set
+ */
+static bool
+py_doubles_get(PyObject* obj,
+               Py_ssize_t n,
+               const char* name,
+               py_doubles* arr,
+               bool writable = false)
+{
+	arr->data = NULL;
+	arr->view.obj = NULL;
+	arr->borrowed = false;
+
+	const int flags =
+	    PyBUF_C_CONTIGUOUS | PyBUF_FORMAT | (writable ? PyBUF_WRITABLE : 0);
+	if (PyObject_CheckBuffer(obj) &&
+	    (PyObject_GetBuffer(obj, &(arr->view), flags) == 0)) {
+		const char* fmt = arr->view.format;
+		if (fmt && ((fmt[0] == '@') || (fmt[0] == '=') || (fmt[0] == '<')))
+			fmt++;
+		if (fmt && !strcmp(fmt, "d") &&
+		    (arr->view.itemsize == sizeof(double))) {
+			if (arr->view.len != (Py_ssize_t)(n * sizeof(double))) {
+				PyBuffer_Release(&(arr->view));
+				arr->view.obj = NULL;
+				std::stringstream err;
+				err << name << " must have " << n << " components";
+				PyErr_SetString(PyExc_ValueError, err.str().c_str());
+				return false;
+			}
+			arr->data = (double*)arr->view.buf;
+			arr->borrowed = true;
+			return true;
+		}
+		// Not a float64 buffer, let's try to convert it
+		PyBuffer_Release(&(arr->view));
+		arr->view.obj = NULL;
+	}
+	PyErr_Clear();
+
+	if (writable) {
+		std::stringstream err;
+		err << name << " must be a writable C contiguous float64 buffer";
+		PyErr_SetString(PyExc_TypeError, err.str().c_str());
+		return false;
+	}
+
+	std::stringstream msg;
+	msg << name << " must be iterable";
+	PyObject* lst = PySequence_Fast(obj, msg.str().c_str());
+	if (!lst)
+		return false;
+	if (PySequence_Fast_GET_SIZE(lst) != n) {
+		Py_DECREF(lst);
+		std::stringstream err;
+		err << name << " must have " << n << " components";
+		PyErr_SetString(PyExc_ValueError, err.str().c_str());
+		return false;
+	}
+	arr->data = py_iterable_to_double(lst);
+	Py_DECREF(lst);
+	return arr->data != NULL;
+}
+
+/** @brief Release an array got with py_doubles_get()
+ * @param arr The array
+ */
+static void
+py_doubles_release(py_doubles* arr)
+{
+	if (arr->borrowed)
+		PyBuffer_Release(&(arr->view));
+	else
+		free(arr->data);
+	arr->data = NULL;
+	arr->view.obj = NULL;
+	arr->borrowed = false;
+}
+
+/** @brief Data attached to each MoorDyn capsule
+ */
+typedef struct
+{
+	/// The lock to access the MoorDyn system
+	PyThread_type_lock lock;
+	/// The registered wave velocities, see ext_wave_register()
+	py_doubles wave_u;
+	/// The registered wave accelerations, see ext_wave_register()
+	py_doubles wave_a;
+	/// The number of times the system state has been modified, see
+	/// get_state_counter()
+	unsigned long state_counter;
+} moordyn_context;
+
+/** @brief Release the registered wave kinematics buffers, if any
+ * @param ctx The MoorDyn capsule context
+ */
+static void
+moordyn_context_release_waves(moordyn_context* ctx)
+{
+	py_doubles_release(&(ctx->wave_u));
+	py_doubles_release(&(ctx->wave_a));
+}
+
+/** @brief Destructor of the MoorDyn capsules, which frees the lock and the
+ * registered buffers
+ *
+ * The MoorDyn system itself is not deleted, that is the job of
+ * MoorDyn_Close()
+ * @param capsule The MoorDyn capsule
+ */
+static void
+moordyn_capsule_destructor(PyObject* capsule)
+{
+	moordyn_context* ctx = (moordyn_context*)PyCapsule_GetContext(capsule);
+	if (!ctx)
+		return;
+	moordyn_context_release_waves(ctx);
+	if (ctx->lock)
+		PyThread_free_lock(ctx->lock);
+	free(ctx);
+}
+
+/** @brief Destructor of the capsules which are holding a reference to the
+ * MoorDyn capsule they were taken from
+ * @param capsule The capsule
+ * @see capsule_set_parent()
+ */
+static void
+child_capsule_destructor(PyObject* capsule)
+{
+	PyObject* parent = (PyObject*)PyCapsule_GetContext(capsule);
+	Py_XDECREF(parent);
+}
+
+/** @brief Make a capsule keep a reference to the MoorDyn capsule it was taken
+ * from, so it can access its lock
+ * @param capsule The new capsule, which shall be created with
+ * child_capsule_destructor()
+ * @param parent The MoorDyn capsule
+ * @return The capsule, NULL if it is NULL
+ */
+static PyObject*
+capsule_set_parent(PyObject* capsule, PyObject* parent)
+{
+	if (!capsule)
+		return NULL;
+	Py_INCREF(parent);
+	if (PyCapsule_SetContext(capsule, (void*)parent)) {
+		Py_DECREF(parent);
+		Py_DECREF(capsule);
+		return NULL;
+	}
+	return capsule;
+}
+
+/** @brief Get the MoorDyn capsule of a system
+ * @param capsule Either the MoorDyn capsule, or a capsule created with
+ * capsule_set_parent()
+ * @return The MoorDyn capsule, NULL if it cannot be found
+ */
+static PyObject*
+moordyn_get_capsule(PyObject* capsule)
+{
+	if (!PyCapsule_IsValid(capsule, moordyn_capsule_name)) {
+		capsule = (PyObject*)PyCapsule_GetContext(capsule);
+		if (!capsule || !PyCapsule_IsValid(capsule, moordyn_capsule_name))
+			return NULL;
+	}
+	return capsule;
+}
+
+/** @brief Get the context of a MoorDyn system
+ * @param capsule Either the MoorDyn capsule, or a capsule created with
+ * capsule_set_parent()
+ * @return The context, NULL if it cannot be found
+ */
+static moordyn_context*
+moordyn_get_context(PyObject* capsule)
+{
+	capsule = moordyn_get_capsule(capsule);
+	if (!capsule)
+		return NULL;
+	return (moordyn_context*)PyCapsule_GetContext(capsule);
+}
+
+/** @brief Get the lock of a MoorDyn system
+ * @param capsule Either the MoorDyn capsule, or a capsule created with
+ * capsule_set_parent()
+ * @return The lock, NULL if it cannot be found
+ */
+static PyThread_type_lock
+moordyn_lock(PyObject* capsule)
+{
+	moordyn_context* ctx = moordyn_get_context(capsule);
+	return ctx ? ctx->lock : NULL;
+}
+
+/** @brief Mark the state of a MoorDyn system as modified, so the cached
+ * snapshots are discarded
+ * @param capsule The MoorDyn capsule
+ * @see get_state_counter()
+ */
+static void
+moordyn_state_changed(PyObject* capsule)
+{
+	moordyn_context* ctx = moordyn_get_context(capsule);
+	if (ctx)
+		ctx->state_counter++;
+}
+
+/** @brief Scoped release of the GIL, holding the MoorDyn system lock instead
+ *
+ * This way several Python threads can simultaneously work with different
+ * MoorDyn systems, while each system is still accessed by a single thread
+ * at a time. No Python API shall be used while this object lives
+ */
+class allow_threads
+{
+  public:
+	/** @brief Release the GIL and acquire the system lock
+	 * @param capsule The MoorDyn capsule, or a capsule created with
+	 * capsule_set_parent()
+	 */
+	allow_threads(PyObject* capsule)
+	  : _lock(moordyn_lock(capsule))
+	{
+		_state = PyEval_SaveThread();
+		if (_lock)
+			PyThread_acquire_lock(_lock, WAIT_LOCK);
+	}
+
+	/** @brief Release the system lock and acquire the GIL back
+	 */
+	~allow_threads()
+	{
+		if (_lock)
+			PyThread_release_lock(_lock);
+		PyEval_RestoreThread(_state);
+	}
+
+  private:
+	/// The system lock
+	PyThread_type_lock _lock;
+	/// The saved thread state
+	PyThreadState* _state;
+};
+
+/** @brief Scoped acquisition of the MoorDyn system lock, keeping the GIL
+ *
+ * This way the system is not read or modified while another thread is
+ * integrating it. If the lock is busy, the GIL is released while waiting for
+ * it. The Python API can be used while this object lives
+ */
+class system_lock
+{
+  public:
+	/** @brief Acquire the system lock
+	 * @param capsule The MoorDyn capsule, or a capsule created with
+	 * capsule_set_parent()
+	 */
+	system_lock(PyObject* capsule)
+	  : _lock(moordyn_lock(capsule))
+	{
+		if (_lock && !PyThread_acquire_lock(_lock, NOWAIT_LOCK)) {
+			Py_BEGIN_ALLOW_THREADS;
+			PyThread_acquire_lock(_lock, WAIT_LOCK);
+			Py_END_ALLOW_THREADS;
+		}
+	}
+
+	/** @brief Release the system lock
+	 */
+	~system_lock()
+	{
+		if (_lock)
+			PyThread_release_lock(_lock);
+	}
+
+  private:
+	/// The system lock
+	PyThread_type_lock _lock;
+};
+
 //                                 MoorDyn2.h
 // =============================================================================
 
+/** @brief Wrap a MoorDyn system into a new Python capsule, with its context
+ * @param system The MoorDyn system
+ * @return A Python capsule, NULL if errors happened
+ */
+static PyObject*
+new_moordyn_capsule(MoorDyn system)
+{
+	PyObject* capsule = PyCapsule_New(
+	    (void*)system, moordyn_capsule_name, moordyn_capsule_destructor);
+	if (!capsule)
+		return NULL;
+	moordyn_context* ctx = (moordyn_context*)calloc(1, sizeof(moordyn_context));
+	if (!ctx) {
+		Py_DECREF(capsule);
+		PyErr_SetString(PyExc_MemoryError, "Failure allocating the context");
+		return NULL;
+	}
+	PyCapsule_SetContext(capsule, (void*)ctx);
+	ctx->lock = PyThread_allocate_lock();
+	if (!ctx->lock) {
+		Py_DECREF(capsule);
+		PyErr_SetString(PyExc_MemoryError, "Failure allocating the lock");
+		return NULL;
+	}
+	return capsule;
+}
+
 /** @brief Wrapper to MoorDyn_Create() function
  * @param args Python passed arguments
  * @return A Python capsule
@@ -95,7 +437,37 @@ create(PyObject*, PyObject* args)
 		return NULL;
 	}
 
-	return PyCapsule_New((void*)system, moordyn_capsule_name, NULL);
+	return new_moordyn_capsule(system);
+}
+
+/** @brief Wrapper to MoorDyn_Clone() function
+ * @param args Python passed arguments
+ * @return A Python capsule
+ */
+static PyObject*
+clone(PyObject*, PyObject* args)
+{
+	PyObject* capsule;
+
+	if (!PyArg_ParseTuple(args, "O", &capsule))
+		return NULL;
+
+	MoorDyn system =
+	    (MoorDyn)PyCapsule_GetPointer(capsule, moordyn_capsule_name);
+	if (!system)
+		return NULL;
+
+	MoorDyn cloned;
+	{
+		allow_threads nogil(capsule);
+		cloned = MoorDyn_Clone(system);
+	}
+	if (!cloned) {
+		PyErr_SetString(PyExc_RuntimeError, "MoorDyn_Clone() failed");
+		return NULL;
+	}
+
+	return new_moordyn_capsule(cloned);
 }
 
 /** @brief Wrapper to MoorDyn_NCoupledDOF() function
@@ -115,6 +487,8 @@ n_coupled_dof(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	unsigned int n;
 	const int err = MoorDyn_NCoupledDOF(system, &n);
 	if (err != 0) {
@@ -143,6 +517,8 @@ set_verbosity(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	return PyLong_FromLong(MoorDyn_SetVerbosity(system, verbosity));
 }
 
@@ -164,6 +540,8 @@ set_logfile(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	return PyLong_FromLong(MoorDyn_SetLogFile(system, filepath));
 }
 
@@ -185,6 +563,8 @@ set_loglevel(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	return PyLong_FromLong(MoorDyn_SetLogLevel(system, verbosity));
 }
 
@@ -207,10 +587,15 @@ log(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	return PyLong_FromLong(MoorDyn_Log(system, level, msg));
 }
 
 /** @brief Wrapper to MoorDyn_Init() function
+ *
+ * The positions and velocities can be either C contiguous float64 buffers
+ * (e.g. NumPy arrays), which are used without copying them, or any iterable
  * @param args Python passed arguments
  * @return 0 in case of success, an error code otherwise
  */
@@ -232,58 +617,59 @@ init(PyObject*, PyObject* args)
 	unsigned int n_dof;
 	MoorDyn_NCoupledDOF(system, &n_dof);
 
-	x_lst = PySequence_Fast(x_lst, "1st argument must be iterable");
-	if (!x_lst)
+	// Get C arrays that MoorDyn might handle
+	py_doubles x_arr, v_arr;
+	if (!py_doubles_get(x_lst, n_dof, "1st argument", &x_arr))
 		return NULL;
-	if (PySequence_Fast_GET_SIZE(x_lst) != n_dof) {
-		std::stringstream err;
-		err << "1st argument must have " << n_dof << " components";
-		PyErr_SetString(PyExc_ValueError, err.str().c_str());
-		return NULL;
-	}
-
-	v_lst = PySequence_Fast(v_lst, "2nd argument must be iterable");
-	if (!v_lst)
-		return NULL;
-	if (PySequence_Fast_GET_SIZE(v_lst) != n_dof) {
-		std::stringstream err;
-		err << "2nd argument must have " << n_dof << " components";
-		PyErr_SetString(PyExc_ValueError, err.str().c_str());
-		return NULL;
-	}
-
-	// Convert them to C arrays that MoorDyn might handle
-	double* x_arr = py_iterable_to_double(x_lst);
-	Py_DECREF(x_lst);
-	double* v_arr = py_iterable_to_double(v_lst);
-	Py_DECREF(v_lst);
-	if ((!x_arr) || (!v_arr)) {
+	if (!py_doubles_get(v_lst, n_dof, "2nd argument", &v_arr)) {
+		py_doubles_release(&x_arr);
 		return NULL;
 	}
 
 	// Now we can call MoorDyn
 	int err;
-	if (skip_ic)
-		err = MoorDyn_Init_NoIC(system, x_arr, v_arr);
-	else
-		err = MoorDyn_Init(system, x_arr, v_arr);
-	free(x_arr);
-	free(v_arr);
+	{
+		allow_threads nogil(capsule);
+		if (skip_ic)
+			err = MoorDyn_Init_NoIC(system, x_arr.data, v_arr.data);
+		else
+			err = MoorDyn_Init(system, x_arr.data, v_arr.data);
+	}
+	moordyn_state_changed(capsule);
+	py_doubles_release(&x_arr);
+	py_doubles_release(&v_arr);
 
 	return PyLong_FromLong(err);
 }
 
 /** @brief Wrapper to MoorDyn_Step() function
+ *
+ * The positions and velocities can be either C contiguous float64 buffers
+ * (e.g. NumPy arrays), which are used without copying them, or any iterable.
+ * If a writable C contiguous float64 buffer is passed as the "out" keyword
+ * argument, the forces are directly written on it
  * @param args Python passed arguments
- * @return The forces on the coupled objects
+ * @param kwargs Python passed keyword arguments
+ * @return The forces on the coupled objects, either a tuple or the "out"
+ * object
  */
 static PyObject*
-step(PyObject*, PyObject* args)
+step(PyObject*, PyObject* args, PyObject* kwargs)
 {
-	PyObject *capsule, *x_lst, *v_lst;
+	PyObject *capsule, *x_lst, *v_lst, *out = Py_None;
 	double t, dt;
+	static const char* kwlist[] = { "", "", "", "", "", "out", NULL };
 
-	if (!PyArg_ParseTuple(args, "OOOdd", &capsule, &x_lst, &v_lst, &t, &dt))
+	if (!PyArg_ParseTupleAndKeywords(args,
+	                                 kwargs,
+	                                 "OOOdd|O",
+	                                 (char**)kwlist,
+	                                 &capsule,
+	                                 &x_lst,
+	                                 &v_lst,
+	                                 &t,
+	                                 &dt,
+	                                 &out))
 		return NULL;
 
 	MoorDyn system =
@@ -295,46 +681,117 @@ step(PyObject*, PyObject* args)
 	unsigned int n_dof;
 	MoorDyn_NCoupledDOF(system, &n_dof);
 
-	x_lst = PySequence_Fast(x_lst, "1st argument must be iterable");
-	if (!x_lst)
+	// Get C arrays that MoorDyn might handle
+	py_doubles x_arr, v_arr, f_arr;
+	if (!py_doubles_get(x_lst, n_dof, "1st argument", &x_arr))
 		return NULL;
-	if (PySequence_Fast_GET_SIZE(x_lst) != n_dof) {
-		std::stringstream err;
-		err << "1st argument must have " << n_dof << " components";
-		PyErr_SetString(PyExc_ValueError, err.str().c_str());
+	if (!py_doubles_get(v_lst, n_dof, "2nd argument", &v_arr)) {
+		py_doubles_release(&x_arr);
 		return NULL;
 	}
+	if (out != Py_None) {
+		if (!py_doubles_get(out, n_dof, "out", &f_arr, true)) {
+			py_doubles_release(&x_arr);
+			py_doubles_release(&v_arr);
+			return NULL;
+		}
+	} else {
+		f_arr.data = (double*)malloc(n_dof * sizeof(double));
+		f_arr.view.obj = NULL;
+		f_arr.borrowed = false;
+		if (!f_arr.data) {
+			py_doubles_release(&x_arr);
+			py_doubles_release(&v_arr);
+			PyErr_SetString(PyExc_MemoryError,
+			                "Failure allocating the forces");
+			return NULL;
+		}
+	}
 
-	v_lst = PySequence_Fast(v_lst, "2nd argument must be iterable");
-	if (!v_lst)
-		return NULL;
-	if (PySequence_Fast_GET_SIZE(v_lst) != n_dof) {
-		std::stringstream err;
-		err << "2nd argument must have " << n_dof << " components";
-		PyErr_SetString(PyExc_ValueError, err.str().c_str());
+	// Now we can call MoorDyn
+	int err;
+	{
+		allow_threads nogil(capsule);
+		err =
+		    MoorDyn_Step(system, x_arr.data, v_arr.data, f_arr.data, &t, &dt);
+	}
+	moordyn_state_changed(capsule);
+
+	py_doubles_release(&x_arr);
+	py_doubles_release(&v_arr);
+
+	if (err != 0) {
+		py_doubles_release(&f_arr);
+		PyErr_SetString(PyExc_RuntimeError,
+		                "MoorDyn reported an error integrating");
 		return NULL;
 	}
 
-	// Convert them to C arrays that MoorDyn might handle
-	double* x_arr = py_iterable_to_double(x_lst);
-	Py_DECREF(x_lst);
-	double* v_arr = py_iterable_to_double(v_lst);
-	Py_DECREF(v_lst);
-	if ((!x_arr) || (!v_arr)) {
+	if (out != Py_None) {
+		py_doubles_release(&f_arr);
+		Py_INCREF(out);
+		return out;
+	}
+
+	PyObject* f_lst = PyTuple_New(n_dof);
+	for (unsigned int i = 0; i < n_dof; i++) {
+		PyTuple_SET_ITEM(f_lst, i, PyFloat_FromDouble(f_arr.data[i]));
+	}
+	py_doubles_release(&f_arr);
+	return f_lst;
+}
+
+/** @brief Wrapper to MoorDyn_StepMany() function
+ *
+ * The positions, velocities and forces are C contiguous float64 buffers (e.g.
+ * NumPy arrays) of n x n_dof components, the latter writable. Any iterable is
+ * accepted for the positions and velocities, at the cost of a copy
+ * @param args Python passed arguments
+ * @return None
+ */
+static PyObject*
+step_many(PyObject*, PyObject* args)
+{
+	PyObject *capsule, *x_lst, *v_lst, *out;
+	unsigned int n;
+	double t0, dt;
+
+	if (!PyArg_ParseTuple(
+	        args, "OIOOddO", &capsule, &n, &x_lst, &v_lst, &t0, &dt, &out))
+		return NULL;
+
+	MoorDyn system =
+	    (MoorDyn)PyCapsule_GetPointer(capsule, moordyn_capsule_name);
+	if (!system)
+		return NULL;
+
+	unsigned int n_dof;
+	MoorDyn_NCoupledDOF(system, &n_dof);
+
+	py_doubles x_arr, v_arr, f_arr;
+	if (!py_doubles_get(x_lst, n * n_dof, "3rd argument", &x_arr))
+		return NULL;
+	if (!py_doubles_get(v_lst, n * n_dof, "4th argument", &v_arr)) {
+		py_doubles_release(&x_arr);
 		return NULL;
 	}
-	double* forces;
-	forces = (double*)malloc(n_dof * sizeof(double));
-	if (!forces) {
-		PyErr_SetString(PyExc_MemoryError, "Failure allocating the forces");
+	if (!py_doubles_get(out, n * n_dof, "7th argument", &f_arr, true)) {
+		py_doubles_release(&x_arr);
+		py_doubles_release(&v_arr);
 		return NULL;
 	}
 
-	// Now we can call MoorDyn
-	const int err = MoorDyn_Step(system, x_arr, v_arr, forces, &t, &dt);
+	int err;
+	{
+		allow_threads nogil(capsule);
+		err = MoorDyn_StepMany(
+		    system, n, x_arr.data, v_arr.data, t0, dt, f_arr.data);
+	}
+	moordyn_state_changed(capsule);
 
-	free(x_arr);
-	free(v_arr);
+	py_doubles_release(&x_arr);
+	py_doubles_release(&v_arr);
+	py_doubles_release(&f_arr);
 
 	if (err != 0) {
 		PyErr_SetString(PyExc_RuntimeError,
@@ -342,12 +799,7 @@ step(PyObject*, PyObject* args)
 		return NULL;
 	}
 
-	PyObject* f_lst = PyTuple_New(n_dof);
-	for (unsigned int i = 0; i < n_dof; i++) {
-		PyTuple_SET_ITEM(f_lst, i, PyFloat_FromDouble(forces[i]));
-	}
-	free(forces);
-	return f_lst;
+	Py_RETURN_NONE;
 }
 
 /** @brief Wrapper to MoorDyn_Close() function
@@ -367,7 +819,11 @@ close(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
-	const int err = MoorDyn_Close(system);
+	int err;
+	{
+		allow_threads nogil(capsule);
+		err = MoorDyn_Close(system);
+	}
 	return PyLong_FromLong(err);
 }
 
@@ -388,13 +844,17 @@ get_waves(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	MoorDynWaves waves = MoorDyn_GetWaves(system);
 	if (!waves) {
 		PyErr_SetString(PyExc_RuntimeError, "MoorDyn_GetWaves() failed");
 		return NULL;
 	}
 
-	return PyCapsule_New((void*)waves, waves_capsule_name, NULL);
+	return capsule_set_parent(
+	    PyCapsule_New((void*)waves, waves_capsule_name, child_capsule_destructor),
+	    capsule);
 }
 
 /** @brief Wrapper to MoorDyn_GetSeafloor() function
@@ -414,13 +874,18 @@ get_seafloor(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	MoorDynSeafloor seafloor = MoorDyn_GetSeafloor(system);
 	if (!seafloor) {
 		PyErr_SetString(PyExc_RuntimeError, "MoorDyn_GetSeafloor() failed");
 		return NULL;
 	}
 
-	return PyCapsule_New((void*)seafloor, seafloor_capsule_name, NULL);
+	return capsule_set_parent(PyCapsule_New((void*)seafloor,
+	                                        seafloor_capsule_name,
+	                                        child_capsule_destructor),
+	                          capsule);
 }
 
 /** @brief Wrapper to MoorDyn_ExternalWaveKinInit() function
@@ -440,6 +905,8 @@ ext_wave_init(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	unsigned int n;
 	const int err = MoorDyn_ExternalWaveKinInit(system, &n);
 	if (err != 0) {
@@ -466,6 +933,8 @@ ext_wave_n(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	unsigned int n;
 	const int err = MoorDyn_ExternalWaveKinGetN(system, &n);
 	if (err != 0) {
@@ -476,16 +945,22 @@ ext_wave_n(PyObject*, PyObject* args)
 }
 
 /** @brief Wrapper to MoorDyn_GetWaveKinCoordinates() function
+ *
+ * If a writable C contiguous float64 buffer is passed as the "out" keyword
+ * argument, the coordinates are directly written on it
  * @param args Python passed arguments
+ * @param kwargs Python passed keyword arguments
  * @return The list of coordinates where the wave kinematics shall be provided
- * (3 by the number of points)
+ * (3 by the number of points), either a tuple or the "out" object
  */
 static PyObject*
-ext_wave_coords(PyObject*, PyObject* args)
+ext_wave_coords(PyObject*, PyObject* args, PyObject* kwargs)
 {
-	PyObject* capsule;
+	PyObject *capsule, *out = Py_None;
+	static const char* kwlist[] = { "", "out", NULL };
 
-	if (!PyArg_ParseTuple(args, "O", &capsule))
+	if (!PyArg_ParseTupleAndKeywords(
+	        args, kwargs, "O|O", (char**)kwlist, &capsule, &out))
 		return NULL;
 
 	MoorDyn system =
@@ -493,6 +968,8 @@ ext_wave_coords(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	// We need to know the number of coordinates to allocate
 	int err;
 	unsigned int n;
@@ -502,6 +979,20 @@ ext_wave_coords(PyObject*, PyObject* args)
 		return NULL;
 	}
 
+	if (out != Py_None) {
+		py_doubles coords;
+		if (!py_doubles_get(out, 3 * n, "out", &coords, true))
+			return NULL;
+		err = MoorDyn_ExternalWaveKinGetCoordinates(system, coords.data);
+		py_doubles_release(&coords);
+		if (err != 0) {
+			PyErr_SetString(PyExc_RuntimeError, "MoorDyn reported an error");
+			return NULL;
+		}
+		Py_INCREF(out);
+		return out;
+	}
+
 	double* coords = (double*)malloc(n * 3 * sizeof(double));
 	if (!coords) {
 		PyErr_SetString(PyExc_RuntimeError, "Failure allocating memory");
@@ -523,6 +1014,11 @@ ext_wave_coords(PyObject*, PyObject* args)
 }
 
 /** @brief Wrapper to MoorDyn_SetWaveKin() function
+ *
+ * The velocities and accelerations can be either C contiguous float64
+ * buffers (e.g. NumPy arrays), which are used without copying them, or any
+ * iterable. If both are None, the buffers registered with
+ * ext_wave_register() are used
  * @param args Python passed arguments
  * @return 0 in case of success, an error code otherwise
  */
@@ -540,8 +1036,25 @@ ext_wave_set(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
-	// We need to know the number of coordinates to avoid errors
+	// The lock is kept while the GIL is released below, so the registered
+	// buffers cannot be replaced in the meantime
+	system_lock guard(capsule);
 	int err;
+	if ((v_lst == Py_None) && (a_lst == Py_None)) {
+		moordyn_context* ctx = moordyn_get_context(capsule);
+		if (!ctx || !ctx->wave_u.data || !ctx->wave_a.data) {
+			PyErr_SetString(PyExc_RuntimeError,
+			                "No wave kinematics buffers were registered");
+			return NULL;
+		}
+		Py_BEGIN_ALLOW_THREADS;
+		err = MoorDyn_ExternalWaveKinSet(
+		    system, ctx->wave_u.data, ctx->wave_a.data, t);
+		Py_END_ALLOW_THREADS;
+		return PyLong_FromLong(err);
+	}
+
+	// We need to know the number of coordinates to avoid errors
 	unsigned int n;
 	err = MoorDyn_ExternalWaveKinGetN(system, &n);
 	if (err != 0) {
@@ -550,40 +1063,79 @@ ext_wave_set(PyObject*, PyObject* args)
 	}
 	n *= 3;
 
-	v_lst = PySequence_Fast(v_lst, "1st argument must be iterable");
-	if (!v_lst)
+	// Get C arrays that MoorDyn might handle
+	py_doubles v_arr, a_arr;
+	if (!py_doubles_get(v_lst, n, "1st argument", &v_arr))
 		return NULL;
-	if (PySequence_Fast_GET_SIZE(v_lst) != n) {
-		std::stringstream err;
-		err << "1st argument must have " << n << " components";
-		PyErr_SetString(PyExc_ValueError, err.str().c_str());
+	if (!py_doubles_get(a_lst, n, "2nd argument", &a_arr)) {
+		py_doubles_release(&v_arr);
 		return NULL;
 	}
 
-	a_lst = PySequence_Fast(a_lst, "2nd argument must be iterable");
-	if (!a_lst)
+	// Now we can call MoorDyn
+	Py_BEGIN_ALLOW_THREADS;
+	err = MoorDyn_ExternalWaveKinSet(system, v_arr.data, a_arr.data, t);
+	Py_END_ALLOW_THREADS;
+	py_doubles_release(&v_arr);
+	py_doubles_release(&a_arr);
+	return PyLong_FromLong(err);
+}
+
+/** @brief Register persistent buffers for the externally handled wave
+ * kinematics
+ *
+ * The buffers, C contiguous float64 ones (e.g. NumPy arrays), are kept until
+ * other ones are registered or the system is destroyed, so ext_wave_set()
+ * can read them at each time step without any conversion. Passing None for
+ * both unregisters the current buffers
+ * @param args Python passed arguments
+ * @return None
+ */
+static PyObject*
+ext_wave_register(PyObject*, PyObject* args)
+{
+	PyObject *capsule, *v_obj, *a_obj;
+
+	if (!PyArg_ParseTuple(args, "OOO", &capsule, &v_obj, &a_obj))
 		return NULL;
-	if (PySequence_Fast_GET_SIZE(a_lst) != n) {
-		std::stringstream err;
-		err << "2nd argument must have " << n << " components";
-		PyErr_SetString(PyExc_ValueError, err.str().c_str());
+
+	MoorDyn system =
+	    (MoorDyn)PyCapsule_GetPointer(capsule, moordyn_capsule_name);
+	if (!system)
+		return NULL;
+
+	system_lock guard(capsule);
+	moordyn_context* ctx = moordyn_get_context(capsule);
+	if (!ctx) {
+		PyErr_SetString(PyExc_RuntimeError, "Invalid MoorDyn system");
 		return NULL;
 	}
 
-	// Convert them to C arrays that MoorDyn might handle
-	double* v_arr = py_iterable_to_double(v_lst);
-	Py_DECREF(v_lst);
-	double* a_arr = py_iterable_to_double(a_lst);
-	Py_DECREF(a_lst);
-	if ((!v_arr) || (!a_arr)) {
+	if ((v_obj == Py_None) && (a_obj == Py_None)) {
+		moordyn_context_release_waves(ctx);
+		Py_RETURN_NONE;
+	}
+
+	unsigned int n;
+	if (MoorDyn_ExternalWaveKinGetN(system, &n) != 0) {
+		PyErr_SetString(PyExc_RuntimeError, "MoorDyn reported an error");
 		return NULL;
 	}
+	n *= 3;
 
-	// Now we can call MoorDyn
-	err = MoorDyn_ExternalWaveKinSet(system, v_arr, a_arr, t);
-	free(v_arr);
-	free(a_arr);
-	return PyLong_FromLong(err);
+	// The buffers shall be kept, so we cannot accept copies
+	py_doubles v_arr, a_arr;
+	if (!py_doubles_get(v_obj, n, "1st argument", &v_arr, true))
+		return NULL;
+	if (!py_doubles_get(a_obj, n, "2nd argument", &a_arr, true)) {
+		py_doubles_release(&v_arr);
+		return NULL;
+	}
+	moordyn_context_release_waves(ctx);
+	ctx->wave_u = v_arr;
+	ctx->wave_a = a_arr;
+
+	Py_RETURN_NONE;
 }
 
 /** @brief Wrapper to MoorDyn_GetNumberBodies() function
@@ -603,6 +1155,8 @@ get_number_bodies(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	unsigned int n;
 	const int err = MoorDyn_GetNumberBodies(system, &n);
 	if (err != 0) {
@@ -630,13 +1184,18 @@ get_body(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	MoorDynBody body = MoorDyn_GetBody(system, i);
 	if (!body) {
 		PyErr_SetString(PyExc_RuntimeError, "MoorDyn_GetBody() failed");
 		return NULL;
 	}
 
-	return PyCapsule_New((void*)body, body_capsule_name, NULL);
+	return capsule_set_parent(PyCapsule_New((void*)body,
+	                                        body_capsule_name,
+	                                        child_capsule_destructor),
+	                          capsule);
 }
 
 /** @brief Wrapper to MoorDyn_GetNumberRods() function
@@ -656,6 +1215,8 @@ get_number_rods(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	unsigned int n;
 	const int err = MoorDyn_GetNumberRods(system, &n);
 	if (err != 0) {
@@ -683,13 +1244,18 @@ get_rod(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	MoorDynRod rod = MoorDyn_GetRod(system, i);
 	if (!rod) {
 		PyErr_SetString(PyExc_RuntimeError, "MoorDyn_GetRod() failed");
 		return NULL;
 	}
 
-	return PyCapsule_New((void*)rod, rod_capsule_name, NULL);
+	return capsule_set_parent(PyCapsule_New((void*)rod,
+	                                        rod_capsule_name,
+	                                        child_capsule_destructor),
+	                          capsule);
 }
 
 /** @brief Wrapper to MoorDyn_GetNumberPoints() function
@@ -709,6 +1275,8 @@ get_number_points(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	unsigned int n;
 	const int err = MoorDyn_GetNumberPoints(system, &n);
 	if (err != 0) {
@@ -736,13 +1304,18 @@ get_point(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	MoorDynPoint point = MoorDyn_GetPoint(system, i);
 	if (!point) {
 		PyErr_SetString(PyExc_RuntimeError, "MoorDyn_GetPoint() failed");
 		return NULL;
 	}
 
-	return PyCapsule_New((void*)point, point_capsule_name, NULL);
+	return capsule_set_parent(PyCapsule_New((void*)point,
+	                                        point_capsule_name,
+	                                        child_capsule_destructor),
+	                          capsule);
 }
 
 /** @brief Wrapper to MoorDyn_GetNumberLines() function
@@ -762,6 +1335,8 @@ get_number_lines(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	unsigned int n;
 	const int err = MoorDyn_GetNumberLines(system, &n);
 	if (err != 0) {
@@ -789,13 +1364,156 @@ get_line(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	MoorDynLine line = MoorDyn_GetLine(system, i);
 	if (!line) {
 		PyErr_SetString(PyExc_RuntimeError, "MoorDyn_GetLine() failed");
 		return NULL;
 	}
 
-	return PyCapsule_New((void*)line, line_capsule_name, NULL);
+	return capsule_set_parent(PyCapsule_New((void*)line,
+	                                        line_capsule_name,
+	                                        child_capsule_destructor),
+	                          capsule);
+}
+
+/** @brief Wrapper to MoorDyn_GetSnapshotLayout() function
+ * @param args Python passed arguments
+ * @return The object types, ids, first node offsets and number of nodes
+ */
+static PyObject*
+get_snapshot_layout(PyObject*, PyObject* args)
+{
+	PyObject* capsule;
+
+	if (!PyArg_ParseTuple(args, "O", &capsule))
+		return NULL;
+
+	MoorDyn system =
+	    (MoorDyn)PyCapsule_GetPointer(capsule, moordyn_capsule_name);
+	if (!system)
+		return NULL;
+
+	system_lock guard(capsule);
+
+	unsigned int n;
+	int err = MoorDyn_GetSnapshotSize(system, &n, NULL);
+	if (err != 0) {
+		PyErr_SetString(PyExc_RuntimeError, "MoorDyn reported an error");
+		return NULL;
+	}
+	int* types = (int*)malloc(n * sizeof(int));
+	unsigned int* data = (unsigned int*)malloc(3 * n * sizeof(unsigned int));
+	if (!types || !data) {
+		free(types);
+		free(data);
+		PyErr_SetString(PyExc_MemoryError, "Failure allocating memory");
+		return NULL;
+	}
+	err = MoorDyn_GetSnapshotLayout(
+	    system, types, data, data + n, data + 2 * n);
+	if (err != 0) {
+		free(types);
+		free(data);
+		PyErr_SetString(PyExc_RuntimeError, "MoorDyn reported an error");
+		return NULL;
+	}
+
+	PyObject* lst = PyTuple_New(n);
+	for (unsigned int i = 0; i < n; i++) {
+		PyTuple_SET_ITEM(lst,
+		                 i,
+		                 Py_BuildValue("(iIII)",
+		                               types[i],
+		                               data[i],
+		                               data[n + i],
+		                               data[2 * n + i]));
+	}
+	free(types);
+	free(data);
+	return lst;
+}
+
+/** @brief Wrapper to MoorDyn_GetSystemSnapshot() function
+ *
+ * The outputs shall be either None or writable C contiguous float64 buffers
+ * with 3 times the number of nodes components
+ * @param args Python passed arguments
+ * @return None
+ */
+static PyObject*
+get_snapshot(PyObject*, PyObject* args)
+{
+	PyObject *capsule, *r_obj, *rd_obj, *f_obj;
+
+	if (!PyArg_ParseTuple(args, "OOOO", &capsule, &r_obj, &rd_obj, &f_obj))
+		return NULL;
+
+	MoorDyn system =
+	    (MoorDyn)PyCapsule_GetPointer(capsule, moordyn_capsule_name);
+	if (!system)
+		return NULL;
+
+	unsigned int n;
+	int err = MoorDyn_GetSnapshotSize(system, NULL, &n);
+	if (err != 0) {
+		PyErr_SetString(PyExc_RuntimeError, "MoorDyn reported an error");
+		return NULL;
+	}
+
+	PyObject* objs[3] = { r_obj, rd_obj, f_obj };
+	const char* names[3] = { "r", "rd", "f" };
+	py_doubles arrs[3];
+	for (unsigned int i = 0; i < 3; i++) {
+		arrs[i].data = NULL;
+		arrs[i].view.obj = NULL;
+		arrs[i].borrowed = false;
+		if (objs[i] == Py_None)
+			continue;
+		if (!py_doubles_get(objs[i], 3 * n, names[i], arrs + i, true)) {
+			for (unsigned int j = 0; j < i; j++)
+				py_doubles_release(arrs + j);
+			return NULL;
+		}
+	}
+
+	{
+		allow_threads nogil(capsule);
+		err = MoorDyn_GetSystemSnapshot(
+		    system, arrs[0].data, arrs[1].data, arrs[2].data);
+	}
+	for (unsigned int i = 0; i < 3; i++)
+		py_doubles_release(arrs + i);
+	if (err != 0) {
+		PyErr_SetString(PyExc_RuntimeError, "MoorDyn reported an error");
+		return NULL;
+	}
+
+	Py_RETURN_NONE;
+}
+
+/** @brief Get the number of times the system state has been modified
+ *
+ * The counter is increased each time the system is initialized, integrated,
+ * deserialized or loaded, so the cached snapshots can be discarded
+ * @param args Python passed arguments
+ * @return The counter
+ */
+static PyObject*
+get_state_counter(PyObject*, PyObject* args)
+{
+	PyObject* capsule;
+
+	if (!PyArg_ParseTuple(args, "O", &capsule))
+		return NULL;
+
+	moordyn_context* ctx = moordyn_get_context(capsule);
+	if (!ctx) {
+		PyErr_SetString(PyExc_TypeError, "A MoorDyn capsule was expected");
+		return NULL;
+	}
+	return PyLong_FromUnsignedLong(ctx->state_counter);
 }
 
 /** @brief Wrapper to MoorDyn_GetFASTtens() function
@@ -817,6 +1535,8 @@ get_fast_tens(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	float* fair_h_ten = (float*)malloc(num_lines * sizeof(float));
 	float* fair_v_ten = (float*)malloc(num_lines * sizeof(float));
 	float* anch_h_ten = (float*)malloc(num_lines * sizeof(float));
@@ -879,6 +1599,8 @@ serialize(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	int err;
 	size_t array_size;
 	err = MoorDyn_Serialize(system, &array_size, NULL);
@@ -922,14 +1644,17 @@ deserialize(PyObject*, PyObject* args)
 	if (!system || !PyBytes_Check(bytes))
 		return NULL;
 
+	system_lock guard(capsule);
+
 	char* array = PyBytes_AsString(bytes);
 	const int err = MoorDyn_Deserialize(system, (uint64_t*)array);
+	moordyn_state_changed(capsule);
 	if (err != 0) {
 		PyErr_SetString(PyExc_RuntimeError, "MoorDyn reported an error");
 		return NULL;
 	}
 
-	return Py_None;
+	Py_RETURN_NONE;
 }
 
 /** @brief Wrapper to MoorDyn_Save() function
@@ -950,12 +1675,16 @@ save(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
-	const int err = MoorDyn_Save(system, filepath);
+	int err;
+	{
+		allow_threads nogil(capsule);
+		err = MoorDyn_Save(system, filepath);
+	}
 	if (err != 0) {
 		PyErr_SetString(PyExc_RuntimeError, "MoorDyn reported an error");
 		return NULL;
 	}
-	return Py_None;
+	Py_RETURN_NONE;
 }
 
 /** @brief Wrapper to MoorDyn_Load() function
@@ -976,12 +1705,17 @@ load(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
-	const int err = MoorDyn_Load(system, filepath);
+	int err;
+	{
+		allow_threads nogil(capsule);
+		err = MoorDyn_Load(system, filepath);
+	}
+	moordyn_state_changed(capsule);
 	if (err != 0) {
 		PyErr_SetString(PyExc_RuntimeError, "MoorDyn reported an error");
 		return NULL;
 	}
-	return Py_None;
+	Py_RETURN_NONE;
 }
 
 /** @brief Wrapper to MoorDyn_SaveRodVTK() function
@@ -1002,7 +1736,12 @@ save_vtk(PyObject*, PyObject* args)
 	if (!system)
 		return NULL;
 
-	return PyLong_FromLong(MoorDyn_SaveVTK(system, filepath));
+	int err;
+	{
+		allow_threads nogil(capsule);
+		err = MoorDyn_SaveVTK(system, filepath);
+	}
+	return PyLong_FromLong(err);
 }
 
 //                                 Waves.h
@@ -1018,10 +1757,18 @@ waves_getkin(PyObject*, PyObject* args)
 {
 	PyObject* capsule;
 	double x, y, z;
-	PyObject* seafloor;
+	PyObject* t_obj = Py_None;
+	PyObject* seafloor = Py_None;
 
-	if (!PyArg_ParseTuple(args, "Oddd|O", &capsule, &x, &y, &z, &seafloor))
+	if (!PyArg_ParseTuple(
+	        args, "Oddd|OO", &capsule, &x, &y, &z, &t_obj, &seafloor))
 		return NULL;
+	double t;
+	if (t_obj != Py_None) {
+		t = PyFloat_AsDouble(t_obj);
+		if (PyErr_Occurred())
+			return NULL;
+	}
 
 	MoorDynWaves instance =
 	    (MoorDynWaves)PyCapsule_GetPointer(capsule, waves_capsule_name);
@@ -1037,8 +1784,18 @@ waves_getkin(PyObject*, PyObject* args)
 	}
 
 	double u[3], ud[3], zeta, pdyn;
-	const int err = MoorDyn_GetWavesKin(
-		instance, x, y, z, u, ud, &zeta, &pdyn, seabed);
+	int err;
+	{
+		allow_threads nogil(capsule);
+		if (t_obj == Py_None) {
+			err = MoorDyn_GetWavesKin(
+			    instance, x, y, z, u, ud, &zeta, &pdyn, seabed);
+		} else {
+			const double pos[3] = { x, y, z };
+			err = MoorDyn_GetWavesKinArray(
+			    instance, 1, pos, &t, u, ud, &zeta, &pdyn, seabed, 1);
+		}
+	}
 	if (err != 0) {
 		PyErr_SetString(PyExc_RuntimeError, "MoorDyn reported an error");
 		return NULL;
@@ -1059,6 +1816,95 @@ waves_getkin(PyObject*, PyObject* args)
 	return lst;
 }
 
+/** @brief Wrapper to MoorDyn_GetWavesKinArray() function
+ *
+ * The positions and outputs are C contiguous float64 buffers (e.g. NumPy
+ * arrays), the latter writable. The times and the outputs can be None
+ * @param args Python passed arguments
+ * @return None
+ */
+static PyObject*
+waves_getkin_array(PyObject*, PyObject* args)
+{
+	PyObject *capsule, *pos_obj, *t_obj, *u_obj, *ud_obj, *zeta_obj,
+	    *pdyn_obj, *seafloor;
+	unsigned int n, n_threads;
+
+	if (!PyArg_ParseTuple(args,
+	                      "OIOOOOOOOI",
+	                      &capsule,
+	                      &n,
+	                      &pos_obj,
+	                      &t_obj,
+	                      &u_obj,
+	                      &ud_obj,
+	                      &zeta_obj,
+	                      &pdyn_obj,
+	                      &seafloor,
+	                      &n_threads))
+		return NULL;
+
+	MoorDynWaves instance =
+	    (MoorDynWaves)PyCapsule_GetPointer(capsule, waves_capsule_name);
+	if (!instance)
+		return NULL;
+
+	MoorDynSeafloor seabed = NULL;
+	if (seafloor != Py_None) {
+		seabed = (MoorDynSeafloor)PyCapsule_GetPointer(
+			seafloor, seafloor_capsule_name);
+		if (!seabed)
+			return NULL;
+	}
+
+	PyObject* objs[6] = { pos_obj, t_obj, u_obj, ud_obj, zeta_obj, pdyn_obj };
+	const unsigned int sizes[6] = { 3 * n, n, 3 * n, 3 * n, n, n };
+	const char* names[6] = { "positions", "times", "velocities",
+		                     "accelerations", "wave heights",
+		                     "dynamic pressures" };
+	// Unset arrays are safe to release, and passed as NULL to MoorDyn
+	py_doubles arrs[6];
+	for (unsigned int i = 0; i < 6; i++) {
+		arrs[i].data = NULL;
+		arrs[i].view.obj = NULL;
+		arrs[i].borrowed = false;
+	}
+	for (unsigned int i = 0; i < 6; i++) {
+		if (objs[i] == Py_None)
+			continue;
+		// The positions and times are inputs, the rest are outputs
+		if (!py_doubles_get(objs[i], sizes[i], names[i], arrs + i, i > 1)) {
+			for (unsigned int j = 0; j < i; j++)
+				py_doubles_release(arrs + j);
+			return NULL;
+		}
+	}
+
+	int err;
+	{
+		allow_threads nogil(capsule);
+		err = MoorDyn_GetWavesKinArray(instance,
+		                               n,
+		                               arrs[0].data,
+		                               arrs[1].data,
+		                               arrs[2].data,
+		                               arrs[3].data,
+		                               arrs[4].data,
+		                               arrs[5].data,
+		                               seabed,
+		                               n_threads);
+	}
+	for (unsigned int i = 0; i < 6; i++)
+		py_doubles_release(arrs + i);
+
+	if (err != 0) {
+		PyErr_SetString(PyExc_RuntimeError, "MoorDyn reported an error");
+		return NULL;
+	}
+
+	Py_RETURN_NONE;
+}
+
 //                                 Seafloor.h
 // =============================================================================
 
@@ -1080,6 +1926,8 @@ seafloor_getdepth(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double depth;
 	const int err = MoorDyn_GetDepthAt(instance, x, y, &depth);
 	if (err != 0) {
@@ -1107,6 +1955,8 @@ seafloor_getavgdepth(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double depth;
 	const int err = MoorDyn_GetAverageDepth(instance, &depth);
 	if (err != 0) {
@@ -1134,6 +1984,8 @@ seafloor_getmindepth(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double depth;
 	const int err = MoorDyn_GetMinDepth(instance, &depth);
 	if (err != 0) {
@@ -1164,6 +2016,8 @@ body_get_id(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	int n;
 	const int err = MoorDyn_GetBodyID(instance, &n);
 	if (err != 0) {
@@ -1191,6 +2045,8 @@ body_get_type(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	int n;
 	const int err = MoorDyn_GetBodyType(instance, &n);
 	if (err != 0) {
@@ -1218,6 +2074,8 @@ body_get_state(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[6], rd[6];
 	const int err = MoorDyn_GetBodyState(instance, r, rd);
 	if (err != 0) {
@@ -1255,6 +2113,8 @@ body_get_pos(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetBodyPos(instance, r);
 	if (err != 0) {
@@ -1287,6 +2147,8 @@ body_get_angle(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetBodyAngle(instance, r);
 	if (err != 0) {
@@ -1319,6 +2181,8 @@ body_get_vel(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetBodyVel(instance, r);
 	if (err != 0) {
@@ -1351,6 +2215,8 @@ body_get_angvel(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetBodyAngVel(instance, r);
 	if (err != 0) {
@@ -1383,6 +2249,8 @@ body_get_force(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double f[6];
 	const int err = MoorDyn_GetBodyForce(instance, f);
 	if (err != 0) {
@@ -1415,6 +2283,8 @@ body_get_m(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double m[6][6];
 	const int err = MoorDyn_GetBodyM(instance, m);
 	if (err != 0) {
@@ -1452,6 +2322,8 @@ body_save_vtk(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	return PyLong_FromLong(MoorDyn_SaveBodyVTK(instance, filepath));
 }
 
@@ -1473,6 +2345,8 @@ body_use_vtk(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	return PyLong_FromLong(MoorDyn_UseBodyVTK(instance, filepath));
 }
 
@@ -1496,6 +2370,8 @@ rod_get_id(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	int n;
 	const int err = MoorDyn_GetRodID(instance, &n);
 	if (err != 0) {
@@ -1523,6 +2399,8 @@ rod_get_type(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	int n;
 	const int err = MoorDyn_GetRodType(instance, &n);
 	if (err != 0) {
@@ -1550,6 +2428,8 @@ rod_get_force(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double f[6];
 	const int err = MoorDyn_GetRodForce(instance, f);
 	if (err != 0) {
@@ -1582,6 +2462,8 @@ rod_get_m(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double m[6][6];
 	const int err = MoorDyn_GetRodM(instance, m);
 	if (err != 0) {
@@ -1618,6 +2500,8 @@ rod_get_n(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	unsigned int n;
 	const int err = MoorDyn_GetRodN(instance, &n);
 	if (err != 0) {
@@ -1646,6 +2530,8 @@ rod_get_node_pos(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetRodNodePos(instance, node, r);
 	if (err != 0) {
@@ -1678,6 +2564,8 @@ rod_get_node_vel(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetRodNodeVel(instance, node, r);
 	if (err != 0) {
@@ -1710,6 +2598,8 @@ rod_save_vtk(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	return PyLong_FromLong(MoorDyn_SaveRodVTK(instance, filepath));
 }
 
@@ -1733,6 +2623,8 @@ point_get_id(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	int n;
 	const int err = MoorDyn_GetPointID(instance, &n);
 	if (err != 0) {
@@ -1760,6 +2652,8 @@ point_get_type(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	int t;
 	const int err = MoorDyn_GetPointType(instance, &t);
 	if (err != 0) {
@@ -1787,6 +2681,8 @@ point_get_pos(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetPointPos(instance, r);
 	if (err != 0) {
@@ -1818,6 +2714,8 @@ point_get_vel(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetPointVel(instance, r);
 	if (err != 0) {
@@ -1849,6 +2747,8 @@ point_get_force(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetPointForce(instance, r);
 	if (err != 0) {
@@ -1880,6 +2780,8 @@ point_get_m(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double m[3][3];
 	const int err = MoorDyn_GetPointM(instance, m);
 	if (err != 0) {
@@ -1916,6 +2818,8 @@ point_get_nattached(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	unsigned int n;
 	const int err = MoorDyn_GetPointNAttached(instance, &n);
 	if (err != 0) {
@@ -1944,6 +2848,8 @@ point_get_attached(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	MoorDynLine l;
 	int e;
 	const int err = MoorDyn_GetPointAttached(instance, i, &l, &e);
@@ -1952,8 +2858,13 @@ point_get_attached(PyObject*, PyObject* args)
 		return NULL;
 	}
 
+	PyObject* line = capsule_set_parent(
+	    PyCapsule_New((void*)l, line_capsule_name, child_capsule_destructor),
+	    moordyn_get_capsule(capsule));
+	if (!line)
+		return NULL;
 	PyObject* pyv = PyTuple_New(2);
-	PyTuple_SET_ITEM(pyv, 0, PyCapsule_New((void*)l, line_capsule_name, NULL));
+	PyTuple_SET_ITEM(pyv, 0, line);
 	PyTuple_SET_ITEM(pyv, 1, PyLong_FromLong(e));
 	return pyv;
 }
@@ -1976,6 +2887,8 @@ point_save_vtk(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	return PyLong_FromLong(MoorDyn_SavePointVTK(instance, filepath));
 }
 
@@ -1999,6 +2912,8 @@ line_get_id(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	int n;
 	const int err = MoorDyn_GetLineID(instance, &n);
 	if (err != 0) {
@@ -2026,6 +2941,8 @@ line_get_n(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	unsigned int n;
 	const int err = MoorDyn_GetLineN(instance, &n);
 	if (err != 0) {
@@ -2053,6 +2970,8 @@ line_get_ulen(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double l;
 	const int err = MoorDyn_GetLineUnstretchedLength(instance, &l);
 	if (err != 0) {
@@ -2081,6 +3000,8 @@ line_set_ulen(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	const int err = MoorDyn_SetLineUnstretchedLength(instance, l);
 	if (err != 0) {
 		PyErr_SetString(PyExc_RuntimeError, "MoorDyn reported an error");
@@ -2108,6 +3029,8 @@ line_set_ulenv(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	const int err = MoorDyn_SetLineUnstretchedLengthVel(instance, v);
 	if (err != 0) {
 		PyErr_SetString(PyExc_RuntimeError, "MoorDyn reported an error");
@@ -2134,6 +3057,8 @@ line_is_const_ea(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	int b;
 	const int err = MoorDyn_IsLineConstantEA(instance, &b);
 	if (err != 0) {
@@ -2161,6 +3086,8 @@ line_get_const_ea(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double ea;
 	const int err = MoorDyn_GetLineConstantEA(instance, &ea);
 	if (err != 0) {
@@ -2189,6 +3116,8 @@ line_set_const_ea(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	const int err = MoorDyn_SetLineConstantEA(instance, ea);
 	if (err != 0) {
 		PyErr_SetString(PyExc_RuntimeError, "MoorDyn reported an error");
@@ -2215,6 +3144,8 @@ line_is_pbend(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	int b;
 	const int err = MoorDyn_IsLinePressBend(instance, &b);
 	if (err != 0) {
@@ -2243,6 +3174,8 @@ line_set_pbend(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	const int err = MoorDyn_SetLinePressBend(instance, b);
 	if (err != 0) {
 		PyErr_SetString(PyExc_RuntimeError, "MoorDyn reported an error");
@@ -2270,6 +3203,8 @@ line_set_pint(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	pvals = PySequence_Fast(pvals, "2 argument must be iterable");
 	if (!pvals)
 		return NULL;
@@ -2322,6 +3257,8 @@ line_get_node_pos(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetLineNodePos(instance, node, r);
 	if (err != 0) {
@@ -2354,6 +3291,8 @@ line_get_node_vel(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetLineNodeVel(instance, node, r);
 	if (err != 0) {
@@ -2386,6 +3325,8 @@ line_get_node_force(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetLineNodeForce(instance, node, r);
 	if (err != 0) {
@@ -2418,6 +3359,8 @@ line_get_node_ten(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetLineNodeTen(instance, node, r);
 	if (err != 0) {
@@ -2450,6 +3393,8 @@ line_get_node_bend(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetLineNodeBendStiff(instance, node, r);
 	if (err != 0) {
@@ -2482,6 +3427,8 @@ line_get_node_w(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetLineNodeWeight(instance, node, r);
 	if (err != 0) {
@@ -2514,6 +3461,8 @@ line_get_node_drag(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetLineNodeDrag(instance, node, r);
 	if (err != 0) {
@@ -2546,6 +3495,8 @@ line_get_node_froudekrylov(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetLineNodeFroudeKrilov(instance, node, r);
 	if (err != 0) {
@@ -2578,6 +3529,8 @@ line_get_node_seabed(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double r[3];
 	const int err = MoorDyn_GetLineNodeSeabedForce(instance, node, r);
 	if (err != 0) {
@@ -2610,6 +3563,8 @@ line_get_node_curv(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double t;
 	const int err = MoorDyn_GetLineNodeCurv(instance, node, &t);
 	if (err != 0) {
@@ -2638,6 +3593,8 @@ line_get_node_m(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double m[3][3];
 	const int err = MoorDyn_GetLineNodeM(instance, node, m);
 	if (err != 0) {
@@ -2675,6 +3632,8 @@ line_get_fairlead_tension(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double t;
 	const int err = MoorDyn_GetLineFairTen(instance, &t);
 	if (err != 0) {
@@ -2702,6 +3661,8 @@ line_get_max_tension(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	double t;
 	const int err = MoorDyn_GetLineMaxTen(instance, &t);
 	if (err != 0) {
@@ -2730,11 +3691,17 @@ line_save_vtk(PyObject*, PyObject* args)
 	if (!instance)
 		return NULL;
 
+	system_lock guard(capsule);
+
 	return PyLong_FromLong(MoorDyn_SaveLineVTK(instance, filepath));
 }
 
 static PyMethodDef moordyn_methods[] = {
 	{ "create", create, METH_VARARGS, "Creates the MoorDyn system" },
+	{ "clone",
+	  clone,
+	  METH_VARARGS,
+	  "Clones an already initialized MoorDyn system" },
 	{ "n_coupled_dof",
 	  n_coupled_dof,
 	  METH_VARARGS,
@@ -2757,10 +3724,14 @@ static PyMethodDef moordyn_methods[] = {
 	  "Log a message to both the terminal screen and the log file" },
 	{ "init", init, METH_VARARGS, "Initializes MoorDyn" },
 	{ "step",
-	  step,
-	  METH_VARARGS,
+	  (PyCFunction)(void (*)(void))step,
+	  METH_VARARGS | METH_KEYWORDS,
 	  "simulates the mooring system starting at time t and ending at time "
 	  "t+d" },
+	{ "step_many",
+	  step_many,
+	  METH_VARARGS,
+	  "simulates the mooring system along n coupling time steps" },
 	{ "close",
 	  close,
 	  METH_VARARGS,
@@ -2780,10 +3751,14 @@ static PyMethodDef moordyn_methods[] = {
 	  "Get the number of points where the wave kinematics shall be "
 	  "provided" },
 	{ "ext_wave_coords",
-	  ext_wave_coords,
-	  METH_VARARGS,
+	  (PyCFunction)(void (*)(void))ext_wave_coords,
+	  METH_VARARGS | METH_KEYWORDS,
 	  "Get the coordinates where the wave kinematics shall be provided" },
 	{ "ext_wave_set", ext_wave_set, METH_VARARGS, "Set the wave kinematics" },
+	{ "ext_wave_register",
+	  ext_wave_register,
+	  METH_VARARGS,
+	  "Register persistent buffers for the wave kinematics" },
 	{ "get_number_bodies",
 	  get_number_bodies,
 	  METH_VARARGS,
@@ -2804,6 +3779,18 @@ static PyMethodDef moordyn_methods[] = {
 	  METH_VARARGS,
 	  "Get the number of mooring lines" },
 	{ "get_line", get_line, METH_VARARGS, "Get a mooring line" },
+	{ "get_snapshot_layout",
+	  get_snapshot_layout,
+	  METH_VARARGS,
+	  "Get the layout of the whole system snapshot" },
+	{ "get_snapshot",
+	  get_snapshot,
+	  METH_VARARGS,
+	  "Get the positions, velocities and forces of all the system nodes" },
+	{ "get_state_counter",
+	  get_state_counter,
+	  METH_VARARGS,
+	  "Get the number of times the system state has been modified" },
 	{ "get_fast_tens",
 	  get_fast_tens,
 	  METH_VARARGS,
@@ -2823,6 +3810,10 @@ static PyMethodDef moordyn_methods[] = {
 	  METH_VARARGS,
 	  "Save a .vtm file of the whole system" },
 	{ "waves_getkin", waves_getkin, METH_VARARGS, "Get waves kinematics" },
+	{ "waves_getkin_array",
+	  waves_getkin_array,
+	  METH_VARARGS,
+	  "Get waves kinematics on a set of points" },
 	{ "seafloor_getdepth",
 	  seafloor_getdepth,
 	  METH_VARARGS,
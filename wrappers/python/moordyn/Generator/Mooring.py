@@ -90,6 +90,15 @@ class Mooring:
     def __get_footer(self):
         return ("-" * 80) + "\n"
 
+    def Write(self):
+        """Write the MoorDyn input file
+
+        Returns:
+        str: The input file path
+        """
+        self.__write_input_file()
+        return self.__input_file_path
+
     def Create(self):
         self.__write_input_file()
         print("Created the MoorDyn file: '{}'".format(self.__input_file_path))
@@ -21,7 +21,12 @@ It is used in the same way than the regular MoorDyn C API:
 
 The majority of functions are returning error codes, exactly the same way the
 MoorDyn v2 C API is doing
+
+An object oriented interface is also provided by moordyn.System, which has
+lower overhead on tight coupling loops
 """
 
 from .moordyn import *
+from .system import System, Body, Rod, Point, Line
 from . import Generator
+from . import ensemble
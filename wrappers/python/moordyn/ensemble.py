@@ -0,0 +1,419 @@
+"""
+Copyright (c) 2022, Jose Luis Cercos-Pita <jlc@core-marine.com>
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import glob
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory, util
+from . import moordyn
+
+
+class Case:
+    """A load case, i.e. a prescribed motion of the coupled objects
+    """
+    __slots__ = ("x", "v", "x0", "v0", "options")
+
+    def __init__(self, x, v=None, x0=None, v0=None, options=None):
+        """Constructor
+
+        Parameters:
+        x (numpy.ndarray (n, n_dof)): Position of the coupled objects at the
+                                      end of each time step
+
+        Keyword arguments:
+        v (numpy.ndarray (n, n_dof)): Velocity of the coupled objects at the
+                                      end of each time step. If None, it is
+                                      computed from x by finite differences
+        x0 (numpy.ndarray (n_dof,)): Position of the coupled objects to
+                                     compute the initial condition. If None,
+                                     the first row of x is used
+        v0 (numpy.ndarray (n_dof,)): Velocity of the coupled objects to
+                                     compute the initial condition. If None,
+                                     the objects are at rest
+        options (dict): Options of the input file to override, e.g.
+                        {"WtrDpth": 50.0}
+        """
+        self.x = x
+        self.v = v
+        self.x0 = x0
+        self.v0 = v0
+        self.options = dict(options or {})
+
+
+def override_options(text, options):
+    """Override some options of a MoorDyn input file
+
+    Parameters:
+    text (str): The contents of the input file
+    options (dict): The options to override. Those not already in the file
+                    are appended at the end of the OPTIONS section
+
+    Returns:
+    str: The modified contents of the input file
+    """
+    lines = text.splitlines(True)
+    options = dict(options)
+    start = None
+    for i, line in enumerate(lines):
+        if line.startswith("---") and "OPTIONS" in line.upper():
+            start = i + 1
+            break
+    if start is None:
+        if not options:
+            return text
+        raise ValueError("The input file has no OPTIONS section")
+    end = start
+    while end < len(lines) and not lines[end].startswith("---"):
+        words = lines[end].split()
+        if len(words) >= 2 and words[1] in options:
+            lines[end] = "{}    {}\n".format(options.pop(words[1]), words[1])
+        end += 1
+    new = ["{}    {}\n".format(v, k) for k, v in options.items()]
+    return "".join(lines[:end] + new + lines[end:])
+
+
+def parse_channels(channels, n_dof):
+    """Compute the columns of each requested channel
+
+    The accepted channels are "forces", for the forces on the coupled objects,
+    and "FairTen<id>" and "AnchTen<id>", for the tension magnitude at the
+    fairlead and the anchor of a line
+
+    Parameters:
+    channels (list): The requested channels
+    n_dof (int): The number of coupled degrees of freedom
+
+    Returns:
+    list: A tuple (name, line id, first column, last column) per channel
+    int: The number of columns
+    """
+    parsed = []
+    n_cols = 0
+    for channel in channels:
+        if channel == "forces":
+            line_id, n = None, n_dof
+        elif channel[:7] in ("FairTen", "AnchTen") and channel[7:].isdigit():
+            line_id, n = int(channel[7:]), 1
+        else:
+            raise ValueError("Unknown channel '{}'".format(channel))
+        parsed.append((channel[:7], line_id, n_cols, n_cols + n))
+        n_cols += n
+    return parsed, n_cols
+
+
+# The worker processes state, set by _worker_init()
+_shm = None
+_results = None
+_systems = OrderedDict()
+_cache_size = 1
+
+
+def _worker_init(shm_name, shape, cache_size):
+    """Attach the worker process to the shared results block
+
+    Parameters:
+    shm_name (str): The shared memory block name
+    shape (tuple): The shape of the results array
+    cache_size (int): The maximum number of systems kept by the worker
+    """
+    import numpy as np
+    global _shm, _results, _cache_size
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _results = np.ndarray(shape, dtype=np.float64, buffer=_shm.buf)
+    _cache_size = max(cache_size, 1)
+    # atexit handlers are not called on forked processes, while the
+    # multiprocessing finalizers are called whatever the start method is
+    util.Finalize(None, _worker_close, exitpriority=10)
+
+
+def _worker_close():
+    """Close the cached systems and detach the worker process from the shared
+    results block
+    """
+    global _shm, _results
+    while _systems:
+        moordyn.Close(_systems.popitem()[1][0])
+    _results = None
+    if _shm is not None:
+        _shm.close()
+        _shm = None
+
+
+def _scratch_prefix(filepath):
+    """Get the prefix of the scratch files written on the ensemble
+
+    Parameters:
+    filepath (str): The base input file path
+
+    Returns:
+    str: The folder where the scratch files are written
+    str: The scratch files name prefix, which shall be followed by the id of
+         the process writing them
+    """
+    folder, fname = os.path.split(os.path.abspath(filepath))
+    stem = os.path.splitext(fname)[0].replace(".", "_")
+    return folder, stem + "_ensemble_"
+
+
+def _remove_stale_files(filepath):
+    """Remove the scratch files left behind by killed worker processes
+
+    Parameters:
+    filepath (str): The base input file path
+    """
+    folder, prefix = _scratch_prefix(filepath)
+    for path in glob.glob(os.path.join(glob.escape(folder),
+                                       glob.escape(prefix) + "*")):
+        pid = os.path.basename(path)[len(prefix):].split("_")[0]
+        if not pid.isdigit():
+            continue
+        try:
+            os.kill(int(pid), 0)
+            continue
+        except ProcessLookupError:
+            pass
+        except OSError:
+            # The process exists, but it belongs to someone else
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _create_system(text, filepath, x, v):
+    """Create and initialize a system that does not write output files
+
+    The input file is written in the same folder than the base one, so the
+    relative paths on it are still valid. The system is created and
+    initialized, and then cloned, so the clone does not write any file. The
+    original system, the input file and the generated outputs are removed
+    afterwards. The files are named after the process id, so the ones left
+    behind by a killed worker are removed by the next run()
+
+    Parameters:
+    text (str): The contents of the input file
+    filepath (str): The base input file path
+    x (numpy.ndarray): Initial position of the coupled objects
+    v (numpy.ndarray): Initial velocity of the coupled objects
+
+    Returns:
+    cmoordyn.MoorDyn: The initialized system
+    """
+    folder, prefix = _scratch_prefix(filepath)
+    fd, tmp_path = tempfile.mkstemp(prefix="{}{}_".format(prefix,
+                                                          os.getpid()),
+                                    suffix=".txt",
+                                    dir=folder)
+    tmp_stem = os.path.splitext(tmp_path)[0]
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        base = moordyn.Create(tmp_path)
+        try:
+            err = moordyn.Init(base, x, v)
+            if err:
+                raise RuntimeError(
+                    "MoorDyn reported an error {} computing the initial "
+                    "condition".format(err))
+            system = moordyn.Clone(base)
+        finally:
+            moordyn.Close(base)
+    finally:
+        for path in glob.glob(tmp_stem + ".*") + glob.glob(tmp_stem + "_*"):
+            os.remove(path)
+    return system
+
+
+def _get_system(text, filepath, x, v):
+    """Get an initialized system from the worker cache, restored to its
+    initial state, or create it if it is not cached
+
+    Parameters:
+    text (str): The contents of the input file
+    filepath (str): The base input file path
+    x (numpy.ndarray): Initial position of the coupled objects
+    v (numpy.ndarray): Initial velocity of the coupled objects
+
+    Returns:
+    cmoordyn.MoorDyn: The system at its initial state
+    """
+    key = hashlib.sha1(text.encode() + x.tobytes() + v.tobytes()).digest()
+    if key in _systems:
+        _systems.move_to_end(key)
+        system, state = _systems[key]
+        moordyn.Deserialize(system, state)
+        return system
+    system = _create_system(text, filepath, x, v)
+    _systems[key] = (system, moordyn.Serialize(system))
+    while len(_systems) > _cache_size:
+        moordyn.Close(_systems.popitem(last=False)[1][0])
+    return system
+
+
+def _run_case(i, text, filepath, x0, v0, x, v, t0, dt, channels):
+    """Integrate a case, writing the channels on the shared results block
+
+    Parameters:
+    i (int): The case index
+    text (str): The contents of the input file, with the options overridden
+    filepath (str): The base input file path
+    x0 (numpy.ndarray): Initial position of the coupled objects
+    v0 (numpy.ndarray): Initial velocity of the coupled objects
+    x (numpy.ndarray (n, n_dof)): Position of the coupled objects
+    v (numpy.ndarray (n, n_dof)): Velocity of the coupled objects
+    t0 (float): The initial time instant
+    dt (float): The coupling time step
+    channels (list): The parsed channels, see parse_channels()
+
+    Returns:
+    int: The case index
+    """
+    import numpy as np
+    system = _get_system(text, filepath, x0, v0)
+    out = _results[i]
+    if len(channels) == 1 and channels[0][0] == "forces":
+        moordyn.StepMany(system, x, v, t0, dt, out=out)
+        return i
+    lines = {}
+    for name, line_id, a, b in channels:
+        if line_id is not None and line_id not in lines:
+            lines[line_id] = moordyn.GetLine(system, line_id)
+    forces = np.empty(x.shape[1])
+    for j in range(x.shape[0]):
+        moordyn.Step(system, x[j], v[j], t0 + j * dt, dt, out=forces)
+        row = out[j]
+        for name, line_id, a, b in channels:
+            if name == "forces":
+                row[a:b] = forces
+            elif name == "FairTen":
+                row[a] = moordyn.GetLineFairTen(lines[line_id])
+            else:
+                row[a] = np.linalg.norm(
+                    moordyn.GetLineNodeTen(lines[line_id], 0))
+    return i
+
+
+def run(input_file, cases, dt, t0=0.0, channels=("forces",),
+        max_workers=None, progress=None, cache_size=4):
+    """Run a set of load cases in parallel
+
+    Parameters:
+    input_file (str or moordyn.Generator.Mooring): The base input file
+    cases (list): The list of moordyn.ensemble.Case. All of them shall
+                  have the same number of time steps
+    dt (float): The coupling time step
+
+    Keyword arguments:
+    t0 (float): The initial time instant
+    channels (list): The channels to record, see parse_channels()
+    max_workers (int): The number of worker processes. If None, as many as
+                       CPUs are available
+    progress (callable): A function called with the number of finished cases
+                         and the total number of cases each time a case
+                         finishes
+    cache_size (int): The maximum number of initialized systems kept by each
+                      worker, to be reused by the cases sharing the options
+                      and the initial position
+
+    Each worker writes a scratch copy of the input file, and the outputs
+    generated while computing the initial condition, on the input file
+    folder, prefixed by "<name>_ensemble_<pid>_". They are removed as soon as
+    the system is initialized, and the ones left behind by killed workers are
+    removed when run() is called again
+
+    Returns:
+    numpy.ndarray (n_cases, n_steps, n_columns): The channels after each
+                                                 time step, with the columns
+                                                 in the same order than the
+                                                 channels
+    """
+    import numpy as np
+    from .Generator import Mooring
+    if isinstance(input_file, Mooring):
+        input_file = input_file.Write()
+    with open(input_file, "r") as f:
+        text = f.read()
+    _remove_stale_files(input_file)
+
+    xs, vs, x0s, v0s = [], [], [], []
+    for case in cases:
+        x = np.ascontiguousarray(case.x, dtype=np.float64)
+        if case.v is None:
+            v = np.gradient(x, dt, axis=0) if len(x) > 1 else np.zeros_like(x)
+        else:
+            v = np.ascontiguousarray(case.v, dtype=np.float64)
+        if x.ndim != 2 or v.shape != x.shape or \
+                (xs and x.shape != xs[0].shape):
+            raise ValueError(
+                "All the cases shall have the same (n, n_dof) positions and "
+                "velocities, got {} and {}".format(x.shape, v.shape))
+        x0 = x[0] if case.x0 is None else case.x0
+        v0 = np.zeros_like(x[0]) if case.v0 is None else case.v0
+        x0s.append(np.ascontiguousarray(x0, dtype=np.float64))
+        v0s.append(np.ascontiguousarray(v0, dtype=np.float64))
+        xs.append(x)
+        vs.append(v)
+    if not xs:
+        return np.empty((0, 0, 0))
+    n_steps, n_dof = xs[0].shape
+    parsed, n_cols = parse_channels(channels, n_dof)
+
+    shape = (len(xs), n_steps, n_cols)
+    shm = shared_memory.SharedMemory(create=True,
+                                     size=max(8 * int(np.prod(shape)), 1))
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_worker_init,
+                                 initargs=(shm.name, shape,
+                                           cache_size)) as executor:
+            futures = [executor.submit(_run_case,
+                                       i,
+                                       override_options(text, case.options),
+                                       input_file,
+                                       x0s[i],
+                                       v0s[i],
+                                       xs[i],
+                                       vs[i],
+                                       t0,
+                                       dt,
+                                       parsed)
+                       for i, case in enumerate(cases)]
+            for n_done, future in enumerate(as_completed(futures)):
+                future.result()
+                if progress is not None:
+                    progress(n_done + 1, len(futures))
+        results = np.ndarray(shape, dtype=np.float64, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return results
@@ -59,6 +59,12 @@ ENDPOINT_A = ENDPOINT_BOTTOM = 0
 ENDPOINT_B = ENDPOINT_TOP = 1
 
 
+OBJECT_LINE = 1
+OBJECT_POINT = 2
+OBJECT_ROD = 3
+OBJECT_BODY = 4
+
+
 #                                  MoorDyn2.h
 #  =============================================================================
 
@@ -182,14 +188,16 @@ def Init(instance, x, v):
     instance (cmoordyn.MoorDyn): The MoorDyn instance
 
     Keyword arguments:
-    x (list): Position of the coupled points
-    v (list): Velocity of the coupled points
+    x (list): Position of the coupled points. A float64 NumPy array is used
+              without copying it
+    v (list): Velocity of the coupled points. A float64 NumPy array is used
+              without copying it
 
     Returns:
     int: 0 uppon success, an error code otherwise
     """
     import cmoordyn
-    return cmoordyn.init(instance, list(x), list(v), 0)
+    return cmoordyn.init(instance, x, v, 0)
 
 
 def Init_NoIC(instance, x, v):
@@ -201,31 +209,96 @@ def Init_NoIC(instance, x, v):
     instance (cmoordyn.MoorDyn): The MoorDyn instance
 
     Keyword arguments:
-    x (list): Position of the coupled points
-    v (list): Velocity of the coupled points
+    x (list): Position of the coupled points. A float64 NumPy array is used
+              without copying it
+    v (list): Velocity of the coupled points. A float64 NumPy array is used
+              without copying it
 
     Returns:
     int: 0 uppon success, an error code otherwise
     """
     import cmoordyn
-    return cmoordyn.init(instance, list(x), list(v), 1)
+    return cmoordyn.init(instance, x, v, 1)
 
 
-def Step(instance, x, v, t, dt):
+def Step(instance, x, v, t, dt, out=None):
     """Compute a time step
 
     Parameters:
     instance (cmoordyn.MoorDyn): The MoorDyn instance
-    x (list): Position of the coupled points
-    v (list): Velocity of the coupled points
+    x (list): Position of the coupled points. A float64 NumPy array is used
+              without copying it
+    v (list): Velocity of the coupled points. A float64 NumPy array is used
+              without copying it
     t (float): The time instant
     dt (float): The time step
 
+    Keyword arguments:
+    out (numpy.ndarray): A preallocated, C contiguous, float64 array where
+                         the forces shall be written. If None, a new tuple is
+                         returned
+
+    Returns:
+    list: The forces acting on the coupled points, i.e. out if it is provided
+    """
+    import cmoordyn
+    return cmoordyn.step(instance, x, v, t, dt, out)
+
+
+def StepMany(instance, x, v, t0, dt, out=None):
+    """Compute several consecutive time steps along a prescribed trajectory
+
+    This is equivalent to call moordyn.Step() for each row of x and v, with
+    the times t0 + i * dt, but without returning to Python in between
+
+    Parameters:
+    instance (cmoordyn.MoorDyn): The MoorDyn instance
+    x (numpy.ndarray (n, n_dof)): Position of the coupled points at the end
+                                  of each time step
+    v (numpy.ndarray (n, n_dof)): Velocity of the coupled points at the end
+                                  of each time step
+    t0 (float): The initial time instant
+    dt (float): The time step
+
+    Keyword arguments:
+    out (numpy.ndarray (n, n_dof)): A preallocated, C contiguous, float64
+                                    array where the forces shall be written.
+                                    If None, a new array is created
+
+    Returns:
+    numpy.ndarray (n, n_dof): The forces acting on the coupled points after
+                              each time step, i.e. out if it is provided
+    """
+    import cmoordyn
+    import numpy as np
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    v = np.ascontiguousarray(v, dtype=np.float64)
+    if x.ndim != 2 or v.shape != x.shape:
+        raise ValueError(
+            "x and v shall be (n, n_dof) arrays, got {} and {}".format(
+                x.shape, v.shape))
+    if out is None:
+        out = np.empty(x.shape)
+    cmoordyn.step_many(instance, x.shape[0], x, v, t0, dt, out)
+    return out
+
+
+def Clone(instance):
+    """Clone an already initialized MoorDyn system
+
+    The clone has the same state than the original system, and both can be
+    evolved independently afterwards. The initial condition and the wave
+    kinematics are not computed again, the latter being shared with the
+    original system. The clone does not write output files
+
+    Parameters:
+    instance (cmoordyn.MoorDyn): The MoorDyn instance, already initialized
+
     Returns:
-    list: The forces acting on the coupled points
+    cmoordyn.MoorDyn: The cloned MoorDyn instance
     """
     import cmoordyn
-    return cmoordyn.step(instance, list(x), list(v), t, dt)
+    return cmoordyn.clone(instance)
 
 
 def Close(instance):
@@ -303,10 +376,10 @@ def ExternalWaveKinGetN(instance):
     int: The number of points
     """
     import cmoordyn
-    return cmoordyn.ext_wave_init(instance)
+    return cmoordyn.ext_wave_n(instance)
 
 
-def GetWaveKinCoordinates(instance):
+def GetWaveKinCoordinates(instance, out=None):
     """Get the points where the waves kinematics shall be provided
 
     The kinematics on those points shall be provided just if WaveKin is set
@@ -315,17 +388,19 @@ def GetWaveKinCoordinates(instance):
     Parameters:
     instance (cmoordyn.MoorDyn): The MoorDyn instance
 
+    Keyword arguments:
+    out (numpy.ndarray (n, 3)): A preallocated, C contiguous, float64 array
+                                where the coordinates shall be written. If
+                                None, a new array is created
+
     Returns:
-    list (n, 3): The list of points
+    numpy.ndarray (n, 3): The points, i.e. out if it is provided
     """
     import cmoordyn
-
-    coords = cmoordyn.ext_wave_coords(instance)
-    n = len(coords) // 3
-    points = []
-    for i in range(n):
-        points.append([coords[3 * i], coords[3 * i + 1], coords[3 * i + 2]])
-    return points
+    if out is None:
+        import numpy as np
+        out = np.empty((cmoordyn.ext_wave_n(instance), 3))
+    return cmoordyn.ext_wave_coords(instance, out=out)
 
 
 def SetWaveKin(instance, u, a, t):
@@ -335,24 +410,45 @@ def SetWaveKin(instance, u, a, t):
 
     Parameters:
     instance (cmoordyn.MoorDyn): The MoorDyn instance
-    u (list (n, 3)): The list of velocities evaluated in the points provided
-                     by moordyn.GetWaveKinCoordinates()
-    a (list (n, 3)): The list of accelerations evaluated in the points provided
-                     by moordyn.GetWaveKinCoordinates()
+    u (numpy.ndarray (n, 3)): The velocities evaluated in the points provided
+                              by moordyn.GetWaveKinCoordinates(). A C
+                              contiguous float64 array is used without
+                              copying it. If both u and a are None, the
+                              buffers registered with
+                              moordyn.RegisterWaveKin() are used
+    a (numpy.ndarray (n, 3)): The accelerations evaluated in the points
+                              provided by moordyn.GetWaveKinCoordinates()
     t (float): The simulation time
 
     Returns:
     int: 0 uppon success, an error code otherwise
     """
     import cmoordyn
+    if u is not None or a is not None:
+        import numpy as np
+        u = np.ascontiguousarray(u, dtype=np.float64)
+        a = np.ascontiguousarray(a, dtype=np.float64)
+    return cmoordyn.ext_wave_set(instance, u, a, t)
 
-    assert len(u) == len(a)
-    uu, aa = [], []
-    for i in range(len(u)):
-        assert len(u[i]) == 3 and len(a[i]) == 3
-        uu += u[i]
-        aa += a[i]
-    return cmoordyn.ext_wave_set(instance, uu, aa, t)
+
+def RegisterWaveKin(instance, u, a):
+    """Register persistent arrays for the kinematics of the waves
+
+    The arrays are kept by MoorDyn, so the caller just have to update them
+    in place and call moordyn.SetWaveKin(instance, None, None, t) on each
+    time step, with no conversions at all
+
+    Parameters:
+    instance (cmoordyn.MoorDyn): The MoorDyn instance
+    u (numpy.ndarray (n, 3)): C contiguous float64 array for the velocities
+                              evaluated in the points provided by
+                              moordyn.GetWaveKinCoordinates(). None to
+                              unregister the arrays
+    a (numpy.ndarray (n, 3)): C contiguous float64 array for the
+                              accelerations. None to unregister the arrays
+    """
+    import cmoordyn
+    cmoordyn.ext_wave_register(instance, u, a)
 
 
 def GetNumberBodies(instance):
@@ -479,6 +575,69 @@ def GetLine(instance, line):
     return cmoordyn.get_line(instance, line)
 
 
+def GetSnapshotLayout(instance):
+    """Get the layout of the whole system snapshot
+
+    The objects are sorted as follows: bodies, rods, points and lines. The
+    layout does not change along the simulation, so it is enough to get it
+    once
+
+    Parameters:
+    instance (cmoordyn.MoorDyn): The MoorDyn instance
+
+    Returns:
+    list: A tuple (type, id, offset, n_nodes) per object, with type one of
+          moordyn.OBJECT_BODY, moordyn.OBJECT_ROD, moordyn.OBJECT_POINT or
+          moordyn.OBJECT_LINE, id the index starting at 1, offset the index
+          of the first node on the snapshot and n_nodes the number of nodes
+    """
+    import cmoordyn
+    return list(cmoordyn.get_snapshot_layout(instance))
+
+
+def GetSystemSnapshot(instance, r=None, rd=None, f=None):
+    """Get the positions, velocities and forces of all the system nodes at
+    once
+
+    The nodes are sorted as reported by moordyn.GetSnapshotLayout(). For
+    bodies the reference point position and linear velocity are provided, as
+    well as the force without the moment. The forces are the net forces for
+    rods and points, and the tensions for lines (see moordyn.GetLineNodeTen())
+
+    Parameters:
+    instance (cmoordyn.MoorDyn): The MoorDyn instance
+
+    Keyword arguments:
+    r (numpy.ndarray (n_nodes, 3)): Preallocated C contiguous float64 array
+                                    for the positions. If None, a new one is
+                                    created
+    rd (numpy.ndarray (n_nodes, 3)): Preallocated C contiguous float64 array
+                                     for the velocities. If None, a new one is
+                                     created
+    f (numpy.ndarray (n_nodes, 3)): Preallocated C contiguous float64 array
+                                    for the forces. If None, a new one is
+                                    created
+
+    Returns:
+    numpy.ndarray (n_nodes, 3): The positions
+    numpy.ndarray (n_nodes, 3): The velocities
+    numpy.ndarray (n_nodes, 3): The forces
+    """
+    import cmoordyn
+    if r is None or rd is None or f is None:
+        import numpy as np
+        layout = cmoordyn.get_snapshot_layout(instance)
+        n = layout[-1][2] + layout[-1][3] if layout else 0
+        if r is None:
+            r = np.empty((n, 3))
+        if rd is None:
+            rd = np.empty((n, 3))
+        if f is None:
+            f = np.empty((n, 3))
+    cmoordyn.get_snapshot(instance, r, rd, f)
+    return r, rd, f
+
+
 def GetFASTtens(instance, n_lines):
     """Get the horizontal and vertical components of the fairlead and anchor
     tensions
@@ -576,7 +735,7 @@ def SaveVTK(instance, filename):
 #  =============================================================================
 
 
-def GetWavesKin(instance, x, y, z, t, seafloor=None):
+def GetWavesKin(instance, x, y, z, t=None, seafloor=None):
     """ Get the wave kinematics
 
     Parameters:
@@ -584,7 +743,7 @@ def GetWavesKin(instance, x, y, z, t, seafloor=None):
     x (float): The x coordinate
     y (float): The y coordinate
     z (float): The z coordinate
-    t (float): The simulation time
+    t (float): The time. If None, the current simulation time
     seafloor (cmoordyn.MoorDynSeafloor): The 3D seafloor instance
 
     Returns:
@@ -597,6 +756,41 @@ def GetWavesKin(instance, x, y, z, t, seafloor=None):
     return cmoordyn.waves_getkin(instance, x, y, z, t, seafloor)
 
 
+def GetWavesKinArray(instance, points, t=None, seafloor=None, n_threads=1):
+    """ Get the wave kinematics on a set of points
+
+    All the points are evaluated in a single native loop
+
+    Parameters:
+    instance (cmoordyn.MoorDynWaves): The waves instance
+    points (numpy.ndarray (n, 3)): The points coordinates
+    t (numpy.ndarray (n,)): The time at each point. If None, the current
+                            simulation time for all of them
+    seafloor (cmoordyn.MoorDynSeafloor): The 3D seafloor instance
+    n_threads (int): The number of threads to split the points among
+
+    Returns:
+    numpy.ndarray (n, 3): The velocities
+    numpy.ndarray (n, 3): The accelerations
+    numpy.ndarray (n,): The wave heights
+    numpy.ndarray (n,): The dynamic pressures
+    """
+    import cmoordyn
+    import numpy as np
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    if points.ndim != 2 or points.shape[1] != 3:
+        raise ValueError(
+            "points shall be a (n, 3) array, got {}".format(points.shape))
+    n = points.shape[0]
+    if t is not None:
+        t = np.ascontiguousarray(np.broadcast_to(t, (n,)), dtype=np.float64)
+    u, ud = np.empty((n, 3)), np.empty((n, 3))
+    zeta, pdyn = np.empty(n), np.empty(n)
+    cmoordyn.waves_getkin_array(
+        instance, n, points, t, u, ud, zeta, pdyn, seafloor, n_threads)
+    return u, ud, zeta, pdyn
+
+
 #                                  Seafloor.h
 #  =============================================================================
 
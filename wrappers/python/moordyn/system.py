@@ -0,0 +1,396 @@
+"""
+Copyright (c) 2022, Jose Luis Cercos-Pita <jlc@core-marine.com>
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+from .moordyn import OBJECT_LINE, OBJECT_POINT, OBJECT_ROD, OBJECT_BODY
+
+
+class _Object:
+    """Base class of the objects owned by a moordyn.System
+
+    The nodes positions, velocities and forces are taken from the system
+    snapshot, which is computed at most once per time step, even if the
+    system is integrated with the moordyn module functions
+    """
+    __slots__ = ("_system", "_capsule", "_offset", "_n_nodes")
+
+    def __init__(self, system, capsule, offset, n_nodes):
+        self._system = system
+        self._capsule = capsule
+        self._offset = offset
+        self._n_nodes = n_nodes
+
+    @property
+    def capsule(self):
+        """The underlying cmoordyn capsule, which can be passed to the
+        functions of the moordyn module
+        """
+        return self._capsule
+
+    @property
+    def r(self):
+        """The nodes positions, a (n_nodes, 3) array
+        """
+        i = self._offset
+        return self._system._get_snapshot()[0][i:i + self._n_nodes]
+
+    @property
+    def rd(self):
+        """The nodes velocities, a (n_nodes, 3) array
+        """
+        i = self._offset
+        return self._system._get_snapshot()[1][i:i + self._n_nodes]
+
+    @property
+    def f(self):
+        """The nodes forces, a (n_nodes, 3) array. See
+        moordyn.GetSystemSnapshot()
+        """
+        i = self._offset
+        return self._system._get_snapshot()[2][i:i + self._n_nodes]
+
+
+class Body(_Object):
+    """A body of a moordyn.System
+    """
+    __slots__ = ("id", "type")
+
+    def __init__(self, system, capsule, offset, n_nodes):
+        super().__init__(system, capsule, offset, n_nodes)
+        c = system._c
+        self.id = c.body_get_id(capsule)
+        self.type = c.body_get_type(capsule)
+
+    @property
+    def angle(self):
+        """The body orientation angles
+        """
+        return self._system._c.body_get_angle(self._capsule)
+
+    @property
+    def angvel(self):
+        """The body angular velocity
+        """
+        return self._system._c.body_get_angvel(self._capsule)
+
+    @property
+    def force(self):
+        """The body net force and moment
+        """
+        return self._system._c.body_get_force(self._capsule)
+
+    @property
+    def M(self):
+        """The body mass matrix
+        """
+        return self._system._c.body_get_m(self._capsule)
+
+
+class Rod(_Object):
+    """A rod of a moordyn.System
+    """
+    __slots__ = ("id", "type", "n")
+
+    def __init__(self, system, capsule, offset, n_nodes):
+        super().__init__(system, capsule, offset, n_nodes)
+        c = system._c
+        self.id = c.rod_get_id(capsule)
+        self.type = c.rod_get_type(capsule)
+        self.n = c.rod_get_n(capsule)
+
+    @property
+    def force(self):
+        """The rod net force
+        """
+        return self._system._c.rod_get_force(self._capsule)
+
+    @property
+    def M(self):
+        """The rod mass matrix
+        """
+        return self._system._c.rod_get_m(self._capsule)
+
+
+class Point(_Object):
+    """A point of a moordyn.System
+    """
+    __slots__ = ("id", "type")
+
+    def __init__(self, system, capsule, offset, n_nodes):
+        super().__init__(system, capsule, offset, n_nodes)
+        c = system._c
+        self.id = c.point_get_id(capsule)
+        self.type = c.point_get_type(capsule)
+
+    @property
+    def M(self):
+        """The point mass matrix
+        """
+        return self._system._c.point_get_m(self._capsule)
+
+    @property
+    def n_attached(self):
+        """The number of attached lines
+        """
+        return self._system._c.point_get_nattached(self._capsule)
+
+
+class Line(_Object):
+    """A line of a moordyn.System
+    """
+    __slots__ = ("id", "n")
+
+    def __init__(self, system, capsule, offset, n_nodes):
+        super().__init__(system, capsule, offset, n_nodes)
+        c = system._c
+        self.id = c.line_get_id(capsule)
+        self.n = c.line_get_n(capsule)
+
+    @property
+    def unstretched_length(self):
+        """The line unstretched length
+        """
+        return self._system._c.line_get_ulen(self._capsule)
+
+    @unstretched_length.setter
+    def unstretched_length(self, l):
+        self._system._c.line_set_ulen(self._capsule, l)
+
+    @property
+    def fairlead_tension(self):
+        """The tension magnitude at the fairlead
+        """
+        return self._system._c.line_get_fairlead_tension(self._capsule)
+
+    @property
+    def max_tension(self):
+        """The maximum tension magnitude along the line
+        """
+        return self._system._c.line_get_max_tension(self._capsule)
+
+
+class System:
+    """A MoorDyn system
+
+    This is an object oriented alternative to the functions of the moordyn
+    module. The C entry points and the objects handles are bound once, so
+    the per-call overhead is lower on tight coupling loops. The capsule
+    can still be used with the moordyn module functions:
+
+    .. code-block:: python
+
+        import numpy as np
+        import moordyn
+        with moordyn.System("Mooring/lines.txt") as system:
+            x = np.concatenate([p.r[0] for p in system.points[3:6]])
+            system.init(x, np.zeros(9))
+            f = system.step(x, np.zeros(9), 0.0, 0.1)
+            print(system.lines[0].f)
+
+    The objects are listed starting at 0, i.e. system.lines[0] is the line
+    with id 1
+    """
+    __slots__ = ("_c", "_capsule", "_step", "_snapshot", "_snapshot_counter",
+                 "n_dof", "bodies", "rods", "points", "lines")
+
+    def __init__(self, filepath=""):
+        """Create the system
+
+        Parameters:
+        filepath (str): The input file path
+        """
+        import cmoordyn
+        self._bind(cmoordyn.create(filepath))
+
+    def _bind(self, capsule):
+        """Bind the system to a cmoordyn capsule, collecting its objects
+
+        Parameters:
+        capsule (cmoordyn.MoorDyn): The MoorDyn instance
+        """
+        import cmoordyn
+        import numpy as np
+        self._c = cmoordyn
+        self._step = cmoordyn.step
+        self._capsule = capsule
+        self.n_dof = cmoordyn.n_coupled_dof(self._capsule)
+        layout = cmoordyn.get_snapshot_layout(self._capsule)
+        n_nodes = layout[-1][2] + layout[-1][3] if layout else 0
+        self._snapshot = (np.empty((n_nodes, 3)),
+                          np.empty((n_nodes, 3)),
+                          np.empty((n_nodes, 3)))
+        self._snapshot_counter = None
+        getters = {OBJECT_BODY: (cmoordyn.get_body, Body),
+                   OBJECT_ROD: (cmoordyn.get_rod, Rod),
+                   OBJECT_POINT: (cmoordyn.get_point, Point),
+                   OBJECT_LINE: (cmoordyn.get_line, Line)}
+        objs = {obj_type: [] for obj_type in getters}
+        for obj_type, obj_id, offset, n in layout:
+            getter, cls = getters[obj_type]
+            objs[obj_type].append(
+                cls(self, getter(self._capsule, obj_id), offset, n))
+        self.bodies = tuple(objs[OBJECT_BODY])
+        self.rods = tuple(objs[OBJECT_ROD])
+        self.points = tuple(objs[OBJECT_POINT])
+        self.lines = tuple(objs[OBJECT_LINE])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def capsule(self):
+        """The underlying cmoordyn capsule, which can be passed to the
+        functions of the moordyn module
+        """
+        return self._capsule
+
+    def _get_snapshot(self):
+        """Get the system snapshot, computing it just if the system has
+        changed since the last call
+
+        The changes are tracked by cmoordyn, so they are detected even if
+        the capsule is passed to the moordyn module functions
+
+        Returns:
+        tuple: The positions, velocities and forces arrays
+        """
+        counter = self._c.get_state_counter(self._capsule)
+        if counter != self._snapshot_counter:
+            self._c.get_snapshot(self._capsule, *self._snapshot)
+            self._snapshot_counter = counter
+        return self._snapshot
+
+    def snapshot(self):
+        """Get the positions, velocities and forces of all the nodes
+
+        See moordyn.GetSystemSnapshot(). The returned arrays are owned by
+        the system, and are overwritten after each time step
+
+        Returns:
+        numpy.ndarray (n_nodes, 3): The positions
+        numpy.ndarray (n_nodes, 3): The velocities
+        numpy.ndarray (n_nodes, 3): The forces
+        """
+        return self._get_snapshot()
+
+    def init(self, x, v, skip_ic=False):
+        """Initializes the system
+
+        Parameters:
+        x (numpy.ndarray): Position of the coupled points
+        v (numpy.ndarray): Velocity of the coupled points
+        skip_ic (bool): True to skip the initial condition computation, e.g.
+                        if the state is loaded afterwards
+
+        Returns:
+        int: 0 uppon success, an error code otherwise
+        """
+        return self._c.init(self._capsule, x, v, 1 if skip_ic else 0)
+
+    def step(self, x, v, t, dt, out=None):
+        """Compute a time step
+
+        See moordyn.Step()
+
+        Parameters:
+        x (numpy.ndarray): Position of the coupled points
+        v (numpy.ndarray): Velocity of the coupled points
+        t (float): The time instant
+        dt (float): The time step
+
+        Keyword arguments:
+        out (numpy.ndarray): A preallocated array for the forces
+
+        Returns:
+        list: The forces acting on the coupled points
+        """
+        return self._step(self._capsule, x, v, t, dt, out)
+
+    def step_many(self, x, v, t0, dt, out=None):
+        """Compute several consecutive time steps along a prescribed
+        trajectory
+
+        See moordyn.StepMany()
+
+        Parameters:
+        x (numpy.ndarray (n, n_dof)): Position of the coupled points
+        v (numpy.ndarray (n, n_dof)): Velocity of the coupled points
+        t0 (float): The initial time instant
+        dt (float): The time step
+
+        Keyword arguments:
+        out (numpy.ndarray (n, n_dof)): A preallocated array for the forces
+
+        Returns:
+        numpy.ndarray (n, n_dof): The forces after each time step
+        """
+        from .moordyn import StepMany
+        return StepMany(self._capsule, x, v, t0, dt, out=out)
+
+    def clone(self):
+        """Clone the system, which shall be already initialized
+
+        See moordyn.Clone()
+
+        Returns:
+        moordyn.System: The cloned system, with the same state
+        """
+        cloned = System.__new__(System)
+        cloned._bind(self._c.clone(self._capsule))
+        return cloned
+
+    def save(self, filepath):
+        """Save the system state into a file
+
+        Parameters:
+        filepath (str): The file path
+        """
+        self._c.save(self._capsule, filepath)
+
+    def load(self, filepath):
+        """Load the system state from a file
+
+        Parameters:
+        filepath (str): The file path
+        """
+        self._c.load(self._capsule, filepath)
+
+    def close(self):
+        """Deallocates the system
+
+        Returns:
+        int: 0 uppon success, an error code otherwise
+        """
+        if self._capsule is None:
+            return 0
+        err = self._c.close(self._capsule)
+        self._capsule = None
+        return err